@@ -0,0 +1,448 @@
+"""polyfuseql.benchmark.Bench
+~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Throughput and latency of the :class:`PolyClient` read paths::
+
+    python -m polyfuseql.benchmark --stack fake --out bench.json
+    python -m polyfuseql.benchmark --stack real --baseline bench.json
+
+Each case (``get``, ``query``, ``count`` and ``batch``, i.e.
+``get_many``) runs against every backend, either on the docker-compose
+stack (``real``) or on in-process stand-ins (``fake``:
+:class:`InMemoryConnector` with an optional simulated round trip, and the
+real :class:`RedisConnector` over ``fakeredis`` when it is installed).
+Per case the report gives ops/s, the p50 / p95 / p99 latency and the
+split of the mean latency between the backend (time spent awaiting the
+connector, measured by :class:`TimedConnector`) and the router (all the
+rest: parsing, planning, caching, result assembly).  Reports are JSON;
+``--baseline`` compares with one saved from another commit and exits
+non-zero on a regression.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import contextvars
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Sequence,
+    Tuple,
+)
+
+from polyfuseql.benchmark.InMemory import InMemoryConnector
+from polyfuseql.client.PolyClient import PolyClient
+
+__all__ = [
+    "CASES",
+    "TARGETS",
+    "TimedConnector",
+    "compare",
+    "main",
+    "run",
+]
+
+CASES = ("get", "query", "count", "batch")
+
+
+class Target(NamedTuple):
+    """What a backend is benchmarked on (keys present on the real
+    stack, seeded into the fake one)."""
+
+    backend: str  # name accepted by PolyClient.get / count
+    entity: str
+    pk: str
+    keys: Tuple[str, ...]
+
+
+TARGETS = (
+    Target(
+        "pg",
+        "products",
+        "productId",
+        tuple(str(i) for i in range(1, 78)),
+    ),
+    Target(
+        "redis",
+        "Customer",
+        "customerId",
+        tuple(f"{i}:string" for i in range(1, 11)),
+    ),
+    Target(
+        "neo4j",
+        "customer",
+        "customerId",
+        (
+            "ALFKI",
+            "ANATR",
+            "ANTON",
+            "AROUT",
+            "BERGS",
+            "BLAUS",
+            "BLONP",
+            "BOLID",
+            "BONAP",
+            "BOTTM",
+        ),
+    ),
+)
+
+# backend name → (PolyClient attribute, names in PolyClient.backends)
+_SLOTS = {
+    "pg": ("pg", ("pg", "postgres")),
+    "redis": ("rd", ("redis",)),
+    "neo4j": ("nj", ("neo4j",)),
+}
+
+#: backend seconds of the running operation (one list per operation)
+_backend_time: contextvars.ContextVar[List[float] | None]
+_backend_time = contextvars.ContextVar("backend_time", default=None)
+
+
+def _charge(seconds: float) -> None:
+    spent = _backend_time.get()
+    if spent is not None:
+        spent[0] += seconds
+
+
+class TimedConnector:
+    """Proxy of a connector charging the time spent awaiting its reads
+    to the operation being measured; everything else is delegated."""
+
+    def __init__(self, conn) -> None:
+        self._conn = conn
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    @staticmethod
+    async def _timed(call: Awaitable) -> Any:
+        started = time.perf_counter()
+        try:
+            return await call
+        finally:
+            _charge(time.perf_counter() - started)
+
+    def ping(self):
+        return self._timed(self._conn.ping())
+
+    def count(self, *args, **kwargs):
+        return self._timed(self._conn.count(*args, **kwargs))
+
+    def get(self, *args, **kwargs):
+        return self._timed(self._conn.get(*args, **kwargs))
+
+    def get_many(self, *args, **kwargs):
+        return self._timed(self._conn.get_many(*args, **kwargs))
+
+    async def scan(self, *args, **kwargs):
+        source = self._conn.scan(*args, **kwargs)
+        async with contextlib.aclosing(source) as batches:
+            while True:
+                started = time.perf_counter()
+                try:
+                    batch = await batches.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    _charge(time.perf_counter() - started)
+                yield batch
+
+
+def install(client: PolyClient, backend: str, conn) -> None:
+    """Make *conn*, timed, serve *backend* in *client*."""
+    attr, names = _SLOTS[backend]
+    timed = TimedConnector(conn)
+    setattr(client, attr, timed)
+    for name in names:
+        client.backends[name] = timed
+
+
+def _rows(target: Target) -> List[Dict[str, Any]]:
+    """Synthetic rows shaped like the Northwind ones."""
+    return [
+        {
+            target.pk: key,
+            "companyName": f"{target.entity} {key}",
+            "contactName": f"Contact {i}",
+            "city": ("Berlin", "London", "México D.F.")[i % 3],
+            "country": ("Germany", "UK", "Mexico")[i % 3],
+            "unitPrice": round(10 + i * 1.25, 2),
+            "unitsInStock": i * 3,
+            "discontinued": i % 7 == 0,
+        }
+        for i, key in enumerate(target.keys)
+    ]
+
+
+async def _fake_redis(target: Target):
+    """:class:`RedisConnector` over ``fakeredis`` (``None`` when the
+    package is not installed)."""
+    try:
+        import fakeredis
+    except ImportError:
+        return None
+    from polyfuseql.connector.Redis import RedisConnector
+
+    conn = RedisConnector({"data_type": "string"})
+    conn._client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    for row in _rows(target):
+        key = f"{target.entity}:{row[target.pk]}"
+        await conn._client.set(key, json.dumps(row))
+    return conn
+
+
+async def fake_client(latency: float = 0.0) -> Tuple[PolyClient, Dict]:
+    """A client whose backends are in-process stand-ins, and the kind of
+    stand-in serving each backend."""
+    client = PolyClient()
+    kinds = {}
+    for target in TARGETS:
+        conn = None
+        if target.backend == "redis" and not latency:
+            conn = await _fake_redis(target)
+        if conn is None:
+            conn = InMemoryConnector({"latency": latency})
+            conn.load(target.entity, _rows(target), target.pk)
+        kinds[target.backend] = type(conn).__name__
+        install(client, target.backend, conn)
+    return client, kinds
+
+
+async def real_client() -> Tuple[PolyClient, Dict]:
+    client = PolyClient()
+    kinds = {}
+    for target in TARGETS:
+        attr, _ = _SLOTS[target.backend]
+        conn = getattr(client, attr)
+        kinds[target.backend] = type(conn).__name__
+        install(client, target.backend, conn)
+    await client.open()
+    return client, kinds
+
+
+def _operation(
+    client: PolyClient, case: str, target: Target, batch: int
+) -> Callable[[int], Awaitable]:
+    """The *i*-th call of *case* on *target* (keys are cycled)."""
+    keys, backend = target.keys, target.backend
+
+    def key(i: int) -> str:
+        return keys[i % len(keys)]
+
+    if case == "get":
+        return lambda i: client.get(target.entity, key(i), backend)
+    if case == "query":
+        sql = f"SELECT * FROM {target.entity} WHERE {target.pk} = ?"
+        return lambda i: client.query(sql, engine=backend, params=[key(i)])
+    if case == "count":
+        return lambda i: client.count(target.entity, backend)
+    if case == "batch":
+        size = min(batch, len(keys))
+        return lambda i: client.get_many(
+            target.entity,
+            [key(i + j) for j in range(size)],
+            backend,
+        )
+    raise ValueError(f"Unknown case: {case}")
+
+
+def percentile(ordered: Sequence[float], q: float) -> float:
+    """Nearest-rank *q*-th percentile of the sorted *ordered*."""
+    if not ordered:
+        return math.nan
+    rank = math.ceil(q / 100 * len(ordered))
+    return ordered[max(0, rank - 1)]
+
+
+async def measure(
+    op: Callable[[int], Awaitable],
+    ops: int,
+    concurrency: int = 1,
+    warmup: int = 10,
+) -> Dict[str, float]:
+    """Run *op* *ops* times from *concurrency* workers, after *warmup*
+    untimed calls (plan and connection caches filled)."""
+    for i in range(warmup):
+        await op(i)
+    latencies = [0.0] * ops
+    backend = [0.0] * ops
+    pending = iter(range(ops))
+
+    async def worker() -> None:
+        for i in pending:
+            spent = [0.0]
+            _backend_time.set(spent)
+            started = time.perf_counter()
+            await op(i)
+            latencies[i] = time.perf_counter() - started
+            backend[i] = spent[0]
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    ordered = sorted(latencies)
+    router = [max(0.0, t - b) for t, b in zip(latencies, backend)]
+    ms = 1000 / max(1, ops)
+    return {
+        "ops": ops,
+        "seconds": wall,
+        "ops_per_s": ops / wall if wall else math.inf,
+        "mean_ms": sum(latencies) * ms,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "router_ms": sum(router) * ms,
+        "backend_ms": sum(backend) * ms,
+    }
+
+
+def _commit() -> str | None:
+    try:
+        done = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return done.stdout.strip()
+
+
+async def run(
+    stack: str = "fake",
+    ops: int = 1000,
+    concurrency: int = 1,
+    warmup: int = 10,
+    cases: Sequence[str] = CASES,
+    backends: Sequence[str] | None = None,
+    batch: int = 50,
+    latency: float = 0.0,
+) -> Dict[str, Any]:
+    """Benchmark *cases* × *backends* → the JSON report (results keyed
+    ``"<case>/<backend>"``; a failing case reports its ``error``)."""
+    if stack == "fake":
+        client, kinds = await fake_client(latency)
+    elif stack == "real":
+        client, kinds = await real_client()
+    else:
+        raise ValueError(f"Unknown stack: {stack}")
+    targets = [t for t in TARGETS if not backends or t.backend in backends]
+    results = {}
+    try:
+        for case in cases:
+            for target in targets:
+                op = _operation(client, case, target, batch)
+                name = f"{case}/{target.backend}"
+                try:
+                    results[name] = await measure(op, ops, concurrency, warmup)
+                except Exception as exc:  # report it, run the rest
+                    results[name] = {"error": repr(exc)}
+    finally:
+        await client.aclose()
+    meta = {
+        "stack": stack,
+        "connectors": kinds,
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "timestamp": time.time(),
+        "ops": ops,
+        "concurrency": concurrency,
+        "batch": batch,
+        "latency": latency,
+    }
+    return {"meta": meta, "results": results}
+
+
+def compare(
+    baseline: Dict[str, Any],
+    report: Dict[str, Any],
+    tolerance: float = 0.10,
+) -> List[str]:
+    """Regressions of *report* against *baseline*: cases whose ops/s
+    dropped, or p99 grew, by more than *tolerance*."""
+    found = []
+    for name, new in report["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if not old or "error" in old or "error" in new:
+            continue
+        before, after = old["ops_per_s"], new["ops_per_s"]
+        if after < before * (1 - tolerance):
+            found.append(f"{name}: {before:.0f} → {after:.0f} ops/s")
+        before, after = old["p99_ms"], new["p99_ms"]
+        if after > before * (1 + tolerance):
+            found.append(f"{name}: p99 {before:.3f} → {after:.3f} ms")
+    return found
+
+
+def render(report: Dict[str, Any]) -> str:
+    head = (
+        f"{'case':<14}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+        f"{'p99 ms':>10}{'router ms':>11}{'backend ms':>12}"
+    )
+    lines = [head]
+    for name, r in report["results"].items():
+        if "error" in r:
+            lines.append(f"{name:<14}  {r['error']}")
+            continue
+        lines.append(
+            f"{name:<14}{r['ops_per_s']:>10.0f}{r['p50_ms']:>10.3f}"
+            f"{r['p95_ms']:>10.3f}{r['p99_ms']:>10.3f}"
+            f"{r['router_ms']:>11.3f}{r['backend_ms']:>12.3f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m polyfuseql.benchmark")
+    parser.add_argument("--stack", choices=("fake", "real"), default="fake")
+    parser.add_argument("--ops", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--case", action="append", choices=CASES)
+    parser.add_argument("--backend", action="append", choices=list(_SLOTS))
+    parser.add_argument("--batch", type=int, default=50)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="simulated round trip of the fake stores, in seconds",
+    )
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--baseline", help="JSON report to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(
+        run(
+            args.stack,
+            args.ops,
+            args.concurrency,
+            args.warmup,
+            args.case or CASES,
+            args.backend,
+            args.batch,
+            args.latency,
+        )
+    )
+    print(render(report))
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump(report, fh, indent=2)
+    if args.baseline:
+        with open(args.baseline) as fh:
+            regressions = compare(json.load(fh), report, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
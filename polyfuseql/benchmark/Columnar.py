@@ -0,0 +1,118 @@
+"""polyfuseql.benchmark.Columnar
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Rows/s of a large products scan as row dicts and as Arrow batches::
+
+    python -m polyfuseql.benchmark.Columnar --rows 200000
+
+``decode/*`` time the Postgres decoding step alone over tuples standing
+for asyncpg records, a ``--batch`` of them per cursor fetch: ``dicts``
+builds a dict per row (:meth:`RowShape.rows`), ``dicts>arrow`` then
+turns them into a table the way a DataFrame consumer of the dict path
+has to, ``arrow`` builds the record batches from the columns
+(:meth:`RowShape.columns`) and ``arrow+ipc`` also writes them out as an
+Arrow IPC stream.  ``scan/*`` run the whole client path over an
+in-memory products table: :meth:`PolyClient.stream` (and a table made
+of its rows) against :meth:`PolyClient.stream_arrow`.  The Arrow cases
+only run when ``pyarrow`` is installed.
+"""
+
+import argparse
+import asyncio
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Sequence
+
+from polyfuseql.benchmark.InMemory import InMemoryConnector
+from polyfuseql.benchmark.Rows import COLUMNS, _rate, _records
+from polyfuseql.client import Arrow
+from polyfuseql.client.PolyClient import PolyClient
+from polyfuseql.connector.RowShape import RowShape
+
+SQL = "SELECT * FROM products"
+
+
+def _fetches(records: List[tuple], batch: int) -> List[List[tuple]]:
+    fetches = []
+    for start in range(0, len(records), batch):
+        end = start + batch
+        fetches.append(records[start:end])
+    return fetches
+
+
+def _client(records: List[tuple], shape: RowShape) -> PolyClient:
+    client = PolyClient()
+    conn = InMemoryConnector()
+    conn.load("products", shape.rows(records), "productId")
+    client.pg = client.backends["pg"] = client.backends["postgres"] = conn
+    client._catalogue["products"] = ("postgres", "productId")
+    return client
+
+
+def _drain(
+    client: PolyClient, stream: str, batch: int, table: bool = False
+) -> Callable[[], Any]:
+    """Read :data:`SQL` through *stream*; with *table*, into a table."""
+
+    async def read() -> Any:
+        items = getattr(client, stream)(SQL, batch_size=batch)
+        found = [item async for item in items]
+        if not table:
+            return found
+        if stream == "stream_arrow":
+            return Arrow.table(found)
+        return Arrow.pa.Table.from_pylist(found)
+
+    return lambda: asyncio.run(read())
+
+
+def run(
+    rows: int = 100000,
+    batch: int = 1000,
+    repeat: int = 3,
+) -> Dict[str, float]:
+    """Rows/s of each path over *rows* product rows."""
+    records = _records(rows)
+    fetches = _fetches(records, batch)
+    attrs = [
+        SimpleNamespace(name=name, type=SimpleNamespace(name=kind))
+        for name, kind in COLUMNS
+    ]
+    shape = RowShape(attrs, camelize=True)
+
+    def arrow() -> List[Any]:
+        return [Arrow.record_batch(shape.columns(f)) for f in fetches]
+
+    cases: Dict[str, Callable[[], Any]] = {
+        "decode/dicts": lambda: [shape.rows(f) for f in fetches],
+    }
+    if Arrow.pa is not None:
+        cases["decode/dicts>arrow"] = lambda: Arrow.pa.Table.from_pylist(
+            [row for f in fetches for row in shape.rows(f)]
+        )
+        cases["decode/arrow"] = arrow
+        cases["decode/arrow+ipc"] = lambda: Arrow.to_ipc(Arrow.table(arrow()))
+    client = _client(records, shape)
+    cases["scan/dicts"] = _drain(client, "stream", batch)
+    if Arrow.pa is not None:
+        cases["scan/dicts>arrow"] = _drain(client, "stream", batch, True)
+        cases["scan/arrow"] = _drain(client, "stream_arrow", batch, True)
+    return {name: _rate(step, rows, repeat) for name, step in cases.items()}
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    prog = "python -m polyfuseql.benchmark.Columnar"
+    parser = argparse.ArgumentParser(prog=prog)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+    rates = run(args.rows, args.batch, args.repeat)
+    if Arrow.pa is None:
+        print("pyarrow is not installed: only the dict paths ran")
+    print(f"{'path':<20}{'rows/s':>12}")
+    for name, rate in rates.items():
+        print(f"{name:<20}{rate:>12.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
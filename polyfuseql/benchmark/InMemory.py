@@ -0,0 +1,116 @@
+"""polyfuseql.benchmark.InMemory
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+In-process stand-in for a store: a :class:`Connector` over Python dicts,
+with an optional simulated round trip per call.  The benchmark runs
+:class:`PolyClient` on top of it to measure the router on its own; the
+tests can use it wherever a real backend is not needed.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, Iterable, List, Sequence
+
+from polyfuseql.connector import Predicate as P
+from polyfuseql.connector.Connector import Connector, Projection
+from polyfuseql.utils.utils import project
+
+Row = Dict[str, Any]
+
+
+class InMemoryConnector(Connector):
+    """Entities kept as ``{entity: {pk: row}}``.
+
+    *latency* (seconds, ``options["latency"]``) is slept once per call,
+    standing for the network round trip of a real store.
+    """
+
+    def __init__(self, options: Dict = None) -> None:
+        super().__init__(options)
+        self.latency = float(self._options.get("latency", 0.0))
+        self.max_batch_size = self._setting(
+            "max_batch_size", "POLYFUSEQL_MAX_BATCH_SIZE", 500, int
+        )
+        self._entities: Dict[str, Dict[str, Row]] = {}
+
+    def load(self, entity: str, rows: Iterable[Row], pk: str) -> None:
+        """Store *rows* under *entity*, keyed on their *pk* field."""
+        table = self._entities.setdefault(entity, {})
+        for row in rows:
+            table[str(row[pk])] = dict(row)
+
+    async def _round_trip(self) -> None:
+        await asyncio.sleep(self.latency)
+
+    @staticmethod
+    def _project(row: Row, columns: Projection | None) -> Row:
+        return dict(row) if columns is None else project(row, columns)
+
+    async def ping(self) -> bool:
+        await self._round_trip()
+        return True
+
+    async def count(self, entity: str) -> int:
+        await self._round_trip()
+        return len(self._entities.get(entity, {}))
+
+    async def get(
+        self, entity: str, pk: str, columns: Projection | None = None
+    ) -> Dict[str, Any]:
+        await self._round_trip()
+        row = self._entities.get(entity, {}).get(str(pk))
+        return self._project(row, columns) if row is not None else {}
+
+    async def get_many(
+        self,
+        entity: str,
+        pks: Sequence[str],
+        columns: Projection | None = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        await self._round_trip()
+        table = self._entities.get(entity, {})
+        found = (str(pk) for pk in pks if str(pk) in table)
+        return {pk: self._project(table[pk], columns) for pk in found}
+
+    async def scan(
+        self,
+        entity: str,
+        batch_size: int | None = None,
+        columns: Projection | None = None,
+        where: P.Predicate | None = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        size = batch_size or self.scan_batch_size
+        rows = list(self._entities.get(entity, {}).values())
+        for start in range(0, len(rows), size):
+            await self._round_trip()
+            end = start + size
+            batch = P.keep(rows[start:end], where, columns, None)
+            if batch:
+                yield batch
+
+    async def insert(
+        self,
+        entity: str,
+        rows: Sequence[Row],
+        pk: str,
+    ) -> int:
+        await self._round_trip()
+        self.load(entity, rows, pk)
+        return len(rows)
+
+    async def update(
+        self,
+        entity: str,
+        pks: Sequence[str],
+        changes: Row,
+        pk: str,
+    ) -> int:
+        await self._round_trip()
+        table = self._entities.get(entity, {})
+        found = [table[str(key)] for key in pks if str(key) in table]
+        for row in found:
+            row.update(changes)
+        return len(found)
+
+    async def delete(self, entity: str, pks: Sequence[str], pk: str) -> int:
+        await self._round_trip()
+        table = self._entities.get(entity, {})
+        return sum(table.pop(str(key), None) is not None for key in pks)
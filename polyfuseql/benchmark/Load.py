@@ -0,0 +1,72 @@
+"""polyfuseql.benchmark.Load
+~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Locust load profile of the HTTP service (:mod:`polyfuseql.service`)::
+
+    python -m polyfuseql.service --workers 4 &
+    locust -f polyfuseql/benchmark/Load.py --host http://127.0.0.1:8000 \\
+        --headless --users 200 --spawn-rate 50 --run-time 1m
+
+Users mix point lookups, batches, SQL queries and counts on the Northwind
+products.  Half of the lookups hit a few hot keys, so identical requests
+overlap and the service has something to coalesce.  Besides the Locust
+report, the run ends with the requests/s each worker served (from the
+``X-Worker`` response header).
+"""
+
+import collections
+import random
+import time
+
+from locust import HttpUser, between, events, task
+
+PRODUCTS = [str(pk) for pk in range(1, 78)]
+HOT = PRODUCTS[:5]
+
+_served: collections.Counter = collections.Counter()
+_started = [time.perf_counter()]
+
+
+def _product() -> str:
+    return random.choice(HOT if random.random() < 0.5 else PRODUCTS)
+
+
+@events.test_start.add_listener
+def _start(**kwargs) -> None:
+    _served.clear()
+    _started[0] = time.perf_counter()
+
+
+@events.request.add_listener
+def _count(response=None, exception=None, **kwargs) -> None:
+    if exception is None and response is not None:
+        _served[response.headers.get("X-Worker", "?")] += 1
+
+
+@events.test_stop.add_listener
+def _report(**kwargs) -> None:
+    elapsed = time.perf_counter() - _started[0]
+    print(f"{'worker':<10}{'requests':>10}{'req/s':>10}")
+    for worker, n in sorted(_served.items()):
+        print(f"{worker:<10}{n:>10}{n / elapsed:>10.0f}")
+
+
+class ServiceUser(HttpUser):
+    wait_time = between(0, 0.01)
+
+    @task(6)
+    def get(self) -> None:
+        self.client.get(f"/get/products/{_product()}", name="/get")
+
+    @task(2)
+    def get_many(self) -> None:
+        pks = random.sample(PRODUCTS, 10)
+        self.client.post("/get_many", json={"table": "products", "pks": pks})
+
+    @task(3)
+    def query(self) -> None:
+        sql = "SELECT * FROM products WHERE productId = ?"
+        self.client.post("/query", json={"sql": sql, "params": [_product()]})
+
+    @task(1)
+    def count(self) -> None:
+        self.client.get("/count/products", name="/count")
@@ -0,0 +1,103 @@
+"""polyfuseql.benchmark.Rows
+~~~~~~~~~~~~~~~~~~~~~~~~~~
+Rows/s of the row normalization step alone, before and after
+:class:`RowShape`::
+
+    python -m polyfuseql.benchmark.Rows --rows 20000
+
+``postgres/json`` is the former path (``row_to_json`` text parsed and
+camelized with a regex per key), ``postgres/record`` the native-record
+one (tuples standing for asyncpg records).  ``redis/json`` and
+``redis/orjson`` decode the string values Redis returns; the latter only
+runs when ``orjson`` is installed.
+"""
+
+import argparse
+import json
+import re
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Sequence
+
+from polyfuseql.connector.RowShape import RowShape
+from polyfuseql.utils import utils
+
+# northwind ``products``: name and Postgres type of each column
+COLUMNS = (
+    ("product_id", "int2"),
+    ("product_name", "varchar"),
+    ("supplier_id", "int2"),
+    ("category_id", "int2"),
+    ("quantity_per_unit", "varchar"),
+    ("unit_price", "float4"),
+    ("units_in_stock", "int2"),
+    ("units_on_order", "int2"),
+    ("reorder_level", "int2"),
+    ("discontinued", "int4"),
+)
+
+
+def _records(n: int) -> List[tuple]:
+    pack, price, stock = "10 boxes x 20 bags", 18.25, (39, 0, 10, 0)
+    rows = []
+    for i in range(n):
+        rows.append((i, f"Product {i}", i % 29, i % 8, pack, price, *stock))
+    return rows
+
+
+def _legacy(doc: str) -> Dict[str, Any]:
+    """The former per-row decoding: parse, then one regex per key."""
+
+    def camel(s: str) -> str:
+        return re.sub(r"_([a-z])", lambda m: m.group(1).upper(), s)
+
+    return {camel(k): v for k, v in json.loads(doc).items()}
+
+
+def _rate(step: Callable[[], Any], rows: int, repeat: int) -> float:
+    """Best rows/s of *repeat* runs of *step* (which handles *rows*)."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        step()
+        best = min(best, time.perf_counter() - started)
+    return rows / best
+
+
+def run(rows: int = 10000, repeat: int = 5) -> Dict[str, float]:
+    """Rows/s of each decoding path over *rows* product rows."""
+    records = _records(rows)
+    names = [name for name, _ in COLUMNS]
+    docs = [json.dumps(dict(zip(names, r))) for r in records]
+    keys = [utils.camel_key(name) for name in names]
+    blobs = [json.dumps(dict(zip(keys, r))) for r in records]
+    attrs = [
+        SimpleNamespace(name=name, type=SimpleNamespace(name=kind))
+        for name, kind in COLUMNS
+    ]
+    shape = RowShape(attrs, camelize=True)
+    cases = {
+        "postgres/json": lambda: [_legacy(d) for d in docs],
+        "postgres/record": lambda: shape.rows(records),
+        "redis/json": lambda: [json.loads(b) for b in blobs],
+    }
+    if utils.orjson is not None:
+        cases["redis/orjson"] = lambda: [utils.orjson.loads(b) for b in blobs]
+    return {name: _rate(step, rows, repeat) for name, step in cases.items()}
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    prog = "python -m polyfuseql.benchmark.Rows"
+    parser = argparse.ArgumentParser(prog=prog)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    rates = run(args.rows, args.repeat)
+    print(f"{'path':<18}{'rows/s':>12}")
+    for name, rate in rates.items():
+        print(f"{name:<18}{rate:>12.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
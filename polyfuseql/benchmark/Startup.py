@@ -0,0 +1,75 @@
+"""polyfuseql.benchmark.Startup
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Cold start of a worker, each sample in a fresh interpreter::
+
+    python -m polyfuseql.benchmark.Startup --repeat 10
+
+``import`` times ``from polyfuseql.client.PolyClient import PolyClient``,
+``construct`` a ``PolyClient()`` and ``first use`` creating the
+connector of ``--backend`` (the only one a Redis-only worker builds).
+The drivers column lists which of asyncpg, redis and neo4j the process
+had imported by then: connectors, and so drivers, are loaded on first
+use of their backend (see :mod:`polyfuseql.connector.ConnectorFactory`).
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Sequence
+
+DRIVERS = ("asyncpg", "redis", "neo4j")
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from polyfuseql.client.PolyClient import PolyClient
+imported = time.perf_counter()
+client = PolyClient()
+built = time.perf_counter()
+client.backends[sys.argv[1]]
+used = time.perf_counter()
+print(json.dumps({
+    "import": imported - started,
+    "construct": built - imported,
+    "first use": used - built,
+    "drivers": [m for m in %r if m in sys.modules],
+}))
+""" % (DRIVERS,)
+
+
+def _sample(backend: str) -> Dict:
+    cmd = [sys.executable, "-c", _PROBE, backend]
+    out = subprocess.run(cmd, capture_output=True, check=True, text=True)
+    return json.loads(out.stdout)
+
+
+def run(backend: str = "redis", repeat: int = 5) -> Dict[str, float | List]:
+    """Median seconds of each step over *repeat* fresh interpreters."""
+    samples = [_sample(backend) for _ in range(repeat)]
+    steps = ("import", "construct", "first use")
+    result: Dict[str, float | List] = {
+        step: statistics.median(s[step] for s in samples) for step in steps
+    }
+    result["drivers"] = samples[-1]["drivers"]
+    return result
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    prog = "python -m polyfuseql.benchmark.Startup"
+    parser = argparse.ArgumentParser(prog=prog)
+    parser.add_argument("--backend", default="redis")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    result = run(args.backend, args.repeat)
+    drivers = result.pop("drivers")
+    print(f"{'step':<12}{'ms':>10}")
+    for step, seconds in result.items():
+        print(f"{step:<12}{seconds * 1000:>10.1f}")
+    print(f"drivers imported: {', '.join(drivers) or 'none'}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,5 @@
+import sys
+
+from polyfuseql.benchmark.Bench import main
+
+sys.exit(main())
@@ -0,0 +1,95 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+def _approx_size(value: Any) -> int:
+    """Serialized size of *value*, used for the byte bound."""
+    return len(json.dumps(value, default=str))
+
+
+class LRUCache:
+    """In-process LRU bounded by entry count and (approximate) bytes, with
+    an optional time-to-live per entry."""
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        max_bytes: int | None = None,
+        ttl: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._clock = clock
+        # key → (value, expires_at | None, size)
+        self._entries: OrderedDict[Hashable, Tuple[Any, float | None, int]]
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        value, expires_at, _ = entry
+        if expires_at is not None and expires_at <= self._clock():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._remove(key)
+        size = 0
+        if self._max_bytes is not None:
+            size = _approx_size(value)
+            if size > self._max_bytes:
+                return  # would evict everything and still not fit
+        expires_at = self._clock() + self._ttl if self._ttl else None
+        self._entries[key] = (value, expires_at, size)
+        self._bytes += size
+        while len(self._entries) > self._max_entries or (
+            self._max_bytes is not None and self._bytes > self._max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        self._remove(key)
+
+    def delete_where(self, predicate: Callable[[Hashable, Any], bool]) -> None:
+        """Remove every entry for which ``predicate(key, value)`` holds."""
+        doomed = [k for k, e in self._entries.items() if predicate(k, e[0])]
+        for key in doomed:
+            self._remove(key)
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,64 @@
+import json
+from typing import TYPE_CHECKING, Any, Dict, Hashable, List, Sequence, Tuple
+
+if TYPE_CHECKING:  # the cache does not import the redis driver itself
+    from polyfuseql.connector.Redis import RedisConnector
+
+PREFIX = "polyfuseql:cache"
+
+
+def _glob_escape(text: str) -> str:
+    return "".join(f"\\{ch}" if ch in "*?[]\\" else ch for ch in text)
+
+
+def _glob_nocase(text: str) -> str:
+    return "".join(
+        f"[{ch.lower()}{ch.upper()}]" if ch.isalpha() else _glob_escape(ch)
+        for ch in text
+    )
+
+
+class RedisCache:
+    """Shared L2 result cache stored in Redis through a
+    :class:`RedisConnector` (JSON values, ``SET … EX ttl``)."""
+
+    def __init__(self, connector: "RedisConnector", ttl: float | None = None):
+        self._connector = connector
+        self._ttl = int(ttl) if ttl else None
+
+    @staticmethod
+    def _key(key: Tuple[Hashable, ...]) -> str:
+        return ":".join([PREFIX, *map(str, key)])
+
+    async def get_many(
+        self, keys: Sequence[Tuple[Hashable, ...]]
+    ) -> Dict[Tuple[Hashable, ...], Any]:
+        async with self._connector._redis() as r:
+            raws = await r.mget([self._key(k) for k in keys])
+        return {k: json.loads(raw) for k, raw in zip(keys, raws) if raw}
+
+    async def set_many(self, items: Dict[Tuple[Hashable, ...], Any]) -> None:
+        if not items:
+            return
+        async with self._connector._redis() as r:
+            pipe = r.pipeline(transaction=False)
+            for key, value in items.items():
+                payload = json.dumps(value, default=str)
+                pipe.set(self._key(key), payload, ex=self._ttl)
+            await pipe.execute()
+
+    async def invalidate(self, table: str, pk: str | None = None) -> None:
+        """Drop every backend's entries for *table* (and *pk*)."""
+        parts: List[str] = [_glob_escape(PREFIX), "*", _glob_nocase(table)]
+        if pk is not None:
+            parts.append(_glob_escape(str(pk)))
+        pattern = ":".join(parts + ["*"])
+        async with self._connector._redis() as r:
+            batch = []
+            async for key in r.scan_iter(match=pattern, count=1000):
+                batch.append(key)
+                if len(batch) >= 1000:
+                    await r.unlink(*batch)
+                    batch.clear()
+            if batch:
+                await r.unlink(*batch)
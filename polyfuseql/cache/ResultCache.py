@@ -0,0 +1,143 @@
+"""polyfuseql.cache.ResultCache
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Read-through cache in front of the connectors.
+
+Entries are keyed on ``(backend, entity, pk, projection)``.  Lookups go to
+the in-process :class:`LRUCache` first, then to the optional shared
+:class:`RedisCache` (L2), and only then to the backend.  Concurrent misses
+for the same key are coalesced into one backend fetch (single flight); the
+waiters share its error, but when the fetching task is cancelled they
+fetch the keys themselves.  A fetch that overlaps an invalidation of its
+table is not cached.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Tuple
+
+from polyfuseql.cache.LRUCache import LRUCache
+from polyfuseql.cache.RedisCache import RedisCache
+
+# (backend, entity, pk, projection)
+CacheKey = Tuple[str, str, str, str]
+Loader = Callable[[List[CacheKey]], Awaitable[Dict[CacheKey, Dict]]]
+
+_MISS = object()
+_RETRY = object()  # the fetch a waiter joined was cancelled
+
+
+class ResultCache:
+    def __init__(self, l1: LRUCache, l2: RedisCache | None = None) -> None:
+        self.l1 = l1
+        self.l2 = l2
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+        self._generations: Dict[str, int] = {}
+        self.l2_hits = 0
+        self.loads = 0
+        self.coalesced = 0
+
+    def _generation(self, entity: str) -> int:
+        return self._generations.get(entity.lower(), 0)
+
+    async def get_many(
+        self, keys: Sequence[CacheKey], load: Loader
+    ) -> Dict[CacheKey, Dict[str, Any]]:
+        """Return ``{key: row}`` for *keys*, calling ``load(missing)`` once
+        for the keys neither cached nor already being fetched."""
+        found: Dict[CacheKey, Dict[str, Any]] = {}
+        waiting: Dict[CacheKey, asyncio.Future] = {}
+        owned: Dict[CacheKey, asyncio.Future] = {}
+        for key in dict.fromkeys(keys):
+            row = self.l1.get(key, _MISS)
+            if row is not _MISS:
+                found[key] = row
+            elif key in self._inflight:
+                waiting[key] = self._inflight[key]
+                self.coalesced += 1
+            else:
+                owned[key] = asyncio.get_running_loop().create_future()
+        self._inflight.update(owned)
+
+        try:
+            if owned:
+                await self._fill(list(owned), load, owned, found)
+        except Exception as exc:
+            for future in owned.values():
+                if not future.done():
+                    future.set_exception(exc)
+                    future.exception()  # retrieved: waiters re-raise it
+            raise
+        except BaseException:  # cancelled: the waiters load on their own
+            for future in owned.values():
+                if not future.done():
+                    future.set_result(_RETRY)
+            raise
+        finally:
+            for key in owned:
+                self._inflight.pop(key, None)
+
+        retry = []
+        for key, future in waiting.items():
+            row = await asyncio.shield(future)  # not cancelled for others
+            if row is _RETRY:
+                retry.append(key)
+            elif row:
+                found[key] = row
+        if retry:
+            found.update(await self.get_many(retry, load))
+        return {key: dict(row) for key, row in found.items()}
+
+    async def _fill(
+        self,
+        missing: List[CacheKey],
+        load: Loader,
+        owned: Dict[CacheKey, asyncio.Future],
+        found: Dict[CacheKey, Dict[str, Any]],
+    ) -> None:
+        generations = {key: self._generation(key[1]) for key in missing}
+        if self.l2 is not None:
+            for key, row in (await self.l2.get_many(missing)).items():
+                self.l2_hits += 1
+                if generations[key] == self._generation(key[1]):
+                    self.l1.set(key, row)
+                found[key] = row
+                owned[key].set_result(row)
+            missing = [key for key in missing if key not in found]
+        if not missing:
+            return
+
+        self.loads += 1
+        loaded = await load(missing)
+        fresh = {}
+        for key in missing:
+            row = loaded.get(key)
+            if row and generations[key] == self._generation(key[1]):
+                self.l1.set(key, row)
+                fresh[key] = row
+            if row:
+                found[key] = row
+            owned[key].set_result(row)
+        if self.l2 is not None:
+            await self.l2.set_many(fresh)
+
+    async def invalidate(self, entity: str, pk: str | None = None) -> None:
+        """Drop the cached rows of *entity* (only *pk* when given)."""
+        entity_l = entity.lower()
+        self._generations[entity_l] = self._generation(entity) + 1
+
+        def matches(key: CacheKey, row: Dict) -> bool:
+            if key[1].lower() != entity_l:
+                return False
+            return pk is None or key[2] == str(pk)
+
+        self.l1.delete_where(matches)
+        if self.l2 is not None:
+            await self.l2.invalidate(entity, pk)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.l1.stats(),
+            "l2_hits": self.l2_hits,
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
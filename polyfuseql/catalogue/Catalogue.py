@@ -1,6 +1,9 @@
+import functools
 import json
 import pathlib
-from typing import Tuple
+import types
+import weakref
+from typing import Any, Callable, Dict, List, Sequence, Tuple
 
 ROOT = pathlib.Path(__file__).resolve().parent.parent  # repo root guess
 DEFAULT_MAPPING: dict[str, Tuple[str, str]] = {
@@ -11,18 +14,120 @@ DEFAULT_MAPPING: dict[str, Tuple[str, str]] = {
 }
 
 
+@functools.cache
+def _mapping_file(path: pathlib.Path) -> Dict[str, Any]:
+    """Contents of *path* (read once per process)."""
+    if not path.exists():
+        return {}
+    with path.open() as fh:
+        return json.load(fh)
+
+
+def _ref(callback: Callable) -> Callable[[], Callable | None]:
+    """Weak reference to a bound method, strong to anything else."""
+    if isinstance(callback, types.MethodType):
+        return weakref.WeakMethod(callback)
+    return lambda: callback
+
+
 class Catalogue(dict):
-    """table → (backend, pkCol). Loads mapping.json if present."""
+    """table → (backend, pkCol). Loads mapping.json if present.
+
+    A table may also be copied to other backends (read replicas, the
+    optional ``"replicas"`` list of a mapping entry); the optimizer then
+    reads it from whichever of :meth:`replicas` is cheapest.
+
+    Callbacks registered with :meth:`subscribe` are called with the table
+    name whenever its mapping is changed or removed, so caches derived
+    from the mapping can be invalidated.  Bound methods are held weakly,
+    so a short-lived client subscribed to the :meth:`shared` catalogue
+    does not outlive its use.
+
+    A table may instead be split over several instances of its backend
+    (the optional ``"shards"`` object of a mapping entry, see
+    :mod:`polyfuseql.connector.Sharding`); :meth:`shards` returns it.
+
+    ``mapping.json`` is read once per process; every catalogue starts
+    from that copy.
+    """
+
+    _shared: "Catalogue | None" = None
 
     def __init__(self) -> None:  # type: ignore[override]
+        self._listeners: List[Callable[[], Callable | None]] = []
+        self._replicas: Dict[str, List[str]] = {}
+        self._shards: Dict[str, Dict[str, Any]] = {}
         super().__init__(DEFAULT_MAPPING)
-        mapping_file = ROOT / "catalogue" / "mapping.json"
-        if mapping_file.exists():
-            with mapping_file.open() as fh:
-                data = json.load(fh)
-            # normalize keys → lower
-            for tbl, cfg in data.items():
-                self[tbl.lower()] = (
-                    cfg["backend"],
-                    cfg["pk"],
-                )
+        data = _mapping_file(ROOT / "catalogue" / "mapping.json")
+        # normalize keys → lower
+        for tbl, cfg in data.items():
+            self[tbl.lower()] = (
+                cfg["backend"],
+                cfg["pk"],
+            )
+            if cfg.get("replicas"):
+                self._replicas[tbl.lower()] = list(cfg["replicas"])
+            if cfg.get("shards"):
+                self._shards[tbl.lower()] = dict(cfg["shards"])
+
+    @classmethod
+    def shared(cls) -> "Catalogue":
+        """The process-wide catalogue, for clients that should all see
+        the same mapping (``PolyClient({"catalogue": "shared"})``)."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def subscribe(self, callback: Callable[[str], None]) -> None:
+        self._listeners.append(_ref(callback))
+
+    def _changed(self, table: str) -> None:
+        live = [(ref, ref()) for ref in self._listeners]
+        live = [(ref, callback) for ref, callback in live if callback]
+        self._listeners = [ref for ref, _ in live]  # drop collected ones
+        for _, callback in live:
+            callback(table)
+
+    def replicas(self, table: str) -> List[str]:
+        """Backends holding *table*, its owner first."""
+        owner = self.get(table)
+        if owner is None:
+            return []
+        copies = self._replicas.get(table, [])
+        return [owner[0]] + [b for b in copies if b != owner[0]]
+
+    def set_replicas(self, table: str, backends: Sequence[str]) -> None:
+        """Declare the backends that hold a copy of *table* besides its
+        owner (same primary key)."""
+        self._replicas[table] = list(backends)
+        self._changed(table)
+
+    def shards(self, table: str) -> Dict[str, Any] | None:
+        """The ``"shards"`` spec of *table* (``None``: one instance)."""
+        return self._shards.get(table)
+
+    def set_shards(self, table: str, spec: Dict[str, Any] | None) -> None:
+        """Split *table* over the instances of *spec* (``{"by": "hash" |
+        "range" | "consistent", "instances": [...], ...}``); ``None``
+        puts it back on the backend's single instance."""
+        if spec:
+            self._shards[table] = dict(spec)
+        else:
+            self._shards.pop(table, None)
+        self._changed(table)
+
+    def __setitem__(self, table: str, value: Tuple[str, str]) -> None:
+        changed = self.get(table) != value
+        super().__setitem__(table, value)
+        if changed:
+            self._changed(table)
+
+    def __delitem__(self, table: str) -> None:
+        super().__delitem__(table)
+        self._replicas.pop(table, None)
+        self._shards.pop(table, None)
+        self._changed(table)
+
+    def update(self, *args, **kwargs) -> None:  # type: ignore[override]
+        for table, value in dict(*args, **kwargs).items():
+            self[table] = value
@@ -0,0 +1,187 @@
+"""polyfuseql.client.Aggregate
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Lowering of aggregate queries::
+
+    SELECT categoryId, COUNT(*) AS n, AVG(unitPrice) AS avg_price
+    FROM products WHERE discontinued = 0
+    GROUP BY categoryId HAVING COUNT(*) > 1
+
+becomes an :class:`AggregatePlan`: the plan of the rows to aggregate
+(reading only the columns the aggregation needs), a backend-neutral
+:class:`~polyfuseql.connector.Aggregation.Aggregation` and how its slots
+map back to the SELECT list.  A scan is aggregated by its store
+(``GROUP BY`` on Postgres, Cypher aggregation on Neo4j, a local fold
+over the scan elsewhere); key lookups and joins are aggregated locally
+over their streamed rows.  Either way :meth:`AggregatePlan.rows` brings
+the groups to one shape and order, so the result does not depend on
+where it was computed.
+
+Supported: ``GROUP BY`` plain columns, ``COUNT(*)`` and ``COUNT`` /
+``SUM`` / ``AVG`` / ``MIN`` / ``MAX`` of a column, and a HAVING over the
+aggregates and group columns (as in WHERE, see
+:func:`LogicalPlan.predicate`).
+"""
+
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlglot import exp
+
+from polyfuseql.client.Join import JoinPlan
+from polyfuseql.client.PlanCache import Plan
+from polyfuseql.connector.Aggregation import Agg, Aggregation
+from polyfuseql.optimizer import LogicalPlan
+
+_FUNCS = {
+    exp.Count: "count",
+    exp.Sum: "sum",
+    exp.Avg: "avg",
+    exp.Min: "min",
+    exp.Max: "max",
+}
+
+Row = Dict[str, Any]
+#: name of an input column in the rows being aggregated
+Naming = Callable[[exp.Column], str]
+
+
+class AggregatePlan:
+    """Aggregate *source* (a :class:`Plan` or :class:`JoinPlan`).
+
+    *output* lists ``(name, slot)`` in SELECT order; *limit* caps the
+    groups.
+    """
+
+    __slots__ = ("source", "aggregation", "output", "limit")
+
+    def __init__(
+        self,
+        source: Plan | JoinPlan,
+        aggregation: Aggregation,
+        output: Tuple[Tuple[str, str], ...],
+        limit: int | None = None,
+    ) -> None:
+        self.source = source
+        self.aggregation = aggregation
+        self.output = output
+        self.limit = limit
+
+    @property
+    def tables(self) -> Tuple[str, ...]:
+        return self.source.tables
+
+    def rows(self, groups: List[Row]) -> List[Row]:
+        """Output rows of the slot rows *groups*, ordered by group key
+        (NULL first) and cut at the limit."""
+        slots = self.aggregation.key_slots
+        try:
+            groups = sorted(groups, key=lambda r: _order(r, slots))
+        except TypeError:  # keys of mixed types
+            groups = sorted(groups, key=lambda r: str(_order(r, slots)))
+        if self.limit is not None:
+            groups = groups[: self.limit]
+        rows = []
+        for group in groups:
+            done = self.aggregation.finish(group)
+            rows.append({name: done.get(slot) for name, slot in self.output})
+        return rows
+
+
+def _order(row: Row, slots: List[str]) -> Tuple:
+    return tuple((row.get(s) is not None, row.get(s)) for s in slots)
+
+
+def _name(item: exp.Expression) -> str:
+    """Output name of a SELECT item: its alias, else the column name,
+    else the SQL text (``COUNT(*)``)."""
+    if isinstance(item, exp.Alias):
+        return item.alias
+    if isinstance(item, exp.Column):
+        return item.name
+    return item.sql()
+
+
+class _Lowering:
+    """Collect the aggregates and input columns of one query."""
+
+    def __init__(self, naming: Naming) -> None:
+        self.naming = naming
+        self.aggs: Dict[Agg, str] = {}
+        self.columns: Dict[str, exp.Column] = {}
+
+    def column(self, col: exp.Column) -> str:
+        name = self.naming(col)
+        self.columns.setdefault(name, col)
+        return name
+
+    def agg(self, call: exp.AggFunc) -> str:
+        """Slot of the aggregate *call* (added on first use)."""
+        func = _FUNCS.get(type(call))
+        if func is None:
+            msg = f"Unsupported aggregate: {call.sql()}"
+            raise NotImplementedError(msg)
+        arg = call.this
+        if isinstance(arg, exp.Star) and func == "count":
+            agg = Agg("count")
+        elif isinstance(arg, exp.Column) and not arg.is_star:
+            agg = Agg(func, self.column(arg))
+        elif isinstance(arg, exp.Distinct):
+            raise NotImplementedError("DISTINCT aggregates are not supported")
+        else:
+            msg = f"Aggregate a plain column: {call.sql()}"
+            raise NotImplementedError(msg)
+        return self.aggs.setdefault(agg, f"a{len(self.aggs)}")
+
+
+def lower(
+    grouped: LogicalPlan.Aggregate,
+    project: LogicalPlan.Project,
+    naming: Naming,
+) -> Tuple[Aggregation, Tuple[Tuple[str, str], ...], List[exp.Column]]:
+    """``(aggregation, output, columns)`` of an aggregate query;
+    *columns* are the input columns to read, one per name."""
+    lowering = _Lowering(naming)
+    keys: Dict[str, str] = {}
+    for key in grouped.keys:
+        if not isinstance(key, exp.Column) or key.is_star:
+            raise NotImplementedError("GROUP BY plain columns only")
+        keys.setdefault(lowering.column(key), f"g{len(keys)}")
+
+    output = []
+    for item in project.items:
+        expr = item.this if isinstance(item, exp.Alias) else item
+        if isinstance(expr, exp.Column):
+            slot = keys.get(naming(expr))
+            if slot is None:
+                msg = f"'{expr.sql()}' must appear in GROUP BY"
+                raise NotImplementedError(msg)
+        elif isinstance(expr, exp.AggFunc):
+            slot = lowering.agg(expr)
+        else:
+            msg = f"Select group columns and aggregates: {item.sql()}"
+            raise NotImplementedError(msg)
+        output.append((_name(item), slot))
+    if len({name for name, _ in output}) != len(output):
+        raise NotImplementedError("Duplicate column names in projection")
+
+    having = None
+    if grouped.having is not None:
+        aliases = dict(output)
+
+        def slots(node: exp.Expression) -> exp.Expression:
+            if isinstance(node, exp.AggFunc):
+                return exp.column(lowering.agg(node))
+            if isinstance(node, exp.Column):
+                slot = None if node.table else aliases.get(node.name)
+                if slot is None:
+                    slot = keys.get(naming(node))
+                if slot is None:
+                    msg = f"HAVING on '{node.sql()}' outside GROUP BY"
+                    raise NotImplementedError(msg)
+                return exp.column(slot)
+            return node
+
+        having = LogicalPlan.predicate(grouped.having.transform(slots))
+
+    aggs = tuple(lowering.aggs)  # in slot order
+    aggregation = Aggregation(tuple(keys), aggs, having)
+    return aggregation, tuple(output), list(lowering.columns.values())
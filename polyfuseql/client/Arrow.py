@@ -0,0 +1,198 @@
+"""polyfuseql.client.Arrow
+~~~~~~~~~~~~~~~~~~~~~~~~
+Columnar results: ``query(..., format="arrow")`` and
+``stream_arrow(...)`` (needs ``pyarrow``)::
+
+    table = await pc.query("SELECT * FROM products", format="arrow")
+    df = table.to_pandas()                   # or polars.from_arrow(table)
+    ipc = Arrow.to_ipc(table)                # Arrow IPC stream bytes
+
+Batches are built from :data:`~polyfuseql.connector.Connector.Columns`
+(``{name: values}``) without going through row dicts where the store
+allows it: Postgres decodes each cursor fetch of native records column
+by column (:meth:`RowShape.columns`); Redis and Neo4j payloads, which
+arrive per entity, are transposed batch by batch.  Every batch is one
+:class:`pyarrow.RecordBatch`; a table only wraps them (no copy), and
+both expose the Arrow C stream interface (``__arrow_c_stream__``), so
+consumers such as pandas, polars or DuckDB read the buffers in place.
+
+Every batch of a result has the same schema.  Batches are held back
+while a column has only been NULL (its type is not known yet), up to
+:data:`HOLD` of them; the schema then comes from the held batches: a
+column typed differently by two batches takes the promoted type (int
+and float: float) or, when there is none (a store mixing numbers and
+text), strings, and a column still without a type is a string column.
+Later batches are built to that schema (columns a batch lacks are
+all-null); a value that does not fit it, or a column it lacks, raises
+:class:`ValueError`.  ``query(..., format="arrow")`` holds the whole
+result, so its table never does.
+"""
+
+import contextlib
+from typing import Any, AsyncIterator, Iterable, List, Sequence
+
+from polyfuseql.connector.Connector import Columns
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional: only the Arrow results need it
+    pa = None
+
+#: batches a stream holds back while a column's type is unknown
+HOLD = 8
+
+
+def _require() -> None:
+    if pa is None:
+        raise ImportError("format='arrow' needs pyarrow (pip install pyarrow)")
+
+
+def _array(values: List[Any], type_=None):
+    try:
+        return pa.array(values, type=type_)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        if type_ is not None and type_ != pa.string():
+            raise
+        text = [None if v is None else str(v) for v in values]
+        return pa.array(text, type=pa.string())
+
+
+def record_batch(columns: Columns, schema=None):
+    """*columns* as a :class:`pyarrow.RecordBatch`, following *schema*
+    when given (columns it lacks are appended with their own type)."""
+    _require()
+    if schema is None:
+        arrays = [_array(values) for values in columns.values()]
+        return pa.RecordBatch.from_arrays(arrays, names=list(columns))
+    rows = len(next(iter(columns.values()), []))
+    arrays, names = [], []
+    for field in schema:
+        values = columns.get(field.name)
+        if values is None:
+            arrays.append(pa.nulls(rows, type=field.type))
+        else:
+            try:
+                arrays.append(_array(values, field.type))
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                msg = f"Column '{field.name}' does not fit {field.type}"
+                raise ValueError(msg) from None
+        names.append(field.name)
+    for name, values in columns.items():  # fields the schema lacks
+        if schema.get_field_index(name) < 0:
+            arrays.append(_array(values))
+            names.append(name)
+    return pa.RecordBatch.from_arrays(arrays, names=names)
+
+
+def _field_type(name: str, types: List[Any]):
+    """One type for the *types* a column had in different batches."""
+    if len(types) == 1:
+        return types[0]
+    schemas = [pa.schema([pa.field(name, t)]) for t in types]
+    try:
+        unified = pa.unify_schemas(schemas, promote_options="permissive")
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.string()
+    return unified.field(name).type
+
+
+def _unify(schemas: Sequence[Any], final: bool = True):
+    """One schema for batches of *schemas*: fields in order of first
+    appearance, each with :func:`_field_type` of its non-null types.  A
+    field only ever NULL stays ``null`` when *final* (no batch follows),
+    else it becomes a string field."""
+    types = {}
+    for schema in schemas:
+        for field in schema:
+            seen = types.setdefault(field.name, [])
+            if not pa.types.is_null(field.type) and field.type not in seen:
+                seen.append(field.type)
+    fields = []
+    for name, seen in types.items():
+        if seen:
+            fields.append(pa.field(name, _field_type(name, seen)))
+        else:
+            fields.append(pa.field(name, pa.null() if final else pa.string()))
+    return pa.schema(fields)
+
+
+def _conform(batch, schema):
+    """*batch* with the fields of *schema*: missing columns all-null,
+    others cast (to text when the schema made the column strings)."""
+    arrays = []
+    for field in schema:
+        index = batch.schema.get_field_index(field.name)
+        if index < 0:
+            arrays.append(pa.nulls(batch.num_rows, type=field.type))
+            continue
+        array = batch.column(index)
+        if array.type == field.type:
+            arrays.append(array)
+        elif field.type == pa.string() and not pa.types.is_null(array.type):
+            arrays.append(_array(array.to_pylist(), pa.string()))
+        else:
+            arrays.append(array.cast(field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+async def record_batches(
+    batches: AsyncIterator[Columns],
+    hold: int | None = HOLD,
+) -> AsyncIterator[Any]:
+    """Record batches of a stream of :data:`Columns`, all of one schema
+    (see the module docstring).  Up to *hold* batches are held back
+    while a column has no type; ``None`` holds the whole stream."""
+    _require()
+    schema, held = None, []
+    async with contextlib.aclosing(batches) as source:
+        async for columns in source:
+            if schema is not None:
+                batch = record_batch(columns, schema)
+                if batch.num_columns > len(schema):
+                    names = batch.schema.names
+                    extra = [n for n in names if n not in schema.names]
+                    msg = f"Columns {extra} are not in the stream's schema"
+                    raise ValueError(msg)
+                yield batch
+                continue
+            held.append(record_batch(columns))
+            if hold is None:
+                continue
+            schemas = [batch.schema for batch in held]
+            found = _unify(schemas)
+            typed = not any(pa.types.is_null(f.type) for f in found)
+            if typed or len(held) >= hold:
+                schema = found if typed else _unify(schemas, final=False)
+                for batch in held:
+                    yield _conform(batch, schema)
+                held = []
+    if held:
+        schema = _unify([batch.schema for batch in held])
+        for batch in held:
+            yield _conform(batch, schema)
+
+
+def table(batches: Iterable[Any]):
+    """The batches as one :class:`pyarrow.Table`, without copying them
+    (types differing between batches are promoted)."""
+    _require()
+    tables = [pa.Table.from_batches([batch]) for batch in batches]
+    if not tables:
+        return pa.table({})
+    return pa.concat_tables(tables, promote_options="default")
+
+
+def to_ipc(data, sink=None):
+    """Write a table or record batch in the Arrow IPC stream format to
+    *sink* (a path or file object); without a sink return the bytes."""
+    _require()
+    out = pa.BufferOutputStream() if sink is None else sink
+    with pa.ipc.new_stream(out, data.schema) as writer:
+        writer.write(data)
+    return out.getvalue().to_pybytes() if sink is None else None
+
+
+def from_ipc(data: bytes):
+    """Read back an IPC stream written by :func:`to_ipc`."""
+    _require()
+    return pa.ipc.open_stream(data).read_all()
@@ -0,0 +1,104 @@
+"""polyfuseql.client.FanOut
+~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Run one logical read against several backends concurrently.
+
+Modes:
+    gather  – wait for every backend, keep all answers.
+    first   – return the first successful answer, cancel the rest.
+    quorum  – return as soon as *n* backends returned identical rows.
+
+Each backend call is bounded by its own timeout; failures (including
+timeouts) are reported per backend instead of failing the whole read.
+"""
+
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Tuple
+
+MODES = ("gather", "first", "quorum")
+
+Fetch = Callable[[], Awaitable[List[Dict[str, Any]]]]
+Timeout = float | Mapping[str, float] | None
+
+
+def _timeout_for(timeout: Timeout, backend: str) -> float | None:
+    if isinstance(timeout, Mapping):
+        return timeout.get(backend)
+    return timeout
+
+
+def _fingerprint(rows: List[Dict[str, Any]]) -> str:
+    return json.dumps(rows, sort_keys=True, default=str)
+
+
+async def _cancel(tasks) -> None:
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def fan_out(
+    calls: Dict[str, Fetch],
+    *,
+    mode: str = "gather",
+    timeout: Timeout = None,
+    quorum: int | None = None,
+) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, BaseException]]:
+    """Run *calls* (backend → fetch) concurrently according to *mode*.
+
+    Returns ``(answers, errors)``: the rows of the backends whose answer
+    is used (in the order of *calls* for ``gather``, in completion order
+    otherwise) and the exception of every backend that failed.  Raises the
+    first error when no backend could answer, and :class:`RuntimeError`
+    when a quorum cannot be reached.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown fan-out mode '{mode}'")
+    needed = quorum or len(calls) // 2 + 1
+    if mode == "quorum" and not 0 < needed <= len(calls):
+        raise ValueError(f"Quorum {needed} impossible with {len(calls)}")
+
+    tasks = {
+        asyncio.ensure_future(
+            asyncio.wait_for(fetch(), _timeout_for(timeout, backend))
+        ): backend
+        for backend, fetch in calls.items()
+    }
+    answers: Dict[str, List[Dict[str, Any]]] = {}
+    errors: Dict[str, BaseException] = {}
+    groups: Dict[str, List[str]] = {}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                backend = tasks[task]
+                if task.exception() is not None:
+                    errors[backend] = task.exception()
+                    continue
+                answers[backend] = task.result()
+                if mode == "first":
+                    return {backend: answers[backend]}, errors
+                if mode == "quorum":
+                    key = _fingerprint(answers[backend])
+                    group = groups.setdefault(key, [])
+                    group.append(backend)
+                    if len(group) >= needed:
+                        return {b: answers[b] for b in group}, errors
+            if mode == "quorum":
+                best = max(map(len, groups.values()), default=0)
+                if best + len(pending) < needed:
+                    break
+    finally:
+        await _cancel(pending)
+
+    if not answers:
+        raise next(iter(errors.values()))
+    if mode == "quorum":
+        raise RuntimeError(
+            f"Quorum of {needed} not reached: {len(answers)} answers "
+            f"in {len(groups)} disagreeing groups, {len(errors)} errors"
+        )
+    return {b: answers[b] for b in calls if b in answers}, errors
@@ -0,0 +1,348 @@
+"""polyfuseql.client.Join
+~~~~~~~~~~~~~~~~~~~~~~~~
+Federated equi-join of two tables that may live on different backends.
+
+Strategies, picked from per-side cardinality estimates:
+    bind – one side's join column is its primary key: stream the other
+           (smaller) side, hash each batch on the join key and fetch the
+           distinct keys with one batched ``get_many`` (bind join).
+    hash – build a hash table on the smaller side, stream the other side
+           through it.  When the build side outgrows ``max_rows`` both
+           sides are partitioned to temporary files and joined partition
+           by partition (Grace hash join), so memory stays bounded.
+
+Per-side filters are pushed into the scan of that side (evaluated by
+the store); rows fetched by key are filtered here, before they reach
+the hash table.  Primary-key predicates are not filters at all but
+pushed down as ``get_many`` keys (see :meth:`PolyClient._plan_join`).
+"""
+
+import contextlib
+import math
+import os
+import pickle
+import tempfile
+import zlib
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Sequence,
+    Tuple,
+)
+
+from polyfuseql.client.PlanCache import Param, _bind
+from polyfuseql.connector import Predicate as P
+from polyfuseql.connector.Connector import Projection
+
+Row = Dict[str, Any]
+Batches = AsyncIterator[List[Row]]
+Lookup = Callable[[List[str]], Awaitable[Dict[str, Row]]]
+
+
+def join_key(value: Any) -> str | None:
+    """Normalized join key: ``1`` (Postgres) joins ``"1"`` (Redis)."""
+    return None if value is None else str(value)
+
+
+class JoinSide:
+    """One table of a join: where it lives and what is read from it."""
+
+    __slots__ = (
+        "table",
+        "alias",
+        "key",
+        "backend",
+        "pk_col",
+        "pk_val",
+        "where",
+        "columns",
+        "replicas",
+    )
+
+    def __init__(self, table: str, alias: str) -> None:
+        self.table = table
+        self.alias = alias
+        self.key: str | None = None  # join column
+        self.backend: str | None = None
+        self.pk_col: str | None = None
+        self.pk_val: List[str | Param] | None = None  # pushed-down keys
+        self.where: P.Predicate | None = None  # besides the pk predicate
+        self.columns: Projection | None = None
+        self.replicas: Tuple[str, ...] = ()  # backends holding the table
+
+    @property
+    def lookup_by_key(self) -> bool:
+        """Whether the side can be probed with ``get_many`` on its key."""
+        if self.pk_val is not None or not (self.key and self.pk_col):
+            return False
+        return self.key.lower() == self.pk_col.lower()
+
+
+class JoinPlan:
+    """``SELECT ... FROM left JOIN right ON left.key = right.key``.
+
+    *output* lists ``(name, side, column)`` with *side* 0 (left) or 1
+    (right); ``None`` selects every column of both sides, qualifying the
+    column names present on both as ``alias.column``.  *limit* caps the
+    joined rows.
+    """
+
+    __slots__ = ("left", "right", "output", "limit")
+
+    def __init__(
+        self,
+        left: JoinSide,
+        right: JoinSide,
+        output: Tuple[Tuple[str, int, str], ...] | None,
+        limit: int | None = None,
+    ) -> None:
+        self.left = left
+        self.right = right
+        self.output = output
+        self.limit = limit
+
+    @property
+    def tables(self) -> Tuple[str, str]:
+        return self.left.table, self.right.table
+
+    def bind(
+        self, params: Sequence[Any] | Mapping[str, Any] | None = None
+    ) -> Tuple[List[str] | None, List[str] | None]:
+        """Pushed-down keys of each side with the placeholders bound."""
+
+        def keys(side: JoinSide) -> List[str] | None:
+            if side.pk_val is None:
+                return None
+            return list(dict.fromkeys(_bind(v, params) for v in side.pk_val))
+
+        return keys(self.left), keys(self.right)
+
+    def combine(self, left: Row, right: Row) -> Row:
+        if self.output is not None:
+            sides = (left, right)
+            return {name: sides[i].get(col) for name, i, col in self.output}
+        row = {}
+        for k, v in left.items():
+            row[f"{self.left.alias}.{k}" if k in right else k] = v
+        for k, v in right.items():
+            row[f"{self.right.alias}.{k}" if k in left else k] = v
+        return row
+
+
+class JoinInput:
+    """How the executor reads one side.
+
+    *batches* opens a fresh stream of the side's rows, *estimate* is its
+    expected cardinality (``None`` when unknown) and *lookup*, when the
+    join column is the side's key, fetches rows by join key.  *where* is
+    the side's filter with its parameters bound; *pushed* tells that the
+    store already applied it to *batches* (looked-up rows are always
+    filtered here).
+    """
+
+    def __init__(
+        self,
+        side: JoinSide,
+        batches: Callable[[], Batches],
+        estimate: int | None,
+        lookup: Lookup | None = None,
+        where: P.Predicate | None = None,
+        pushed: bool = False,
+    ) -> None:
+        self.side = side
+        self.batches = batches
+        self.estimate = estimate
+        self.lookup = lookup
+        self.where = where
+        self.pushed = pushed
+
+    async def rows(self) -> Batches:
+        """The side's batches with its filter applied."""
+        where = None if self.pushed else self.where
+        async with contextlib.aclosing(self.batches()) as batches:
+            async for batch in batches:
+                if where is not None:
+                    batch = [row for row in batch if P.matches(where, row)]
+                if batch:
+                    yield batch
+
+
+def choose_strategy(
+    estimates: Sequence[int | None], probes: Sequence[bool]
+) -> Tuple[str, int]:
+    """``("bind", outer)`` or ``("hash", build)``, sides as 0/1, from the
+    cardinality *estimates* of both sides and whether each can be
+    probed by key."""
+    sizes = [math.inf if e is None else e for e in estimates]
+    bind = []
+    for outer in (0, 1):
+        inner = 1 - outer
+        if probes[inner] and sizes[outer] <= sizes[inner]:
+            bind.append(outer)
+    if bind:
+        return "bind", min(bind, key=lambda outer: sizes[outer])
+    return "hash", 0 if sizes[0] <= sizes[1] else 1
+
+
+async def bind_join(outer: JoinInput, inner: JoinInput) -> AsyncIterator:
+    """Yield batches of ``(outer_row, inner_row)`` pairs, one batched
+    lookup of the inner side per outer batch."""
+    outer_key, where = outer.side.key, inner.where
+    async for batch in outer.rows():
+        by_key: Dict[str, List[Row]] = {}
+        for row in batch:
+            key = join_key(row.get(outer_key))
+            if key is not None:
+                by_key.setdefault(key, []).append(row)
+        if not by_key:
+            continue
+        found = await inner.lookup(list(by_key))
+        pairs = [
+            (row, match)
+            for key, match in found.items()
+            if P.matches(where, match)
+            for row in by_key.get(key, ())
+        ]
+        if pairs:
+            yield pairs
+
+
+class _Spill:
+    """Build and probe rows partitioned on the join key in temp files."""
+
+    def __init__(self, partitions: int) -> None:
+        self._dir = tempfile.TemporaryDirectory(prefix="polyfuseql-join-")
+        self.partitions = partitions
+        self._files: Dict[Tuple[str, int], Any] = {}
+
+    def _file(self, role: str, part: int):
+        handle = self._files.get((role, part))
+        if handle is None:
+            path = os.path.join(self._dir.name, f"{role}-{part}")
+            handle = self._files[(role, part)] = open(path, "ab")
+        return handle
+
+    def add(self, role: str, key: str, row: Row) -> None:
+        part = zlib.crc32(key.encode()) % self.partitions
+        pickle.dump((key, row), self._file(role, part))
+
+    def read(self, role: str, part: int):
+        handle = self._files.pop((role, part), None)
+        if handle is None:
+            return
+        handle.close()
+        with open(handle.name, "rb") as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    break
+
+    def close(self) -> None:
+        for handle in self._files.values():
+            handle.close()
+        self._dir.cleanup()
+
+
+class HashJoin:
+    """Hash join of a build and a probe stream, spilling to disk (Grace
+    hash join over *partitions* files) once more than *max_rows* build
+    rows would be held in memory."""
+
+    def __init__(self, max_rows: int = 100_000, partitions: int = 16):
+        self.max_rows = max_rows
+        self.partitions = partitions
+        self.build_rows = 0
+        self.spilled = False
+
+    async def run(self, build: JoinInput, probe: JoinInput) -> AsyncIterator:
+        """Yield batches of ``(build_row, probe_row)`` pairs."""
+        build_key, probe_key = build.side.key, probe.side.key
+        table: Dict[str, List[Row]] = {}
+        spill: _Spill | None = None
+        try:
+            async for batch in build.rows():
+                for row in batch:
+                    key = join_key(row.get(build_key))
+                    if key is None:
+                        continue
+                    self.build_rows += 1
+                    if spill is not None:
+                        spill.add("build", key, row)
+                        continue
+                    table.setdefault(key, []).append(row)
+                    if self.build_rows > self.max_rows:
+                        spill = self._spill(table)
+                        table = {}
+
+            async for batch in probe.rows():
+                pairs = []
+                for row in batch:
+                    key = join_key(row.get(probe_key))
+                    if key is None:
+                        continue
+                    if spill is not None:
+                        spill.add("probe", key, row)
+                        continue
+                    pairs.extend((match, row) for match in table.get(key, ()))
+                if pairs:
+                    yield pairs
+
+            if spill is not None:
+                for part in range(spill.partitions):
+                    pairs = self._join_partition(spill, part)
+                    if pairs:
+                        yield pairs
+        finally:
+            if spill is not None:
+                spill.close()
+
+    def _spill(self, table: Dict[str, List[Row]]) -> _Spill:
+        self.spilled = True
+        spill = _Spill(self.partitions)
+        for key, rows in table.items():
+            for row in rows:
+                spill.add("build", key, row)
+        return spill
+
+    @staticmethod
+    def _join_partition(spill: _Spill, part: int) -> List[Tuple[Row, Row]]:
+        table: Dict[str, List[Row]] = {}
+        for key, row in spill.read("build", part):
+            table.setdefault(key, []).append(row)
+        pairs = []
+        for key, row in spill.read("probe", part):
+            pairs.extend((match, row) for match in table.get(key, ()))
+        return pairs
+
+
+async def execute(
+    plan: JoinPlan,
+    left: JoinInput,
+    right: JoinInput,
+    *,
+    max_rows: int = 100_000,
+    partitions: int = 16,
+) -> AsyncIterator[List[Row]]:
+    """Run the join of *plan*, yielding batches of output rows."""
+    inputs = (left, right)
+    strategy, first = choose_strategy(
+        [i.estimate for i in inputs],
+        [i.lookup is not None for i in inputs],
+    )
+    if strategy == "bind":
+        pairs = bind_join(inputs[first], inputs[1 - first])
+    else:
+        joiner = HashJoin(max_rows, partitions)
+        pairs = joiner.run(inputs[first], inputs[1 - first])
+    async with contextlib.aclosing(pairs) as batches:
+        async for batch in batches:
+            if first == 0:
+                yield [plan.combine(a, b) for a, b in batch]
+            else:
+                yield [plan.combine(b, a) for a, b in batch]
@@ -0,0 +1,156 @@
+"""polyfuseql.client.PlanCache
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Bounded cache of routing plans for the SQL router.
+
+Parsing with sqlglot costs far more than the point lookup it routes to,
+so the validated outcome of :meth:`PolyClient.query_parse_validate_grammar`
+plus the catalogue routing decision is cached per normalized SQL text.
+Parameterized statements (``WHERE customerId = ?`` or ``= :id``) keep
+:class:`Param` markers in the plan, so one plan serves every key.
+"""
+
+import re
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+from polyfuseql.cache.LRUCache import LRUCache
+from polyfuseql.connector.Connector import Projection
+
+_QUOTED = re.compile(r"""('(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.)*"|`[^`]*`)""")
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace outside quoted literals/identifiers."""
+    parts = _QUOTED.split(sql.strip().rstrip(";").strip())
+    for i in range(0, len(parts), 2):  # even parts are outside quotes
+        parts[i] = re.sub(r"\s+", " ", parts[i])
+    return "".join(parts)
+
+
+class Param:
+    """Placeholder in a parameterized query: ``?`` (positional, numbered
+    in query order) or ``:name``."""
+
+    __slots__ = ("name", "index")
+
+    def __init__(self, name: str | None = None) -> None:
+        self.name = name
+        self.index: int | None = None
+
+    def value(self, params: Sequence[Any] | Mapping[str, Any] | None) -> Any:
+        """The bound value as given (filters compare typed values)."""
+        try:
+            if self.name is not None:
+                return params[self.name]  # type: ignore[index]
+            return params[self.index]  # type: ignore[index]
+        except (KeyError, IndexError, TypeError):
+            label = f":{self.name}" if self.name else f"?#{self.index}"
+            raise ValueError(f"No value bound for parameter {label}")
+
+    def bind(self, params: Sequence[Any] | Mapping[str, Any] | None) -> str:
+        return str(self.value(params))
+
+    def __repr__(self) -> str:
+        return f":{self.name}" if self.name else "?"
+
+
+def _bind(value: str | Param, params) -> str:
+    return value.bind(params) if isinstance(value, Param) else value
+
+
+class Plan:
+    """Validated routing decision for one statement.
+
+    *backend* is the catalogue owner of *table*, or ``None`` when the
+    predicate column is not the catalogue primary key (only explicitly
+    targeted engines may then serve the query).  *columns* is the
+    projection pushed down to the connectors (``None`` for ``SELECT *``),
+    *replicas* the backends the optimizer may read *table* from and
+    *limit* the pushed-down row limit.  *where* holds the conditions
+    besides the pk predicate (see :mod:`polyfuseql.connector.Predicate`);
+    with no *pk_col* the plan is a filtered scan.
+    """
+
+    __slots__ = (
+        "table",
+        "pk_col",
+        "pk_val",
+        "backend",
+        "columns",
+        "replicas",
+        "limit",
+        "where",
+    )
+
+    def __init__(
+        self,
+        table: str,
+        pk_col: str,
+        pk_val: str | Param | List[str | Param],
+        backend: str | None,
+        columns: Projection | None = None,
+        replicas: Sequence[str] = (),
+        limit: int | None = None,
+        where: Any = None,
+    ) -> None:
+        self.table = table
+        self.pk_col = pk_col
+        self.pk_val = pk_val
+        self.backend = backend
+        self.columns = columns
+        self.replicas = tuple(replicas)
+        self.limit = limit
+        self.where = where
+
+    @property
+    def tables(self) -> Tuple[str]:
+        return (self.table,)
+
+    def bind(
+        self, params: Sequence[Any] | Mapping[str, Any] | None = None
+    ) -> str | List[str]:
+        """Key value(s) with the placeholders replaced by *params*."""
+        if isinstance(self.pk_val, list):
+            values = [_bind(v, params) for v in self.pk_val]
+            return list(dict.fromkeys(values))
+        return _bind(self.pk_val, params)
+
+
+class PlanCache:
+    def __init__(self, max_size: int = 1024) -> None:
+        self._plans = LRUCache(max_entries=max_size)
+        self.parses = 0
+        self.parse_time = 0.0
+
+    def get(self, sql: str) -> Plan | None:
+        return self._plans.get(normalize_sql(sql))
+
+    def put(self, sql: str, plan: Plan, parse_time: float) -> None:
+        self.parses += 1
+        self.parse_time += parse_time
+        self._plans.set(normalize_sql(sql), plan)
+
+    def invalidate(self, table: str | None = None) -> None:
+        """Forget the plans on *table* (all plans when ``None``)."""
+        if table is None:
+            self._plans.delete_where(lambda _sql, _plan: True)
+            return
+        table = table.lower()
+
+        def reads_table(_sql: str, plan) -> bool:
+            return any(t.lower() == table for t in plan.tables)
+
+        self._plans.delete_where(reads_table)
+
+    def stats(self) -> Dict[str, Any]:
+        lru = self._plans.stats()
+        parses = self.parses
+        return {
+            "size": lru["size"],
+            "hits": lru["hits"],
+            "misses": lru["misses"],
+            "hit_rate": lru["hit_rate"],
+            "evictions": lru["evictions"],
+            "parses": self.parses,
+            "parse_time": self.parse_time,
+            "mean_parse_time": self.parse_time / parses if parses else 0.0,
+        }
@@ -3,16 +3,38 @@
 Unified façade that hides individual datastore connectors.
 This update adds a minimal *read‑only* SQL router using **sqlglot**.
 Supported grammar (MVP):
-    SELECT * FROM <table> WHERE <pkCol> = <literal>
+    SELECT * | <col> [AS <alias>], ... FROM <table> WHERE <pkCol> = <literal>
+        [LIMIT <n>]
+    SELECT <col>, COUNT(*) | SUM(<col>) ... FROM ... [WHERE ...]
+        [GROUP BY <col>, ...] [HAVING ...] [LIMIT <n>]
+
+Statements go through the optimizer (:mod:`polyfuseql.optimizer`) on
+their way to the connectors: pushdown rules, then a cost-based choice
+among the replicas of each table (see :meth:`PolyClient.explain`).
 
 If the table is not found in the in‑memory catalogue the query falls
 back to Postgres.
 """
 
+import asyncio
+import contextlib
+import functools
 import json
 import os
+import re
+import time
 from pathlib import Path
-from typing import Dict, List, Tuple, Union, Sequence
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Tuple,
+    Union,
+    Sequence,
+)
 
 __all__ = [
     "PolyClient",
@@ -21,8 +43,29 @@ __all__ = [
 import sqlglot
 from sqlglot import exp
 
+from polyfuseql.cache.LRUCache import LRUCache
+from polyfuseql.cache.RedisCache import RedisCache
+from polyfuseql.cache.ResultCache import CacheKey, ResultCache
 from polyfuseql.catalogue.Catalogue import Catalogue
+from polyfuseql.client import Aggregate, Join
+from polyfuseql.client.Aggregate import AggregatePlan
+from polyfuseql.client.FanOut import fan_out
+from polyfuseql.client.Join import JoinInput, JoinPlan, JoinSide
+from polyfuseql.client.PlanCache import Param, Plan, PlanCache
+from polyfuseql.client.ResultSet import ResultSet
+from polyfuseql.client.Write import WritePlan, WriteResult
+from polyfuseql.connector import Predicate as P
+from polyfuseql.connector.Aggregation import aggregate_batches
+from polyfuseql.connector.Connector import Columns, Projection, to_columns
 from polyfuseql.connector.ConnectorFactory import ConnectorFactory
+from polyfuseql.connector.Sharding import (
+    ShardedConnector,
+    instance_name,
+    shard_map,
+)
+from polyfuseql.optimizer import LogicalPlan
+from polyfuseql.optimizer.Optimizer import Optimizer
+from polyfuseql.telemetry.Instrumentation import Instrumentation, make_sink
 
 # ────────────────────────────────  Router  ────────────────────────────── #
 # logical_name → (engine_attr_on_client, concrete_name_in_store)
@@ -36,6 +79,156 @@ _MAPPING: Dict[str, Tuple[str, str]] = {
     "products": ("pg", "products"),
 }
 
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _projection(items: List[exp.Expression]) -> Projection | None:
+    """``SELECT *`` → ``None``; ``SELECT a, b AS c`` → ``(("a", "a"),
+    ("c", "b"))`` (alias, column)."""
+    if len(items) == 1 and items[0].is_star:
+        return None
+    columns = []
+    for item in items:
+        col = item.this if isinstance(item, exp.Alias) else item
+        if not isinstance(col, exp.Column) or col.is_star:
+            raise NotImplementedError("Only plain column projections")
+        alias = item.alias_or_name
+        if not (_IDENTIFIER.match(col.name) and _IDENTIFIER.match(alias)):
+            raise NotImplementedError(f"Unsupported column name '{alias}'")
+        columns.append((alias, col.name))
+    if len({alias for alias, _ in columns}) != len(columns):
+        raise NotImplementedError("Duplicate column names in projection")
+    return tuple(columns)
+
+
+def _columns(columns: Projection | None) -> Dict:
+    """Connector keyword for *columns* (omitted for ``SELECT *``)."""
+    return {"columns": columns} if columns else {}
+
+
+def _where(where: P.Predicate | None) -> Dict:
+    """Connector keyword for a scan filter (omitted when unfiltered)."""
+    return {"where": where} if where is not None else {}
+
+
+def _bound(where: P.Predicate | None, params) -> P.Predicate | None:
+    return None if where is None else P.bind(where, params)
+
+
+def _batch_rows(batch: List[Dict] | Columns) -> int:
+    """Rows in a batch of row dicts or of :data:`Columns`."""
+    if isinstance(batch, dict):
+        return len(next(iter(batch.values()), []))
+    return len(batch)
+
+
+def _batch_head(batch: List[Dict] | Columns, n: int) -> List[Dict] | Columns:
+    if isinstance(batch, dict):
+        return {name: values[:n] for name, values in batch.items()}
+    return batch[:n]
+
+
+class _Backends(dict):
+    """backend name → connector.  A backend looked up for the first time
+    is served by *default* (the client's own connector, created on first
+    use); aliases (``"pg"``) share the connector of their backend."""
+
+    def __init__(self, default: Callable[[str], Any]) -> None:
+        super().__init__()
+        self._default = default
+
+    def __missing__(self, name: str) -> Any:
+        backend = ConnectorFactory.canonical(name)
+        if backend != name and backend in self:
+            conn = self[backend]
+        else:
+            try:
+                ConnectorFactory.resolve(backend)
+            except ValueError:
+                raise KeyError(name) from None
+            conn = self[backend] = self._default(backend)
+        self[name] = conn
+        return conn
+
+
+def _pk_literal(expr: exp.Expression) -> str | Param:
+    if isinstance(expr, exp.Placeholder):
+        param = Param(expr.this or None)  # `?` or `:name`
+        param.index = expr.meta.get("index")  # see LogicalPlan.from_ast
+        return param
+    if not isinstance(expr, (exp.Literal, exp.Identifier)):
+        raise NotImplementedError("Unsupported literal type")
+    return expr.this  # unquoted value
+
+
+def _pk_predicate(
+    where_expr: exp.Expression,
+) -> Tuple[str, str | Param | List[str | Param]]:
+    """Validate a pk predicate → ``(pk_col, value | [values])``."""
+    while isinstance(where_expr, exp.Paren):
+        where_expr = where_expr.this
+    if isinstance(where_expr, exp.EQ):
+        col_expr = where_expr.left
+        if not isinstance(col_expr, exp.Column):
+            raise NotImplementedError("Unsupported left-hand expression")
+        return col_expr.name, _pk_literal(where_expr.right)
+    if isinstance(where_expr, exp.In):
+        col_expr = where_expr.this
+        subquery = where_expr.args.get("query")
+        if not isinstance(col_expr, exp.Column) or subquery:
+            raise NotImplementedError("Require WHERE pk IN (literal, ...)")
+        values = [_pk_literal(e) for e in where_expr.expressions]
+        return col_expr.name, list(dict.fromkeys(values))
+    if isinstance(where_expr, exp.Or):
+        cols, values = set(), []
+        for operand in where_expr.flatten():
+            col, val = _pk_predicate(operand)
+            cols.add(col.lower())
+            values.extend(val if isinstance(val, list) else [val])
+        if len(cols) != 1:
+            raise NotImplementedError("OR is only supported on the pk")
+        return col, list(dict.fromkeys(values))
+    raise NotImplementedError("Require WHERE pk = literal predicate")
+
+
+def _write_value(expr: exp.Expression) -> Any:
+    """Value of an INSERT / SET item: a literal, ``NULL`` or a Param."""
+    return None if isinstance(expr, exp.Null) else LogicalPlan.literal(expr)
+
+
+def _keys(pks: str | Sequence[str]) -> List[str]:
+    pks = [pks] if isinstance(pks, str) else pks
+    return list(dict.fromkeys(str(pk) for pk in pks))
+
+
+def _join_output(
+    items: List[exp.Expression], sides: Dict[str, int]
+) -> Tuple[Tuple[str, int, str], ...] | None:
+    """``SELECT *`` → ``None``; ``SELECT c.a, o.b AS x`` → ``(("a", 0,
+    "a"), ("x", 1, "b"))`` (name, side, column)."""
+    if len(items) == 1 and items[0].is_star:
+        return None
+    output = []
+    for item in items:
+        col = item.this if isinstance(item, exp.Alias) else item
+        if not isinstance(col, exp.Column) or col.is_star:
+            raise NotImplementedError("Only plain column projections")
+        name = item.alias_or_name
+        if not (_IDENTIFIER.match(col.name) and _IDENTIFIER.match(name)):
+            raise NotImplementedError(f"Unsupported column name '{name}'")
+        output.append((name, sides[_qualifier(col, sides)], col.name))
+    if len({name for name, _, _ in output}) != len(output):
+        raise NotImplementedError("Duplicate column names in projection")
+    return tuple(output)
+
+
+def _qualifier(col: exp.Column, sides: Dict[str, int]) -> str:
+    alias = col.table.lower()
+    if alias not in sides:
+        msg = f"Qualify '{col.name}' with one of the joined tables"
+        raise NotImplementedError(msg)
+    return alias
+
 
 # ---------------------------------------------------------------------------
 # PolyClient
@@ -49,18 +242,166 @@ class PolyClient:
 
     def __init__(self, options: Dict = None) -> None:
         self.options = options
-        self.pg = ConnectorFactory.create_connector("postgres", options)
-        self.rd = ConnectorFactory.create_connector("redis", options)
-        self.nj = ConnectorFactory.create_connector("neo4j", options)
+        opts = options or {}
+        #: ``options["catalogue"]``: a :class:`Catalogue` or ``"shared"``
+        #: (:meth:`Catalogue.shared`); by default the client's own copy
+        catalogue = opts.get("catalogue")
+        if catalogue == "shared":
+            catalogue = Catalogue.shared()
+        self._catalogue: Catalogue = catalogue or Catalogue()
+
+        #: the client's own connector of each backend, created on first
+        #: use (see :meth:`_own`)
+        self._connectors: Dict[str, Any] = {}
+        #: backend name → connector serving it; defaults to :meth:`_own`
+        self.backends = _Backends(self._own)
+        #: (backend, table) → connector over the shards of the table
+        self._sharded: Dict[Tuple[str, str], ShardedConnector] = {}
+        #: per-stage spans of the client and its connectors (see
+        #: :mod:`polyfuseql.telemetry.Instrumentation`)
+        spec = opts.get("telemetry")
+        self.telemetry = Instrumentation(
+            make_sink(spec or os.getenv("POLYFUSEQL_TELEMETRY"))
+        )
+        self._catalogue.subscribe(self._sync_key_hint)
+        self._catalogue.subscribe(self._drop_sharded)
+        self._cache = self._build_cache(options)
+        self._plans = PlanCache(opts.get("plan_cache_size", 1024))
+        self._catalogue.subscribe(self._plans.invalidate)
+        #: build-side rows a join holds in memory before spilling to disk
+        self.join_max_build_rows = opts.get("join_max_build_rows", 100_000)
+        self.join_spill_partitions = opts.get("join_spill_partitions", 16)
+        self._optimizer = Optimizer()
+
+    def _own(self, backend: str):
+        """The client's connector of *backend*, created (its driver
+        imported) on first use and wired to the client's telemetry and
+        catalogue."""
+        conn = self._connectors.get(backend)
+        if conn is None:
+            conn = self._create(backend, self.options)
+            self._connectors[backend] = conn
+        return conn
+
+    def _create(self, backend: str, options: Dict | None):
+        conn = ConnectorFactory.create_connector(backend, options)
+        conn.telemetry = self.telemetry
+        self._catalogue.subscribe(conn.invalidate)
+        if hasattr(conn, "set_key_hint"):
+            for table, (owner, pk_col) in self._catalogue.items():
+                if ConnectorFactory.canonical(owner) == backend:
+                    conn.set_key_hint(table, pk_col)
+        return conn
+
+    def _shard(self, backend: str, instance: Dict, index: int):
+        """Connector of one shard *instance* of *backend*: the client's
+        options with the instance's on top.  Tables sharded over the
+        same instance with the same options share it (and its pool); an
+        instance re-declared with other options gets a new one."""
+        name = instance_name(instance, index)
+        extra = {k: v for k, v in instance.items() if k != "name"}
+        spec = json.dumps(extra, sort_keys=True, default=str)
+        key = f"{backend}@{name} {spec}"
+        conn = self._connectors.get(key)
+        if conn is None:
+            options = {**(self.options or {}), **extra}
+            conn = self._connectors[key] = self._create(backend, options)
+        return conn
+
+    def _sharded_connector(
+        self,
+        backend: str,
+        table: str,
+    ) -> ShardedConnector | None:
+        """The connector over the shards of *table* when the catalogue
+        splits it on *backend*."""
+        spec = self._catalogue.shards(table)
+        if spec is None:
+            return None
+        backend = ConnectorFactory.canonical(backend)
+        owner = ConnectorFactory.canonical(self._catalogue[table][0])
+        if backend != owner:  # replicas on other backends are whole
+            return None
+        conn = self._sharded.get((backend, table))
+        if conn is None:
+            instances = spec.get("instances") or []
+            shards = [
+                self._shard(backend, instance, i)
+                for i, instance in enumerate(instances)
+            ]
+            conn = ShardedConnector(shards, shard_map(spec), self.options)
+            conn.telemetry = self.telemetry
+            self._sharded[(backend, table)] = conn
+        return conn
+
+    def _drop_sharded(self, table: str) -> None:
+        """Rebuild the shard routing of *table* after its mapping
+        changed (the shard connectors stay open)."""
+        for key in [key for key in self._sharded if key[1] == table]:
+            del self._sharded[key]
+
+    @property
+    def pg(self):
+        return self._own("postgres")
+
+    @pg.setter
+    def pg(self, conn) -> None:
+        self._connectors["postgres"] = conn
+
+    @property
+    def rd(self):
+        return self._own("redis")
+
+    @rd.setter
+    def rd(self, conn) -> None:
+        self._connectors["redis"] = conn
+
+    @property
+    def nj(self):
+        return self._own("neo4j")
 
-        self._catalogue: Catalogue = Catalogue()
+    @nj.setter
+    def nj(self, conn) -> None:
+        self._connectors["neo4j"] = conn
 
-        self.backends = {
-            "pg": self.pg,
-            "postgres": self.pg,
-            "redis": self.rd,
-            "neo4j": self.nj,
+    def _sync_key_hint(self, table: str) -> None:
+        """Tell the Neo4j connector which pk the catalogue expects (a
+        connector created later picks up every hint itself)."""
+        backend, pk_col = self._catalogue.get(table, ("", ""))
+        if backend == "neo4j" and "neo4j" in self._connectors:
+            self.nj.set_key_hint(table, pk_col)
+
+    # .................................................................
+    # lifecycle: warm pools at startup, drain them at shutdown
+    # .................................................................
+
+    async def open(self) -> None:
+        """Eagerly open the connector of every backend in the catalogue
+        (e.g. warm the Postgres pool) and the shards of sharded tables."""
+        backends = {
+            ConnectorFactory.canonical(backend)
+            for table in self._catalogue
+            for backend in self._catalogue.replicas(table)
         }
+        conns = [self._own(backend) for backend in sorted(backends)]
+        for table in self._catalogue:
+            if self._catalogue.shards(table) is not None:
+                owner = self._catalogue[table][0]
+                conns.append(self._sharded_connector(owner, table))
+        await asyncio.gather(*(conn.open() for conn in conns))
+
+    async def aclose(self) -> None:
+        """Close every connector created so far, draining pooled
+        connections."""
+        conns = list(self._connectors.values())
+        await asyncio.gather(*(conn.aclose() for conn in conns))
+
+    async def __aenter__(self) -> "PolyClient":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
 
     # .................................................................
     # internal: mapping loader
@@ -84,6 +425,11 @@ class PolyClient:
             data = json.loads(path.read_text())
             for tbl, spec in data.items():
                 self._catalogue[tbl.lower()] = (spec["backend"], spec["pk"])
+                if spec.get("replicas"):
+                    replicas = spec["replicas"]
+                    self._catalogue.set_replicas(tbl.lower(), replicas)
+                if spec.get("shards"):
+                    self._catalogue.set_shards(tbl.lower(), spec["shards"])
         else:
             # built‑in minimal mapping
             self._catalogue.update(
@@ -99,74 +445,637 @@ class PolyClient:
         if not backend:
             backend, source = _MAPPING[logical]
         source = logical
-        print(backend, source)
-        match backend:
-            case "pg":
-                return await self.pg.count(source)
-            case "redis":
-                return await self.rd.count(source)
-            case "neo4j":
-                return await self.nj.count(source)
-            case _:
-                raise ValueError(f"Unknown backend: {backend}")
+        conn = self._connector(backend, source)
+        with self.telemetry.span("count", table=source, backend=backend):
+            n = await conn.count(source)
+        self._optimizer.stats.observe_cardinality(backend, source, n)
+        return n
 
     async def get(self, logical: str, pk: str, backend: str = "") -> Dict:
         if not backend:
             backend, source = _MAPPING[logical]
         source = logical
-        print(backend, source)
-        conn = self.backends.get(backend)
-        if not conn:
-            raise ValueError(f"Unknown backend '{backend}'")
-        obj = await conn.get(source, pk)
+        with self.telemetry.span("get", table=source, backend=backend):
+            obj = await self._get_one(backend, source, pk)
         return obj
 
+    async def get_many(
+        self, logical: str, pks: Sequence[str], backend: str = ""
+    ) -> ResultSet:
+        """Fetch several entities with one batched backend call.
+
+        Rows come back in the order of *pks* (duplicates collapsed);
+        keys without an entity are listed in ``result.missing``.
+        """
+        if not backend:
+            backend, source = _MAPPING[logical]
+        source = logical
+        with self.telemetry.span("get_many", table=source, backend=backend):
+            return await self._get_many(backend, source, pks)
+
+    # .................................................................
+    # write path: every copy of the table is written concurrently
+    # .................................................................
+
+    async def insert(
+        self,
+        table: str,
+        rows: Sequence[Dict[str, Any]],
+        *,
+        engines: str | Sequence[str] | None = None,
+        timeout: float | Dict[str, float] | None = None,
+    ) -> WriteResult:
+        """Insert *rows* (each with the table's catalogue pk) in bulk.
+
+        The write goes to *engines*, by default to every backend holding
+        *table* (its owner and replicas), all at once: ``executemany`` /
+        ``COPY`` on Postgres, one MULTI/EXEC on Redis and ``UNWIND``-ed
+        ``MERGE`` on Neo4j.  The :class:`WriteResult` maps each backend
+        that took the write to its row count and lists the failed (or
+        timed out, see *timeout*) ones in ``errors``; when every backend
+        fails the first error is raised.
+        """
+        rows = list(rows)
+        targets, pk = self._write_targets(table, engines)
+        if any(row.get(pk) is None for row in rows):
+            raise ValueError(f"Every inserted row needs its pk '{pk}'")
+        keys = _keys([row[pk] for row in rows])
+        args = (rows, pk)
+        return await self._write("insert", table, targets, keys, timeout, args)
+
+    async def update(
+        self,
+        table: str,
+        pks: str | Sequence[str],
+        changes: Dict[str, Any],
+        *,
+        engines: str | Sequence[str] | None = None,
+        timeout: float | Dict[str, float] | None = None,
+    ) -> WriteResult:
+        """Set *changes* on the entities with *pks* (missing keys are
+        skipped), on every copy of *table* like :meth:`insert`."""
+        targets, pk = self._write_targets(table, engines)
+        if any(field.lower() == pk.lower() for field in changes):
+            raise NotImplementedError(f"The pk '{pk}' cannot be updated")
+        keys = _keys(pks)
+        args = (keys, dict(changes), pk)
+        return await self._write("update", table, targets, keys, timeout, args)
+
+    async def delete(
+        self,
+        table: str,
+        pks: str | Sequence[str],
+        *,
+        engines: str | Sequence[str] | None = None,
+        timeout: float | Dict[str, float] | None = None,
+    ) -> WriteResult:
+        """Delete the entities with *pks* from every copy of *table*."""
+        targets, pk = self._write_targets(table, engines)
+        keys = _keys(pks)
+        args = (keys, pk)
+        return await self._write("delete", table, targets, keys, timeout, args)
+
+    def _write_targets(
+        self, table: str, engines: str | Sequence[str] | None
+    ) -> Tuple[List[str], str]:
+        """``(backends, pk)`` of a write on *table*."""
+        pk = self._write_pk(table)
+        if engines is None:
+            backends = self._catalogue.replicas(table)
+        else:
+            backends = [engines] if isinstance(engines, str) else list(engines)
+        for backend in backends:
+            self._connector(backend)  # unknown backends fail up front
+        return backends, pk
+
+    def _write_pk(self, table: str) -> str:
+        """Catalogue pk of *table*; writes need one to key the rows."""
+        owner = self._catalogue.get(table)
+        if owner is None:
+            raise ValueError(f"No catalogue entry for table '{table}'")
+        return owner[1]
+
+    async def _write(
+        self,
+        op: str,
+        table: str,
+        backends: Sequence[str],
+        keys: List[str],
+        timeout: float | Dict[str, float] | None,
+        args: Tuple,
+    ) -> WriteResult:
+        """Run connector method *op* on every backend concurrently, then
+        drop the written keys from the result cache (even when some
+        backend failed: its copy may be partly written)."""
+        calls = {
+            backend: functools.partial(
+                getattr(self._connector(backend, table), op), table, *args
+            )
+            for backend in backends
+        }
+        attrs = {"table": table, "keys": len(keys)}
+        with self.telemetry.span(op, **attrs) as span:
+            try:
+                written, errors = await fan_out(calls, timeout=timeout)
+            finally:
+                if self._cache is not None:
+                    await asyncio.gather(
+                        *(self._cache.invalidate(table, key) for key in keys)
+                    )
+            span.set(failed=len(errors))
+        return WriteResult(written, errors)
+
+    # .................................................................
+    # read-through result cache
+    # .................................................................
+
+    def _build_cache(self, options: Dict | None) -> ResultCache | None:
+        """``options["cache"]``: ``True`` or ``{"max_entries", "max_bytes",
+        "ttl", "l2": "redis"}``; disabled when absent."""
+        spec = (options or {}).get("cache")
+        if not spec:
+            return None
+        spec = {} if spec is True else dict(spec)
+        l1 = LRUCache(
+            max_entries=spec.get("max_entries", 10_000),
+            max_bytes=spec.get("max_bytes"),
+            ttl=spec.get("ttl"),
+        )
+        l2 = None
+        if spec.get("l2") == "redis":
+            l2 = RedisCache(self.rd, ttl=spec.get("ttl"))
+        return ResultCache(l1, l2)
+
+    @staticmethod
+    def _cache_key(
+        backend: str,
+        source: str,
+        pk: str,
+        columns: Projection | None = None,
+    ) -> CacheKey:
+        backend = "postgres" if backend == "pg" else backend
+        projection = "*"
+        if columns:
+            projection = ",".join(f"{c} AS {a}" for a, c in columns)
+        return backend, source, str(pk), projection
+
+    async def invalidate(self, table: str, pk: str) -> None:
+        """Drop the cached row of *table*/*pk* on every backend."""
+        if self._cache is not None:
+            await self._cache.invalidate(table, pk)
+
+    async def invalidate_table(self, table: str) -> None:
+        """Drop every cached row of *table* on every backend."""
+        if self._cache is not None:
+            await self._cache.invalidate(table)
+
+    def cache_stats(self) -> Dict:
+        return self._cache.stats() if self._cache is not None else {}
+
+    async def _get_one(
+        self,
+        backend: str,
+        source: str,
+        pk: str,
+        columns: Projection | None = None,
+    ) -> Dict:
+        conn = self._connector(backend, source)
+        if self._cache is None:
+            return await conn.get(source, pk, **_columns(columns))
+        key = self._cache_key(backend, source, pk, columns)
+
+        async def load(keys: List[CacheKey]) -> Dict[CacheKey, Dict]:
+            return {key: await conn.get(source, pk, **_columns(columns))}
+
+        found = await self._cache.get_many([key], load)
+        return found.get(key, {})
+
+    async def _get_many(
+        self,
+        backend: str,
+        source: str,
+        pks: Sequence[str],
+        columns: Projection | None = None,
+    ) -> ResultSet:
+        conn = self._connector(backend, source)
+        keys = list(dict.fromkeys(str(pk) for pk in pks))
+        if self._cache is None:
+            found = await self._fetch_chunks(conn, source, keys, columns)
+        else:
+            key_of = functools.partial(self._cache_key, backend, source)
+            by_key = {key_of(pk, columns): pk for pk in keys}
+
+            async def load(missing: List[CacheKey]) -> Dict[CacheKey, Dict]:
+                # cache keys → pks, fetch, and back
+                wanted = [by_key[key] for key in missing]
+                rows = await self._fetch_chunks(conn, source, wanted, columns)
+                pairs = zip(missing, wanted)
+                return {key: rows[pk] for key, pk in pairs if pk in rows}
+
+            cached = await self._cache.get_many(list(by_key), load)
+            found = {by_key[key]: row for key, row in cached.items()}
+        return ResultSet(
+            (found[pk] for pk in keys if pk in found),
+            missing=(pk for pk in keys if pk not in found),
+        )
+
+    @staticmethod
+    async def _fetch_chunks(
+        conn,
+        source: str,
+        keys: List[str],
+        columns: Projection | None = None,
+    ) -> Dict[str, Dict]:
+        """Batched fetch split into ``conn.max_batch_size`` chunks."""
+        found: Dict[str, Dict] = {}
+        size = max(1, conn.max_batch_size)
+        for start in range(0, len(keys), size):
+            end = start + size
+            chunk = keys[start:end]
+            rows = await conn.get_many(source, chunk, **_columns(columns))
+            found.update(rows)
+        return found
+
         # ---------------------------------------------------------------------
         # NEW: SQL router  (MVP)
         # ---------------------------------------------------------------------
 
-    def query_parse_validate_grammar(self, sql: str) -> Tuple | None:
+    def query_parse_validate_grammar(
+        self, sql: str, allow_scan: bool = False
+    ) -> Tuple | None:
         """
         Analyzes and validates the SQL query.
         Parameters
         ----------
         sql : str
             SQL statement – only a limited subset is supported.
+        allow_scan : bool
+            Accept a missing WHERE clause (full scan); *pk_col* and
+            *pk_val* are then ``None``.
+
+        Returns ``(table, pk_col, pk_val)``; *pk_val* is a single value for
+        ``pk = literal`` and a list of values (in query order, duplicates
+        removed) for ``pk IN (...)`` or ``pk = a OR pk = b ...``.  Values
+        written as ``?`` or ``:name`` are returned as :class:`Param`
+        markers (``?`` numbered in query order) to be bound later.
         """
-        # ------------------------------------------------------------------
-        # 1. Parse & validate grammar subset
-        # ------------------------------------------------------------------
-        ast = sqlglot.parse_one(sql, dialect="mysql")
+        return self._parse(sql, allow_scan)[:3]
 
-        if not isinstance(ast, exp.Select):
-            raise NotImplementedError("Only SELECT supported at this stage")
-        if ast.expressions and not (
-            len(ast.expressions) == 1 and ast.expressions[0].is_star
-        ):
-            msg = "Only SELECT * supported (projections TBD)"
-            raise NotImplementedError(msg)
-
-        # Table name
-        tbl_expr = ast.find(exp.Table)
-        if not tbl_expr:
-            raise NotImplementedError("No table found in query")
-        table = tbl_expr.name
-
-        # WHERE pk = literal predicate
-        where_expr = ast.args.get("where")
-        if isinstance(where_expr, exp.Where):
-            where_expr = where_expr.this
-        if not isinstance(where_expr, exp.EQ):
+    def _parse(
+        self,
+        sql: str | exp.Expression,
+        allow_scan: bool = False,
+    ) -> Tuple:
+        """:meth:`query_parse_validate_grammar` plus the projection →
+        ``(table, pk_col, pk_val, columns)``."""
+        ast = sql
+        if not isinstance(ast, exp.Expression):
+            ast = sqlglot.parse_one(sql, dialect="mysql")
+        logical = self._optimizer.optimize(ast)
+        scan, pk_col, pk_val, columns = self._lower_scan(logical, allow_scan)
+        return scan.table, pk_col, pk_val, columns
+
+    @staticmethod
+    def _lower_scan(logical: LogicalPlan.Node, allow_scan: bool) -> Tuple:
+        """Single-table logical plan → ``(scan, pk_col, pk_val,
+        columns)``; the conditions pushed to the scan must form one
+        ``pk = literal | pk IN (...) | pk = a OR pk = b ...`` predicate."""
+        _, project, _, scan = LogicalPlan.layers(logical)
+        if not isinstance(scan, LogicalPlan.Scan):
+            raise NotImplementedError("JOIN has no single pk predicate")
+        columns = _projection(project.items)
+        if not scan.predicates and allow_scan:
+            return scan, None, None, columns
+        if len(scan.predicates) != 1:
             raise NotImplementedError("Require WHERE pk = literal predicate")
-        col_expr, lit_expr = where_expr.left, where_expr.right
-        if not isinstance(col_expr, exp.Column):
-            raise NotImplementedError("Unsupported left-hand expression")
-        if not isinstance(lit_expr, (exp.Literal, exp.Identifier)):
-            raise NotImplementedError("Unsupported literal type")
-        pk_col = col_expr.name
-        pk_val = lit_expr.this  # unquoted value
+        pk_col, pk_val = _pk_predicate(scan.predicates[0])
+        return scan, pk_col, pk_val, columns
+
+    def _plan(
+        self, sql: str, allow_scan: bool = False
+    ) -> Plan | JoinPlan | AggregatePlan:
+        """Parse, optimize and route *sql* once per normalized text."""
+        plan = self._plans.get(sql)
+        if plan is None:
+            started = time.perf_counter()
+            with self.telemetry.span("parse"):
+                ast = sqlglot.parse_one(sql, dialect="mysql")
+            with self.telemetry.span("plan"):
+                logical = self._optimizer.optimize(ast)
+                if LogicalPlan.aggregate(logical) is not None:
+                    plan = self._plan_aggregate(logical)
+                elif len(LogicalPlan.scans(logical)) > 1:
+                    plan = self._plan_join(logical)
+                else:
+                    plan = self._plan_lookup(logical, allow_scan)
+            self._plans.put(sql, plan, time.perf_counter() - started)
+        if isinstance(plan, WritePlan):
+            raise NotImplementedError("Use execute() for INSERT/UPDATE/DELETE")
+        unfiltered = isinstance(plan, Plan) and plan.where is None
+        if not allow_scan and unfiltered and plan.pk_col is None:
+            raise NotImplementedError("Require WHERE pk = literal predicate")
+        return plan
+
+    def _plan_lookup(
+        self,
+        logical: LogicalPlan.Node,
+        allow_scan: bool,
+        any_key: bool = True,
+    ) -> Plan:
+        """Route a single-table statement.  A lone pk predicate is a key
+        lookup, as in :meth:`query_parse_validate_grammar`; any other
+        WHERE becomes the plan's *where* filter (next to a predicate on
+        the catalogue pk, if there is one), pushed down to the store.
+        Without *any_key* a lone equality on another column than the
+        catalogue pk is a filter too, rather than a lookup only explicit
+        engines may serve."""
+        try:
+            lowered = self._lower_scan(logical, allow_scan)
+            where = None
+        except NotImplementedError:
+            lowered, where = self._lower_filter(logical)
+        scan, pk_col, pk_val, columns = lowered
+        table = scan.table
+        owner = self._catalogue.get(table, ("postgres", pk_col))
+        backend, expected_pk = owner
+        if pk_col is not None and pk_col.lower() != expected_pk.lower():
+            if any_key:
+                backend = None  # only explicit engines may serve it
+            else:
+                lowered, where = self._lower_filter(logical)
+                scan, pk_col, pk_val, columns = lowered
+        replicas = self._catalogue.replicas(table) if backend else ()
+        plan = Plan(table, pk_col, pk_val, backend, columns, replicas)
+        plan.limit, plan.where = scan.limit, where
+        return plan
+
+    def _plan_aggregate(self, logical: LogicalPlan.Node) -> AggregatePlan:
+        """Lower a ``GROUP BY`` / aggregate statement: the rows to
+        aggregate are planned as a lookup, scan or join of only the
+        columns the aggregation reads (see :mod:`Aggregate`)."""
+        limit, project, _, source = LogicalPlan.layers(logical)
+        grouped = LogicalPlan.aggregate(logical)
+        if isinstance(source, LogicalPlan.Scan):
+            lowered = Aggregate.lower(grouped, project, lambda c: c.name)
+            aggregation, output, columns = lowered
+            items = [exp.column(col.name) for col in columns]
+            rows = LogicalPlan.Project(grouped.child, items)
+            plan = self._plan_lookup(rows, True, any_key=False)
+        else:
+            aliases = (source.left.alias, source.right.alias)
+            sides = {alias.lower(): i for i, alias in enumerate(aliases)}
+
+            def naming(col: exp.Column) -> str:
+                return f"{_qualifier(col, sides)}__{col.name}"
+
+            lowered = Aggregate.lower(grouped, project, naming)
+            aggregation, output, columns = lowered
+            items = [exp.alias_(col, naming(col)) for col in columns]
+            rows = LogicalPlan.Project(grouped.child, items or [exp.Star()])
+            plan = self._plan_join(rows)
+        count = None if limit is None else limit.count
+        return AggregatePlan(plan, aggregation, output, count)
+
+    def _lower_filter(self, logical: LogicalPlan.Node) -> Tuple:
+        """``((scan, pk_col, pk_val, columns), where)`` of a filtered
+        single-table statement; *pk_col* is set when one conjunct is a
+        pk predicate on the table's catalogue pk."""
+        _, project, _, scan = LogicalPlan.layers(logical)
+        columns = _projection(project.items)
+        if not scan.predicates:
+            raise NotImplementedError("Require WHERE pk = literal predicate")
+        _, expected = self._catalogue.get(scan.table, (None, ""))
+        pk_col = pk_val = None
+        conds = []
+        for cond in scan.predicates:
+            try:
+                col, val = _pk_predicate(cond)
+            except NotImplementedError:
+                col = None
+            if pk_col is None and col and col.lower() == expected.lower():
+                pk_col, pk_val = col, val
+            else:
+                conds.append(cond)
+        where = P.all_of(LogicalPlan.predicate(c) for c in conds)
+        return (scan, pk_col, pk_val, columns), where
+
+    def _plan_join(self, logical: LogicalPlan.Node) -> JoinPlan:
+        """Lower ``SELECT ... FROM a JOIN b ON a.x = b.y [WHERE ...]``.
+
+        Pushdown must have moved every WHERE conjunct onto one table:
+        equality / IN on that table's catalogue pk becomes its pushed-down
+        keys, anything else the side's *where* filter (pushed into its
+        scan).  Each side only fetches the columns projection pushdown
+        left on its scan.
+        """
+        limit, project, where, join = LogicalPlan.layers(logical)
+        if where is not None:
+            raise NotImplementedError("Each condition must use one table")
+        scans = (join.left, join.right)
+        left = JoinSide(join.left.table, join.left.alias)
+        right = JoinSide(join.right.table, join.right.alias)
+        sides = {left.alias.lower(): 0, right.alias.lower(): 1}
+        if len(sides) != 2:
+            raise NotImplementedError("Alias the joined tables apart")
+        by_index = (left, right)
+
+        on = join.on
+        if not (
+            isinstance(on, exp.EQ)
+            and isinstance(on.left, exp.Column)
+            and isinstance(on.right, exp.Column)
+        ):
+            raise NotImplementedError("Require JOIN ... ON a.col = b.col")
+        for col in (on.left, on.right):
+            by_index[sides[_qualifier(col, sides)]].key = col.name
+        if not (left.key and right.key):
+            raise NotImplementedError("ON must compare the two tables")
+
+        for side, scan in zip(by_index, scans):
+            owner = self._catalogue.get(side.table, ("postgres", None))
+            side.backend, side.pk_col = owner
+            side.replicas = tuple(self._catalogue.replicas(side.table))
+            filters = []
+            for cond in scan.predicates:
+                try:
+                    pk_col, pk_val = _pk_predicate(cond)
+                except NotImplementedError:
+                    pk_col = None
+                expected = (side.pk_col or "").lower()
+                on_pk = pk_col and pk_col.lower() == expected
+                if on_pk and side.pk_val is None:
+                    values = pk_val if isinstance(pk_val, list) else [pk_val]
+                    side.pk_val = values
+                else:
+                    filters.append(LogicalPlan.predicate(cond))
+            side.where = P.all_of(filters)
+            if scan.columns is not None:
+                side.columns = tuple((c, c) for c in scan.columns)
+
+        output = _join_output(project.items, sides)
+        count = None if limit is None else limit.count
+        return JoinPlan(left, right, output, count)
+
+    def explain(self, sql: str) -> str:
+        """Describe how *sql* would run, without running it.
+
+        The text lists the logical plan after the pushdown rules, then
+        the physical plan: per table the backend the optimizer picks and
+        the estimated cost of each replica, and for a join the strategy
+        (bind or hash join) and its sides.  Estimates come from the
+        latencies and cardinalities observed so far, so they sharpen as
+        the client serves queries.  ``print(client.explain(sql))``.
+        """
+        ast = sqlglot.parse_one(sql, dialect="mysql")
+        lines = ["Logical plan:"]
+        lines += LogicalPlan.render(self._optimizer.optimize(ast), 1)
+        lines.append("Physical plan:")
+        plan = self._plan(sql, allow_scan=True)
+        if isinstance(plan, AggregatePlan):
+            lines += self._explain_aggregate(plan)
+        elif isinstance(plan, JoinPlan):
+            lines += self._explain_join(plan)
+        elif plan.backend is None:
+            lines.append(
+                f"  {plan.pk_col} is not the catalogue pk of {plan.table}: "
+                "only an explicit engine= can serve it"
+            )
+        else:
+            lines += self._explain_read(
+                plan.table,
+                plan.replicas or (plan.backend,),
+                plan.pk_col,
+                plan.pk_val,
+                plan.columns,
+                plan.limit,
+                plan.where,
+            )
+        return "\n".join(lines)
+
+    def _explain_read(
+        self,
+        table: str,
+        backends: Sequence[str],
+        pk_col: str | None,
+        pk_val: Any,
+        columns: Projection | None,
+        limit: int | None = None,
+        where: P.Predicate | None = None,
+        depth: int = 1,
+    ) -> List[str]:
+        pad = "  " * depth
+        if pk_col is None:
+            rows = None
+            access = f"Scan {table}"
+        else:
+            rows = len(pk_val) if isinstance(pk_val, list) else 1
+            access = f"Lookup {table}.{pk_col} ({rows} key(s))"
+        chosen = self._optimizer.choose(table, backends, rows)
+        lines = [f"{pad}{access} on {chosen}"]
+        sharded = self._sharded_connector(chosen, table)
+        if sharded is not None:
+            lines.append(f"{pad}  {self._explain_shards(sharded, pk_val)}")
+        if columns is not None:
+            names = ", ".join(f"{c} AS {a}" for a, c in columns)
+            lines.append(f"{pad}  columns: {names}")
+        if where is not None:
+            lines.append(f"{pad}  filter: {P.describe(where)}")
+        if limit is not None:
+            lines.append(f"{pad}  limit: {limit}")
+        if rows is None:
+            rows = self._optimizer.estimate(table, chosen)
+        lines.append(f"{pad}  est. rows: {'?' if rows is None else rows}")
+        costs = []
+        for backend in backends:
+            cost = self._optimizer.cost(backend, table, rows)
+            mark = " (chosen)" if backend == chosen else ""
+            costs.append(f"{backend}={cost * 1000:.3f}ms{mark}")
+        lines.append(f"{pad}  cost: {', '.join(costs)}")
+        return lines
+
+    @staticmethod
+    def _explain_shards(sharded: ShardedConnector, pk_val: Any) -> str:
+        shards = sharded.shard_map
+        total, by = len(shards), shards.by
+        keys = pk_val if isinstance(pk_val, list) else [pk_val]
+        if pk_val is None or any(isinstance(k, Param) for k in keys):
+            return f"shards: {total} ({by}), queried concurrently"
+        hit = len(shards.split(keys))
+        return f"shards: {hit} of {total} ({by}), queried concurrently"
+
+    def _explain_aggregate(self, plan: AggregatePlan) -> List[str]:
+        aggregation, source = plan.aggregation, plan.source
+        aggs = aggregation.aggs
+        calls = [f"{func.upper()}({column or '*'})" for func, column in aggs]
+        head = f"  Aggregate {', '.join(calls)}"
+        if aggregation.keys:
+            head += f" GROUP BY {', '.join(aggregation.keys)}"
+        lines = [head]
+        if aggregation.having is not None:
+            lines.append(f"    having: {P.describe(aggregation.having)}")
+        if plan.limit is not None:
+            lines.append(f"    limit: {plan.limit}")
+        if isinstance(source, JoinPlan):
+            lines.append("    computed: locally over the join")
+            return lines + ["  " + line for line in self._explain_join(source)]
+        backends = source.replicas or (source.backend,)
+        if source.pk_col is not None:
+            computed = "locally over the looked-up rows"
+        else:
+            chosen = self._optimizer.choose(source.table, backends, None)
+            conn = self._connector(chosen, source.table)
+            native = conn.native_aggregates
+            computed = "natively" if native else "locally over the scan"
+            computed += f" on {chosen}"
+            if isinstance(conn, ShardedConnector):
+                computed += ", per shard, then combined"
+        lines.append(f"    computed: {computed}")
+        return lines + self._explain_read(
+            source.table,
+            backends,
+            source.pk_col,
+            source.pk_val,
+            source.columns or None,
+            where=source.where,
+            depth=2,
+        )
+
+    def _explain_join(self, plan: JoinPlan) -> List[str]:
+        sides = (plan.left, plan.right)
+        estimates = [
+            (
+                len(side.pk_val)
+                if side.pk_val is not None
+                else self._optimizer.estimate(side.table)
+            )
+            for side in sides
+        ]
+        probes = [side.lookup_by_key for side in sides]
+        strategy, first = Join.choose_strategy(estimates, probes)
+        a, b = sides[first], sides[1 - first]
+        on = f"{a.alias}.{a.key} = {b.alias}.{b.key}"
+        if strategy == "bind":
+            lines = [f"  BindJoin outer={a.alias} inner={b.alias} ON {on}"]
+        else:
+            lines = [f"  HashJoin build={a.alias} probe={b.alias} ON {on}"]
+        if plan.limit is not None:
+            lines.append(f"    limit: {plan.limit}")
+        for side in sides:
+            lines.append(f"    {side.alias}:")
+            lines += self._explain_read(
+                side.table,
+                side.replicas or (side.backend,),
+                side.pk_col if side.pk_val is not None else None,
+                side.pk_val,
+                side.columns,
+                where=side.where,
+                depth=3,
+            )
+        return lines
 
-        return table, pk_col, pk_val
+    def plan_cache_stats(self) -> Dict:
+        """Plan cache size, hit rate and time spent parsing."""
+        return self._plans.stats()
 
     def set_backends(
         self,
@@ -201,10 +1110,39 @@ class PolyClient:
 
         return backends
 
-    async def query(self, sql: str, *, engine: str = None) -> List:
+    async def query(
+        self,
+        sql: str,
+        *,
+        engine: str | Sequence[str] = None,
+        engines: Sequence[str] | None = None,
+        include_source: bool = False,
+        mode: str = "gather",
+        timeout: float | Dict[str, float] | None = None,
+        quorum: int | None = None,
+        params: Sequence | Dict | None = None,
+        format: str = "rows",
+    ) -> List:
         """Execute *SELECT \\* FROM tbl WHERE pk = literal*
         against one or many backends.
 
+        A column list (``SELECT productName AS name, unitPrice ...``) is
+        pushed down so each store only returns those fields: named
+        columns in the Postgres SELECT, HMGET / ``JSON.GET`` paths on
+        Redis and a map projection in Cypher.
+
+        ``pk IN (...)`` and ``OR`` chains of pk equalities are served by
+        batched ``get_many`` calls (chunked per backend) and return rows
+        in the order the keys appear in the query.
+
+        Any other WHERE (comparisons, ``IN``, ``BETWEEN``, ``LIKE``,
+        ``IS NULL`` combined with ``AND`` / ``OR`` / ``NOT``) is pushed
+        down as a filter: a parameterized WHERE on Postgres, a Cypher
+        ``WHERE`` on Neo4j and an ``FT.SEARCH`` query on Redis when the
+        namespace has a RediSearch index (otherwise the rows are filtered
+        while scanning).  Next to a pk predicate it filters the looked-up
+        rows.
+
         Parameters
         ----------
         sql : str
@@ -213,26 +1151,603 @@ class PolyClient:
             *None* → use the catalogue‑owner backend (default).
             A backend name or list thereof → fan‑out query to each requested
             backend (`"postgres"|"redis"|"neo4j"`).
+        engines : Sequence[str]
+            Backends to fan the query out to, concurrently.
+        include_source : bool
+            Tag fan-out rows with the backend that served them (`_source`).
+        mode : str
+            Fan-out mode: `"gather"` (all backends), `"first"` (first
+            backend to answer, the others are cancelled) or `"quorum"`
+            (first answer returned identically by *quorum* backends).
+        timeout : float | Dict[str, float]
+            Per-backend timeout in seconds, globally or per backend name.
+            Failed and timed-out backends are reported in `result.errors`.
+        quorum : int
+            Agreeing backends required in `"quorum"` mode (majority).
+        params : Sequence | Dict
+            Values bound to `?` (by position) or `:name` placeholders; the
+            parsed plan is cached per SQL text and reused for every value.
+        format : str
+            `"rows"` (a list of dicts) or `"arrow"`: a `pyarrow.Table`
+            built batch by batch from the columns the store returns (see
+            :mod:`polyfuseql.client.Arrow`; one engine only, without
+            *timeout* or *quorum*).
+        """
+        if format not in ("rows", "arrow"):
+            raise ValueError(f"Unknown result format '{format}'")
+        with self.telemetry.span("query", sql=sql):
+            if format == "arrow":
+                many = not isinstance(engine, (str, type(None)))
+                if engines is not None or many:
+                    msg = "format='arrow' reads one engine"
+                    raise NotImplementedError(msg)
+                if timeout is not None or quorum is not None:
+                    msg = "format='arrow' takes no fan-out timeout or quorum"
+                    raise NotImplementedError(msg)
+                from polyfuseql.client import Arrow  # imports pyarrow
+
+                plan = self._plan(sql)
+                columns = self._plan_batches(plan, engine, None, params, True)
+                batches = Arrow.record_batches(columns, hold=None)
+                return Arrow.table([batch async for batch in batches])
+            return await self._query(
+                sql,
+                engine,
+                engines,
+                include_source,
+                mode,
+                timeout,
+                quorum,
+                params,
+            )
+
+    async def execute(
+        self,
+        sql: str,
+        *,
+        engines: str | Sequence[str] | None = None,
+        timeout: float | Dict[str, float] | None = None,
+        params: Sequence | Dict | None = None,
+    ) -> WriteResult:
+        """Run an INSERT, UPDATE or DELETE statement.
+
+        Supported grammar::
+
+            INSERT INTO tbl (pk, col, ...) VALUES (...), (...)
+            UPDATE tbl SET col = value, ... WHERE <pk predicate>
+            DELETE FROM tbl WHERE <pk predicate>
+
+        where the pk predicate is the one :meth:`query` accepts (``pk =
+        v``, ``pk IN (...)``, ``OR`` chains) on the catalogue pk.  Values
+        are literals, ``NULL`` or ``?`` / ``:name`` placeholders bound
+        from *params*; plans are cached like those of :meth:`query`.
+        Runs as :meth:`insert` / :meth:`update` / :meth:`delete`.
         """
+        plan = self._plan_write(sql)
+        options = {"engines": engines, "timeout": timeout}
+        match plan.kind:
+            case "insert":
+                rows = plan.bind_rows(params)
+                return await self.insert(plan.table, rows, **options)
+            case "update":
+                keys = plan.bind_keys(params)
+                changes = plan.bind_changes(params)
+                return await self.update(plan.table, keys, changes, **options)
+            case _:
+                keys = plan.bind_keys(params)
+                return await self.delete(plan.table, keys, **options)
+
+    def _plan_write(self, sql: str) -> WritePlan:
+        plan = self._plans.get(sql)
+        if plan is None:
+            started = time.perf_counter()
+            with self.telemetry.span("parse"):
+                ast = sqlglot.parse_one(sql, dialect="mysql")
+            with self.telemetry.span("plan"):
+                plan = self._lower_write(ast)
+            self._plans.put(sql, plan, time.perf_counter() - started)
+        if not isinstance(plan, WritePlan):
+            raise NotImplementedError("execute() runs INSERT/UPDATE/DELETE")
+        return plan
+
+    def _lower_write(self, ast: exp.Expression) -> WritePlan:
+        if not isinstance(ast, (exp.Insert, exp.Update, exp.Delete)):
+            raise NotImplementedError("execute() runs INSERT/UPDATE/DELETE")
+        placeholders = ast.find_all(exp.Placeholder, bfs=False)
+        for index, node in enumerate(p for p in placeholders if not p.this):
+            node.meta["index"] = index  # `?` numbered in query order
+        if isinstance(ast, exp.Insert):
+            return self._lower_insert(ast)
+        table = ast.this.name
+        pk = self._write_pk(table)
+        where = ast.args.get("where")
+        if where is None:
+            raise NotImplementedError("Require WHERE pk = literal predicate")
+        pk_col, pk_val = _pk_predicate(where.this)
+        if pk_col.lower() != pk.lower():
+            raise NotImplementedError(f"Writes select rows by their pk '{pk}'")
+        if isinstance(ast, exp.Delete):
+            return WritePlan("delete", table, pk, pk_val)
+        changes = {}
+        for item in ast.expressions:
+            column = item.left if isinstance(item, exp.EQ) else None
+            if not isinstance(column, exp.Column):
+                raise NotImplementedError("Require SET col = value, ...")
+            changes[column.name] = _write_value(item.right)
+        return WritePlan("update", table, pk, pk_val, changes=changes)
+
+    def _lower_insert(self, ast: exp.Insert) -> WritePlan:
+        target, values = ast.this, ast.expression
+        if not isinstance(target, exp.Schema):
+            raise NotImplementedError("INSERT must list its columns")
+        if not isinstance(values, exp.Values):
+            raise NotImplementedError("Only INSERT ... VALUES supported")
+        table = target.this.name
+        pk = self._write_pk(table)
+        fields = [col.name for col in target.expressions]
+        if pk not in fields:
+            raise NotImplementedError(f"INSERT must set the pk '{pk}'")
+        rows = []
+        for row in values.expressions:
+            if len(row.expressions) != len(fields):
+                raise ValueError("INSERT row and column list differ in size")
+            rows.append(tuple(_write_value(e) for e in row.expressions))
+        return WritePlan("insert", table, pk, fields=fields, rows=rows)
 
-        table, pk_col, pk_val = self.query_parse_validate_grammar(sql)
-        print(table, pk_col, pk_val)
+    async def _query(
+        self,
+        sql: str,
+        engine: str | Sequence[str] | None,
+        engines: Sequence[str] | None,
+        include_source: bool,
+        mode: str,
+        timeout: float | Dict[str, float] | None,
+        quorum: int | None,
+        params: Sequence | Dict | None,
+    ) -> List:
+        plan = self._plan(sql)
+        if isinstance(plan, AggregatePlan):
+            many = not isinstance(engine, (str, type(None)))
+            if engines is not None or many:
+                raise NotImplementedError("Aggregates run on one engine")
+            return ResultSet(await self._aggregate(plan, engine, params))
+        if isinstance(plan, JoinPlan):
+            if engine or engines:
+                raise NotImplementedError("Joins run on the catalogue owners")
+            joined = self._join_batches(plan, params)
+            rows = [row async for batch in joined for row in batch]
+            return ResultSet(rows)
+        table, pk_col, pk_val = plan.table, plan.pk_col, plan.bind(params)
+        if engines is None and not isinstance(engine, (str, type(None))):
+            engines = engine
+        where = _bound(plan.where, params)
+        if pk_col is None:  # filtered scan
+            if engines is not None:
+                raise NotImplementedError("Filtered scans run on one engine")
+            scan = self._read_batches(plan, engine, None, params)
+            async with contextlib.aclosing(scan) as batches:
+                rows = [row async for batch in batches for row in batch]
+            return ResultSet(rows)
+        if engines is not None:
+            backends = self.set_backends(table, pk_col, engines)
+            return await self._query_fan_out(
+                table,
+                pk_val,
+                plan.columns,
+                backends,
+                include_source,
+                mode,
+                timeout,
+                quorum,
+                plan.limit,
+                where,
+            )
         if not engine:
-            backend_tuple = self._catalogue.get(table, ("postgres", pk_col))
-            backend, expected_pk = backend_tuple
-            print(pk_col.lower(), expected_pk.lower())
-            if pk_col.lower() != expected_pk.lower():
+            if plan.backend is None:
                 raise ValueError(
                     f"Predicate column must be primary key, got '{pk_col}'"
                 )
+            backend = self._replica(plan, pk_val)
         else:
             backend = engine
+        columns, limit = plan.columns, plan.limit
+        return await self._fetch(backend, table, pk_val, columns, limit, where)
+
+    async def stream(
+        self,
+        sql: str,
+        *,
+        engine: str | None = None,
+        batch_size: int | None = None,
+        params: Sequence | Dict | None = None,
+    ) -> AsyncIterator[Dict]:
+        """Iterate over the rows of *sql* without materializing them.
+
+        Besides the :meth:`query` grammar this accepts full scans
+        (``SELECT * FROM tbl``, filtered or not), read through a
+        server-side cursor on Postgres, ``SCAN`` plus pipelined fetches on
+        Redis and a ``fetch_size``-paged result on Neo4j; a filter is
+        pushed into the scan.  Rows are pulled from the backend
+        *batch_size* at a time (default: the connector's
+        ``scan_batch_size``) and only when the consumer asks for more, so
+        memory stays flat whatever the table size; a ``LIMIT`` caps the
+        batch size and closes the scan once enough rows arrived.  Wrap the
+        iterator in :func:`contextlib.aclosing` to release the backend
+        cursor promptly when stopping early.
+        """
+        async with contextlib.aclosing(
+            self._stream_batches(sql, engine, batch_size, params)
+        ) as batches:
+            async for batch in batches:
+                for row in batch:
+                    yield row
+
+    async def stream_arrow(
+        self,
+        sql: str,
+        *,
+        engine: str | None = None,
+        batch_size: int | None = None,
+        params: Sequence | Dict | None = None,
+    ) -> AsyncIterator[Any]:
+        """:meth:`stream`, as ``pyarrow.RecordBatch`` objects of up to
+        *batch_size* rows built from the columns the store returns (see
+        :mod:`polyfuseql.client.Arrow`).  Each batch exports through the
+        Arrow C data interface (``__arrow_c_array__``) or IPC
+        (:func:`Arrow.to_ipc`) as it is."""
+        from polyfuseql.client import Arrow  # imports pyarrow
+
+        columns = self._stream_batches(sql, engine, batch_size, params, True)
+        batches = Arrow.record_batches(columns)
+        async with contextlib.aclosing(batches) as source:
+            async for batch in source:
+                yield batch
+
+    async def _stream_batches(
+        self,
+        sql: str,
+        engine: str | None,
+        batch_size: int | None,
+        params: Sequence | Dict | None,
+        columnar: bool = False,
+    ) -> AsyncIterator[List[Dict] | Columns]:
+        plan = self._plan(sql, allow_scan=True)
+        args = (engine, batch_size, params, columnar)
+        batches = self._plan_batches(plan, *args)
+        async with contextlib.aclosing(batches) as source:
+            async for batch in source:
+                yield batch
+
+    async def _plan_batches(
+        self,
+        plan: Plan | JoinPlan | AggregatePlan,
+        engine: str | None,
+        batch_size: int | None,
+        params: Sequence | Dict | None,
+        columnar: bool = False,
+    ) -> AsyncIterator[List[Dict] | Columns]:
+        """Result batches of *plan*; *columnar* yields :data:`Columns`
+        (decoded column-wise by the store on a scan, transposed from the
+        rows otherwise)."""
+        if isinstance(plan, AggregatePlan):
+            rows = await self._aggregate(plan, engine, params)
+            size = batch_size or len(rows) or 1
+            for start in range(0, len(rows), size):
+                end = start + size
+                batch = rows[start:end]
+                yield to_columns(batch) if columnar else batch
+            return
+        if isinstance(plan, JoinPlan):
+            joined = self._join_batches(plan, params, batch_size)
+            async with contextlib.aclosing(joined) as batches:
+                async for batch in batches:
+                    yield to_columns(batch) if columnar else batch
+            return
+        read = self._read_batches(plan, engine, batch_size, params, columnar)
+        async with contextlib.aclosing(read) as batches:
+            async for batch in batches:
+                yield batch
+
+    async def _read_batches(
+        self,
+        plan: Plan,
+        engine: str | None,
+        batch_size: int | None,
+        params: Sequence | Dict | None,
+        columnar: bool = False,
+    ) -> AsyncIterator[List[Dict] | Columns]:
+        """Batches of a single-table *plan*: a key lookup, or a scan with
+        its filter pushed down to the backend (read with
+        :meth:`Connector.scan_columns` when *columnar*)."""
+        backend = engine or plan.backend
+        if backend is None:
+            raise ValueError(
+                f"Predicate column must be primary key, got '{plan.pk_col}'"
+            )
+        where = _bound(plan.where, params)
+        if plan.pk_col is not None:
+            pk_val = plan.bind(params)
+            if not engine:
+                backend = self._replica(plan, pk_val)
+            rows = await self._fetch(
+                backend, plan.table, pk_val, plan.columns, plan.limit, where
+            )
+            if rows and columnar:
+                names = plan.columns and [alias for alias, _ in plan.columns]
+                yield to_columns(list(rows), names or None)
+            elif rows:
+                yield list(rows)
+            return
+        if not engine:
+            backend = self._replica(plan, None)
+        conn = self._connector(backend, plan.table)
+        if plan.limit is not None:
+            size = batch_size or conn.scan_batch_size
+            batch_size = max(1, min(size, plan.limit))
+        scan = (conn.scan_columns if columnar else conn.scan)(
+            plan.table,
+            batch_size,
+            **_columns(plan.columns),
+            **_where(where),
+        )
+        observed = self._observed(backend, plan.table, scan)
+        limited = self._limited(observed, plan.limit)
+        async with contextlib.aclosing(limited) as batches:
+            async for batch in batches:
+                yield batch
+
+    async def _aggregate(
+        self,
+        plan: AggregatePlan,
+        engine: str | None,
+        params: Sequence | Dict | None,
+    ) -> List[Dict]:
+        """Run an aggregate *plan*.  A scan is aggregated by the backend
+        it reads (natively or over the scan, see
+        :meth:`Connector.aggregate`); the rows of a key lookup or a join
+        are aggregated here, batch by batch as they stream in."""
+        aggregation = plan.aggregation.bind(params)
+        source = plan.source
+        if isinstance(source, JoinPlan):
+            batches = self._join_batches(source, params)
+        elif source.pk_col is not None:
+            batches = self._read_batches(source, engine, None, params)
+        else:
+            backend = engine or source.backend
+            if backend is None:
+                raise ValueError(f"No backend holds '{source.table}'")
+            if not engine:
+                backend = self._replica(source, None)
+            conn = self._connector(backend, source.table)
+            where = _bound(source.where, params)
+            try:
+                groups = await conn.aggregate(
+                    source.table, aggregation, **_where(where)
+                )
+            except Exception:
+                self._optimizer.failed(backend)
+                raise
+            return plan.rows(groups)
+        with self.telemetry.span("aggregate"):
+            async with contextlib.aclosing(batches) as rows:
+                groups = await aggregate_batches(rows, aggregation)
+        return plan.rows(groups)
+
+    def _replica(self, plan: Plan, pk_val: str | List[str] | None) -> str:
+        """Cheapest backend holding *plan*'s table for reading *pk_val*
+        (``None``: the whole table)."""
+        rows = None
+        if pk_val is not None:
+            rows = len(pk_val) if isinstance(pk_val, list) else 1
+        backends = plan.replicas or (plan.backend,)
+        with self.telemetry.span("route", table=plan.table) as span:
+            backend = self._optimizer.choose(plan.table, backends, rows)
+            span.set(backend=backend)
+        return backend
+
+    @staticmethod
+    async def _limited(
+        batches: AsyncIterator[List[Dict]], limit: int | None
+    ) -> AsyncIterator[List[Dict]]:
+        """*batches* cut off after *limit* rows (closing the source)."""
+        async with contextlib.aclosing(batches) as source:
+            left = limit
+            async for batch in source:
+                if left is not None:
+                    batch = _batch_head(batch, left)
+                    left -= _batch_rows(batch)
+                if _batch_rows(batch):
+                    yield batch
+                if left is not None and left <= 0:
+                    break
+
+    async def _observed(
+        self, backend: str, table: str, batches: AsyncIterator[List[Dict]]
+    ) -> AsyncIterator[List[Dict]]:
+        """Pass a scan of *table* through, timing the backend (not the
+        consumer); a scan read to the end also records the cardinality."""
+        elapsed, rows = 0.0, 0
+        async with contextlib.aclosing(batches) as source:
+            while True:
+                started = time.perf_counter()
+                try:
+                    batch = await source.__anext__()
+                except StopAsyncIteration:
+                    break
+                except Exception:
+                    self._optimizer.failed(backend)
+                    raise
+                finally:
+                    elapsed += time.perf_counter() - started
+                rows += _batch_rows(batch)
+                yield batch
+        self._optimizer.stats.observe(backend, elapsed, rows)
+        self._optimizer.stats.observe_cardinality(backend, table, rows)
+
+    async def _timed(self, backend: str, call: Awaitable[List]) -> List:
+        """Await a read of *backend*, recording its latency (or failure)
+        for the optimizer."""
+        started = time.perf_counter()
+        try:
+            rows = await call
+        except Exception:
+            self._optimizer.failed(backend)
+            raise
+        elapsed = time.perf_counter() - started
+        self._optimizer.stats.observe(backend, elapsed, len(rows))
+        return rows
+
+    async def _join_batches(
+        self,
+        plan: JoinPlan,
+        params: Sequence | Dict | None,
+        batch_size: int | None = None,
+    ) -> AsyncIterator[List[Dict]]:
+        """Run a federated join (see :mod:`polyfuseql.client.Join`)."""
+        keys = plan.bind(params)
+        sides = (plan.left, plan.right)
+        wheres = [_bound(side.where, params) for side in sides]
+        inputs = await asyncio.gather(
+            *(
+                self._join_input(side, pks, batch_size, where)
+                for side, pks, where in zip(sides, keys, wheres)
+            ),
+        )
+        joined = Join.execute(
+            plan,
+            *inputs,
+            max_rows=self.join_max_build_rows,
+            partitions=self.join_spill_partitions,
+        )
+        joined = self._limited(joined, plan.limit)
+        async with contextlib.aclosing(joined) as batches:
+            async for batch in batches:
+                yield batch
+
+    async def _join_input(
+        self,
+        side: JoinSide,
+        pks: List[str] | None,
+        batch_size: int | None,
+        where: P.Predicate | None = None,
+    ) -> JoinInput:
+        """Rows, cardinality estimate and key lookup of one join side:
+        pushed-down keys are fetched with ``get_many``, other sides are
+        scanned with *where* pushed into the scan (and probed by key when
+        joined on their pk, *where* then applies to the probed rows,
+        fetched with the filtered columns added).  The side is
+        read from its cheapest replica; the estimate comes from the
+        runtime statistics, or a ``count`` when there are none yet."""
+        rows = None if pks is None else len(pks)
+        backends = side.replicas or (side.backend,)
+        with self.telemetry.span("route", table=side.table) as span:
+            backend = self._optimizer.choose(side.table, backends, rows)
+            span.set(backend=backend)
+        conn = self._connector(backend, side.table)
+        columns = side.columns
+        fetch_columns = columns
+        if where is not None and columns is not None:
+            fetch_columns = P.widen(columns, where)
+
+        async def lookup(keys: List[str]) -> Dict[str, Dict]:
+            fetch = self._fetch_chunks(conn, side.table, keys, fetch_columns)
+            return await self._timed(backend, fetch)
+
+        if pks is not None:
 
-        conn = self.backends.get(backend)
-        if not conn:
-            raise ValueError(f"Unknown backend '{backend}'")
-        print(table)
-        print(pk_val)
-        row = await conn.get(table, pk_val)
+            async def fetched():
+                found = await lookup(pks)
+                rows = [found[pk] for pk in pks if pk in found]
+                if rows:
+                    yield rows
 
-        return [row] if row else []
+            return JoinInput(side, fetched, len(pks), where=where)
+
+        def scan():
+            rows = conn.scan(
+                side.table,
+                batch_size,
+                **_columns(columns),
+                **_where(where),
+            )
+            return self._observed(backend, side.table, rows)
+
+        estimate = self._optimizer.estimate(side.table, backend)
+        if estimate is None:
+            try:
+                estimate = await conn.count(side.table)
+            except Exception:  # no cheap count: treat the side as large
+                estimate = None
+            else:
+                stats = self._optimizer.stats
+                stats.observe_cardinality(backend, side.table, estimate)
+        probe = lookup if side.lookup_by_key else None
+        return JoinInput(side, scan, estimate, probe, where, pushed=True)
+
+    def _connector(self, backend: str, table: str | None = None):
+        """Connector serving *backend*, or *table* on it when the table
+        is sharded."""
+        if table is not None:
+            sharded = self._sharded_connector(backend, table)
+            if sharded is not None:
+                return sharded
+        try:
+            return self.backends[backend]
+        except KeyError:
+            raise ValueError(f"Unknown backend '{backend}'") from None
+
+    async def _fetch(
+        self,
+        backend: str,
+        table: str,
+        pk_val: str | List[str],
+        columns: Projection | None = None,
+        limit: int | None = None,
+        where: P.Predicate | None = None,
+    ) -> List:
+        fetch = columns if where is None else P.widen(columns, where)
+
+        async def read() -> List:
+            if isinstance(pk_val, list):
+                return await self._get_many(backend, table, pk_val, fetch)
+            row = await self._get_one(backend, table, pk_val, fetch)
+            return [row] if row else []
+
+        rows = await self._timed(backend, read())
+        if where is not None:
+            rows[:] = P.keep(rows, where, columns, fetch)
+        if limit is not None:
+            del rows[limit:]
+        return rows
+
+    async def _query_fan_out(
+        self,
+        table: str,
+        pk_val: str | List[str],
+        columns: Projection | None,
+        backends: Sequence[str],
+        include_source: bool,
+        mode: str,
+        timeout: float | Dict[str, float] | None,
+        quorum: int | None,
+        limit: int | None = None,
+        where: P.Predicate | None = None,
+    ) -> ResultSet:
+        """Run the lookup on every backend concurrently (see FanOut)."""
+        calls = {}
+        for backend in backends:
+            self._connector(backend)  # unknown backends fail up front
+            calls[backend] = functools.partial(
+                self._fetch, backend, table, pk_val, columns, limit, where
+            )
+        answers, errors = await fan_out(
+            calls, mode=mode, timeout=timeout, quorum=quorum
+        )
+        if mode == "quorum":  # agreeing answers are identical: keep one
+            answers = dict([next(iter(answers.items()))])
+        rows = [
+            {**row, "_source": backend} if include_source else row
+            for backend, backend_rows in answers.items()
+            for row in backend_rows
+        ]
+        return ResultSet(rows, errors=errors)
@@ -0,0 +1,20 @@
+from typing import Any, Dict, Iterable, List, Mapping
+
+
+class ResultSet(list):
+    """Rows returned by :class:`PolyClient` plus what could not be served.
+
+    Behaves like the plain ``List[Dict]`` returned so far; ``missing``
+    lists the requested keys for which no entity was found and ``errors``
+    maps each backend that failed during a fan-out to its exception.
+    """
+
+    def __init__(
+        self,
+        rows: Iterable[Dict[str, Any]] = (),
+        missing: Iterable[str] = (),
+        errors: Mapping[str, BaseException] | None = None,
+    ) -> None:
+        super().__init__(rows)
+        self.missing: List[str] = list(missing)
+        self.errors: Dict[str, BaseException] = dict(errors or {})
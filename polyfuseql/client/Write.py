@@ -0,0 +1,109 @@
+"""polyfuseql.client.Write
+~~~~~~~~~~~~~~~~~~~~~~~~
+INSERT / UPDATE / DELETE through the router.
+
+:class:`WritePlan` is the validated, cacheable form of a write statement
+(placeholders kept as :class:`Param` markers, like read plans).  A write
+goes to every backend holding the table – its catalogue owner and its
+replicas – concurrently (dual write); the :class:`WriteResult` says
+which stores took it and which failed, so the caller can repair the
+copies that are now behind.
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+from polyfuseql.client.PlanCache import Param, _bind
+
+KINDS = ("insert", "update", "delete")
+
+Params = Sequence[Any] | Mapping[str, Any] | None
+
+
+def _value(value: Any, params: Params) -> Any:
+    return value.value(params) if isinstance(value, Param) else value
+
+
+class WritePlan:
+    """One write statement on *table*.
+
+    ``insert``: *fields* and one tuple of values per row in *rows*;
+    ``update``: the *changes* ``{field: value}``; ``update`` / ``delete``:
+    the catalogue pk *pk_col* and the key(s) *pk_val* they apply to.
+    """
+
+    __slots__ = (
+        "kind",
+        "table",
+        "fields",
+        "rows",
+        "changes",
+        "pk_col",
+        "pk_val",
+    )
+
+    def __init__(
+        self,
+        kind: str,
+        table: str,
+        pk_col: str,
+        pk_val: str | Param | List[str | Param] | None = None,
+        fields: Sequence[str] = (),
+        rows: Sequence[Tuple[Any, ...]] = (),
+        changes: Mapping[str, Any] | None = None,
+    ) -> None:
+        if kind not in KINDS:
+            raise ValueError(f"Unknown write kind '{kind}'")
+        self.kind = kind
+        self.table = table
+        self.pk_col = pk_col
+        self.pk_val = pk_val
+        self.fields = tuple(fields)
+        self.rows = [tuple(row) for row in rows]
+        self.changes = dict(changes or {})
+
+    @property
+    def tables(self) -> Tuple[str]:
+        return (self.table,)
+
+    def bind_rows(self, params: Params = None) -> List[Dict[str, Any]]:
+        """The inserted rows with the placeholders replaced by *params*."""
+        return [
+            {f: _value(v, params) for f, v in zip(self.fields, row)}
+            for row in self.rows
+        ]
+
+    def bind_changes(self, params: Params = None) -> Dict[str, Any]:
+        return {f: _value(v, params) for f, v in self.changes.items()}
+
+    def bind_keys(self, params: Params = None) -> List[str]:
+        """Keys of an ``update`` / ``delete`` (duplicates removed)."""
+        values = self.pk_val
+        if not isinstance(values, list):
+            values = [values]
+        return list(dict.fromkeys(_bind(v, params) for v in values))
+
+
+class WriteResult(dict):
+    """``{backend: entities written}`` for the stores that took a write;
+    ``errors`` maps every store that failed to its exception."""
+
+    def __init__(
+        self,
+        written: Mapping[str, int] | Iterable[Tuple[str, int]] = (),
+        errors: Mapping[str, BaseException] | None = None,
+    ) -> None:
+        super().__init__(written)
+        self.errors: Dict[str, BaseException] = dict(errors or {})
+
+    @property
+    def ok(self) -> bool:
+        """Every targeted store took the write."""
+        return not self.errors
+
+    @property
+    def succeeded(self) -> List[str]:
+        return list(self)
+
+    @property
+    def failed(self) -> List[str]:
+        return list(self.errors)
@@ -0,0 +1,281 @@
+"""polyfuseql.connector.Aggregation
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Backend-neutral ``GROUP BY`` pushed down to the connectors::
+
+    Aggregation(keys=("categoryId",),
+                aggs=(Agg("count"), Agg("avg", "unitPrice")),
+                having=Cmp("a0", "gt", 1))
+
+A connector answers with one row per group, keyed on *slots*: ``g0,
+g1, ...`` for the GROUP BY values and ``a0, a1, ...`` for the aggregates
+(*having* filters those slot rows).  Postgres and Neo4j compile it to
+SQL / Cypher; :class:`LocalAggregator` computes it over streamed batches
+for the stores that cannot, one column at a time rather than row by row.
+A table split over shards runs the :func:`partial` aggregation on every
+shard and merges the groups with :func:`combine`.
+
+Semantics follow SQL: ``COUNT(*)`` counts rows, the other aggregates
+skip NULLs and are NULL over no values, and an aggregation without keys
+yields one row even when nothing matched.  :func:`finish` brings the
+values of every engine to the same types: counts as ints, averages as
+floats and float sums and averages rounded to 12 significant digits,
+so the result does not depend on where (or in what order) it was added.
+"""
+
+import math
+import numbers
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Tuple
+
+from polyfuseql.connector import Predicate as P
+
+FUNCS = ("count", "sum", "avg", "min", "max")
+
+Row = Dict[str, Any]
+
+
+class Agg(NamedTuple):
+    func: str
+    column: str | None = None  # None: COUNT(*)
+
+
+class Aggregation(NamedTuple):
+    keys: Tuple[str, ...]
+    aggs: Tuple[Agg, ...]
+    having: P.Predicate | None = None
+
+    @property
+    def key_slots(self) -> List[str]:
+        return [f"g{i}" for i in range(len(self.keys))]
+
+    @property
+    def agg_slots(self) -> List[str]:
+        return [f"a{i}" for i in range(len(self.aggs))]
+
+    def columns(self) -> List[str]:
+        """Columns the aggregation reads, in order of appearance."""
+        names = [*self.keys, *(a.column for a in self.aggs if a.column)]
+        return list(dict.fromkeys(names))
+
+    def bind(self, params) -> "Aggregation":
+        if self.having is None:
+            return self
+        return self._replace(having=P.bind(self.having, params))
+
+    def finish(self, row: Row) -> Row:
+        """*row* with its aggregates passed through :func:`finish`."""
+        done = dict(row)
+        for slot, agg in zip(self.agg_slots, self.aggs):
+            done[slot] = finish(agg.func, row.get(slot))
+        return done
+
+
+def finish(func: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if func == "count":
+        return int(value)
+    if func == "avg" or (func == "sum" and isinstance(value, float)):
+        return float(f"{float(value):.12g}")
+    return value
+
+
+def _number(value: Any) -> Any:
+    """Numeric text as a number (Redis hashes hold every field as a
+    string); anything else as it is."""
+    if not isinstance(value, str):
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def _ordered(value: Any) -> Tuple[Any, ...]:
+    """Sort key of MIN / MAX: values compare as stored (``'01234'``
+    stays text); a column mixing types orders numbers before text
+    before anything else rather than failing."""
+    if isinstance(value, numbers.Number):
+        return (0, value)
+    if isinstance(value, str):
+        return (1, value)
+    return (2, type(value).__name__, value)
+
+
+def _values(
+    func: str,
+    column: List[Any],
+    index: List[int] | None,
+) -> List[Any]:
+    """The non-NULL values of *column* at *index* (all of them: None),
+    as numbers for SUM / AVG."""
+    picked = column if index is None else [column[i] for i in index]
+    if func in ("sum", "avg"):
+        return [_number(v) for v in picked if v is not None]
+    return [v for v in picked if v is not None]
+
+
+def _add(total: Any, values: List[Any]) -> Any:
+    if any(isinstance(v, float) for v in values) or isinstance(total, float):
+        return math.fsum((total, *values))  # exact per batch
+    return total + sum(values)
+
+
+class LocalAggregator:
+    """Aggregate rows batch by batch in memory.
+
+    Each batch is split into columns; rows are bucketed by their key
+    tuple and every aggregate of a bucket is updated with builtins over
+    the bucket's column values (``len`` / ``sum`` / ``math.fsum`` /
+    ``min`` / ``max``).  Memory holds one accumulator per group.
+    """
+
+    def __init__(self, aggregation: Aggregation) -> None:
+        self.aggregation = aggregation
+        self._groups: Dict[Tuple[Any, ...], List[Any]] = {}
+        self.rows = 0
+
+    def _state(self, key: Tuple[Any, ...]) -> List[Any]:
+        state = self._groups.get(key)
+        if state is None:
+            # count → n; sum / avg → [n, total]; min / max → value
+            aggs = self.aggregation.aggs
+            state = [0 if agg.func == "count" else None for agg in aggs]
+            self._groups[key] = state
+        return state
+
+    def add(self, rows: List[Row]) -> None:
+        """Fold one batch of rows into the groups."""
+        if not rows:
+            return
+        self.rows += len(rows)
+        keys, aggs = self.aggregation.keys, self.aggregation.aggs
+        names = self.aggregation.columns()
+        columns = {name: [row.get(name) for row in rows] for name in names}
+        buckets: Dict[Tuple[Any, ...], List[int] | None]
+        if keys:
+            buckets = {}
+            tuples = zip(*(columns[k] for k in keys))
+            for i, key in enumerate(tuples):
+                buckets.setdefault(key, []).append(i)
+        else:
+            buckets = {(): None}
+        for key, index in buckets.items():
+            state = self._state(key)
+            for j, agg in enumerate(aggs):
+                if agg.column is None:
+                    state[j] += len(rows) if index is None else len(index)
+                    continue
+                values = _values(agg.func, columns[agg.column], index)
+                if not values:
+                    continue
+                state[j] = self._fold(agg.func, state[j], values)
+
+    @staticmethod
+    def _fold(func: str, state: Any, values: List[Any]) -> Any:
+        if func == "count":
+            return state + len(values)
+        if func in ("sum", "avg"):
+            n, total = state or (0, 0)
+            return [n + len(values), _add(total, values)]
+        pick = min if func == "min" else max
+        best = pick(values, key=_ordered)
+        return best if state is None else pick(state, best, key=_ordered)
+
+    def result(self) -> List[Row]:
+        """One row per group (keyed on the slots), *having* applied."""
+        aggregation = self.aggregation
+        groups = self._groups
+        if not groups and not aggregation.keys:
+            groups = {(): self._state(())}
+        rows = []
+        for key, state in groups.items():
+            row = dict(zip(aggregation.key_slots, key))
+            slots = zip(aggregation.agg_slots, aggregation.aggs, state)
+            for slot, agg, value in slots:
+                if agg.func in ("sum", "avg") and value is not None:
+                    n, total = value
+                    value = total / n if agg.func == "avg" else total
+                row[slot] = value
+            if P.matches(aggregation.having, row):
+                rows.append(row)
+        return rows
+
+
+async def aggregate_batches(
+    batches: AsyncIterator[List[Row]], aggregation: Aggregation
+) -> List[Row]:
+    """Run :class:`LocalAggregator` over an async iterator of batches."""
+    local = LocalAggregator(aggregation)
+    async for batch in batches:
+        local.add(batch)
+    return local.result()
+
+
+def partial(aggregation: Aggregation) -> Aggregation:
+    """What each part of a split table (a shard) computes so that
+    :func:`combine` can merge the parts: AVG as SUM and COUNT of its
+    column, and no HAVING (it applies to the merged groups)."""
+    aggs: List[Agg] = []
+    for agg in aggregation.aggs:
+        if agg.func == "avg":
+            aggs += [Agg("sum", agg.column), Agg("count", agg.column)]
+        else:
+            aggs.append(agg)
+    return Aggregation(aggregation.keys, tuple(aggs))
+
+
+def _part(func: str, value: Any) -> Any:
+    """A part's value of *func*: counts and sums as numbers, MIN / MAX
+    as stored."""
+    return _number(value) if func in ("count", "sum") else value
+
+
+def _merge(func: str, state: Any, value: Any) -> Any:
+    if value is None:
+        return state
+    value = _part(func, value)
+    if state is None:
+        return value
+    if func == "count":
+        return int(state) + int(value)
+    if func == "sum":
+        return _add(state, [value])
+    pick = min if func == "min" else max
+    return pick(state, value, key=_ordered)
+
+
+def combine(aggregation: Aggregation, parts: List[List[Row]]) -> List[Row]:
+    """The groups of *aggregation* from the slot rows of
+    :func:`partial` computed on each part, *having* applied."""
+    split = partial(aggregation)
+    groups: Dict[Tuple[Any, ...], List[Any]] = {}
+    for rows in parts:
+        for row in rows:
+            key = tuple(row.get(slot) for slot in split.key_slots)
+            values = [row.get(slot) for slot in split.agg_slots]
+            state = groups.get(key)
+            if state is None:
+                aggs = zip(split.aggs, values)
+                groups[key] = [_part(a.func, v) for a, v in aggs]
+                continue
+            for j, agg in enumerate(split.aggs):
+                state[j] = _merge(agg.func, state[j], values[j])
+    if not groups and not aggregation.keys:
+        groups[()] = [0 if a.func == "count" else None for a in split.aggs]
+    rows = []
+    for key, state in groups.items():
+        row = dict(zip(aggregation.key_slots, key))
+        values = iter(state)
+        for slot, agg in zip(aggregation.agg_slots, aggregation.aggs):
+            value = next(values)
+            if agg.func == "avg":
+                n = next(values)
+                value = None if value is None or not n else value / n
+            row[slot] = value
+        if P.matches(aggregation.having, row):
+            rows.append(row)
+    return rows
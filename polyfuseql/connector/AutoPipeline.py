@@ -0,0 +1,106 @@
+"""polyfuseql.connector.AutoPipeline
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Coalesce concurrent single-key reads into batched round trips.
+
+Point lookups issued by concurrent requests each cost one round trip.
+An :class:`AutoPipeline` parks every ``get(key)`` for a short *window*
+(by default until the event loop has run the other ready tasks), then
+serves all parked keys with one batched *fetch* – e.g. a single ``MGET``
+– and hands each caller its value.  A batch is also sent as soon as it
+holds *max_batch* keys.  Keys asked for twice in a window are fetched
+once; every caller but the first gets a deep copy of the value, so
+nested JSON objects are not shared either.
+"""
+
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Set
+
+Fetch = Callable[[Sequence[str]], Awaitable[Sequence[Any]]]
+
+
+class AutoPipeline:
+    def __init__(
+        self,
+        fetch: Fetch,
+        window: float = 0.0,
+        max_batch: int = 500,
+    ) -> None:
+        self._fetch = fetch
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._flushes: Set[asyncio.Task] = set()
+        self.calls = 0
+        self.batches = 0
+
+    async def get(self, key: str) -> Any:
+        """The value *fetch* returns for *key*, batched with the keys
+        other tasks ask for meanwhile."""
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._pending.setdefault(key, []).append(waiter)
+        self.calls += 1
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await waiter
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            self.batches += 1
+            task = asyncio.ensure_future(self._run(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _run(self, batch: Dict[str, List[asyncio.Future]]) -> None:
+        keys = list(batch)
+        try:
+            values = await self._fetch(keys)
+        except Exception as exc:
+            for waiters in batch.values():
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(exc)
+            return
+        except BaseException:  # cancelled: nobody will answer the waiters
+            self._cancel(batch)
+            raise
+        for key, value in zip(keys, values):
+            for i, waiter in enumerate(batch[key]):
+                if not waiter.done():  # the caller may have been cancelled
+                    # callers of a shared key get their own copy
+                    shared = value if i == 0 else copy.deepcopy(value)
+                    waiter.set_result(shared)
+
+    @staticmethod
+    def _cancel(batch: Dict[str, List[asyncio.Future]]) -> None:
+        for waiters in batch.values():
+            for waiter in waiters:
+                waiter.cancel()
+
+    async def aclose(self) -> None:
+        """Cancel the parked gets and the batches in flight."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        self._cancel(batch)
+        flushes = list(self._flushes)
+        for task in flushes:
+            task.cancel()
+        await asyncio.gather(*flushes, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        batches = self.batches
+        return {
+            "calls": self.calls,
+            "batches": batches,
+            "calls_per_batch": self.calls / batches if batches else 0.0,
+        }
@@ -1,11 +1,94 @@
 # connector_base.py
+import contextlib
+import operator
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Any, AsyncIterator, Callable, Dict, List, Sequence, Tuple
+
+from polyfuseql.connector import Predicate as P
+from polyfuseql.connector.Aggregation import Aggregation, aggregate_batches
+from polyfuseql.telemetry.Instrumentation import Instrumentation, make_sink
+from polyfuseql.utils.utils import env
+
+#: ``((alias, column), ...)`` – the columns to fetch, keyed on the names
+#: the caller sees (camelCase, as in ``SELECT productName AS name``).
+#: ``None`` means every column (``SELECT *``).
+Projection = Tuple[Tuple[str, str], ...]
+#: a batch of rows column by column: ``{name: [value, ...]}``
+Columns = Dict[str, List[Any]]
+
+
+def to_columns(
+    rows: List[Dict[str, Any]], names: Sequence[str] | None = None
+) -> Columns:
+    """*rows* as :data:`Columns`; without *names*, every key of any row
+    (in order of appearance), missing values as ``None``."""
+    if names is None:
+        names = list(rows[0]) if rows else []
+        if set().union(*rows).difference(names):  # rows of varying keys
+            names = list(dict.fromkeys(key for row in rows for key in row))
+    if len(names) < 2 or not rows:
+        return {name: [row.get(name) for row in rows] for name in names}
+    try:  # every row has every key: transpose in C
+        values = zip(*map(operator.itemgetter(*names), rows))
+        return {name: list(col) for name, col in zip(names, values)}
+    except KeyError:
+        return {name: [row.get(name) for row in rows] for name in names}
 
 
 class Connector(ABC):
+    #: upper bound on the keys sent in one ``get_many`` call
+    max_batch_size: int = 500
+    #: ``backend`` attribute of the connector's telemetry spans
+    backend_name: str = ""
+    #: ``aggregate`` runs in the store (not over a local scan)
+    native_aggregates: bool = False
+
     def __init__(self, options: Dict = None) -> None:
         self._options = options or {}
+        #: entities per batch yielded by ``scan``
+        self.scan_batch_size = self._setting(
+            "scan_batch_size", "POLYFUSEQL_SCAN_BATCH_SIZE", 500, int
+        )
+        #: per-stage spans (see :mod:`polyfuseql.telemetry`); PolyClient
+        #: replaces it with the one it shares with all its connectors
+        self.telemetry = Instrumentation(
+            self._setting("telemetry", "POLYFUSEQL_TELEMETRY", None, make_sink)
+        )
+
+    def _setting(
+        self,
+        key: str,
+        env_name: str,
+        default: Any,
+        cast: Callable[[Any], Any] = str,
+    ) -> Any:
+        """Resolve a tunable: ``options[key]`` → ``$env_name`` → default."""
+        value = self._options.get(key)
+        if value is None:
+            value = env(env_name)
+        if value is None:
+            return default
+        return cast(value)
+
+    def _span(self, stage: str, **attrs: Any):
+        """Telemetry span of *stage* on this connector's backend."""
+        return self.telemetry.span(stage, backend=self.backend_name, **attrs)
+
+    async def open(self) -> None:
+        """Eagerly acquire backend resources (no-op unless overridden)."""
+
+    async def aclose(self) -> None:
+        """Release every backend resource held by the connector."""
+
+    def invalidate(self, entity: str) -> None:
+        """Forget per-entity state after its catalogue mapping changed."""
+
+    async def __aenter__(self) -> "Connector":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
 
     @abstractmethod
     async def ping(self) -> bool:
@@ -16,5 +99,107 @@ class Connector(ABC):
         pass
 
     @abstractmethod
-    async def get(self, entity: str, pk: str) -> Dict[str, Any]:
-        pass
+    async def get(
+        self, entity: str, pk: str, columns: Projection | None = None
+    ) -> Dict[str, Any]:
+        """Fetch one entity, only its *columns* when given."""
+
+    @abstractmethod
+    async def get_many(
+        self,
+        entity: str,
+        pks: Sequence[str],
+        columns: Projection | None = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Fetch several entities in one round trip.
+
+        Returns ``{pk: entity}`` for the keys that exist; missing keys are
+        simply absent from the result.  *columns* is pushed down to the
+        store so only the projected fields travel.
+        """
+
+    @abstractmethod
+    def scan(
+        self,
+        entity: str,
+        batch_size: int | None = None,
+        columns: Projection | None = None,
+        where: P.Predicate | None = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream every entity in batches of at most *batch_size*.
+
+        Implemented as async generators that only fetch the next batch
+        when the caller asks for it, so memory stays bounded by the batch
+        size whatever the size of the entity.  With *where* only the
+        entities matching it are returned, filtered by the store where it
+        can (see :mod:`polyfuseql.connector.Predicate`).
+        """
+
+    async def scan_columns(
+        self,
+        entity: str,
+        batch_size: int | None = None,
+        columns: Projection | None = None,
+        where: P.Predicate | None = None,
+    ) -> AsyncIterator[Columns]:
+        """:meth:`scan`, each batch as :data:`Columns` (for columnar
+        results).  This default transposes the row batches; stores that
+        can decode their replies column by column override it."""
+        names = None if columns is None else [a for a, _ in columns]
+        kwargs = {} if where is None else {"where": where}
+        scan = self.scan(entity, batch_size, columns, **kwargs)
+        async with contextlib.aclosing(scan) as batches:
+            async for batch in batches:
+                yield to_columns(batch, names)
+
+    async def aggregate(
+        self,
+        entity: str,
+        aggregation: Aggregation,
+        where: P.Predicate | None = None,
+    ) -> List[Dict[str, Any]]:
+        """One row per group of the entities matching *where*, keyed on
+        the slots of *aggregation* (see :mod:`Aggregation`).
+
+        This default scans only the columns the aggregation reads and
+        folds the batches into a :class:`LocalAggregator`; stores with
+        native aggregation override it (``native_aggregates``).
+        """
+        names = aggregation.columns()
+        columns = tuple((name, name) for name in names) or None
+        kwargs = {} if where is None else {"where": where}
+        batches = self.scan(entity, columns=columns, **kwargs)
+        with self._span("aggregate", entity=entity):
+            return await aggregate_batches(batches, aggregation)
+
+    @abstractmethod
+    async def insert(
+        self,
+        entity: str,
+        rows: Sequence[Dict[str, Any]],
+        pk: str,
+    ) -> int:
+        """Write *rows*, keyed on their *pk* field, in bulk.
+
+        Returns the number of rows written.  Key-value and graph stores
+        overwrite an existing entity with the same key; Postgres rejects
+        the duplicate (and the whole batch with it).
+        """
+
+    @abstractmethod
+    async def update(
+        self,
+        entity: str,
+        pks: Sequence[str],
+        changes: Dict[str, Any],
+        pk: str,
+    ) -> int:
+        """Set the *changes* fields on the entities with *pks*.
+
+        Returns how many entities were updated; missing keys are skipped
+        (never created).
+        """
+
+    @abstractmethod
+    async def delete(self, entity: str, pks: Sequence[str], pk: str) -> int:
+        """Remove the entities with *pks*; returns how many existed."""
@@ -1,19 +1,96 @@
-from typing import Dict
+"""polyfuseql.connector.ConnectorFactory
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Registry of connector classes by backend name.
+
+A backend's module (and its driver: asyncpg, redis, neo4j) is imported
+the first time a connector of that backend is created, so a process
+that only talks to Redis never loads the Postgres or Neo4j drivers.
+
+Other packages add backends through the ``polyfuseql.connectors`` entry
+point group, e.g. in their ``pyproject.toml``::
+
+    [project.entry-points."polyfuseql.connectors"]
+    sqlite = "polyfuseql_sqlite:SQLiteConnector"
+
+or at runtime with :meth:`ConnectorFactory.register`.  Entry points are
+only looked up for names that are neither built in nor registered.
+"""
+
+import importlib
+from importlib import metadata
+from typing import Callable, Dict, List
 
 from polyfuseql.connector.Connector import Connector
-from polyfuseql.connector.Neo4j import Neo4jConnector
-from polyfuseql.connector.Postgres import PostgresConnector
-from polyfuseql.connector.Redis import RedisConnector
+
+ENTRY_POINT_GROUP = "polyfuseql.connectors"
+
+#: built-in backends: name → ``"module:Class"``
+_BUILTIN: Dict[str, str] = {
+    "postgres": "polyfuseql.connector.Postgres:PostgresConnector",
+    "redis": "polyfuseql.connector.Redis:RedisConnector",
+    "neo4j": "polyfuseql.connector.Neo4j:Neo4jConnector",
+}
+#: other names of a backend
+ALIASES: Dict[str, str] = {"pg": "postgres"}
+
+ConnectorType = Callable[[Dict | None], Connector]
+
+
+def _load(target: str) -> ConnectorType:
+    module, _, attr = target.partition(":")
+    return getattr(importlib.import_module(module), attr)
 
 
 class ConnectorFactory:
+    #: name → connector class, or its ``"module:Class"`` / entry point
+    _registry: Dict[str, object] = dict(_BUILTIN)
+    _entry_points_loaded = False
+
     @staticmethod
-    def create_connector(conn_type: str, options: Dict = None) -> Connector:
-        if conn_type == "neo4j":
-            return Neo4jConnector(options)
-        elif conn_type == "postgres":
-            return PostgresConnector(options)
-        elif conn_type == "redis":
-            return RedisConnector(options)
-        else:
+    def canonical(conn_type: str) -> str:
+        """Backend name of *conn_type* (``"pg"`` → ``"postgres"``)."""
+        return ALIASES.get(conn_type, conn_type)
+
+    @classmethod
+    def register(cls, conn_type: str, connector: ConnectorType | str) -> None:
+        """Serve *conn_type* with *connector*: a class (or any callable
+        taking the options) or a ``"module:Class"`` imported on first
+        use."""
+        cls._registry[cls.canonical(conn_type)] = connector
+
+    @classmethod
+    def _entry_points(cls) -> None:
+        if cls._entry_points_loaded:
+            return
+        cls._entry_points_loaded = True
+        for ep in metadata.entry_points(group=ENTRY_POINT_GROUP):
+            cls._registry.setdefault(ep.name, ep)
+
+    @classmethod
+    def available(cls) -> List[str]:
+        """Names of every known backend (without importing them)."""
+        cls._entry_points()
+        return sorted(cls._registry)
+
+    @classmethod
+    def resolve(cls, conn_type: str) -> ConnectorType:
+        """Connector class of *conn_type*, importing it on first use."""
+        name = cls.canonical(conn_type)
+        if name not in cls._registry:
+            cls._entry_points()
+        target = cls._registry.get(name)
+        if target is None:
             raise ValueError(f"Unknown connector type: {conn_type}")
+        if isinstance(target, str):
+            target = cls._registry[name] = _load(target)
+        elif isinstance(target, metadata.EntryPoint):
+            target = cls._registry[name] = target.load()
+        return target
+
+    @classmethod
+    def create_connector(
+        cls,
+        conn_type: str,
+        options: Dict = None,
+    ) -> Connector:
+        return cls.resolve(conn_type)(options)
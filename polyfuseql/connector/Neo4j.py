@@ -1,41 +1,283 @@
-from typing import Dict, Any
+import asyncio
+import contextvars
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Sequence, Tuple
 
-from polyfuseql.connector.Connector import Connector
-from neo4j import AsyncGraphDatabase
+from polyfuseql.connector import Predicate as P
+from polyfuseql.connector.Aggregation import Aggregation
+from polyfuseql.connector.Connector import Connector, Projection
+from neo4j import READ_ACCESS, WRITE_ACCESS, AsyncGraphDatabase, AsyncSession
+from neo4j.exceptions import ClientError
 
-from polyfuseql.utils.utils import env
+from polyfuseql.utils.utils import env, flag
+
+_LABEL_PROPERTIES = (
+    "CALL db.schema.nodeTypeProperties() YIELD nodeLabels, propertyName "
+    "WHERE $label IN nodeLabels "
+    "RETURN collect(DISTINCT propertyName) AS props"
+)
+_LABEL_INDEXES = (
+    "SHOW INDEXES YIELD labelsOrTypes, properties "
+    "WHERE $label IN labelsOrTypes AND properties = [$prop] "
+    "RETURN count(*) AS n"
+)
+
+
+def _return_expr(columns: Projection | None) -> str:
+    """``properties(n)``, or a map projection of the *columns* only."""
+    if columns is None:
+        return "properties(n)"
+    items = []
+    for alias, col in columns:
+        items.append(f".{col}" if alias == col else f"{alias}: n.{col}")
+    return f"n {{{', '.join(items)}}}"
+
+
+_LIKE_OPS = {
+    "prefix": "STARTS WITH",
+    "suffix": "ENDS WITH",
+    "contains": "CONTAINS",
+    "equals": "=",
+}
+
+
+def _where_cypher(pred: P.Predicate, params: Dict[str, Any]) -> str:
+    """Cypher condition on ``n`` for *pred*, its values passed as
+    ``$w0, $w1, ...`` in *params*.  ``LIKE`` with only leading / trailing
+    ``%`` becomes ``STARTS WITH`` / ``ENDS WITH`` / ``CONTAINS`` (which
+    text indexes serve), any other pattern a ``=~`` regular expression."""
+
+    def arg(value: Any) -> str:
+        name = f"w{len(params)}"
+        params[name] = value
+        return f"${name}"
+
+    if isinstance(pred, P.Not):
+        return f"NOT ({_where_cypher(pred.item, params)})"
+    if not isinstance(pred, P.Cmp):
+        glue = " AND " if isinstance(pred, P.And) else " OR "
+        parts = (_where_cypher(p, params) for p in pred.items)
+        return "(" + glue.join(parts) + ")"
+    prop = f"n.{pred.column}"
+    match pred.op:
+        case "in":
+            return f"{prop} IN {arg(list(pred.value))}"
+        case "between":
+            low, high = pred.value
+            return f"({prop} >= {arg(low)} AND {prop} <= {arg(high)})"
+        case "like":
+            affix = P.like_affix(pred.value)
+            if affix is not None:
+                kind, text = affix
+                return f"{prop} {_LIKE_OPS[kind]} {arg(text)}"
+            regex = "(?s)" + P.like_regex(pred.value).pattern
+            return f"{prop} =~ {arg(regex)}"
+        case "null":
+            return f"{prop} IS NULL"
+        case "notnull":
+            return f"{prop} IS NOT NULL"
+    return f"{prop} {P.SYMBOLS[pred.op]} {arg(pred.value)}"
+
+
+def _agg_cypher(func: str, column: str | None) -> str:
+    """Aggregate call; ``sum`` is NULL over no values, as in SQL."""
+    if column is None:
+        return "count(*)"
+    prop = f"n.{column}"
+    if func == "sum":
+        return f"CASE count({prop}) WHEN 0 THEN null ELSE sum({prop}) END"
+    return f"{func}({prop})"
+
+
+def _aggregate_cypher(
+    label: str,
+    aggregation: Aggregation,
+    where: P.Predicate | None,
+    params: Dict[str, Any],
+) -> str:
+    """``MATCH ... WITH keys, aggregates`` (Cypher groups on the non
+    aggregate items), the slots collected into a map ``n`` that a HAVING
+    filters like a node."""
+    items = [
+        f"n.{key} AS {slot}"
+        for key, slot in zip(aggregation.keys, aggregation.key_slots)
+    ]
+    items += [
+        f"{_agg_cypher(*agg)} AS {slot}"
+        for agg, slot in zip(aggregation.aggs, aggregation.agg_slots)
+    ]
+    slots = [*aggregation.key_slots, *aggregation.agg_slots]
+    cypher = f"MATCH (n:{label.capitalize()}) "
+    if where is not None:
+        cypher += f"WHERE {_where_cypher(where, params)} "
+    cypher += f"WITH {', '.join(items)} "
+    cypher += f"WITH {{{', '.join(f'{s}: {s}' for s in slots)}}} AS n "
+    if aggregation.having is not None:
+        cypher += f"WHERE {_where_cypher(aggregation.having, params)} "
+    return cypher + "RETURN n AS p"
 
 
 class Neo4jConnector(Connector):
+    """Neo4j access keyed on a per-label primary-key property.
+
+    The key property of a label is resolved once and cached, from (in
+    order) the ``neo4j_keys`` option ``{label: property}``, a one-time
+    ``db.schema.nodeTypeProperties()`` probe (preferring a hint such as
+    the catalogue pk, see :meth:`set_key_hint`) or, when the schema cannot
+    be read, by probing the candidate properties with the looked-up value.
+    Every later lookup is a single parameterized query.
+
+    Lookups and counts run as managed read transactions (``execute_read``)
+    in READ sessions, so with the ``neo4j://`` routing ``scheme`` a
+    cluster serves them from its followers / read replicas.  Writes run
+    in one managed write transaction (retried by the driver on transient
+    errors), in ``UNWIND`` batches of ``max_batch_size``.
+
+    Every call opens its own session, unless it is made inside a
+    :meth:`session` block.  With ``causal_consistency`` all sessions share
+    one bookmark manager: a read waits until the server answering it has
+    applied the writes made before through this connector.
+    """
+
+    backend_name = "neo4j"
+    native_aggregates = True
+
     def __init__(self, options: Dict = None) -> None:
         super().__init__(options)
-        host = env("NEO4J_HOST", "localhost")
-        port = env("NEO4J_PORT", "7687")
+        # options override the environment for one instance (a shard)
+        host = self._setting("host", "NEO4J_HOST", "localhost")
+        port = self._setting("port", "NEO4J_PORT", "7687")
         user = env("NEO4J_USER", "neo4j")
         password = env("NEO4J_PASSWORD", "password")
-        uri = f"bolt://{host}:{port}"
-        self._driver = AsyncGraphDatabase.driver(uri, auth=(user, password))
+        #: ``bolt`` (one server) or ``neo4j`` (cluster routing)
+        scheme = self._setting("scheme", "NEO4J_SCHEME", "bolt")
+        self.database = self._setting("database", "NEO4J_DATABASE", None)
+        self.max_pool_size = self._setting(
+            "max_pool_size", "NEO4J_MAX_POOL_SIZE", 100, int
+        )
+        #: seconds a session waits for a free pooled connection
+        self.acquisition_timeout = self._setting(
+            "acquisition_timeout", "NEO4J_ACQUISITION_TIMEOUT", 60.0, float
+        )
+        #: seconds after which a pooled connection is replaced
+        self.max_connection_lifetime = self._setting(
+            "max_connection_lifetime",
+            "NEO4J_MAX_CONNECTION_LIFETIME",
+            3600.0,
+            float,
+        )
+        self._uri, self._auth = f"{scheme}://{host}:{port}", (user, password)
+        self._graph = None  # driver, created on first use
+        causal = self._setting(
+            "causal_consistency", "NEO4J_CAUSAL_CONSISTENCY", False, flag
+        )
+        self._bookmarks = None
+        if causal:
+            self._bookmarks = AsyncGraphDatabase.bookmark_manager()
+        #: (session, lock) of the enclosing :meth:`session` block
+        self._scope: contextvars.ContextVar[Tuple[AsyncSession, Any] | None]
+        self._scope = contextvars.ContextVar(f"neo4j_{id(self)}", default=None)
+        self.max_batch_size = self._setting(
+            "max_batch_size", "NEO4J_MAX_BATCH_SIZE", 1000, int
+        )
+        explicit = self._options.get("neo4j_keys") or {}
+        self._explicit_keys = {k.lower(): v for k, v in explicit.items()}
+        self._keys: Dict[str, str] = dict(self._explicit_keys)
+        self._key_hints: Dict[str, str] = {}
+        self._key_lock = asyncio.Lock()
+        self.probe_queries = 0
+        self.probes_avoided = 0
+
+    @property
+    def _driver(self):
+        """The driver and its connection pool, created on first use and
+        again after :meth:`aclose`."""
+        if self._graph is None:
+            self._graph = AsyncGraphDatabase.driver(
+                self._uri,
+                auth=self._auth,
+                max_connection_pool_size=self.max_pool_size,
+                connection_acquisition_timeout=self.acquisition_timeout,
+                max_connection_lifetime=self.max_connection_lifetime,
+            )
+        return self._graph
+
+    @_driver.setter
+    def _driver(self, driver) -> None:
+        self._graph = driver
+
+    async def aclose(self) -> None:
+        """Close the driver; the next call opens a new one."""
+        driver, self._graph = self._graph, None
+        if driver is not None:
+            await driver.close()
+
+    def _new_session(self, access_mode: str = READ_ACCESS, **config: Any):
+        return self._driver.session(
+            database=self.database,
+            default_access_mode=access_mode,
+            bookmark_manager=self._bookmarks,
+            **config,
+        )
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """Share one session among the calls made inside the block (and
+        the tasks it starts), e.g. for all the lookups of one request::
+
+            async with nj.session():
+                customer = await nj.get("customer", "ALFKI")
+                orders = await nj.get_many("order", ids)
+
+        The calls take turns on it: a session runs one transaction at a
+        time.  Reads in the block see its earlier writes (the session
+        chains its own bookmarks).  ``scan`` keeps its own session, as it
+        holds one while the caller consumes it.  Nested blocks reuse the
+        outer session.
+        """
+        scoped = self._scope.get()
+        if scoped is not None:
+            yield scoped[0]
+            return
+        async with self._new_session() as s:
+            token = self._scope.set((s, asyncio.Lock()))
+            try:
+                yield s
+            finally:
+                self._scope.reset(token)
+
+    @asynccontextmanager
+    async def _session(self, access_mode: str = READ_ACCESS):
+        """The scoped session when inside :meth:`session`, else a new
+        one in *access_mode*."""
+        scoped = self._scope.get()
+        if scoped is None:
+            async with self._new_session(access_mode) as s:
+                yield s
+            return
+        s, lock = scoped
+        async with lock:
+            yield s
 
     async def ping(self) -> bool:
-        async with self._driver.session() as s:
+        async with self._session() as s:
             await s.run("RETURN 1")
             return True
 
     async def count(self, label: str) -> int:
-        async with self._driver.session() as s:
-            query = f"MATCH (n:{label.capitalize()}) RETURN count(n) AS n"
-            result = await s.run(query)
-            rec = await result.single()
-            return rec["n"]
+        query = f"MATCH (n:{label.capitalize()}) RETURN count(n) AS n"
 
-    async def get(self, label: str, pk: str) -> Dict[str, Any]:
-        """Fetch one node by its *possible* primary‑key property.
+        async def work(tx) -> int:
+            return (await (await tx.run(query)).single())["n"]
 
-        The seed dataset is inconsistent (`customerId` vs `CustomerID` vs
-        `entityId`).  Try a list of candidate property names until a match
-        is found.  Returns an empty dict if nothing matches.
-        """
-        prop_candidates = [
+        async with self._session() as s:
+            with self._span("round_trip", label=label):
+                return await s.execute_read(work)
+
+    @staticmethod
+    def _key_candidates(label: str) -> List[str]:
+        return [
             f"{label}Id",  # customerId / productId
             f"{label}ID",  # customerID / productID
             "CustomerID",
@@ -44,13 +286,290 @@ class Neo4jConnector(Connector):
             "id",
         ]
 
-        async with self._driver.session() as s:
-            for prop in prop_candidates:
-                cypher = (
-                    f"MATCH (n:{label.capitalize()}) "
-                    f"WHERE n.{prop} = $id RETURN properties(n) AS p LIMIT 1"
-                )
-                rec = await (await s.run(cypher, id=pk)).single()
-                if rec and rec["p"]:
-                    return rec["p"]
-        return {}
+    def set_key_hint(self, label: str, prop: str) -> None:
+        """Prefer *prop* (e.g. the catalogue pk) when resolving *label*."""
+        self._key_hints[label.lower()] = prop
+
+    def invalidate(self, label: str) -> None:
+        label = label.lower()
+        if label not in self._explicit_keys:
+            self._keys.pop(label, None)
+
+    def key_resolution_stats(self) -> Dict[str, Any]:
+        return {
+            "resolved": dict(self._keys),
+            "probe_queries": self.probe_queries,
+            "probes_avoided": self.probes_avoided,
+        }
+
+    async def _resolve_key(
+        self, s: AsyncSession, label: str, pks: Sequence[str]
+    ) -> str | None:
+        """Return the cached key property of *label*, resolving it first
+        if needed.  ``None`` means it could not be determined (yet)."""
+        prop = self._keys.get(label.lower())
+        if prop is not None:
+            return prop
+        async with self._key_lock:
+            prop = self._keys.get(label.lower())
+            if prop is None:
+                prop = await self._probe_key(s, label, pks)
+                if prop is not None:
+                    self._keys[label.lower()] = prop
+                    await self._check_index(s, label, prop)
+        return prop
+
+    async def _probe_key(
+        self, s: AsyncSession, label: str, pks: Sequence[str]
+    ) -> str | None:
+        candidates = self._key_candidates(label)
+        hint = self._key_hints.get(label.lower())
+        if hint:
+            candidates = [hint] + [c for c in candidates if c != hint]
+        try:
+            self.probe_queries += 1
+            result = await s.run(_LABEL_PROPERTIES, label=label.capitalize())
+            rec = await result.single()
+            props = set(rec["props"]) if rec else set()
+        except ClientError:  # procedure unavailable / not allowed
+            props = set()
+        for prop in candidates:
+            if prop in props:
+                return prop
+        # schema unknown: probe with the values being looked up
+        for prop in candidates:
+            self.probe_queries += 1
+            cypher = (
+                f"MATCH (n:{label.capitalize()}) "
+                f"WHERE n.{prop} IN $ids RETURN count(n) > 0 AS hit"
+            )
+            rec = await (await s.run(cypher, ids=list(pks))).single()
+            if rec and rec["hit"]:
+                return prop
+        return None
+
+    async def _check_index(self, s: AsyncSession, label: str, prop: str):
+        params = {"label": label.capitalize(), "prop": prop}
+        try:
+            self.probe_queries += 1
+            result = await s.run(_LABEL_INDEXES, params)
+            rec = await result.single()
+        except ClientError:
+            return
+        if rec and not rec["n"]:
+            logging.warning(
+                "No index on :%s(%s); lookups will scan the label",
+                label.capitalize(),
+                prop,
+            )
+
+    def _count_avoided(
+        self, label: str, prop: str, complete: bool, probed: bool
+    ) -> None:
+        """Add the queries candidate probing would have spent on top of
+        the single resolved query (unless this call had to probe)."""
+        if probed:
+            return
+        candidates = self._key_candidates(label)
+        if complete and prop in candidates:
+            self.probes_avoided += candidates.index(prop)
+        else:
+            self.probes_avoided += len(candidates) - 1
+
+    async def get(
+        self, label: str, pk: str, columns: Projection | None = None
+    ) -> Dict[str, Any]:
+        """Fetch one node by the resolved primary‑key property of *label*.
+
+        The seed dataset is inconsistent (`customerId` vs `CustomerID` vs
+        `entityId`), so the property is resolved once per label (see the
+        class docstring).  *columns* become a map projection.  Returns an
+        empty dict if nothing matches.
+        """
+        probes = self.probe_queries
+        async with self._session() as s:
+            prop = await self._resolve_key(s, label, [pk])
+            if prop is None:
+                return {}
+            cypher = (
+                f"MATCH (n:{label.capitalize()}) "
+                f"WHERE n.{prop} = $id "
+                f"RETURN {_return_expr(columns)} AS p LIMIT 1"
+            )
+
+            async def work(tx):
+                return await (await tx.run(cypher, id=pk)).single()
+
+            with self._span("round_trip", label=label):
+                rec = await s.execute_read(work)
+        found = bool(rec and rec["p"])
+        probed = self.probe_queries != probes
+        self._count_avoided(label, prop, found, probed)
+        return rec["p"] if found else {}
+
+    async def get_many(
+        self,
+        label: str,
+        pks: Sequence[str],
+        columns: Projection | None = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Fetch several nodes with one ``UNWIND $ids`` query on the
+        resolved key property of *label*."""
+        found: Dict[str, Dict[str, Any]] = {}
+        probes = self.probe_queries
+        async with self._session() as s:
+            prop = await self._resolve_key(s, label, pks)
+            if prop is None:
+                return found
+            cypher = (
+                f"UNWIND $ids AS id "
+                f"MATCH (n:{label.capitalize()}) WHERE n.{prop} = id "
+                f"RETURN id, {_return_expr(columns)} AS p"
+            )
+
+            async def work(tx):
+                result = await tx.run(cypher, ids=list(pks))
+                return [rec async for rec in result]
+
+            with self._span("round_trip", label=label, keys=len(pks)):
+                records = await s.execute_read(work)
+            for rec in records:
+                if rec["p"]:
+                    found.setdefault(rec["id"], rec["p"])
+        complete = len(found) == len(set(pks))
+        probed = self.probe_queries != probes
+        self._count_avoided(label, prop, complete, probed)
+        return found
+
+    async def scan(
+        self,
+        label: str,
+        batch_size: int | None = None,
+        columns: Projection | None = None,
+        where: P.Predicate | None = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream the nodes of *label* (those matching *where*, compiled
+        to a parameterized Cypher ``WHERE``).  The session pulls records
+        from the server *batch_size* at a time (``fetch_size``), only when
+        the previous batch has been consumed, in an auto-commit query of
+        a READ session (a managed transaction would buffer the result)."""
+        batch_size = batch_size or self.scan_batch_size
+        projection = _return_expr(columns)
+        params: Dict[str, Any] = {}
+        cypher = f"MATCH (n:{label.capitalize()}) "
+        if where is not None:
+            cypher += f"WHERE {_where_cypher(where, params)} "
+        cypher += f"RETURN {projection} AS p"
+        async with self._new_session(fetch_size=batch_size) as s:
+            result = await s.run(cypher, params)
+            batch = []
+            async for rec in result:
+                batch.append(rec["p"])
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+    async def aggregate(
+        self,
+        label: str,
+        aggregation: Aggregation,
+        where: P.Predicate | None = None,
+    ) -> List[Dict[str, Any]]:
+        """Run the aggregation as one Cypher query in a read
+        transaction."""
+        params: Dict[str, Any] = {}
+        cypher = _aggregate_cypher(label, aggregation, where, params)
+
+        async def work(tx):
+            result = await tx.run(cypher, params)
+            return [rec["p"] async for rec in result]
+
+        async with self._session() as s:
+            with self._span("round_trip", label=label):
+                return await s.execute_read(work)
+
+    async def _write(self, label: str, pks: List[str], pk: str, work):
+        """Run ``work(tx, prop)`` in a write transaction, *prop* being
+        the key property of *label* (*pk* when none is resolved yet)."""
+        async with self._session(WRITE_ACCESS) as s:
+            prop = await self._resolve_key(s, label, pks) or pk
+            with self._span("round_trip", label=label, keys=len(pks)):
+                return await s.execute_write(work, prop)
+
+    def _chunks(self, items: Sequence[Any]) -> List[Sequence[Any]]:
+        size = max(1, self.max_batch_size)
+        chunks = []
+        for start in range(0, len(items), size):
+            end = start + size
+            chunks.append(items[start:end])
+        return chunks
+
+    async def insert(
+        self,
+        label: str,
+        rows: Sequence[Dict[str, Any]],
+        pk: str,
+    ) -> int:
+        """``UNWIND $rows MERGE`` on the key property, then ``SET n +=
+        row``: an existing node with the same key is updated in place."""
+        if not rows:
+            return 0
+        node = label.capitalize()
+
+        async def work(tx, prop: str) -> int:
+            cypher = (
+                f"UNWIND $rows AS row "
+                f"MERGE (n:{node} {{{prop}: row.{pk}}}) SET n += row"
+            )
+            for chunk in self._chunks(list(rows)):
+                await (await tx.run(cypher, rows=chunk)).consume()
+            return len(rows)
+
+        return await self._write(label, [str(r[pk]) for r in rows], pk, work)
+
+    async def update(
+        self,
+        label: str,
+        pks: Sequence[str],
+        changes: Dict[str, Any],
+        pk: str,
+    ) -> int:
+        """``SET n += $changes`` on the matched nodes (a ``None`` value
+        removes the property)."""
+        if not pks or not changes:
+            return 0
+        node = label.capitalize()
+
+        async def work(tx, prop: str) -> int:
+            cypher = (
+                f"UNWIND $ids AS id MATCH (n:{node}) WHERE n.{prop} = id "
+                f"SET n += $changes RETURN count(n) AS n"
+            )
+            total = 0
+            for chunk in self._chunks(list(pks)):
+                result = await tx.run(cypher, ids=chunk, changes=changes)
+                total += (await result.single())["n"]
+            return total
+
+        return await self._write(label, list(pks), pk, work)
+
+    async def delete(self, label: str, pks: Sequence[str], pk: str) -> int:
+        """``DETACH DELETE`` the matched nodes and their relationships."""
+        if not pks:
+            return 0
+        node = label.capitalize()
+
+        async def work(tx, prop: str) -> int:
+            cypher = (
+                f"UNWIND $ids AS id MATCH (n:{node}) WHERE n.{prop} = id "
+                f"DETACH DELETE n RETURN count(*) AS n"
+            )
+            total = 0
+            for chunk in self._chunks(list(pks)):
+                result = await tx.run(cypher, ids=chunk)
+                total += (await result.single())["n"]
+            return total
+
+        return await self._write(label, list(pks), pk, work)
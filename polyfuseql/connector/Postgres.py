@@ -1,67 +1,491 @@
 # ---------------------------------------------------------------------------
-# Connectors (very thin) – open/close per call for simplicity
+# Connectors (very thin) – one lazily created asyncpg pool per connector
 # ---------------------------------------------------------------------------
-import json
-import logging
+import asyncio
+import contextlib
+import functools
+from contextlib import asynccontextmanager
 
-from typing import Dict, Any
+from typing import Any, AsyncIterator, Callable, Dict, List, Sequence, Tuple
 
 import asyncpg
-from polyfuseql.connector.Connector import Connector
-from polyfuseql.utils.utils import _camelize_keys, env
+from polyfuseql.connector import Predicate as P
+from polyfuseql.connector.Aggregation import Aggregation
+from polyfuseql.connector.Connector import Columns, Connector, Projection
+from polyfuseql.connector.RowShape import RowShape
+from polyfuseql.connector.StatementCache import StatementCache, StatementKey
+from polyfuseql.utils.utils import _snake, env
+
+# result column carrying the pk text of a get_many row
+_PK = "__pk"
+
+
+@functools.lru_cache(maxsize=256)
+def _select_expr(columns: Projection | None) -> str:
+    """Columns selected for *columns*: the whole row (keys camelized once
+    per statement by its :class:`RowShape`), or only the projected
+    snake_case columns, already named after their alias."""
+    if columns is None:
+        return "t.*"
+    return ", ".join(f't.{_snake(col)} AS "{alias}"' for alias, col in columns)
+
+
+def _pk_values(pks: Sequence[str]) -> List[Any]:
+    """Key strings as bound to ``= ANY($n)`` (numeric keys as ints)."""
+    if all(pk.isdigit() for pk in pks):
+        return [int(pk) for pk in pks]
+    return list(pks)
+
+
+def _where_sql(pred: P.Predicate, args: List[Any]) -> str:
+    """Parameterized SQL condition for *pred*; its values are appended to
+    *args* and referenced as ``$n``, so the text only depends on the
+    shape of the filter and prepares once per shape."""
+
+    def arg(value: Any) -> str:
+        args.append(value)
+        return f"${len(args)}"
+
+    if isinstance(pred, P.Not):
+        return f"NOT ({_where_sql(pred.item, args)})"
+    if not isinstance(pred, P.Cmp):
+        glue = " AND " if isinstance(pred, P.And) else " OR "
+        return "(" + glue.join(_where_sql(p, args) for p in pred.items) + ")"
+    col = f"t.{_snake(pred.column)}"
+    match pred.op:
+        case "in":
+            return f"{col} = ANY({arg(list(pred.value))})"
+        case "between":
+            low, high = pred.value
+            return f"{col} BETWEEN {arg(low)} AND {arg(high)}"
+        case "like":
+            return f"{col} LIKE {arg(pred.value)}"
+        case "null":
+            return f"{col} IS NULL"
+        case "notnull":
+            return f"{col} IS NOT NULL"
+    return f"{col} {P.SYMBOLS[pred.op]} {arg(pred.value)}"
+
+
+def _agg_sql(func: str, column: str | None) -> str:
+    """Aggregate call; sums and averages are taken over ``numeric`` so
+    they are exact whatever the column type (``real`` included)."""
+    if column is None:
+        return "COUNT(*)"
+    col = f"t.{_snake(column)}"
+    if func in ("sum", "avg"):
+        col += "::numeric"
+    return f"{func.upper()}({col})"
+
+
+def _aggregate_sql(
+    table: str,
+    aggregation: Aggregation,
+    where: P.Predicate | None,
+    args: List[Any],
+) -> str:
+    """``SELECT keys, aggregates FROM table t [WHERE] GROUP BY keys``;
+    a HAVING filters the grouped rows by slot name in an outer query."""
+    items = [
+        f"t.{_snake(key)} AS {slot}"
+        for key, slot in zip(aggregation.keys, aggregation.key_slots)
+    ]
+    items += [
+        f"{_agg_sql(*agg)} AS {slot}"
+        for agg, slot in zip(aggregation.aggs, aggregation.agg_slots)
+    ]
+    query = f"SELECT {', '.join(items)} FROM {table} t"
+    if where is not None:
+        query += f" WHERE {_where_sql(where, args)}"
+    if aggregation.keys:
+        numbers = range(1, len(aggregation.keys) + 1)
+        query += f" GROUP BY {', '.join(map(str, numbers))}"
+    if aggregation.having is not None:
+        having = _where_sql(aggregation.having, args)
+        query = f"SELECT * FROM ({query}) t WHERE {having}"
+    return query
 
 
 class PostgresConnector(Connector):
+    """Postgres access through a shared :class:`asyncpg.Pool`.
+
+    The pool is created on first use (or by :meth:`open` / ``async with``)
+    and sized through ``options`` or the ``POSTGRES_POOL_*`` env vars:
+
+    ``pool_min_size``          / ``POSTGRES_POOL_MIN_SIZE``       (1)
+    ``pool_max_size``          / ``POSTGRES_POOL_MAX_SIZE``       (10)
+    ``pool_acquire_timeout``   / ``POSTGRES_POOL_ACQUIRE_TIMEOUT`` (10 s)
+    ``pool_max_idle_lifetime`` / ``POSTGRES_POOL_MAX_IDLE_LIFETIME`` (300 s,
+    idle connections older than this are closed and recycled)
+
+    ``get_many`` batches are capped at ``max_batch_size`` /
+    ``POSTGRES_MAX_BATCH_SIZE`` keys (1000).
+
+    Point lookups run through per-connection prepared statements
+    (:class:`StatementCache`, ``statement_cache_size`` /
+    ``POSTGRES_STATEMENT_CACHE_SIZE``, default 128 per connection).
+
+    Rows are read as native records and turned into dicts through a
+    :class:`RowShape` computed once per statement and kept in
+    ``self.shapes``.
+
+    Bulk inserts use ``executemany`` (one pipelined round trip) below
+    ``copy_threshold`` / ``POSTGRES_COPY_THRESHOLD`` rows (500) and the
+    binary ``COPY`` protocol from there on.
+    """
+
+    backend_name = "postgres"
+    native_aggregates = True
+
     def __init__(self, options: Dict = None) -> None:
         super().__init__(options)
-        self._options = options
-        self._host = env("POSTGRES_HOST", "localhost")
-        self._port = int(env("POSTGRES_PORT", "5432"))
+        # options override the environment for one instance (a shard)
+        self._host = self._setting("host", "POSTGRES_HOST", "localhost")
+        self._port = self._setting("port", "POSTGRES_PORT", 5432, int)
         self._user = env("POSTGRES_USER", "northwind")
         self._password = env("POSTGRES_PASSWORD", "northwind")
         self._database = env("POSTGRES_DB", "northwind")
+        self._min_size = self._setting(
+            "pool_min_size", "POSTGRES_POOL_MIN_SIZE", 1, int
+        )
+        self._max_size = self._setting(
+            "pool_max_size", "POSTGRES_POOL_MAX_SIZE", 10, int
+        )
+        self._acquire_timeout = self._setting(
+            "pool_acquire_timeout",
+            "POSTGRES_POOL_ACQUIRE_TIMEOUT",
+            10.0,
+            float,
+        )
+        self._max_idle_lifetime = self._setting(
+            "pool_max_idle_lifetime",
+            "POSTGRES_POOL_MAX_IDLE_LIFETIME",
+            300.0,
+            float,
+        )
+        self.max_batch_size = self._setting(
+            "max_batch_size", "POSTGRES_MAX_BATCH_SIZE", 1000, int
+        )
+        self.copy_threshold = self._setting(
+            "copy_threshold", "POSTGRES_COPY_THRESHOLD", 500, int
+        )
+        self._pool: asyncpg.Pool | None = None
+        self._pool_lock = asyncio.Lock()
+        self.statements = StatementCache(
+            self._setting(
+                "statement_cache_size",
+                "POSTGRES_STATEMENT_CACHE_SIZE",
+                128,
+                int,
+            )
+        )
+        self.shapes: Dict[StatementKey, RowShape] = {}
+
+    async def _get_pool(self) -> asyncpg.Pool:
+        if self._pool is None:
+            async with self._pool_lock:
+                if self._pool is None:  # another task may have won the race
+                    idle = self._max_idle_lifetime
+                    self._pool = await asyncpg.create_pool(
+                        host=self._host,
+                        port=self._port,
+                        user=self._user,
+                        password=self._password,
+                        database=self._database,
+                        min_size=self._min_size,
+                        max_size=self._max_size,
+                        max_inactive_connection_lifetime=idle,
+                        init=self._init_connection,
+                    )
+        return self._pool
 
-    async def _connect(self) -> asyncpg.Connection:
-        return await asyncpg.connect(
-            host=self._host,
-            port=self._port,
-            user=self._user,
-            password=self._password,
-            database=self._database,
+    async def _init_connection(self, conn: asyncpg.Connection) -> None:
+        """Pool hook for every new (or recycled) server connection."""
+        pid = conn.get_server_pid()
+        self.statements.discard_connection(pid)  # pid reused by the server
+        conn.add_termination_listener(
+            lambda _conn: self.statements.discard_connection(pid)
         )
 
-    async def ping(self) -> bool:
-        conn = await self._connect()
+    @asynccontextmanager
+    async def _connect(self):
+        with self._span("acquire"):
+            pool = await self._get_pool()
+            conn = await pool.acquire(timeout=self._acquire_timeout)
+        try:
+            yield conn
+        finally:
+            await pool.release(conn)
+
+    async def open(self) -> None:
+        """Create the pool now so ``min_size`` connections are warm."""
+        await self._get_pool()
+
+    async def aclose(self) -> None:
+        """Drain the pool: wait for acquired connections, then close."""
+        async with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            await pool.close()
+        self.statements.invalidate()
+        self.shapes.clear()
+
+    def invalidate(self, table: str) -> None:
+        """Drop cached statements and row shapes after *table*'s mapping
+        changed."""
+        self.statements.invalidate(table)
+        table = table.lower()
+        for key in [k for k in self.shapes if str(k[0]).lower() == table]:
+            del self.shapes[key]
+
+    def _shape(
+        self,
+        key: StatementKey,
+        stmt: asyncpg.prepared_stmt.PreparedStatement,
+        columns: Projection | None,
+    ) -> RowShape:
+        """The row shape of *stmt*, built on the first use of *key*."""
+        shape = self.shapes.get(key)
+        if shape is None:
+            attrs = stmt.get_attributes()
+            shape = RowShape(attrs, camelize=columns is None, keep=(_PK,))
+            self.shapes[key] = shape
+        return shape
+
+    async def _prepared(
+        self,
+        conn: asyncpg.Connection,
+        key: StatementKey,
+        query: str,
+        method: str,
+        *args,
+    ) -> Tuple[asyncpg.prepared_stmt.PreparedStatement, Any]:
+        """Run *query* through the prepared-statement cache and return the
+        statement with its result.
+
+        *method* names the :class:`PreparedStatement` call to make
+        (``"fetchrow"``, ``"fetch"``, …).
+        """
+        stmt = await self.statements.prepare(conn, key, query)
         try:
+            return stmt, await getattr(stmt, method)(*args)
+        except (
+            asyncpg.exceptions.InvalidCachedStatementError,
+            asyncpg.exceptions.OutdatedSchemaCacheError,
+        ):
+            # the table changed under the cached plan: re-prepare once,
+            # its result columns may have changed too
+            self.statements.discard(conn, key)
+            self.shapes.pop(key, None)
+            stmt = await self.statements.prepare(conn, key, query)
+            return stmt, await getattr(stmt, method)(*args)
+
+    @staticmethod
+    def _pk_column(table: str) -> str:
+        return "customer_id" if table == "customers" else "product_id"
+
+    async def ping(self) -> bool:
+        async with self._connect() as conn:
             await conn.execute("SELECT 1")
             return True
-        finally:
-            await conn.close()
 
     async def count(self, table: str) -> int:
-        conn = await self._connect()
-        try:
+        async with self._connect() as conn:
             query = f"SELECT COUNT(*) AS n FROM {table}"
-            logging.log(logging.WARNING, query)
-            row = await conn.fetchrow(query)
+            with self._span("round_trip", table=table):
+                row = await conn.fetchrow(query)
             return int(row["n"])
-        finally:
-            await conn.close()
 
-    async def get(self, table: str, pk: str) -> Dict[str, Any]:
-        pk_col = "customer_id" if table == "customers" else "product_id"
-        conn = await self._connect()
-        try:
-            query = f"SELECT row_to_json(t) FROM {table} t WHERE {pk_col} = $1"
-            print("GET BEFORE AWAIT" + query)
+    async def get(
+        self, table: str, pk: str, columns: Projection | None = None
+    ) -> Dict[str, Any]:
+        pk_col = self._pk_column(table)
+        async with self._connect() as conn:
+            select = _select_expr(columns)
+            query = f"SELECT {select} FROM {table} t WHERE {pk_col} = $1"
             if pk.isdigit():
                 pk_val = int(pk)
             else:
                 pk_val = pk
-            row = await conn.fetchrow(query, pk_val)
-            print("GET AFTER AWAIT" + str(row))
-            print("GET AFTER AWAIT" + str(type(row)))
-            row = json.loads(row.get("row_to_json"))
-            return _camelize_keys(row) if row else {}
-        finally:
-            await conn.close()
+            key = (table, pk_col, columns or "*")
+            with self._span("round_trip", table=table):
+                fetch = self._prepared(conn, key, query, "fetchrow", pk_val)
+                stmt, record = await fetch
+        if record is None:
+            return {}
+        with self._span("deserialize", table=table):
+            return self._shape(key, stmt, columns).row(record)
+
+    async def get_many(
+        self,
+        table: str,
+        pks: Sequence[str],
+        columns: Projection | None = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Fetch every row whose pk is in *pks* with one ``= ANY($1)``."""
+        if not pks:
+            return {}
+        pk_col = self._pk_column(table)
+        if all(pk.isdigit() for pk in pks):
+            by_text = {str(int(pk)): pk for pk in pks}
+            values = [int(pk) for pk in pks]
+        else:
+            by_text = {pk: pk for pk in pks}
+            values = list(pks)
+        query = (
+            f'SELECT {pk_col}::text AS "{_PK}", {_select_expr(columns)} '
+            f"FROM {table} t WHERE {pk_col} = ANY($1)"
+        )
+        async with self._connect() as conn:
+            key = (table, pk_col, columns or "*", "any")
+            with self._span("round_trip", table=table, keys=len(values)):
+                fetch = self._prepared(conn, key, query, "fetch", values)
+                stmt, records = await fetch
+        found = {}
+        with self._span("deserialize", table=table, rows=len(records)):
+            shape = self._shape(key, stmt, columns)
+            for record in records:
+                row = shape.row(record)
+                pk = by_text.get(row.pop(_PK))
+                if pk is not None:
+                    found[pk] = row
+        return found
+
+    async def scan(
+        self,
+        table: str,
+        batch_size: int | None = None,
+        columns: Projection | None = None,
+        where: P.Predicate | None = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream *table* through a server-side cursor, *batch_size* rows
+        per fetch.  *where* becomes a parameterized ``WHERE`` clause.  The
+        pooled connection is held until the iteration ends (or the
+        iterator is closed)."""
+        scan = self._scan(table, batch_size, columns, where, RowShape.rows)
+        async with contextlib.aclosing(scan) as batches:
+            async for batch in batches:
+                yield batch
+
+    async def scan_columns(
+        self,
+        table: str,
+        batch_size: int | None = None,
+        columns: Projection | None = None,
+        where: P.Predicate | None = None,
+    ) -> AsyncIterator[Columns]:
+        """:meth:`scan` decoding each fetch of records column by column
+        (see :meth:`RowShape.columns`)."""
+        scan = self._scan(table, batch_size, columns, where, RowShape.columns)
+        async with contextlib.aclosing(scan) as batches:
+            async for batch in batches:
+                yield batch
+
+    async def _scan(
+        self,
+        table: str,
+        batch_size: int | None,
+        columns: Projection | None,
+        where: P.Predicate | None,
+        decode: Callable[[RowShape, List], Any],
+    ) -> AsyncIterator[Any]:
+        batch_size = batch_size or self.scan_batch_size
+        query = f"SELECT {_select_expr(columns)} FROM {table} t"
+        args: List[Any] = []
+        if where is not None:
+            query += f" WHERE {_where_sql(where, args)}"
+        async with self._connect() as conn:
+            async with conn.transaction():  # cursors live in a transaction
+                stmt = await conn.prepare(query)
+                # the filter does not change the result columns
+                key = (table, None, columns or "*", "scan")
+                shape = self._shape(key, stmt, columns)
+                cursor = await stmt.cursor(*args)
+                while True:
+                    with self._span("round_trip", table=table):
+                        records = await cursor.fetch(batch_size)
+                    if not records:
+                        break
+                    with self._span("deserialize", table=table):
+                        batch = decode(shape, records)
+                    yield batch
+
+    async def aggregate(
+        self,
+        table: str,
+        aggregation: Aggregation,
+        where: P.Predicate | None = None,
+    ) -> List[Dict[str, Any]]:
+        """Run the aggregation as one ``GROUP BY`` statement."""
+        args: List[Any] = []
+        query = _aggregate_sql(table, aggregation, where, args)
+        async with self._connect() as conn:
+            with self._span("round_trip", table=table):
+                stmt = await conn.prepare(query)
+                records = await stmt.fetch(*args)
+            with self._span("deserialize", table=table, rows=len(records)):
+                return RowShape(stmt.get_attributes()).rows(records)
+
+    async def insert(
+        self,
+        table: str,
+        rows: Sequence[Dict[str, Any]],
+        pk: str,
+    ) -> int:
+        """Insert *rows* (camelCase fields → snake_case columns, a field
+        missing from a row is written as NULL) in one statement batch:
+        ``executemany``, or ``COPY`` for ``copy_threshold`` rows and up.
+        Atomic: a failing row rolls the whole batch back."""
+        if not rows:
+            return 0
+        fields = list(dict.fromkeys(field for row in rows for field in row))
+        columns = [_snake(field) for field in fields]
+        records = [tuple(row.get(f) for f in fields) for row in rows]
+        async with self._connect() as conn:
+            with self._span("round_trip", table=table, rows=len(records)):
+                if len(records) >= self.copy_threshold:
+                    await conn.copy_records_to_table(
+                        table, records=records, columns=columns
+                    )
+                else:
+                    numbers = range(1, len(fields) + 1)
+                    marks = ", ".join(f"${i}" for i in numbers)
+                    query = (
+                        f"INSERT INTO {table} ({', '.join(columns)}) "
+                        f"VALUES ({marks})"
+                    )
+                    await conn.executemany(query, records)
+        return len(records)
+
+    async def update(
+        self,
+        table: str,
+        pks: Sequence[str],
+        changes: Dict[str, Any],
+        pk: str,
+    ) -> int:
+        """One ``UPDATE ... SET ... WHERE pk = ANY($n)`` for every key."""
+        if not pks or not changes:
+            return 0
+        sets = ", ".join(
+            f"{_snake(field)} = ${i}" for i, field in enumerate(changes, 1)
+        )
+        query = (
+            f"UPDATE {table} SET {sets} "
+            f"WHERE {_snake(pk)} = ANY(${len(changes) + 1})"
+        )
+        args = [*changes.values(), _pk_values(pks)]
+        async with self._connect() as conn:
+            with self._span("round_trip", table=table, keys=len(pks)):
+                status = await conn.execute(query, *args)
+        return int(status.split()[-1])  # "UPDATE <n>"
+
+    async def delete(self, table: str, pks: Sequence[str], pk: str) -> int:
+        """One ``DELETE ... WHERE pk = ANY($1)`` for every key."""
+        if not pks:
+            return 0
+        query = f"DELETE FROM {table} WHERE {_snake(pk)} = ANY($1)"
+        async with self._connect() as conn:
+            with self._span("round_trip", table=table, keys=len(pks)):
+                status = await conn.execute(query, _pk_values(pks))
+        return int(status.split()[-1])  # "DELETE <n>"
@@ -0,0 +1,261 @@
+"""polyfuseql.connector.Predicate
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Backend-neutral row filter pushed down to the connectors::
+
+    Cmp(column, op, value)      op: eq neq gt gte lt lte in between like
+                                    null notnull
+    And(items) / Or(items) / Not(item)
+
+*value* is a literal, a tuple for ``in`` and ``(low, high)`` for
+``between``; columns are the camelCase names the caller sees.  Each
+connector compiles the tree to what its store evaluates natively
+(parameterized SQL, a Cypher ``WHERE``, a RediSearch query) and
+:func:`evaluate` gives the same answer in Python for whatever a store
+cannot filter itself.  It follows SQL's three-valued logic: comparing a
+missing (NULL) column is unknown, and only rows the predicate holds for
+are kept.
+"""
+
+import functools
+import re
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple, Union
+
+from polyfuseql.utils.utils import project
+
+Row = Dict[str, Any]
+
+OPS = (
+    "eq",
+    "neq",
+    "gt",
+    "gte",
+    "lt",
+    "lte",
+    "in",
+    "between",
+    "like",
+    "null",
+    "notnull",
+)
+#: comparison operators as written in SQL and Cypher
+SYMBOLS = {
+    "eq": "=",
+    "neq": "<>",
+    "gt": ">",
+    "gte": ">=",
+    "lt": "<",
+    "lte": "<=",
+}
+
+
+class Cmp(NamedTuple):
+    column: str
+    op: str
+    value: Any = None
+
+
+class And(NamedTuple):
+    items: Tuple["Predicate", ...]
+
+
+class Or(NamedTuple):
+    items: Tuple["Predicate", ...]
+
+
+class Not(NamedTuple):
+    item: "Predicate"
+
+
+Predicate = Union[Cmp, And, Or, Not]
+
+
+def all_of(items: Iterable[Predicate]) -> Predicate | None:
+    """Conjunction of *items* (``None`` when empty)."""
+    items = tuple(items)
+    if not items:
+        return None
+    return items[0] if len(items) == 1 else And(items)
+
+
+def columns(pred: Predicate) -> List[str]:
+    """Columns read by *pred*, in order of appearance."""
+    if isinstance(pred, Cmp):
+        return [pred.column]
+    items = (pred.item,) if isinstance(pred, Not) else pred.items
+    return list(dict.fromkeys(c for item in items for c in columns(item)))
+
+
+def bind(pred: Predicate, params) -> Predicate:
+    """*pred* with its :class:`Param` placeholders replaced by *params*."""
+    if isinstance(pred, Cmp):
+        value = pred.value
+        if isinstance(value, tuple):
+            value = tuple(_value(v, params) for v in value)
+        else:
+            value = _value(value, params)
+        return pred._replace(value=value)
+    if isinstance(pred, Not):
+        return Not(bind(pred.item, params))
+    return type(pred)(tuple(bind(item, params) for item in pred.items))
+
+
+def _value(value: Any, params) -> Any:
+    lookup = getattr(value, "value", None)  # PlanCache.Param
+    return value if lookup is None else lookup(params)
+
+
+@functools.lru_cache(maxsize=256)
+def like_regex(pattern: str) -> re.Pattern:
+    """SQL ``LIKE`` pattern (``%`` any run, ``_`` one character, ``\\``
+    escapes) as an anchored regular expression."""
+    out, chars = [], iter(pattern)
+    for ch in chars:
+        if ch == "\\":
+            out.append(re.escape(next(chars, "\\")))
+        elif ch == "%":
+            out.append(".*")
+        elif ch == "_":
+            out.append(".")
+        else:
+            out.append(re.escape(ch))
+    return re.compile("".join(out), re.DOTALL)
+
+
+def like_affix(pattern: str) -> Tuple[str, str] | None:
+    """``("prefix" | "suffix" | "contains" | "equals", text)`` when the
+    LIKE *pattern* has only leading / trailing ``%`` wildcards."""
+    if "_" in pattern or "\\" in pattern:
+        return None
+    text = pattern.strip("%")
+    if "%" in text:
+        return None
+    head, tail = pattern.startswith("%"), pattern.endswith("%")
+    if head and tail:
+        return "contains", text
+    if tail:
+        return "prefix", text
+    if head:
+        return "suffix", text
+    return "equals", text
+
+
+def _coerce(got: Any, like: Any) -> Any:
+    """Compare numbers as numbers even when the store returned text
+    (Redis hashes hold every field as a string)."""
+    if isinstance(got, str) and isinstance(like, (int, float)):
+        if not isinstance(like, bool):
+            try:
+                return float(got)
+            except ValueError:
+                return got
+    return got
+
+
+def _compare(pred: Cmp, got: Any) -> bool:
+    op, value = pred.op, pred.value
+    if op == "in":
+        return any(_coerce(got, v) == v for v in value)
+    if op == "between":
+        low, high = value
+        return low <= _coerce(got, low) <= high
+    if op == "like":
+        return like_regex(value).fullmatch(str(got)) is not None
+    got = _coerce(got, value)
+    match op:
+        case "eq":
+            return got == value
+        case "neq":
+            return got != value
+        case "gt":
+            return got > value
+        case "gte":
+            return got >= value
+        case "lt":
+            return got < value
+        case "lte":
+            return got <= value
+    raise ValueError(f"Unknown operator: {op}")
+
+
+def evaluate(pred: Predicate, row: Row) -> bool | None:
+    """``True``, ``False`` or ``None`` (unknown) for *row*."""
+    if isinstance(pred, Cmp):
+        got = row.get(pred.column)
+        if pred.op in ("null", "notnull"):
+            return (got is None) == (pred.op == "null")
+        if got is None:
+            return None
+        try:
+            return _compare(pred, got)
+        except TypeError:  # incomparable types
+            return None
+    if isinstance(pred, Not):
+        result = evaluate(pred.item, row)
+        return None if result is None else not result
+    stop = isinstance(pred, Or)  # the value that decides an AND / OR
+    result: bool | None = not stop
+    for item in pred.items:
+        value = evaluate(item, row)
+        if value is stop:
+            return stop
+        if value is None:
+            result = None
+    return result
+
+
+def matches(pred: Predicate | None, row: Row) -> bool:
+    return pred is None or evaluate(pred, row) is True
+
+
+def widen(fetch: Tuple | None, pred: Predicate) -> Tuple | None:
+    """Projection *fetch* plus the columns *pred* reads, so the filter
+    can be evaluated on the fetched rows; ``None`` (whole rows) when a
+    filtered column is shadowed by an alias of another column."""
+    if fetch is None:
+        return None
+    aliases = dict(fetch)
+    extra = []
+    for col in columns(pred):
+        if col not in aliases:
+            extra.append((col, col))
+        elif aliases[col] != col:
+            return None
+    return tuple(fetch) + tuple(extra)
+
+
+def keep(
+    rows: Iterable[Row | None],
+    pred: Predicate | None,
+    wanted: Tuple | None,
+    fetched: Tuple | None,
+) -> List[Row]:
+    """The rows (fetched with the *fetched* projection, see
+    :func:`widen`) that match *pred*, cut down to the *wanted* one."""
+    kept = [row for row in rows if row and matches(pred, row)]
+    if wanted is None or fetched == wanted:
+        return kept
+    if fetched is None:
+        return [project(row, wanted) for row in kept]
+    return [{alias: row.get(alias) for alias, _ in wanted} for row in kept]
+
+
+def describe(pred: Predicate) -> str:
+    """SQL-like text of *pred* (for :meth:`PolyClient.explain`)."""
+    if isinstance(pred, Not):
+        return f"NOT ({describe(pred.item)})"
+    if not isinstance(pred, Cmp):
+        glue = " AND " if isinstance(pred, And) else " OR "
+        return "(" + glue.join(describe(p) for p in pred.items) + ")"
+    col, op, value = pred
+    match op:
+        case "in":
+            return f"{col} IN ({', '.join(map(repr, value))})"
+        case "between":
+            return f"{col} BETWEEN {value[0]!r} AND {value[1]!r}"
+        case "like":
+            return f"{col} LIKE {value!r}"
+        case "null":
+            return f"{col} IS NULL"
+        case "notnull":
+            return f"{col} IS NOT NULL"
+    return f"{col} {SYMBOLS[op]} {value!r}"
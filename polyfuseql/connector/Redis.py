@@ -1,17 +1,191 @@
+import asyncio
+import contextlib
 import json
+import logging
+import re
 from contextlib import asynccontextmanager
-from typing import Dict, Any
+from typing import Any, AsyncIterator, Dict, List, Sequence, Tuple
 
-from polyfuseql.connector.Connector import Connector
-from polyfuseql.utils.utils import env
+from polyfuseql.connector import Predicate as P
+from polyfuseql.connector.AutoPipeline import AutoPipeline
+from polyfuseql.connector.Connector import Connector, Projection
+from polyfuseql.utils.utils import env, flag, loads, project
 import redis.asyncio as aioredis
+from redis.commands.json import JSON
+from redis.exceptions import ResponseError, WatchError
+
+# data_type → Redis TYPE name, to keep SCAN on one representation
+_SCAN_TYPES = {"string": "string", "hash": "hash", "json": "ReJSON-RL"}
+
+#: how ``count`` is answered (see :meth:`RedisConnector.count`)
+COUNT_MODES = ("auto", "scan", "set", "hll", "index")
+
+
+def _nodes(value: str | Sequence[str]) -> List[tuple[str, int]]:
+    """Parse ``"host:port,host:port"`` (or a list of them)."""
+    if isinstance(value, str):
+        value = [v for v in value.split(",") if v.strip()]
+    nodes = []
+    for node in value:
+        host, _, port = node.strip().rpartition(":")
+        nodes.append((host, int(port)))
+    return nodes
+
+
+def _json_paths(columns: Projection) -> List[str]:
+    return list(dict.fromkeys(f"$.{col}" for _, col in columns))
+
+
+def _from_paths(
+    raw: str | None, paths: List[str], columns: Projection
+) -> Dict[str, Any] | None:
+    """Decode a ``JSON.GET key $.a $.b`` reply into the projected row."""
+    if raw is None:
+        return None
+    values = loads(raw)
+    if len(paths) == 1:  # one path → bare array, several → {path: array}
+        values = {paths[0]: values}
+    row = {}
+    for alias, col in columns:
+        found = values.get(f"$.{col}") or [None]
+        row[alias] = found[0]
+    return row
+
+
+def _from_fields(
+    values: List[str | None], columns: Projection
+) -> Dict[str, Any] | None:
+    """Zip an ``HMGET`` reply with the projection (``None``: no hash)."""
+    if all(v is None for v in values):
+        return None
+    return {alias: v for (alias, _), v in zip(columns, values)}
+
+
+def _hash_fields(row: Dict[str, Any]) -> Dict[str, Any]:
+    """HSET mapping of *row*: strings and numbers as they are, other
+    values as JSON; ``None`` fields are left out."""
+    fields = {}
+    for field, value in row.items():
+        if value is None:
+            continue
+        plain = isinstance(value, (str, int, float))
+        if isinstance(value, bool) or not plain:
+            value = json.dumps(value)
+        fields[field] = value
+    return fields
+
+
+#: ``update`` of hashes / JSON documents: the changes go to the KEYS
+#: that exist, atomically (ARGV: data type, number of pairs, the field /
+#: value pairs (path / JSON for documents), then the fields to HDEL)
+_UPDATE_SCRIPT = """
+local last = 2 + 2 * tonumber(ARGV[2])
+local updated = 0
+for _, key in ipairs(KEYS) do
+  if redis.call('EXISTS', key) == 1 then
+    if ARGV[1] == 'json' then
+      for i = 3, last, 2 do
+        redis.call('JSON.SET', key, ARGV[i], ARGV[i + 1])
+      end
+    elseif last > 2 then
+      redis.call('HSET', key, unpack(ARGV, 3, last))
+    end
+    if #ARGV > last then
+      redis.call('HDEL', key, unpack(ARGV, last + 1))
+    end
+    updated = updated + 1
+  end
+end
+return updated
+"""
+
+_RANGES = {
+    "eq": "[{v} {v}]",
+    "gt": "[({v} +inf]",
+    "gte": "[{v} +inf]",
+    "lt": "[-inf ({v}]",
+    "lte": "[-inf {v}]",
+}
+
+
+def _tag(value: Any) -> str:
+    """Escape a TAG value for the RediSearch query syntax."""
+    return re.sub(r"([^A-Za-z0-9_])", r"\\\1", str(value))
+
+
+def _number(value: Any) -> str | None:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return repr(value)
+
+
+Search = Tuple[str, bool]
+
+
+def _search_query(pred: P.Predicate, schema: Dict[str, str]) -> Search | None:
+    """RediSearch query for *pred* over an index with the *schema*
+    ``{field: type}`` → ``(query, exact)``; ``None`` when it cannot be
+    expressed.  Only NUMERIC ranges are *exact*: TAG matches ignore case
+    and split on separators, so they may return extra documents, and an
+    ``AND`` may leave out the parts it cannot express.  Rows found by an
+    inexact query are filtered again in Python."""
+    if isinstance(pred, P.Cmp):
+        return _search_cmp(pred, schema.get(pred.column, "").upper())
+    if isinstance(pred, P.Not):
+        inner = _search_query(pred.item, schema)
+        if inner is None or not inner[1]:
+            return None  # negating a superset would drop matches
+        return f"-({inner[0]})", False  # also keeps docs without the field
+    parts = [_search_query(item, schema) for item in pred.items]
+    if isinstance(pred, P.Or):
+        if None in parts:
+            return None
+        exact = all(e for _, e in parts)
+        return "(" + " | ".join(q for q, _ in parts) + ")", exact
+    found = [part for part in parts if part is not None]
+    if not found:
+        return None
+    exact = len(found) == len(parts) and all(e for _, e in found)
+    return "(" + " ".join(q for q, _ in found) + ")", exact
+
+
+def _search_cmp(pred: P.Cmp, kind: str) -> Search | None:
+    field, op, value = f"@{pred.column}", pred.op, pred.value
+    if kind == "NUMERIC":
+        values = value if op in ("in", "between") else (value,)
+        numbers = [_number(v) for v in values]
+        if None in numbers:
+            return None
+        if op == "between":
+            return f"{field}:[{numbers[0]} {numbers[1]}]", True
+        if op == "in":
+            ranges = (f"{field}:[{n} {n}]" for n in numbers)
+            return "(" + " | ".join(ranges) + ")", True
+        if op == "neq":  # docs without the field match too: re-check
+            return f"-{field}:[{numbers[0]} {numbers[0]}]", False
+        if op in _RANGES:
+            return f"{field}:" + _RANGES[op].format(v=numbers[0]), True
+        return None
+    if kind == "TAG":
+        if op == "eq":
+            return f"{field}:{{{_tag(value)}}}", False
+        if op == "in":
+            tags = " | ".join(_tag(v) for v in value)
+            return f"{field}:{{{tags}}}", False
+        affix = P.like_affix(value) if op == "like" else None
+        if affix and affix[0] == "prefix" and affix[1]:
+            return f"{field}:{{{_tag(affix[1])}*}}", False
+    return None
 
 
 class RedisConnector(Connector):
+    backend_name = "redis"
+
     def __init__(self, options: Dict = None) -> None:
         super().__init__(options)
-        self._host = env("REDIS_HOST", "localhost")
-        self._port = int(env("REDIS_PORT", "6379"))
+        # options override the environment for one instance (a shard)
+        self._host = self._setting("host", "REDIS_HOST", "localhost")
+        self._port = self._setting("port", "REDIS_PORT", 6379, int)
         self._username = env("REDIS_USER", "northwind")
         self._password = env("REDIS_PASSWORD", "northwind")
         self._client: aioredis.Redis | None = None
@@ -19,48 +193,365 @@ class RedisConnector(Connector):
             self._options = options
         else:
             self._options = {"data_type": "string"}
+        self.max_batch_size = self._setting(
+            "max_batch_size", "REDIS_MAX_BATCH_SIZE", 500, int
+        )
+        self.count_mode = self._setting(
+            "count_mode",
+            "REDIS_COUNT_MODE",
+            "auto",
+        )
+        if self.count_mode not in COUNT_MODES:
+            raise ValueError(f"Unknown count mode: {self.count_mode}")
+        #: COUNT hint of the SCAN calls made by ``count``
+        self.scan_count = self._setting(
+            "scan_count",
+            "REDIS_SCAN_COUNT",
+            1000,
+            int,
+        )
+        #: RediSearch index answering ``count`` (FT.INFO num_docs)
+        self.count_index = self._setting(
+            "count_index", "REDIS_COUNT_INDEX", "idx:{namespace}:{data_type}"
+        )
+        #: nodes (cluster primaries / shards) scanned in parallel
+        self.scan_nodes = self._setting(
+            "scan_nodes",
+            "REDIS_SCAN_NODES",
+            [],
+            _nodes,
+        )
+        #: connection pool of each client (see :meth:`_new_client`)
+        self.max_connections = self._setting(
+            "max_connections", "REDIS_MAX_CONNECTIONS", 50, int
+        )
+        #: seconds a command waits for a free pooled connection
+        self.pool_timeout = self._setting(
+            "pool_timeout", "REDIS_POOL_TIMEOUT", 5.0, float
+        )
+        self.socket_timeout = self._setting(
+            "socket_timeout", "REDIS_SOCKET_TIMEOUT", 5.0, float
+        )
+        self.socket_connect_timeout = self._setting(
+            "socket_connect_timeout",
+            "REDIS_SOCKET_CONNECT_TIMEOUT",
+            5.0,
+            float,
+        )
+        self.socket_keepalive = self._setting(
+            "socket_keepalive", "REDIS_SOCKET_KEEPALIVE", True, flag
+        )
+        #: seconds between PINGs of idle pooled connections (0: never)
+        self.health_check_interval = self._setting(
+            "health_check_interval", "REDIS_HEALTH_CHECK_INTERVAL", 30, int
+        )
+        #: speak RESP3 (``HELLO 3``) instead of RESP2
+        self.resp3 = self._setting("resp3", "REDIS_RESP3", False, flag)
+        #: coalesce concurrent ``get`` calls into one batched round trip
+        self.auto_pipeline = self._setting(
+            "auto_pipeline", "REDIS_AUTO_PIPELINE", False, flag
+        )
+        #: seconds a coalesced ``get`` waits for others (0: one loop tick)
+        self.pipeline_window = self._setting(
+            "pipeline_window", "REDIS_PIPELINE_WINDOW", 0.0, float
+        )
+        self._pipeline: AutoPipeline | None = None
+        self._json_commands: Tuple[aioredis.Redis, JSON] | None = None
+        self._node_clients: List[aioredis.Redis] = []
+        self._missing_indexes: set[str] = set()
+        self._index_schemas: Dict[str, Dict[str, str]] = {}
+        self._unindexed: set[str] = set()  # warned about Python filtering
 
     @asynccontextmanager
     async def _redis(self):
         if not self._client:
-            self._client = aioredis.Redis(
-                host=self._host,
-                port=self._port,
-                decode_responses=True,
-                password=self._password,
-            )
+            self._client = self._new_client(self._host, self._port)
         try:
             yield self._client
         finally:
             pass  # keep connection open for reuse
 
+    def _nodes(self) -> List[aioredis.Redis]:
+        """Clients of the ``scan_nodes`` (the main client when unset)."""
+        if not self.scan_nodes:
+            return [self._client]
+        if not self._node_clients:
+            self._node_clients = [
+                self._new_client(host, port) for host, port in self.scan_nodes
+            ]
+        return self._node_clients
+
+    def _new_client(self, host: str, port: int) -> aioredis.Redis:
+        """Client over its own pool of at most ``max_connections``
+        keepalive sockets.  The pool blocks (up to ``pool_timeout``) rather
+        than fail when every connection is busy; the client closes it."""
+        pool = aioredis.BlockingConnectionPool(
+            host=host,
+            port=port,
+            password=self._password,
+            decode_responses=True,
+            max_connections=self.max_connections,
+            timeout=self.pool_timeout,
+            socket_timeout=self.socket_timeout,
+            socket_connect_timeout=self.socket_connect_timeout,
+            socket_keepalive=self.socket_keepalive,
+            health_check_interval=self.health_check_interval,
+            protocol=3 if self.resp3 else 2,
+        )
+        return aioredis.Redis.from_pool(pool)
+
+    def _json(self, r: aioredis.Redis) -> JSON:
+        """RedisJSON commands of *r*, built once per client."""
+        if self._json_commands is None or self._json_commands[0] is not r:
+            self._json_commands = (r, r.json())
+        return self._json_commands[1]
+
+    async def aclose(self) -> None:
+        pipeline, self._pipeline = self._pipeline, None
+        if pipeline is not None:
+            await pipeline.aclose()
+        self._json_commands = None
+        client, self._client = self._client, None
+        nodes, self._node_clients = self._node_clients, []
+        for c in [client, *nodes]:
+            if c is not None:
+                await c.aclose()
+
+    def invalidate(self, entity: str) -> None:
+        self._missing_indexes.clear()
+        self._index_schemas.clear()
+        self._unindexed.clear()
+
+    def _match(self, namespace: str) -> str:
+        """SCAN pattern of the keys holding the configured ``data_type``.
+
+        Keys follow ``<namespace>:<id>:<data_type>`` (``Customer:1:hash``),
+        so each representation is matched on its suffix as well as on its
+        Redis TYPE.
+        """
+        data_type = self._options.get("data_type", "")
+        if data_type in _SCAN_TYPES:
+            return f"{namespace}:*:{data_type}"
+        return f"{namespace}:*"
+
+    def _id(self, id_: Any) -> str:
+        """*id_* as the ``<id>:<data_type>`` part of its key (as it is when
+        it already names a representation: ``1:hash``)."""
+        id_ = str(id_)
+        data_type = self._options.get("data_type", "")
+        if data_type not in _SCAN_TYPES:
+            return id_
+        if id_.rpartition(":")[2] in _SCAN_TYPES:
+            return id_
+        return f"{id_}:{data_type}"
+
+    def _counter_key(self, namespace: str) -> str:
+        data_type = self._options.get("data_type", "")
+        return f"polyfuseql:count:{namespace}:{data_type}"
+
     async def ping(self) -> bool:
         async with self._redis() as r:
             return await r.ping()
 
     async def count(self, namespace: str) -> int:
-        prefix = f"{namespace}:*"
-        total, cursor = 0, 0
+        """
+        Count the entities of a namespace stored as ``data_type``.
+
+        ``count_mode`` selects the strategy:
+
+        * ``index`` – ``num_docs`` of the RediSearch index ``count_index``;
+        * ``set`` / ``hll`` – the size of a set (exact) or HyperLogLog
+          (approximate, ~0.8 %) of pks kept up to date by :meth:`track`;
+          it is built with one SCAN the first time it is missing;
+        * ``scan`` – SCAN the keyspace, in parallel over ``scan_nodes``;
+        * ``auto`` (default) – the index when it exists, else an existing
+          counter, else SCAN.
+        :param namespace: expected namespace to count
+        :return: Number of entities
+        """
         async with self._redis() as r:
-            while True:
-                c = await r.scan(cursor=cursor, match=prefix, count=1000)
-                cursor, keys = c
+            if self.count_mode in ("auto", "index"):
+                total = await self._count_index(r, namespace)
+                if total is not None:
+                    return total
+            if self.count_mode in ("auto", "set", "hll"):
+                total = await self._count_counter(r, namespace)
+                if total is not None:
+                    return total
+                if self.count_mode != "auto":
+                    return await self.rebuild_count(namespace)
+            return await self._count_scan(namespace)
+
+    async def _count_index(
+        self,
+        r: aioredis.Redis,
+        namespace: str,
+    ) -> int | None:
+        found = await self._index_info(r, namespace)
+        return None if found is None else int(found[1]["num_docs"])
+
+    def _index_name(self, namespace: str) -> str:
+        data_type = self._options.get("data_type", "")
+        return self.count_index.format(
+            namespace=namespace,
+            data_type=data_type,
+        )
+
+    async def _index_info(
+        self, r: aioredis.Redis, namespace: str
+    ) -> Tuple[str, Dict[str, Any]] | None:
+        """``(index, FT.INFO reply)`` of *namespace*'s RediSearch index,
+        ``None`` when it does not exist (remembered until invalidated)."""
+        index = self._index_name(namespace)
+        if index in self._missing_indexes:
+            return None
+        try:
+            info = await r.ft(index).info()
+        except ResponseError:
+            self._missing_indexes.add(index)
+            return None
+        return index, info
+
+    async def _index_schema(
+        self, r: aioredis.Redis, namespace: str
+    ) -> Tuple[str, Dict[str, str]] | None:
+        """``(index, {field: type})`` of *namespace*'s index (cached)."""
+        index = self._index_name(namespace)
+        schema = self._index_schemas.get(index)
+        if schema is None:
+            found = await self._index_info(r, namespace)
+            if found is None:
+                return None
+            schema = {}
+            for attr in found[1].get("attributes", []):
+                spec = dict(zip(attr[::2], attr[1::2]))
+                schema[spec["attribute"]] = spec["type"]
+            self._index_schemas[index] = schema
+        return index, schema
+
+    async def _count_counter(
+        self,
+        r: aioredis.Redis,
+        namespace: str,
+    ) -> int | None:
+        key = self._counter_key(namespace)
+        match await r.type(key):
+            case "set":
+                return await r.scard(key)
+            case "string":  # HyperLogLog
+                return await r.pfcount(key)
+            case _:
+                return None
+
+    async def _count_scan(self, namespace: str) -> int:
+        async def count_node(r: aioredis.Redis) -> int:
+            total = 0
+            async for keys in self._scan_keys(r, namespace):
                 total += len(keys)
-                if cursor == 0:  # fin del cursor
-                    print("cursor was 0")
-                    break
+            return total
+
+        totals = await asyncio.gather(*map(count_node, self._nodes()))
+        return sum(totals)
+
+    async def _scan_keys(
+        self, r: aioredis.Redis, namespace: str, count: int | None = None
+    ) -> AsyncIterator[List[str]]:
+        """Yield the pages of keys SCAN returns for *namespace*."""
+        data_type = self._options.get("data_type", "")
+        cursor = 0
+        while True:
+            cursor, keys = await r.scan(
+                cursor=cursor,
+                match=self._match(namespace),
+                count=count or self.scan_count,
+                _type=_SCAN_TYPES.get(data_type),
+            )
+            if keys:
+                yield keys
+            if cursor == 0:
+                break
+
+    async def track(self, namespace: str, pks: Sequence[str]) -> None:
+        """Record written *pks* in the maintained counter of *namespace*.
+
+        Only needed with the ``set`` / ``hll`` count modes (``auto`` uses
+        a counter once one exists) for keys written by other clients:
+        :meth:`insert` and :meth:`delete` keep an existing counter in step
+        within their own transaction.
+        """
+        if not pks:
+            return
+        key = self._counter_key(namespace)
+        pks = [self._id(pk) for pk in pks]
+        async with self._redis() as r:
+            if self.count_mode == "hll":
+                await r.pfadd(key, *pks)
+            else:
+                await r.sadd(key, *pks)
+
+    async def untrack(self, namespace: str, pks: Sequence[str]) -> None:
+        """Forget deleted *pks*; HyperLogLogs need :meth:`rebuild_count`."""
+        if self.count_mode == "hll":
+            raise NotImplementedError(
+                "A HyperLogLog cannot forget keys; use rebuild_count"
+            )
+        if pks:
+            ids = [self._id(pk) for pk in pks]
+            async with self._redis() as r:
+                await r.srem(self._counter_key(namespace), *ids)
+
+    async def rebuild_count(self, namespace: str) -> int:
+        """(Re)build the counter of *namespace* from one SCAN pass.
+
+        The counter is filled under a temporary key and renamed over the
+        old one, so readers never see a partial count.
+        """
+        key = self._counter_key(namespace)
+        tmp = f"{key}:rebuild"
+        prefix = len(namespace) + 1
+        total = 0
+        async with self._redis() as r:
+            await r.delete(tmp)
+            for node in self._nodes():
+                async for keys in self._scan_keys(node, namespace):
+                    pks = [k[prefix:] for k in keys]
+                    if self.count_mode == "hll":
+                        await r.pfadd(tmp, *pks)
+                    else:
+                        await r.sadd(tmp, *pks)
+                    total += len(pks)
+            if total:
+                await r.rename(tmp, key)
+            else:
+                await r.delete(key)
         return total
 
-    async def get(self, namespace: str, pk: str) -> Dict[str, Any]:
+    async def get(
+        self, namespace: str, pk: str, columns: Projection | None = None
+    ) -> Dict[str, Any]:
         """
         Accept a format like :json or :hash or :string
-        to get expected data type
+        to get expected data type.  With ``auto_pipeline`` the gets issued
+        concurrently within ``pipeline_window`` share one batched round
+        trip (see :class:`AutoPipeline`).
         :param namespace: expected namespace to connect
         :param pk: identifier of the namespaced entity to get
+        :param columns: only fetch these fields (HMGET / JSON.GET paths)
         :return: Dictionary with the values of the entity
         """
         key = f"{namespace}:{pk}"
-        print(key)
+        if columns is not None:
+            async with self._redis() as r:
+                docs = await self._fetch_keys(r, [key], columns)
+            return docs[0] or {}
+        if self.auto_pipeline:
+            if self._pipeline is None:
+                self._pipeline = AutoPipeline(
+                    self._fetch_pipelined,
+                    self.pipeline_window,
+                    self.max_batch_size,
+                )
+            return await self._pipeline.get(key) or {}
         data_type = self._options.get("data_type", "")
         match data_type:
             case "string":
@@ -74,15 +565,364 @@ class RedisConnector(Connector):
 
     async def get_string(self, key: str) -> Dict:
         async with self._redis() as r:
-            raw = await r.get(key)
-            return json.loads(raw) if raw else {}
+            with self._span("round_trip"):
+                raw = await r.get(key)
+        with self._span("deserialize"):
+            return loads(raw) if raw else {}
 
     async def get_hash(self, key: str) -> Dict | None:
         async with self._redis() as r:
-            raw = await r.hgetall(key)
-            return raw
+            with self._span("round_trip"):
+                return await r.hgetall(key)
 
     async def get_json(self, key: str) -> Dict:
         async with self._redis() as r:
-            raw = await r.json().get(key)
-            return raw
+            with self._span("round_trip"):
+                return await self._json(r).get(key)
+
+    async def _fetch_pipelined(
+        self, keys: Sequence[str]
+    ) -> List[Dict[str, Any] | None]:
+        async with self._redis() as r:
+            return await self._fetch_keys(r, keys)
+
+    async def get_many(
+        self,
+        namespace: str,
+        pks: Sequence[str],
+        columns: Projection | None = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch several keys of one namespace in a single round trip:
+        MGET for strings, a pipeline of HGETALL for hashes and JSON.MGET
+        for JSON documents (HMGET / ``JSON.GET`` paths with *columns*).
+        :param namespace: expected namespace to connect
+        :param pks: identifiers of the namespaced entities to get
+        :param columns: only fetch these fields
+        :return: Dictionary pk -> entity for the keys that exist
+        """
+        if not pks:
+            return {}
+        keys = [f"{namespace}:{pk}" for pk in pks]
+        async with self._redis() as r:
+            docs = await self._fetch_keys(r, keys, columns)
+        return {pk: doc for pk, doc in zip(pks, docs) if doc}
+
+    async def _fetch_keys(
+        self,
+        r: aioredis.Redis,
+        keys: Sequence[str],
+        columns: Projection | None = None,
+    ) -> List[Dict[str, Any] | None]:
+        """Read *keys* in one round trip according to ``data_type``."""
+        if columns is not None:
+            return await self._fetch_fields(r, keys, columns)
+        data_type = self._options.get("data_type", "")
+        match data_type:
+            case "string":
+                with self._span("round_trip", keys=len(keys)):
+                    raws = await r.mget(keys)
+                with self._span("deserialize", rows=len(raws)):
+                    return [loads(raw) if raw else None for raw in raws]
+            case "hash":
+                pipe = r.pipeline(transaction=False)
+                for key in keys:
+                    pipe.hgetall(key)
+                with self._span("round_trip", keys=len(keys)):
+                    return await pipe.execute()
+            case "json":
+                with self._span("round_trip", keys=len(keys)):
+                    raws = await self._json(r).mget(keys, "$")
+                return [raw[0] if raw else None for raw in raws]
+            case _:
+                raise NotImplementedError(f"Unknown data type: {data_type}")
+
+    async def _fetch_fields(
+        self, r: aioredis.Redis, keys: Sequence[str], columns: Projection
+    ) -> List[Dict[str, Any] | None]:
+        """Projected read: HMGET for hashes and ``JSON.GET`` with one path
+        per column for JSON, pipelined; strings are stored as one blob, so
+        they are decoded whole and projected locally."""
+        data_type = self._options.get("data_type", "")
+        match data_type:
+            case "string":
+                with self._span("round_trip", keys=len(keys)):
+                    raws = await r.mget(keys)
+                with self._span("deserialize", rows=len(raws)):
+                    docs = [loads(raw) if raw else None for raw in raws]
+                    return [project(d, columns) if d else None for d in docs]
+            case "hash":
+                fields = [col for _, col in columns]
+                pipe = r.pipeline(transaction=False)
+                for key in keys:
+                    pipe.hmget(key, fields)
+                with self._span("round_trip", keys=len(keys)):
+                    replies = await pipe.execute()
+                with self._span("deserialize", rows=len(replies)):
+                    return [_from_fields(v, columns) for v in replies]
+            case "json":
+                paths = _json_paths(columns)
+                pipe = r.pipeline(transaction=False)
+                for key in keys:
+                    pipe.execute_command("JSON.GET", key, *paths)
+                with self._span("round_trip", keys=len(keys)):
+                    replies = await pipe.execute()
+                with self._span("deserialize", rows=len(replies)):
+                    return [_from_paths(v, paths, columns) for v in replies]
+            case _:
+                raise NotImplementedError(f"Unknown data type: {data_type}")
+
+    async def scan(
+        self,
+        namespace: str,
+        batch_size: int | None = None,
+        columns: Projection | None = None,
+        where: P.Predicate | None = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream every entity of a namespace: SCAN pages of keys of the
+        configured ``data_type`` (TYPE filter) and fetch each page with
+        one pipelined round trip.  The next page is only requested once
+        the previous batch has been consumed.
+        :param namespace: expected namespace to scan
+        :param batch_size: entities per yielded batch
+        :param columns: only fetch these fields
+        :param where: only the entities matching it (see _scan_where)
+        :return: Async iterator of entity batches
+        """
+        batch_size = batch_size or self.scan_batch_size
+        if where is not None:
+            filtered = self._scan_where(namespace, batch_size, columns, where)
+            async with contextlib.aclosing(filtered) as batches:
+                async for batch in batches:
+                    yield batch
+            return
+        async with self._redis() as r:
+            pending = []
+            async for keys in self._scan_keys(r, namespace, batch_size):
+                pending.extend(keys)
+                while len(pending) >= batch_size:
+                    chunk, pending = pending[:batch_size], pending[batch_size:]
+                    fetched = await self._fetch_keys(r, chunk, columns)
+                    docs = [d for d in fetched if d]
+                    if docs:
+                        yield docs
+            if pending:
+                fetched = await self._fetch_keys(r, pending, columns)
+                docs = [d for d in fetched if d]
+                if docs:
+                    yield docs
+
+    async def _scan_where(
+        self,
+        namespace: str,
+        batch_size: int,
+        columns: Projection | None,
+        where: P.Predicate,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Filtered scan.  When the namespace has a RediSearch index
+        (``count_index``) and *where*, or some AND-ed part of it, maps to
+        its NUMERIC / TAG fields, ``FT.SEARCH ... NOCONTENT`` pages pick
+        the matching keys and only those are fetched.  Otherwise every
+        key is scanned and *where* evaluated in Python, one batch at a
+        time.  Rows from an inexact search are re-checked in Python."""
+        async with self._redis() as r:
+            found = await self._index_schema(r, namespace)
+            search = found and _search_query(where, found[1])
+            if search:
+                query, exact = search
+                check = None if exact else where
+                fetch = columns if exact else P.widen(columns, where)
+                batches = self._search(r, found[0], query, batch_size, fetch)
+            else:
+                if namespace not in self._unindexed:
+                    self._unindexed.add(namespace)
+                    logging.warning(
+                        "No usable RediSearch index for %s; filtering it "
+                        "in Python during SCAN",
+                        namespace,
+                    )
+                check, fetch = where, P.widen(columns, where)
+                batches = self.scan(namespace, batch_size, fetch)
+            async with contextlib.aclosing(batches) as source:
+                async for batch in source:
+                    rows = P.keep(batch, check, columns, fetch)
+                    if rows:
+                        yield rows
+
+    async def _search(
+        self,
+        r: aioredis.Redis,
+        index: str,
+        query: str,
+        batch_size: int,
+        columns: Projection | None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Page through the keys matching *query* and fetch each page."""
+        offset = 0
+        while True:
+            reply = await r.execute_command(
+                "FT.SEARCH",
+                index,
+                query,
+                "NOCONTENT",
+                "LIMIT",
+                offset,
+                batch_size,
+            )
+            keys = reply[1:]
+            if keys:
+                fetched = await self._fetch_keys(r, keys, columns)
+                docs = [d for d in fetched if d]
+                if docs:
+                    yield docs
+            offset += len(keys)
+            if len(keys) < batch_size or offset >= reply[0]:
+                break
+
+    async def _live_counter(
+        self,
+        r: aioredis.Redis,
+        namespace: str,
+    ) -> str | None:
+        """Redis type of *namespace*'s maintained counter (``"set"``, or
+        ``"string"`` for a HyperLogLog); ``None`` when there is none to
+        keep in step.  A missing counter is left missing: a partial one
+        would be trusted by :meth:`count`, which builds it whole."""
+        if self.count_mode not in ("auto", "set", "hll"):
+            return None
+        kind = await r.type(self._counter_key(namespace))
+        return kind if kind in ("set", "string") else None
+
+    def _queue_write(
+        self, pipe: aioredis.client.Pipeline, key: str, row: Dict[str, Any]
+    ) -> None:
+        """Queue the commands replacing *key* by *row*."""
+        data_type = self._options.get("data_type", "")
+        match data_type:
+            case "string":
+                pipe.set(key, json.dumps(row))
+            case "hash":
+                pipe.delete(key)  # no stale fields from a previous row
+                fields = _hash_fields(row)
+                if fields:
+                    pipe.hset(key, mapping=fields)
+            case "json":
+                pipe.execute_command("JSON.SET", key, "$", json.dumps(row))
+            case _:
+                raise NotImplementedError(f"Unknown data type: {data_type}")
+
+    async def insert(
+        self,
+        namespace: str,
+        rows: Sequence[Dict[str, Any]],
+        pk: str,
+    ) -> int:
+        """
+        Write *rows* as ``<namespace>:<row[pk]>:<data_type>`` keys of the
+        configured ``data_type`` in one pipelined MULTI/EXEC transaction
+        (existing keys are replaced).  A maintained count set / HyperLogLog is
+        updated in the same transaction.
+        :param namespace: namespace of the keys
+        :param rows: entities to write
+        :param pk: field holding the key of each entity
+        :return: Number of entities written
+        """
+        if not rows:
+            return 0
+        ids = [self._id(row[pk]) for row in rows]
+        async with self._redis() as r:
+            counter = await self._live_counter(r, namespace)
+            pipe = r.pipeline(transaction=True)
+            for id_, row in zip(ids, rows):
+                self._queue_write(pipe, f"{namespace}:{id_}", row)
+            key = self._counter_key(namespace)
+            if counter == "set":
+                pipe.sadd(key, *ids)
+            elif counter == "string":
+                pipe.pfadd(key, *ids)
+            with self._span("round_trip", keys=len(ids)):
+                await pipe.execute()
+        return len(rows)
+
+    async def update(
+        self,
+        namespace: str,
+        pks: Sequence[str],
+        changes: Dict[str, Any],
+        pk: str,
+    ) -> int:
+        """
+        Set *changes* on the existing keys among *pks*: HSET (HDEL for
+        ``None``) on hashes and ``JSON.SET`` of each field path on JSON,
+        in one Lua script checking that each key exists (a key deleted
+        meanwhile is not recreated); strings are read, merged and
+        written back under WATCH (retried when another client changed
+        one of the keys meanwhile).
+        :return: Number of entities updated
+        """
+        if not pks or not changes:
+            return 0
+        keys = [f"{namespace}:{self._id(id_)}" for id_ in pks]
+        data_type = self._options.get("data_type", "")
+        if data_type not in ("string", "hash", "json"):
+            raise NotImplementedError(f"Unknown data type: {data_type}")
+        async with self._redis() as r:
+            if data_type == "string":
+                return await self._update_strings(r, keys, changes)
+            if data_type == "json":
+                pairs = [(f"$.{f}", json.dumps(v)) for f, v in changes.items()]
+                nulls = []
+            else:
+                pairs = list(_hash_fields(changes).items())
+                nulls = [field for field, v in changes.items() if v is None]
+            args = [data_type, len(pairs), *(x for p in pairs for x in p)]
+            script = r.register_script(_UPDATE_SCRIPT)
+            with self._span("round_trip", keys=len(keys)):
+                updated = await script(keys=keys, args=[*args, *nulls])
+        return int(updated)
+
+    async def _update_strings(
+        self, r: aioredis.Redis, keys: List[str], changes: Dict[str, Any]
+    ) -> int:
+        async with r.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(*keys)
+                    with self._span("round_trip", keys=len(keys)):
+                        raws = await pipe.mget(keys)
+                    found = [(k, raw) for k, raw in zip(keys, raws) if raw]
+                    if not found:
+                        return 0
+                    pipe.multi()
+                    for key, raw in found:
+                        pipe.set(key, json.dumps({**loads(raw), **changes}))
+                    with self._span("round_trip", keys=len(found)):
+                        await pipe.execute()
+                    return len(found)
+                except WatchError:
+                    continue
+
+    async def delete(self, namespace: str, pks: Sequence[str], pk: str) -> int:
+        """
+        DEL the keys of *pks* in one MULTI/EXEC, removing them from a
+        maintained count set too.  A HyperLogLog cannot forget keys, so
+        it is dropped instead (:meth:`count` then scans, or rebuilds it in
+        the ``hll`` mode).
+        :return: Number of entities deleted
+        """
+        if not pks:
+            return 0
+        async with self._redis() as r:
+            counter = await self._live_counter(r, namespace)
+            pipe = r.pipeline(transaction=True)
+            ids = [self._id(id_) for id_ in pks]
+            pipe.delete(*(f"{namespace}:{id_}" for id_ in ids))
+            key = self._counter_key(namespace)
+            if counter == "set":
+                pipe.srem(key, *ids)
+            elif counter == "string":
+                pipe.delete(key)
+            with self._span("round_trip", keys=len(pks)):
+                replies = await pipe.execute()
+        return int(replies[0])
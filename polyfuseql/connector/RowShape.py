@@ -0,0 +1,131 @@
+"""polyfuseql.connector.RowShape
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Native asyncpg ``Record`` → row dict, with the key mapping worked out once.
+
+Postgres used to hand back each row as ``row_to_json`` text that was then
+parsed and camelized key by key.  A :class:`RowShape` is built once per
+prepared statement from its result attributes: the output key of every
+column (camelCase for ``SELECT *``, the alias otherwise) and a converter
+for the few types whose native Python value differs from what the JSON
+path produced.  Rows stay identical to the JSON ones – numbers, ISO
+date/time strings, parsed ``json`` – so they still compare equal to the
+Redis and Neo4j copies of the same data.  Types without a converter
+(text, integers, booleans, arrays, intervals, …) pass through as decoded
+by asyncpg.  :meth:`RowShape.columns` decodes a batch column by column
+instead, for the columnar (Arrow) results.
+"""
+
+import math
+import struct
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Sequence, Tuple
+
+from polyfuseql.utils.utils import camel_key, loads
+
+Converter = Callable[[Any], Any]
+
+_NON_FINITE = {math.inf: "Infinity", -math.inf: "-Infinity"}
+
+
+def _numeric(value: Decimal) -> Any:
+    if not value.is_finite():
+        return str(value)  # JSON has no NaN / Infinity: Postgres quotes them
+    return int(value) if value.as_tuple().exponent >= 0 else float(value)
+
+
+def _float8(value: float) -> Any:
+    if not math.isfinite(value):
+        return _NON_FINITE.get(value, "NaN")
+    # Postgres prints integral doubles below 1e15 without a fraction
+    return int(value) if value.is_integer() and abs(value) < 1e15 else value
+
+
+def _float4(value: float) -> Any:
+    """asyncpg widens ``real`` to a double (18.4 → 18.399999618530273);
+    Postgres prints the shortest text that reads back as the same float4."""
+    if not math.isfinite(value):
+        return _NON_FINITE.get(value, "NaN")
+    for digits in range(6, 10):
+        short = float(f"{value:.{digits}g}")
+        if struct.unpack("f", struct.pack("f", short))[0] == value:
+            value = short
+            break
+    return int(value) if value.is_integer() and abs(value) < 1e6 else value
+
+
+def _iso(value: Any) -> str:
+    return value.isoformat()
+
+
+def _bytea(value: bytes) -> str:
+    return "\\x" + value.hex()
+
+
+#: converters keyed on the Postgres type name of a result column
+CONVERTERS: Dict[str, Converter] = {
+    "numeric": _numeric,
+    "float4": _float4,
+    "float8": _float8,
+    "date": _iso,
+    "time": _iso,
+    "timetz": _iso,
+    "timestamp": _iso,
+    "timestamptz": _iso,
+    "uuid": str,
+    "json": loads,
+    "jsonb": loads,
+    "bytea": _bytea,
+}
+
+
+class RowShape:
+    """Key names and converters of one statement's result columns.
+
+    *attributes* are ``PreparedStatement.get_attributes()`` (anything with
+    ``.name`` and ``.type.name``).  With *camelize*, column names become
+    camelCase keys except those listed in *keep*.
+    """
+
+    __slots__ = ("names", "converters")
+
+    def __init__(
+        self,
+        attributes: Iterable[Any],
+        camelize: bool = False,
+        keep: Sequence[str] = (),
+    ) -> None:
+        names, converters = [], []
+        for i, attr in enumerate(attributes):
+            name = attr.name
+            if camelize and name not in keep:
+                name = camel_key(name)
+            names.append(name)
+            convert = CONVERTERS.get(attr.type.name)
+            if convert is not None:
+                converters.append((i, convert))
+        self.names: Tuple[str, ...] = tuple(names)
+        self.converters: Tuple[Tuple[int, Converter], ...] = tuple(converters)
+
+    def row(self, record: Iterable[Any]) -> Dict[str, Any]:
+        """One record (its values in column order) as a row dict."""
+        if not self.converters:
+            return dict(zip(self.names, record))
+        values = list(record)
+        for i, convert in self.converters:
+            if values[i] is not None:
+                values[i] = convert(values[i])
+        return dict(zip(self.names, values))
+
+    def rows(self, records: Iterable[Iterable[Any]]) -> list:
+        row = self.row
+        return [row(r) for r in records]
+
+    def columns(self, records: Sequence[Iterable[Any]]) -> Dict[str, list]:
+        """*records* as ``{name: values}``, each column converted in one
+        pass (no row dicts are built)."""
+        values = [list(col) for col in zip(*records)]
+        if not values:
+            values = [[] for _ in self.names]
+        for i, convert in self.converters:
+            values[i] = [None if v is None else convert(v) for v in values[i]]
+        return dict(zip(self.names, values))
@@ -0,0 +1,359 @@
+"""polyfuseql.connector.Sharding
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+A logical table split over several instances of one backend.  The
+catalogue declares it next to the table's owner (``mapping.json``)::
+
+    "orders": {"backend": "postgres", "pk": "orderId",
+               "shards": {"by": "consistent",
+                          "instances": [{"host": "pg-a"},
+                                        {"host": "pg-b", "port": 5433}]}}
+
+Each instance is a connector of the backend built with the instance's
+options on top of the client's (``host``, ``port``, ...).  A
+:class:`ShardMap` gives the shard owning a pk:
+
+``hash``
+    ``crc32(pk) mod N``: even spread, but adding a shard moves almost
+    every key.
+``range``
+    ``"bounds": [b1, ..., bN-1]`` – shard *i* holds the keys below
+    bound *i* (and not below the one before); numeric bounds compare
+    keys as numbers.
+``consistent``
+    a hash ring with ``"vnodes"`` points per instance (64), keyed on
+    the instance's ``name`` (else ``host:port``): adding or removing a
+    shard only moves the keys of the ring arcs it takes or gives back,
+    about 1/N of them.
+
+:class:`ShardedConnector` serves the table as one connector: a point
+lookup goes to the owning shard, ``get_many`` and writes are split per
+shard and run concurrently, scans read every shard at once and merge
+their batches as they arrive (in no particular order), and aggregates
+run on every shard and are combined (see :func:`Aggregation.combine`).
+"""
+
+import asyncio
+import bisect
+import contextlib
+import hashlib
+import zlib
+from typing import Any, AsyncIterator, Dict, List, Sequence, TypeVar
+
+from polyfuseql.connector import Predicate as P
+from polyfuseql.connector.Aggregation import Aggregation, combine, partial
+from polyfuseql.connector.Connector import Columns, Connector, Projection
+
+T = TypeVar("T")
+
+STRATEGIES = ("hash", "range", "consistent")
+
+
+def instance_name(instance: Dict[str, Any], index: int) -> str:
+    """Stable name of a shard instance: ``name``, else ``host:port``."""
+    if instance.get("name"):
+        return str(instance["name"])
+    if instance.get("host"):
+        return f"{instance['host']}:{instance.get('port', '')}"
+    return f"shard{index}"
+
+
+class ShardMap:
+    """Which of the shards owns a pk."""
+
+    by = ""
+
+    def __init__(self, names: Sequence[str]) -> None:
+        if not names:
+            raise ValueError("A sharded table needs at least one instance")
+        self.names = list(names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def owner(self, key: Any) -> int:
+        raise NotImplementedError
+
+    def split(self, keys: Sequence[Any]) -> Dict[int, List[Any]]:
+        """*keys* grouped by owning shard (each group in key order)."""
+        parts: Dict[int, List[Any]] = {}
+        for key in keys:
+            parts.setdefault(self.owner(key), []).append(key)
+        return parts
+
+
+class HashShards(ShardMap):
+    by = "hash"
+
+    def owner(self, key: Any) -> int:
+        return zlib.crc32(str(key).encode()) % len(self.names)
+
+
+def _coerce(key: Any, bound: Any) -> Any:
+    """*key* comparable with *bound* (pks often arrive as SQL text)."""
+    if isinstance(bound, (int, float)) and not isinstance(key, (int, float)):
+        try:
+            return float(key)
+        except ValueError:
+            msg = f"Key {key!r} does not fit numeric shard ranges"
+            raise ValueError(msg) from None
+    if isinstance(bound, str):
+        return str(key)
+    return key
+
+
+class RangeShards(ShardMap):
+    by = "range"
+
+    def __init__(self, names: Sequence[str], bounds: Sequence[Any]) -> None:
+        super().__init__(names)
+        if len(bounds) != len(names) - 1:
+            msg = "Range shards need one bound less than instances"
+            raise ValueError(msg)
+        if list(bounds) != sorted(bounds):
+            raise ValueError("Range shard bounds must be ascending")
+        self.bounds = list(bounds)
+
+    def owner(self, key: Any) -> int:
+        if not self.bounds:
+            return 0
+        return bisect.bisect_right(self.bounds, _coerce(key, self.bounds[0]))
+
+
+def _point(text: str) -> int:
+    digest = hashlib.blake2b(text.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class ConsistentShards(ShardMap):
+    by = "consistent"
+
+    def __init__(self, names: Sequence[str], vnodes: int = 64) -> None:
+        super().__init__(names)
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("Consistent shards need distinct names")
+        ring = sorted(
+            (_point(f"{name}#{i}"), shard)
+            for shard, name in enumerate(self.names)
+            for i in range(vnodes)
+        )
+        self._points = [point for point, _ in ring]
+        self._shards = [shard for _, shard in ring]
+
+    def owner(self, key: Any) -> int:
+        i = bisect.bisect(self._points, _point(str(key)))
+        return self._shards[i % len(self._shards)]
+
+
+def shard_map(spec: Dict[str, Any]) -> ShardMap:
+    """The :class:`ShardMap` of a catalogue ``"shards"`` entry."""
+    by = spec.get("by", "hash")
+    instances = spec.get("instances") or []
+    names = [instance_name(inst, i) for i, inst in enumerate(instances)]
+    if by == "hash":
+        return HashShards(names)
+    if by == "range":
+        return RangeShards(names, spec.get("bounds") or [])
+    if by == "consistent":
+        return ConsistentShards(names, int(spec.get("vnodes", 64)))
+    raise ValueError(f"Unknown sharding '{by}' (one of {STRATEGIES})")
+
+
+async def merge(sources: Sequence[AsyncIterator[T]]) -> AsyncIterator[T]:
+    """Items of every source as they arrive, the sources read
+    concurrently (at most one item per source waits to be consumed);
+    closing the merge closes every source."""
+    if len(sources) == 1:
+        async with contextlib.aclosing(sources[0]) as items:
+            async for item in items:
+                yield item
+        return
+    queue: asyncio.Queue = asyncio.Queue(len(sources))
+
+    async def pump(source: AsyncIterator[T]) -> None:
+        try:
+            async with contextlib.aclosing(source) as items:
+                async for item in items:
+                    await queue.put((True, item))
+        except Exception as exc:
+            await queue.put((False, exc))
+        else:
+            await queue.put((False, None))
+
+    tasks = [asyncio.create_task(pump(source)) for source in sources]
+    running = len(tasks)
+    try:
+        while running:
+            ok, item = await queue.get()
+            if ok:
+                yield item
+            elif item is not None:
+                raise item
+            else:
+                running -= 1
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _chunks(keys: List[Any], size: int) -> List[List[Any]]:
+    chunks = []
+    for start in range(0, len(keys), size):
+        end = start + size
+        chunks.append(keys[start:end])
+    return chunks
+
+
+class ShardedConnector(Connector):
+    """One table served by *shards* (connectors of the same backend),
+    the owner of each pk given by *shard_map*."""
+
+    def __init__(
+        self,
+        shards: Sequence[Connector],
+        shard_map: ShardMap,
+        options: Dict = None,
+    ) -> None:
+        super().__init__(options)
+        if len(shards) != len(shard_map):
+            raise ValueError("One connector per shard is needed")
+        self.shards = list(shards)
+        self.shard_map = shard_map
+        self.backend_name = shards[0].backend_name
+        self.scan_batch_size = shards[0].scan_batch_size
+        self.max_batch_size = sum(s.max_batch_size for s in shards)
+        self.native_aggregates = all(s.native_aggregates for s in shards)
+
+    def _owner(self, key: Any) -> Connector:
+        return self.shards[self.shard_map.owner(key)]
+
+    async def _each(self, method: str, *args, **kwargs) -> List[Any]:
+        calls = (getattr(s, method)(*args, **kwargs) for s in self.shards)
+        return await asyncio.gather(*calls)
+
+    async def open(self) -> None:
+        await self._each("open")
+
+    async def aclose(self) -> None:
+        await self._each("aclose")
+
+    def invalidate(self, entity: str) -> None:
+        for shard in self.shards:
+            shard.invalidate(entity)
+
+    async def ping(self) -> bool:
+        return all(await self._each("ping"))
+
+    async def count(self, entity: str) -> int:
+        return sum(await self._each("count", entity))
+
+    async def get(
+        self, entity: str, pk: str, columns: Projection | None = None
+    ) -> Dict[str, Any]:
+        kwargs = {} if columns is None else {"columns": columns}
+        return await self._owner(pk).get(entity, pk, **kwargs)
+
+    async def get_many(
+        self,
+        entity: str,
+        pks: Sequence[str],
+        columns: Projection | None = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        kwargs = {} if columns is None else {"columns": columns}
+        calls = []
+        for index, keys in self.shard_map.split(pks).items():
+            shard = self.shards[index]
+            for chunk in _chunks(keys, shard.max_batch_size):
+                calls.append(shard.get_many(entity, chunk, **kwargs))
+        found: Dict[str, Dict[str, Any]] = {}
+        for part in await asyncio.gather(*calls):
+            found.update(part)
+        return found
+
+    def _scans(
+        self,
+        method: str,
+        entity: str,
+        batch_size: int | None,
+        columns: Projection | None,
+        where: P.Predicate | None,
+    ) -> List[AsyncIterator]:
+        kwargs = {} if where is None else {"where": where}
+        return [
+            getattr(s, method)(entity, batch_size, columns, **kwargs)
+            for s in self.shards
+        ]
+
+    async def scan(
+        self,
+        entity: str,
+        batch_size: int | None = None,
+        columns: Projection | None = None,
+        where: P.Predicate | None = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        scans = self._scans("scan", entity, batch_size, columns, where)
+        async with contextlib.aclosing(merge(scans)) as batches:
+            async for batch in batches:
+                yield batch
+
+    async def scan_columns(
+        self,
+        entity: str,
+        batch_size: int | None = None,
+        columns: Projection | None = None,
+        where: P.Predicate | None = None,
+    ) -> AsyncIterator[Columns]:
+        method = "scan_columns"
+        scans = self._scans(method, entity, batch_size, columns, where)
+        async with contextlib.aclosing(merge(scans)) as batches:
+            async for batch in batches:
+                yield batch
+
+    async def aggregate(
+        self,
+        entity: str,
+        aggregation: Aggregation,
+        where: P.Predicate | None = None,
+    ) -> List[Dict[str, Any]]:
+        """Partial groups of every shard (AVG as SUM and COUNT, no
+        HAVING), combined into the groups of the whole table."""
+        kwargs = {} if where is None else {"where": where}
+        split = partial(aggregation)
+        parts = await self._each("aggregate", entity, split, **kwargs)
+        return combine(aggregation, parts)
+
+    async def _split_write(
+        self, method: str, entity: str, pks: Sequence[str], *args
+    ) -> int:
+        parts = self.shard_map.split(pks)
+        calls = [
+            getattr(self.shards[i], method)(entity, keys, *args)
+            for i, keys in parts.items()
+        ]
+        return sum(await asyncio.gather(*calls))
+
+    async def insert(
+        self,
+        entity: str,
+        rows: Sequence[Dict[str, Any]],
+        pk: str,
+    ) -> int:
+        parts: Dict[int, List[Dict[str, Any]]] = {}
+        for row in rows:
+            parts.setdefault(self.shard_map.owner(row[pk]), []).append(row)
+        calls = []
+        for index, part in parts.items():
+            calls.append(self.shards[index].insert(entity, part, pk))
+        return sum(await asyncio.gather(*calls))
+
+    async def update(
+        self,
+        entity: str,
+        pks: Sequence[str],
+        changes: Dict[str, Any],
+        pk: str,
+    ) -> int:
+        return await self._split_write("update", entity, pks, changes, pk)
+
+    async def delete(self, entity: str, pks: Sequence[str], pk: str) -> int:
+        return await self._split_write("delete", entity, pks, pk)
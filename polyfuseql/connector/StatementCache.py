@@ -0,0 +1,84 @@
+"""polyfuseql.connector.StatementCache
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Per-connection LRU of asyncpg prepared statements.
+
+Prepared statements live on one server backend, so entries are grouped by
+the backend pid of the pooled connection that prepared them.  The
+Postgres connector drops a pid's entries when that connection is closed
+(pool recycling) or when a new connection reuses the pid, and drops every
+entry for a table when its catalogue mapping changes.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Tuple
+
+import asyncpg
+
+# (table, pk column, projection[, variant]) – table always comes first
+StatementKey = Tuple[Hashable, ...]
+
+
+class StatementCache:
+    """LRU cache of prepared statements keyed on a :data:`StatementKey`."""
+
+    def __init__(self, max_size: int = 128) -> None:
+        self._max_size = max_size
+        self._by_conn: Dict[int, OrderedDict] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def prepare(
+        self,
+        conn: asyncpg.Connection,
+        key: StatementKey,
+        sql: str,
+    ) -> asyncpg.prepared_stmt.PreparedStatement:
+        """Return the statement cached for *key* on *conn*, preparing it
+        (parse + plan) only on a miss."""
+        stmts = self._by_conn.setdefault(conn.get_server_pid(), OrderedDict())
+        stmt = stmts.get(key)
+        if stmt is not None:
+            stmts.move_to_end(key)
+            self.hits += 1
+            return stmt
+
+        self.misses += 1
+        stmt = await conn.prepare(sql)
+        stmts[key] = stmt
+        if len(stmts) > self._max_size:
+            stmts.popitem(last=False)
+            self.evictions += 1
+        return stmt
+
+    def discard(self, conn: asyncpg.Connection, key: StatementKey) -> None:
+        """Forget one statement, e.g. after the server invalidated it."""
+        self._by_conn.get(conn.get_server_pid(), {}).pop(key, None)
+
+    def discard_connection(self, pid: int) -> None:
+        """Forget everything prepared on the backend with *pid*."""
+        self._by_conn.pop(pid, None)
+
+    def invalidate(self, table: str | None = None) -> None:
+        """Drop the statements of *table* (all statements when ``None``)."""
+        if table is None:
+            self._by_conn.clear()
+            return
+        table = table.lower()
+        for stmts in self._by_conn.values():
+            for key in [k for k in stmts if str(k[0]).lower() == table]:
+                del stmts[key]
+
+    def __len__(self) -> int:
+        return sum(len(stmts) for stmts in self._by_conn.values())
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self),
+            "connections": len(self._by_conn),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,399 @@
+"""polyfuseql.optimizer.LogicalPlan
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Logical plan of a SELECT, built from the sqlglot AST::
+
+    Limit → Project → [Aggregate →] Filter → Scan | Join(Scan, Scan)
+
+:func:`push_down` rewrites the tree so that each :class:`Scan` carries
+what its store can evaluate itself: the WHERE conjuncts on its table
+(predicate pushdown), the columns the rest of the plan reads from it
+(projection pushdown) and, when nothing above it drops or merges rows,
+the LIMIT (limit pushdown).  The router lowers the pushed-down scans to
+connector calls (see :meth:`PolyClient._plan`).
+"""
+
+import re
+from typing import Any, List, Sequence, Tuple, Union
+
+from sqlglot import exp
+
+from polyfuseql.client.PlanCache import Param
+from polyfuseql.connector import Predicate as P
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_COMPARISONS = {
+    exp.EQ: "eq",
+    exp.NEQ: "neq",
+    exp.GT: "gt",
+    exp.GTE: "gte",
+    exp.LT: "lt",
+    exp.LTE: "lte",
+}
+#: ``5 < x`` is ``x > 5``
+_FLIPPED = {"gt": "lt", "gte": "lte", "lt": "gt", "lte": "gte"}
+
+
+class Scan:
+    """Read of one table; *alias* is how the query refers to it."""
+
+    __slots__ = ("table", "alias", "predicates", "columns", "limit")
+
+    def __init__(self, table: str, alias: str = "") -> None:
+        self.table = table
+        self.alias = alias or table
+        self.predicates: List[exp.Expression] = []
+        self.columns: List[str] | None = None  # None → every column
+        self.limit: int | None = None
+
+
+class Filter:
+    """Conjunction of *conditions* over the rows of *child*."""
+
+    __slots__ = ("child", "conditions")
+
+    def __init__(self, child, conditions: List[exp.Expression]) -> None:
+        self.child = child
+        self.conditions = conditions
+
+
+class Project:
+    """The SELECT list (``[Star]`` for ``SELECT *``)."""
+
+    __slots__ = ("child", "items")
+
+    def __init__(self, child, items: List[exp.Expression]) -> None:
+        self.child = child
+        self.items = items
+
+    @property
+    def star(self) -> bool:
+        return len(self.items) == 1 and self.items[0].is_star
+
+
+class Aggregate:
+    """``GROUP BY`` *keys* (none: one group) with the aggregate calls of
+    the SELECT list, and the *having* condition on the groups."""
+
+    __slots__ = ("child", "keys", "having")
+
+    def __init__(
+        self,
+        child,
+        keys: List[exp.Expression],
+        having: exp.Expression | None = None,
+    ) -> None:
+        self.child = child
+        self.keys = keys
+        self.having = having
+
+
+class Limit:
+    __slots__ = ("child", "count")
+
+    def __init__(self, child, count: int) -> None:
+        self.child = child
+        self.count = count
+
+
+class Join:
+    """Inner equi-join; *on* is the ``a.x = b.y`` condition."""
+
+    __slots__ = ("left", "right", "on")
+
+    def __init__(self, left: Scan, right: Scan, on) -> None:
+        self.left = left
+        self.right = right
+        self.on = on
+
+
+Node = Union[Scan, Filter, Aggregate, Project, Limit, Join]
+
+
+def conjuncts(expr: exp.Expression | None) -> List[exp.Expression]:
+    """``a AND (b AND c)`` → ``[a, b, c]``; other parentheses are kept."""
+    if expr is None:
+        return []
+    inner = expr
+    while isinstance(inner, exp.Paren):
+        inner = inner.this
+    if isinstance(inner, exp.And):
+        return [c for part in inner.flatten() for c in conjuncts(part)]
+    return [expr]
+
+
+def _limit_count(ast: exp.Select) -> int | None:
+    limit = ast.args.get("limit")
+    if limit is None:
+        return None
+    if ast.args.get("offset") is not None:
+        raise NotImplementedError("OFFSET is not supported")
+    count = limit.expression
+    if not (isinstance(count, exp.Literal) and count.this.isdigit()):
+        raise NotImplementedError("LIMIT requires an integer literal")
+    return int(count.this)
+
+
+def from_ast(ast: exp.Expression) -> Node:
+    """Build the (not yet optimized) logical plan of *ast*."""
+    if not isinstance(ast, exp.Select):
+        raise NotImplementedError("Only SELECT supported at this stage")
+    # number the positional `?` in query order before pushdown regroups
+    # the conditions per table
+    placeholders = ast.find_all(exp.Placeholder, bfs=False)
+    for index, node in enumerate(p for p in placeholders if not p.this):
+        node.meta["index"] = index
+    source = ast.args.get("from")
+    if source is None or not isinstance(source.this, exp.Table):
+        raise NotImplementedError("No table found in query")
+    node: Node = Scan(source.this.name, source.this.alias_or_name)
+
+    joins = ast.args.get("joins") or []
+    if joins:
+        join = joins[0]
+        if (
+            len(joins) != 1
+            or join.side
+            or join.kind not in ("", "INNER")
+            or not isinstance(join.this, exp.Table)
+        ):
+            raise NotImplementedError("Only one INNER JOIN ... ON supported")
+        right = Scan(join.this.name, join.this.alias_or_name)
+        node = Join(node, right, join.args.get("on"))
+
+    where = ast.args.get("where")
+    if where is not None:
+        node = Filter(node, conjuncts(where.this))
+    group = ast.args.get("group")
+    having = ast.args.get("having")
+    aggregates = any(i.find(exp.AggFunc) for i in ast.expressions)
+    if group is not None or having is not None or aggregates:
+        keys = list(group.expressions) if group is not None else []
+        node = Aggregate(node, keys, having.this if having else None)
+    node = Project(node, list(ast.expressions))
+    count = _limit_count(ast)
+    if count is not None:
+        node = Limit(node, count)
+    return node
+
+
+def scans(node: Node) -> List[Scan]:
+    """The leaves of *node*, left to right."""
+    if isinstance(node, Scan):
+        return [node]
+    if isinstance(node, Join):
+        return [node.left, node.right]
+    return scans(node.child)
+
+
+def layers(node: Node) -> Tuple:
+    """``(limit, project, filter, source)`` of a tree shaped like the
+    output of :func:`from_ast` (missing layers are ``None``; an
+    :class:`Aggregate` is skipped, see :func:`aggregate`)."""
+    found = []
+    for kind in (Limit, Project, Aggregate, Filter):
+        if isinstance(node, kind):
+            found.append(node)
+            node = node.child
+        else:
+            found.append(None)
+    limit, project, _, where = found
+    return limit, project, where, node
+
+
+def aggregate(node: Node) -> Aggregate | None:
+    """The :class:`Aggregate` of *node*, if the query has one."""
+    while not isinstance(node, (Scan, Join)):
+        if isinstance(node, Aggregate):
+            return node
+        node = node.child
+    return None
+
+
+def owner(expr: exp.Expression, leaves: Sequence[Scan]) -> Scan | None:
+    """The scan every column of *expr* belongs to (``None`` when they
+    span several).  With one table qualifiers are not checked; in a join
+    every column must be qualified with a table alias."""
+    if len(leaves) == 1:
+        return leaves[0]
+    by_alias = {scan.alias.lower(): scan for scan in leaves}
+    found = set()
+    for col in expr.find_all(exp.Column):
+        scan = by_alias.get(col.table.lower())
+        if scan is None:
+            msg = f"Qualify '{col.name}' with one of the joined tables"
+            raise NotImplementedError(msg)
+        found.add(id(scan))
+    if len(found) != 1:
+        return None
+    return next(s for s in leaves if id(s) in found)
+
+
+def _having_columns(
+    having: exp.Expression | None, items: List[exp.Expression]
+) -> List[exp.Column]:
+    """The columns *having* reads (not the SELECT aliases it names)."""
+    if having is None:
+        return []
+    aliases = {i.alias for i in items if isinstance(i, exp.Alias)}
+    return [
+        col
+        for col in having.find_all(exp.Column)
+        if col.table or col.name not in aliases
+    ]
+
+
+def push_down(root: Node) -> Node:
+    """Apply the predicate, projection and limit pushdown rules to the
+    tree built by :func:`from_ast`; conditions over several tables stay
+    in a residual :class:`Filter` above the join."""
+    limit, project, where, node = layers(root)
+    grouped = aggregate(root)
+    if grouped is not None and project.star:
+        raise NotImplementedError("SELECT * cannot be grouped")
+    leaves = scans(node)
+
+    residual = []
+    for cond in where.conditions if where is not None else []:
+        scan = owner(cond, leaves)
+        if scan is None:
+            residual.append(cond)
+        else:
+            scan.predicates.append(cond)
+
+    if project is not None and not project.star:
+        needed = {id(scan): [] for scan in leaves}
+        exprs = list(project.items)
+        if isinstance(node, Join) and node.on is not None:
+            exprs.append(node.on)
+        for scan in leaves:
+            exprs.extend(scan.predicates)
+        exprs.extend(residual)
+        columns = [c for e in exprs for c in e.find_all(exp.Column)]
+        if grouped is not None:
+            for key in grouped.keys:
+                columns += key.find_all(exp.Column)
+            columns += _having_columns(grouped.having, project.items)
+        for col in columns:
+            scan = owner(col, leaves)
+            needed[id(scan)].append(col.name)
+        for scan in leaves:
+            scan.columns = list(dict.fromkeys(needed[id(scan)]))
+
+    merged = grouped is not None or residual
+    if limit is not None and isinstance(node, Scan) and not merged:
+        node.limit = limit.count
+
+    if residual:
+        node = Filter(node, residual)
+    if grouped is not None:
+        node = Aggregate(node, grouped.keys, grouped.having)
+    if project is not None:
+        node = Project(node, project.items)
+    if limit is not None:
+        node = Limit(node, limit.count)
+    return node
+
+
+def render(node: Node, depth: int = 0) -> List[str]:
+    """Indented text of the tree, one operator per line."""
+    pad = "  " * depth
+    if isinstance(node, Scan):
+        line = f"{pad}Scan {node.table}"
+        if node.alias != node.table:
+            line += f" AS {node.alias}"
+        if node.predicates:
+            where = " AND ".join(p.sql() for p in node.predicates)
+            line += f" [{where}]"
+        if node.columns is not None:
+            line += f" columns={','.join(node.columns)}"
+        if node.limit is not None:
+            line += f" limit={node.limit}"
+        return [line]
+    if isinstance(node, Join):
+        on = node.on.sql() if node.on is not None else ""
+        lines = [f"{pad}Join ON {on}"]
+        for scan in (node.left, node.right):
+            lines += render(scan, depth + 1)
+        return lines
+    if isinstance(node, Filter):
+        text = " AND ".join(c.sql() for c in node.conditions)
+        head = f"{pad}Filter {text}"
+    elif isinstance(node, Aggregate):
+        keys = ", ".join(k.sql() for k in node.keys)
+        head = f"{pad}Aggregate"
+        if keys:
+            head += f" GROUP BY {keys}"
+        if node.having is not None:
+            head += f" HAVING {node.having.sql()}"
+    elif isinstance(node, Project):
+        head = f"{pad}Project {', '.join(i.sql() for i in node.items)}"
+    else:
+        head = f"{pad}Limit {node.count}"
+    return [head] + render(node.child, depth + 1)
+
+
+def literal(expr: exp.Expression) -> Any:
+    """Python value of a literal (numbers as numbers) or a :class:`Param`
+    for a placeholder."""
+    if isinstance(expr, exp.Placeholder):
+        param = Param(expr.this or None)
+        param.index = expr.meta.get("index")
+        return param
+    if isinstance(expr, exp.Neg):
+        value = literal(expr.this)
+        if isinstance(value, (int, float)):
+            return -value
+    if isinstance(expr, exp.Boolean):
+        return expr.this
+    if isinstance(expr, exp.Literal):
+        if expr.is_string:
+            return expr.this
+        number = float(expr.this)
+        return int(number) if number.is_integer() else number
+    raise NotImplementedError(f"Filters compare with literals: {expr.sql()}")
+
+
+def _column(expr: exp.Expression) -> str:
+    if not isinstance(expr, exp.Column) or not _IDENTIFIER.match(expr.name):
+        raise NotImplementedError(f"Unsupported filter column: {expr.sql()}")
+    return expr.name
+
+
+def predicate(expr: exp.Expression) -> P.Predicate:
+    """Compile a WHERE condition into a :mod:`Predicate` tree.
+
+    Supported: comparisons with a literal (either side), ``IN (...)``,
+    ``BETWEEN``, ``LIKE``, ``IS [NOT] NULL`` and ``AND`` / ``OR`` /
+    ``NOT`` over them.
+    """
+    while isinstance(expr, exp.Paren):
+        expr = expr.this
+    if isinstance(expr, exp.And):
+        return P.And(tuple(predicate(e) for e in expr.flatten()))
+    if isinstance(expr, exp.Or):
+        return P.Or(tuple(predicate(e) for e in expr.flatten()))
+    if isinstance(expr, exp.Not):
+        return P.Not(predicate(expr.this))
+    op = _COMPARISONS.get(type(expr))
+    if op is not None:
+        left, right = expr.left, expr.right
+        if not isinstance(left, exp.Column) and isinstance(right, exp.Column):
+            left, right = right, left
+            op = _FLIPPED.get(op, op)
+        if isinstance(right, exp.Null):
+            raise NotImplementedError("Compare with NULL using IS NULL")
+        return P.Cmp(_column(left), op, literal(right))
+    if isinstance(expr, exp.In) and not expr.args.get("query"):
+        values = tuple(literal(e) for e in expr.expressions)
+        return P.Cmp(_column(expr.this), "in", values)
+    if isinstance(expr, exp.Between):
+        bounds = (literal(expr.args["low"]), literal(expr.args["high"]))
+        return P.Cmp(_column(expr.this), "between", bounds)
+    if isinstance(expr, exp.Like):
+        pattern = literal(expr.expression)
+        if not isinstance(pattern, (str, Param)):
+            raise NotImplementedError("LIKE needs a string pattern")
+        return P.Cmp(_column(expr.this), "like", pattern)
+    if isinstance(expr, exp.Is) and isinstance(expr.expression, exp.Null):
+        return P.Cmp(_column(expr.this), "null")
+    raise NotImplementedError(f"Unsupported filter: {expr.sql()}")
@@ -0,0 +1,64 @@
+"""polyfuseql.optimizer.Optimizer
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Rule- and cost-based stage between the SQL parser and the connectors.
+
+The rules are the pushdowns of :mod:`polyfuseql.optimizer.LogicalPlan`.
+The cost model picks among the replicas of a table (the backends the
+catalogue lists for it)::
+
+    cost(backend) = latency(backend) + rows × row_time(backend)
+
+with both terms taken from :class:`RuntimeStats` and *rows* the keys of
+a lookup or, for a scan, the table's last observed cardinality.  A
+backend without observations costs nothing, so every replica is tried
+once before the estimates take over; ties keep the catalogue order
+(owner first).  A failed call is recorded as a *failure_penalty*-second
+round trip, which steers the following queries to the other replicas.
+"""
+
+from typing import Sequence
+
+from sqlglot import exp
+
+from polyfuseql.optimizer import LogicalPlan
+from polyfuseql.optimizer.Stats import RuntimeStats
+
+
+class Optimizer:
+    def __init__(
+        self,
+        stats: RuntimeStats | None = None,
+        failure_penalty: float = 1.0,
+    ) -> None:
+        self.stats = stats if stats is not None else RuntimeStats()
+        self.failure_penalty = failure_penalty
+
+    def optimize(self, ast: exp.Expression) -> LogicalPlan.Node:
+        """Logical plan of *ast* with the pushdown rules applied."""
+        return LogicalPlan.push_down(LogicalPlan.from_ast(ast))
+
+    def estimate(self, table: str, backend: str | None = None):
+        """Expected rows of a full read of *table* (``None``: unknown)."""
+        return self.stats.cardinality(table, backend)
+
+    def cost(self, backend: str, table: str, rows: int | None = None):
+        """Estimated seconds to read *rows* rows of *table* (all of them
+        when ``None``) from *backend*."""
+        latency = self.stats.latency(backend)
+        if latency is None:
+            return 0.0
+        if rows is None:
+            rows = self.estimate(table, backend) or 1
+        return latency + rows * self.stats.row_time(backend)
+
+    def choose(
+        self,
+        table: str,
+        backends: Sequence[str],
+        rows: int | None = None,
+    ) -> str:
+        """The cheapest of *backends* for reading *table*."""
+        return min(backends, key=lambda b: self.cost(b, table, rows))
+
+    def failed(self, backend: str) -> None:
+        self.stats.observe(backend, self.failure_penalty)
@@ -0,0 +1,81 @@
+"""polyfuseql.optimizer.Stats
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Runtime statistics feeding the cost model: per-backend round-trip
+latency and time per returned row (exponentially weighted moving
+averages, so the estimates follow a backend that slows down), and the
+last observed cardinality of each table on each backend.
+
+A call is modelled as ``latency + rows × row_time``.  Each call feeds
+one of the two terms: a call returning at most *small_rows* rows (a
+point lookup, a failure) is mostly latency and updates it with what the
+current row time does not explain; a larger one (a scan) updates the
+row time with what is left once the latency is taken off.
+"""
+
+from typing import Any, Dict, Tuple
+
+
+def _backend(name: str) -> str:
+    return "postgres" if name == "pg" else name
+
+
+class RuntimeStats:
+    def __init__(self, alpha: float = 0.2, small_rows: int = 10) -> None:
+        self.alpha = alpha  # weight of the newest observation
+        self.small_rows = small_rows  # calls up to this many: latency
+        self._latency: Dict[str, float] = {}
+        self._row_time: Dict[str, float] = {}
+        self._calls: Dict[str, int] = {}
+        self._rows: Dict[Tuple[str, str], int] = {}
+
+    def _ewma(self, averages: Dict[str, float], key: str, value: float):
+        old = averages.get(key, value)
+        averages[key] = old + self.alpha * (value - old)
+
+    def observe(self, backend: str, seconds: float, rows: int = 0) -> None:
+        """Record one backend call that took *seconds* for *rows* rows."""
+        backend = _backend(backend)
+        self._calls[backend] = self._calls.get(backend, 0) + 1
+        if rows <= self.small_rows:
+            fixed = seconds - rows * self.row_time(backend)
+            self._ewma(self._latency, backend, max(fixed, 0.0))
+        else:
+            per_row = (seconds - self._latency.get(backend, 0.0)) / rows
+            self._ewma(self._row_time, backend, max(per_row, 0.0))
+
+    def observe_cardinality(self, backend: str, table: str, rows: int):
+        self._rows[(_backend(backend), table.lower())] = rows
+
+    def latency(self, backend: str) -> float | None:
+        """Estimated fixed cost of one call, ``None`` before any call."""
+        backend = _backend(backend)
+        if backend not in self._calls:
+            return None
+        return self._latency.get(backend, 0.0)
+
+    def row_time(self, backend: str) -> float:
+        return self._row_time.get(_backend(backend), 0.0)
+
+    def cardinality(self, table: str, backend: str | None = None):
+        """Rows of *table* on *backend* (on any replica when ``None``)."""
+        table = table.lower()
+        if backend is not None:
+            return self._rows.get((_backend(backend), table))
+        known = [n for (_, t), n in self._rows.items() if t == table]
+        return max(known) if known else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backends": {
+                backend: {
+                    "calls": calls,
+                    "latency": self.latency(backend),
+                    "row_time": self.row_time(backend),
+                }
+                for backend, calls in self._calls.items()
+            },
+            "cardinality": {
+                f"{table}@{backend}": rows
+                for (backend, table), rows in self._rows.items()
+            },
+        }
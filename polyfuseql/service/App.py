@@ -0,0 +1,146 @@
+"""polyfuseql.service.App
+~~~~~~~~~~~~~~~~~~~~~~~
+REST endpoints over :class:`Service`::
+
+    python -m polyfuseql.service --workers 4 --port 8000
+    uvicorn polyfuseql.service.App:create_app --factory --workers 4
+
+=======================  ==============================================
+``POST /query``          ``{"sql", "params", "engines", "mode",
+                         "timeout", "include_source"}`` →
+                         ``{"rows", "missing", "errors"}``
+``GET /get/{t}/{pk}``    the entity (404 when there is none)
+``POST /get_many``       ``{"table", "pks", "backend"}`` →
+                         ``{"rows", "missing"}``
+``GET /count/{t}``       ``{"table", "count"}``
+``GET /stats``           requests and coalesced calls of this worker
+=======================  ==============================================
+
+``/get`` and ``/count`` take an optional ``?backend=``.  Every worker
+process builds its own app, and so its own :class:`PolyClient`, in the
+lifespan: the pools are warmed before the first request and drained
+after the last one once uvicorn, on SIGTERM, has stopped accepting
+connections and let the requests in progress finish.  Each response
+names the worker that served it in ``X-Worker`` (its pid).
+
+Errors map to statuses: ``ValueError`` and SQL parse errors → 400, an
+unknown table (``KeyError``) → 404, an unsupported statement
+(``NotImplementedError``) → 501.
+"""
+
+import os
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlglot.errors import ParseError
+
+from polyfuseql.client.PolyClient import PolyClient
+from polyfuseql.service.Service import Service
+from polyfuseql.utils.utils import env, flag
+
+_STATUS = {
+    ValueError: 400,
+    ParseError: 400,
+    KeyError: 404,
+    NotImplementedError: 501,
+}
+
+
+class QueryRequest(BaseModel):
+    sql: str
+    params: List[Any] | Dict[str, Any] | None = None
+    engines: List[str] | None = None
+    mode: str = "gather"
+    timeout: float | None = None
+    include_source: bool = False
+
+
+class GetManyRequest(BaseModel):
+    table: str
+    pks: List[str]
+    backend: str = ""
+
+
+def create_app(
+    client: Callable[[], PolyClient] | None = None,
+    coalesce: bool | None = None,
+) -> FastAPI:
+    """The service app.  *client* builds the worker's :class:`PolyClient`
+    (default: ``PolyClient()`` configured from the environment);
+    *coalesce* defaults to ``$POLYFUSEQL_COALESCE`` (on)."""
+    if coalesce is None:
+        coalesce = flag(env("POLYFUSEQL_COALESCE", "1"))
+    factory = client or PolyClient
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        service = Service(factory(), coalesce)
+        await service.start()
+        app.state.service = service
+        try:
+            yield
+        finally:
+            await service.stop()
+
+    app = FastAPI(title="PolyFuseQL", lifespan=lifespan)
+    worker = str(os.getpid())
+
+    @app.middleware("http")
+    async def tag_worker(request: Request, call_next):
+        response = await call_next(request)
+        response.headers["X-Worker"] = worker
+        return response
+
+    for exc_type, status in _STATUS.items():
+
+        async def failed(request: Request, exc: Exception, status=status):
+            detail = exc.args[0] if exc.args else repr(exc)
+            return JSONResponse({"detail": str(detail)}, status_code=status)
+
+        app.add_exception_handler(exc_type, failed)
+
+    def service(request: Request) -> Service:
+        return request.app.state.service
+
+    @app.post("/query")
+    async def query(body: QueryRequest, request: Request) -> Dict[str, Any]:
+        return await service(request).query(
+            body.sql,
+            body.params,
+            body.engines,
+            body.mode,
+            body.timeout,
+            body.include_source,
+        )
+
+    @app.get("/get/{table}/{pk}")
+    async def get(
+        table: str, pk: str, request: Request, backend: str = ""
+    ) -> Dict[str, Any]:
+        row = await service(request).get(table, pk, backend)
+        if not row:
+            raise HTTPException(404, f"No {table} with key {pk}")
+        return row
+
+    @app.post("/get_many")
+    async def get_many(body: GetManyRequest, request: Request):
+        svc = service(request)
+        return await svc.get_many(body.table, body.pks, body.backend)
+
+    @app.get("/count/{table}")
+    async def count(
+        table: str,
+        request: Request,
+        backend: str = "",
+    ) -> Dict[str, Any]:
+        n = await service(request).count(table, backend)
+        return {"table": table, "count": n}
+
+    @app.get("/stats")
+    async def stats(request: Request) -> Dict[str, Any]:
+        return service(request).stats()
+
+    return app
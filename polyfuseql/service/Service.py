@@ -0,0 +1,103 @@
+"""polyfuseql.service.Service
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+The operations of the HTTP service, independent of the web framework.
+
+One :class:`Service` per worker process holds the long-lived
+:class:`PolyClient` (and so its connection pools, caches and plan
+cache).  Identical requests in flight at the same time are answered by
+one backend call (see :class:`SingleFlight`).  Only reads are served, so
+a coalesced answer is one any of the callers could have received alone.
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Sequence
+
+from polyfuseql.client.PolyClient import PolyClient
+from polyfuseql.service.SingleFlight import SingleFlight
+
+
+def _errors(result: Any) -> Dict[str, str]:
+    errors = getattr(result, "errors", None) or {}
+    return {backend: repr(exc) for backend, exc in errors.items()}
+
+
+class Service:
+    def __init__(self, client: PolyClient, coalesce: bool = True) -> None:
+        self.client = client
+        self.coalesce = coalesce
+        self.flights = SingleFlight()
+        self.requests = 0
+
+    async def start(self) -> None:
+        """Warm the connection pools before taking traffic."""
+        await self.client.open()
+
+    async def stop(self) -> None:
+        """Drain the connection pools (after the last request)."""
+        await self.client.aclose()
+
+    async def _shared(self, key: Sequence[Any], call) -> Any:
+        self.requests += 1
+        if not self.coalesce:
+            return await call()
+        flight = json.dumps(key, sort_keys=True, default=str)
+        return await self.flights.do(flight, call)
+
+    async def query(
+        self,
+        sql: str,
+        params: Sequence | Dict | None = None,
+        engines: Sequence[str] | None = None,
+        mode: str = "gather",
+        timeout: float | None = None,
+        include_source: bool = False,
+    ) -> Dict[str, Any]:
+        """``{"rows", "missing", "errors"}`` of a SELECT (see
+        :meth:`PolyClient.query`); failed backends as their ``repr``."""
+
+        async def run() -> Dict[str, Any]:
+            rows = await self.client.query(
+                sql,
+                engines=engines,
+                mode=mode,
+                timeout=timeout,
+                include_source=include_source,
+                params=params,
+            )
+            return {
+                "rows": list(rows),
+                "missing": list(getattr(rows, "missing", [])),
+                "errors": _errors(rows),
+            }
+
+        options = [engines, mode, timeout, include_source]
+        return await self._shared(["query", sql, params, *options], run)
+
+    async def get(self, table: str, pk: str, backend: str = "") -> Dict:
+        async def run() -> Dict:
+            return await self.client.get(table, pk, backend)
+
+        return await self._shared(["get", table, pk, backend], run)
+
+    async def get_many(
+        self, table: str, pks: List[str], backend: str = ""
+    ) -> Dict[str, Any]:
+        async def run() -> Dict[str, Any]:
+            rows = await self.client.get_many(table, pks, backend)
+            return {"rows": list(rows), "missing": rows.missing}
+
+        return await self._shared(["get_many", table, pks, backend], run)
+
+    async def count(self, table: str, backend: str = "") -> int:
+        async def run() -> int:
+            return await self.client.count(table, backend)
+
+        return await self._shared(["count", table, backend], run)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "worker": os.getpid(),
+            "requests": self.requests,
+            **self.flights.stats(),
+        }
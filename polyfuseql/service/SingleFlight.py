@@ -0,0 +1,46 @@
+"""polyfuseql.service.SingleFlight
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Coalesce identical concurrent calls into one.
+
+The first caller of a key starts the call; callers of the same key
+arriving before it finishes await that call instead of starting their
+own, and all get its result (or its exception).  The call runs as its own
+task, so a caller that goes away (e.g. a dropped HTTP request) does not
+cancel it for the others.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]):
+        """Result of ``call()``, shared with the concurrent callers of
+        *key*."""
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._landed(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _landed(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # retrieved even if every caller went away
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
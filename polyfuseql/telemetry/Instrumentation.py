@@ -0,0 +1,297 @@
+"""polyfuseql.telemetry.Instrumentation
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+Per-stage timing of the read path, as spans handed to a pluggable sink.
+
+Stages (span names)::
+
+    query / get / get_many / count   one PolyClient call
+    insert / update / delete          one PolyClient write (all stores)
+    parse         sqlglot parse of a statement missing from the plan cache
+    plan          optimizer pushdowns and routing of that statement
+    route         choice of the backend (replica) serving a read
+    acquire       pooled connection checkout (Postgres; Redis and Neo4j
+                  take theirs inside the round trip)
+    round_trip    awaiting the store
+    deserialize   store reply → rows
+    aggregate     a GROUP BY folded locally over scanned batches
+
+Connector spans carry a ``backend`` attribute.  Sinks:
+
+* :class:`NoopSink` (default) – ``span()`` returns a shared do-nothing
+  object, so disabled instrumentation costs one method call;
+* :class:`LoggingSink` – one log record per span;
+* :class:`HistogramSink` – Prometheus-style cumulative histograms per
+  ``(stage, backend)``, exposed in the text format by :meth:`expose`;
+* :class:`OTelSink` – OpenTelemetry spans (needs ``opentelemetry-api``),
+  nested like the calls;
+* :class:`MultiSink` – several of the above.
+
+Pick one with ``PolyClient({"telemetry": ...})`` (a sink, or its name:
+``"noop"``, ``"logging"``, ``"histogram"``, ``"otel"``), the
+``POLYFUSEQL_TELEMETRY`` env var, or at run time with
+``client.telemetry.sink = HistogramSink()``.
+"""
+
+import bisect
+import logging
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+__all__ = [
+    "HistogramSink",
+    "Instrumentation",
+    "LoggingSink",
+    "MultiSink",
+    "NoopSink",
+    "OTelSink",
+    "Sink",
+    "Span",
+    "make_sink",
+]
+
+
+class Sink:
+    """Receives spans: :meth:`start` when one opens (its return value is
+    handed back to :meth:`finish`), :meth:`finish` when it closes."""
+
+    enabled = True
+
+    def start(self, span: "Span") -> Any:
+        return None
+
+    def finish(self, span: "Span", token: Any) -> None:
+        pass
+
+
+class NoopSink(Sink):
+    enabled = False
+
+
+class Span:
+    """One timed stage; *attrs* can be completed while it runs
+    (``span.set(rows=n)``)."""
+
+    __slots__ = (
+        "sink",
+        "name",
+        "attrs",
+        "started",
+        "seconds",
+        "error",
+        "_token",
+    )
+
+    def __init__(self, sink: Sink, name: str, attrs: Dict[str, Any]):
+        self.sink = sink
+        self.name = name
+        self.attrs = attrs
+        self.started = 0.0
+        self.seconds = 0.0
+        self.error: BaseException | None = None
+        self._token: Any = None
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> "Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.seconds = time.perf_counter() - self.started
+        self.error = exc
+        self.sink.finish(self, self._token)
+
+
+class _TracedSpan(Span):
+    """Span whose sink keeps state between start and finish (OTel)."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "Span":
+        self._token = self.sink.start(self)
+        self.started = time.perf_counter()
+        return self
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Instrumentation:
+    """Span factory shared by a client and its connectors."""
+
+    def __init__(self, sink: Sink | None = None) -> None:
+        self.sink = sink if sink is not None else NoopSink()
+
+    def span(self, name: str, **attrs: Any) -> Span | _NullSpan:
+        sink = self.sink
+        if not sink.enabled:
+            return _NULL_SPAN
+        if type(sink).start is Sink.start:
+            return Span(sink, name, attrs)
+        return _TracedSpan(sink, name, attrs)
+
+
+class LoggingSink(Sink):
+    def __init__(
+        self,
+        logger: logging.Logger | None = None,
+        level: int = logging.DEBUG,
+    ) -> None:
+        self.logger = logger or logging.getLogger("polyfuseql.telemetry")
+        self.level = level
+
+    def finish(self, span: Span, token: Any) -> None:
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(
+                self.level,
+                "%s %.3fms %s%s",
+                span.name,
+                span.seconds * 1000,
+                span.attrs,
+                f" error={span.error!r}" if span.error else "",
+            )
+
+
+class HistogramSink(Sink):
+    """Durations per ``(stage, backend)`` in cumulative buckets."""
+
+    BUCKETS = (
+        0.0001,
+        0.00025,
+        0.0005,
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+        10.0,
+    )
+
+    def __init__(
+        self,
+        buckets: Sequence[float] = BUCKETS,
+        name: str = "polyfuseql_stage_seconds",
+    ) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.name = name
+        self._counts: Dict[Tuple[str, str], List[int]] = {}
+        self._sums: Dict[Tuple[str, str], float] = {}
+
+    def finish(self, span: Span, token: Any) -> None:
+        key = (span.name, span.attrs.get("backend", ""))
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            self._sums[key] = 0.0
+        counts[bisect.bisect_left(self.buckets, span.seconds)] += 1
+        self._sums[key] += span.seconds
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """``{"stage" | "stage@backend": {"count", "sum", "buckets"}}``
+        with cumulative bucket counts keyed on their upper bound."""
+        found = {}
+        for (stage, backend), counts in self._counts.items():
+            running, buckets = 0, {}
+            for bound, n in zip((*self.buckets, float("inf")), counts):
+                running += n
+                buckets[bound] = running
+            name = f"{stage}@{backend}" if backend else stage
+            found[name] = {
+                "count": running,
+                "sum": self._sums[(stage, backend)],
+                "buckets": buckets,
+            }
+        return found
+
+    def expose(self) -> str:
+        """The histograms in the Prometheus text exposition format."""
+        lines = [f"# TYPE {self.name} histogram"]
+        for name, data in self.snapshot().items():
+            stage, _, backend = name.partition("@")
+            labels = f'stage="{stage}",backend="{backend}"'
+            for bound, n in data["buckets"].items():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{self.name}_bucket{{{labels},le="{le}"}} {n}')
+            lines.append(f"{self.name}_sum{{{labels}}} {data['sum']}")
+            lines.append(f"{self.name}_count{{{labels}}} {data['count']}")
+        return "\n".join(lines) + "\n"
+
+
+class OTelSink(Sink):
+    """OpenTelemetry spans, made current while they run so that nested
+    stages become their children."""
+
+    def __init__(self, tracer=None) -> None:
+        from opentelemetry import context, trace  # optional dependency
+
+        self._context, self._trace = context, trace
+        self.tracer = tracer or trace.get_tracer("polyfuseql")
+
+    def start(self, span: Span) -> Any:
+        otel = self.tracer.start_span(span.name)
+        ctx = self._trace.set_span_in_context(otel)
+        return otel, self._context.attach(ctx)
+
+    def finish(self, span: Span, token: Any) -> None:
+        otel, attached = token
+        for key, value in span.attrs.items():
+            if value is not None:
+                otel.set_attribute(f"polyfuseql.{key}", value)
+        if span.error is not None:
+            otel.record_exception(span.error)
+            otel.set_status(self._trace.StatusCode.ERROR)
+        otel.end()
+        self._context.detach(attached)
+
+
+class MultiSink(Sink):
+    def __init__(self, *sinks: Sink) -> None:
+        self.sinks = [s for s in sinks if s.enabled]
+        self.enabled = bool(self.sinks)
+
+    def start(self, span: Span) -> Any:
+        return [sink.start(span) for sink in self.sinks]
+
+    def finish(self, span: Span, token: Any) -> None:
+        for sink, own in zip(reversed(self.sinks), reversed(token)):
+            sink.finish(span, own)
+
+
+_SINKS = {
+    "noop": NoopSink,
+    "logging": LoggingSink,
+    "histogram": HistogramSink,
+    "otel": OTelSink,
+}
+
+
+def make_sink(spec: Sink | str | None) -> Sink:
+    """A sink from its name (``None`` / ``""``: no-op)."""
+    if isinstance(spec, Sink):
+        return spec
+    if not spec:
+        return NoopSink()
+    if spec not in _SINKS:
+        raise ValueError(f"Unknown telemetry sink: {spec}")
+    return _SINKS[spec]()
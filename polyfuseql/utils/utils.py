@@ -1,7 +1,16 @@
+import functools
 import json
 import os
 import re
-from typing import Dict, Any
+from typing import Dict, Any, Sequence, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional: the standard library decoder is used
+    orjson = None
+
+#: JSON decoder of the read paths: ``orjson.loads`` when installed
+loads = orjson.loads if orjson is not None else json.loads
 
 
 def _upper_first(s: str) -> str:
@@ -28,17 +37,42 @@ def camelize_dict(d: Dict[str, Any]) -> Dict[str, Any]:
     return {_camelize(k): v for k, v in d.items()}
 
 
+def _snake(name: str) -> str:
+    """Convert camelCase to snake_case (``unitPrice`` → ``unit_price``)."""
+    return re.sub(r"(?<=[a-z0-9])([A-Z])", r"_\1", name).lower()
+
+
+def project(
+    row: Dict[str, Any],
+    columns: Sequence[Tuple[str, str]],
+) -> Dict[str, Any]:
+    """Keep the ``(alias, column)`` *columns* of *row*, renamed to alias;
+    absent columns are ``None``."""
+    return {alias: row.get(column) for alias, column in columns}
+
+
 def env(name: str, default: str | None = None) -> str | None:  # small shorth.
     return os.environ.get(name, default)
 
 
+def flag(value: Any) -> bool:
+    """Boolean setting: ``True`` or ``"1"`` / ``"true"`` / ``"yes"`` /
+    ``"on"`` (any case) from the environment."""
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+
+@functools.lru_cache(maxsize=1024)
+def camel_key(name: str) -> str:
+    """snake_case column → the camelCase key redis / neo4j payloads use
+    (``unit_price`` → ``unitPrice``)."""
+    return re.sub(r"_([a-z])", lambda m: m.group(1).upper(), name)
+
+
 def _camelize_keys(obj: Dict[str, Any]) -> Dict[str, Any]:
     """Convert snake_case → camelCase for Postgres JSON rows so that they match
     redis / neo4j payloads."""
-
-    def camel(s: str) -> str:
-        return re.sub(r"_([a-z])", lambda m: m.group(1).upper(), s)
-
     if isinstance(obj, str):
-        obj = json.loads(obj)
-    return {camel(k): v for k, v in obj.items()}
+        obj = loads(obj)
+    return {camel_key(k): v for k, v in obj.items()}
@@ -0,0 +1,292 @@
+# tests/test_aggregate.py
+from contextlib import asynccontextmanager
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from polyfuseql.benchmark.InMemory import InMemoryConnector
+from polyfuseql.client.PolyClient import PolyClient
+from polyfuseql.connector import Predicate as P
+from polyfuseql.connector.Aggregation import Agg, Aggregation, LocalAggregator
+from polyfuseql.connector.Neo4j import Neo4jConnector
+from polyfuseql.connector.Postgres import PostgresConnector
+
+PRODUCTS = [
+    {
+        "productId": i,
+        "categoryId": None if i % 5 == 0 else i % 3,
+        "unitPrice": None if i == 7 else round(1.1 * i, 2),
+        "discontinued": i % 2,
+    }
+    for i in range(1, 21)
+]
+GROUPED = (
+    "SELECT categoryId, COUNT(*) AS n, COUNT(unitPrice) AS priced, "
+    "SUM(unitPrice) AS total, AVG(unitPrice) AS mean, "
+    "MIN(unitPrice) AS lo, MAX(unitPrice) AS hi "
+    "FROM products GROUP BY categoryId"
+)
+
+
+def client(connector=None):
+    c = PolyClient()
+    if connector is None:
+        connector = InMemoryConnector()
+        connector.load("products", PRODUCTS, "productId")
+    c.pg = c.backends["pg"] = c.backends["postgres"] = connector
+    c.rd = c.backends["redis"] = InMemoryConnector()
+    c._catalogue["products"] = ("postgres", "productId")
+    return c
+
+
+def expected(rows):
+    """GROUP BY categoryId computed the obvious way."""
+    out = {}
+    for row in rows:
+        out.setdefault(row["categoryId"], []).append(row["unitPrice"])
+    found = []
+    for key in sorted(out, key=lambda k: (k is not None, k or 0)):
+        prices = [p for p in out[key] if p is not None]
+        found.append(
+            {
+                "categoryId": key,
+                "n": len(out[key]),
+                "priced": len(prices),
+                "total": round(sum(prices), 9),
+                "mean": round(sum(prices) / len(prices), 9),
+                "lo": min(prices),
+                "hi": max(prices),
+            }
+        )
+    return found
+
+
+def rounded(rows):
+    return [
+        {k: round(v, 9) if isinstance(v, float) else v for k, v in r.items()}
+        for r in rows
+    ]
+
+
+@pytest.mark.asyncio
+async def test_group_by_scan_matches_plain_computation():
+    rows = await client().query(GROUPED)
+    assert rounded(rows) == expected(PRODUCTS)
+
+
+@pytest.mark.parametrize("size", [1, 3, 20])
+def test_local_aggregation_is_independent_of_batches_and_types(size):
+    aggregation = Aggregation(
+        ("categoryId",),
+        (Agg("count"), Agg("sum", "unitPrice"), Agg("avg", "unitPrice")),
+        P.Cmp("a0", "gt", 3),
+    )
+    results, rows = [], PRODUCTS
+    # Redis hashes return every field as a string
+    text = [{k: str(v) for k, v in r.items() if v is not None} for r in rows]
+    for rows in (PRODUCTS, text, PRODUCTS[::-1]):
+        local = LocalAggregator(aggregation)
+        for start in range(0, len(rows), size):
+            end = start + size
+            local.add(rows[start:end])
+        found = [aggregation.finish(r) for r in local.result()]
+        found = [(str(r["g0"]), r["a0"], r["a1"], r["a2"]) for r in found]
+        results.append(sorted(found))
+    assert results[0] == results[1] == results[2]
+    assert [r[0] for r in results[0]] == ["0", "1", "2", "None"]
+
+
+@pytest.mark.asyncio
+async def test_having_where_limit_and_global_aggregates():
+    c = client()
+    rows = await c.query(
+        "SELECT categoryId AS c, COUNT(*) AS n FROM products "
+        "WHERE discontinued = 0 GROUP BY categoryId "
+        "HAVING COUNT(*) > ? AND c IS NOT NULL LIMIT 1",
+        params=[2],
+    )
+    kept = [r for r in PRODUCTS if r["discontinued"] == 0]
+    counts = {}
+    for r in kept:
+        counts[r["categoryId"]] = counts.get(r["categoryId"], 0) + 1
+    first = min(k for k, n in counts.items() if n > 2 and k is not None)
+    assert list(rows) == [{"c": first, "n": counts[first]}]
+
+    rows = await c.query(
+        "SELECT COUNT(*), SUM(unitPrice) FROM products WHERE unitPrice > 1000"
+    )
+    assert list(rows) == [{"COUNT(*)": 0, "SUM(unitPrice)": None}]
+    rows = await c.query(
+        "SELECT COUNT(*) AS n, MAX(productId) AS top FROM products "
+        "WHERE productId IN (3, 4, 99)"
+    )
+    assert list(rows) == [{"n": 2, "top": 4}]
+
+
+class FakePrepared:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def fetch(self, *args):
+        self.conn.args = args
+        return [(1, 3, Decimal("6.60"))]
+
+    def get_attributes(self):
+        types = ("int4", "int8", "numeric")
+        return [
+            SimpleNamespace(name=n, type=SimpleNamespace(name=t))
+            for n, t in zip(("g0", "a0", "a1"), types)
+        ]
+
+
+@pytest.mark.asyncio
+async def test_postgres_runs_one_group_by_statement():
+    pg = PostgresConnector()
+    conn = SimpleNamespace(queries=[])
+
+    async def prepare(query):
+        conn.queries.append(query)
+        return FakePrepared(conn)
+
+    conn.prepare = prepare
+
+    @asynccontextmanager
+    async def connect():
+        yield conn
+
+    pg._connect = connect
+    c = client(pg)
+    rows = await c.query(
+        "SELECT categoryId, COUNT(*) AS n, SUM(unitPrice) AS total "
+        "FROM products WHERE discontinued = 0 "
+        "GROUP BY categoryId HAVING n > 1"
+    )
+    assert list(rows) == [{"categoryId": 1, "n": 3, "total": 6.6}]
+    assert conn.queries == [
+        "SELECT * FROM (SELECT t.category_id AS g0, COUNT(*) AS a0, "
+        "SUM(t.unit_price::numeric) AS a1 FROM products t "
+        "WHERE t.discontinued = $1 GROUP BY 1) t WHERE t.a0 > $2"
+    ]
+    assert conn.args == (0, 1)
+
+
+class FakeSession:
+    def __init__(self):
+        self.queries = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def execute_read(self, work):
+        return await work(self)
+
+    async def run(self, query, params):
+        self.queries.append((query, params))
+
+        async def records():
+            yield {"p": {"g0": 2, "a0": 4, "a1": 12.5}}
+
+        return records()
+
+
+@pytest.mark.asyncio
+async def test_neo4j_aggregates_in_cypher():
+    nj = Neo4jConnector()
+    session = FakeSession()
+    nj._driver = SimpleNamespace(session=lambda **config: session)
+    aggregation = Aggregation(
+        ("categoryId",),
+        (Agg("count"), Agg("sum", "unitPrice")),
+        P.Cmp("a0", "gte", 2),
+    )
+    where = P.Cmp("discontinued", "eq", 0)
+    rows = await nj.aggregate("product", aggregation, where)
+    assert rows == [{"g0": 2, "a0": 4, "a1": 12.5}]
+    [(cypher, params)] = session.queries
+    assert cypher == (
+        "MATCH (n:Product) WHERE n.discontinued = $w0 "
+        "WITH n.categoryId AS g0, count(*) AS a0, CASE count(n.unitPrice) "
+        "WHEN 0 THEN null ELSE sum(n.unitPrice) END AS a1 "
+        "WITH {g0: g0, a0: a0, a1: a1} AS n WHERE n.a0 >= $w1 RETURN n AS p"
+    )
+    assert params == {"w0": 0, "w1": 2}
+
+
+@pytest.mark.asyncio
+async def test_join_aggregate_runs_locally_over_the_joined_rows():
+    c = client()
+    c.rd.load(
+        "customers",
+        [{"customerId": "A", "country": "DE"}, {"customerId": "B"}],
+        "customerId",
+    )
+    c._catalogue["customers"] = ("redis", "customerId")
+    orders = [
+        {"orderId": 1, "customerId": "A", "freight": 5},
+        {"orderId": 2, "customerId": "B", "freight": 20},
+        {"orderId": 3, "customerId": "A", "freight": 30},
+    ]
+    c.pg.load("orders", orders, "orderId")
+    c._catalogue["orders"] = ("postgres", "orderId")
+    rows = await c.query(
+        "SELECT c.country, COUNT(*) AS n, SUM(o.freight) AS freight "
+        "FROM orders o JOIN customers c ON o.customerId = c.customerId "
+        "GROUP BY c.country"
+    )
+    assert list(rows) == [
+        {"country": None, "n": 1, "freight": 20},
+        {"country": "DE", "n": 2, "freight": 35},
+    ]
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "SELECT * FROM products GROUP BY categoryId",
+        "SELECT productId, COUNT(*) FROM products GROUP BY categoryId",
+        "SELECT COUNT(DISTINCT categoryId) FROM products",
+        "SELECT SUM(unitPrice * 2) FROM products",
+        "SELECT categoryId FROM products GROUP BY categoryId + 1",
+    ],
+)
+@pytest.mark.asyncio
+async def test_unsupported_aggregates(sql):
+    with pytest.raises(NotImplementedError):
+        await client().query(sql)
+
+
+def test_explain_names_where_the_aggregate_runs():
+    text = client().explain(
+        "SELECT categoryId, COUNT(*) AS n FROM products "
+        "WHERE discontinued = 0 GROUP BY categoryId HAVING n > 1"
+    )
+    assert "Aggregate GROUP BY categoryId HAVING n > 1" in text
+    assert "columns=categoryId,discontinued" in text
+    assert "computed: locally over the scan on postgres" in text
+
+
+@pytest.mark.asyncio
+async def test_min_max_compare_text_as_stored():
+    rows = [
+        {"productId": 1, "zip": "01234"},
+        {"productId": 2, "zip": "12209"},
+        {"productId": 3, "zip": "WX3 6FW"},
+        {"productId": 4, "zip": 5021},
+    ]
+    connector = InMemoryConnector()
+    connector.load("products", rows, "productId")
+    c = client(connector)
+    found = await c.query(
+        "SELECT MIN(zip) AS lo, MAX(zip) AS hi FROM products "
+        "WHERE productId IN (1, 2)"
+    )
+    assert list(found) == [{"lo": "01234", "hi": "12209"}]
+    # mixed types: numbers before text, no TypeError
+    found = await c.query(
+        "SELECT MIN(zip) AS lo, MAX(zip) AS hi FROM products "
+        "WHERE productId IN (1, 3, 4)"
+    )
+    assert list(found) == [{"lo": 5021, "hi": "WX3 6FW"}]
@@ -0,0 +1,142 @@
+# tests/test_arrow.py
+from types import SimpleNamespace
+
+import pytest
+from polyfuseql.benchmark.InMemory import InMemoryConnector
+from polyfuseql.client import Arrow
+from polyfuseql.client.PolyClient import PolyClient
+from polyfuseql.connector.Connector import to_columns
+from polyfuseql.connector.RowShape import RowShape
+
+
+def product(i):
+    return {"productId": i, "productName": f"P{i}", "unitPrice": i * 1.5}
+
+
+PRODUCTS = [product(i) for i in range(1, 8)]
+
+
+def client(options=None):
+    c = PolyClient(options)
+    conn = InMemoryConnector()
+    conn.load("products", PRODUCTS, "productId")
+    c.pg = c.backends["pg"] = c.backends["postgres"] = conn
+    c._catalogue["products"] = ("postgres", "productId")
+    return c
+
+
+def test_row_shape_decodes_records_column_by_column():
+    attrs = [
+        SimpleNamespace(name=n, type=SimpleNamespace(name=t))
+        for n, t in (("product_id", "int2"), ("unit_price", "float4"))
+    ]
+    shape = RowShape(attrs, camelize=True)
+    records = [(1, 18.0), (2, None), (3, 18.399999618530273)]
+    assert shape.columns(records) == {
+        "productId": [1, 2, 3],
+        "unitPrice": [18, None, 18.4],
+    }
+    assert shape.columns([]) == {"productId": [], "unitPrice": []}
+    rows = shape.rows(records)
+    assert to_columns(rows) == shape.columns(records)
+    varying = [{"a": 1}, {"b": 2, "a": 3}]
+    assert to_columns(varying) == {"a": [1, 3], "b": [None, 2]}
+
+
+@pytest.mark.asyncio
+async def test_columnar_scan_keeps_projection_and_limit():
+    c = client()
+    sql = "SELECT productId AS id, unitPrice FROM products LIMIT 5"
+    batches = c._stream_batches(sql, None, 2, None, columnar=True)
+    found = [batch async for batch in batches]
+    assert found == [
+        {"id": [1, 2], "unitPrice": [1.5, 3.0]},
+        {"id": [3, 4], "unitPrice": [4.5, 6.0]},
+        {"id": [5], "unitPrice": [7.5]},
+    ]
+    lookup = "SELECT productName FROM products WHERE productId IN (2, 9)"
+    batches = c._stream_batches(lookup, None, None, None, columnar=True)
+    assert [batch async for batch in batches] == [{"productName": ["P2"]}]
+
+
+@pytest.mark.asyncio
+async def test_arrow_format_needs_pyarrow_and_one_engine(monkeypatch):
+    c = client()
+    sql = "SELECT * FROM products WHERE productId = 1"
+    with pytest.raises(ValueError):
+        await c.query(sql, format="csv")
+    with pytest.raises(NotImplementedError):
+        await c.query(sql, engines=["postgres", "redis"], format="arrow")
+    with pytest.raises(NotImplementedError):
+        await c.query(sql, timeout=1.0, format="arrow")
+    with pytest.raises(NotImplementedError):
+        await c.query(sql, quorum=2, format="arrow")
+    monkeypatch.setattr(Arrow, "pa", None)
+    with pytest.raises(ImportError):
+        await c.query(sql, format="arrow")
+
+
+@pytest.mark.asyncio
+async def test_arrow_table_batches_and_ipc_round_trip():
+    pa = pytest.importorskip("pyarrow")
+    c = client()
+    sql = "SELECT * FROM products WHERE unitPrice > ?"
+    table = await c.query(sql, params=[3], format="arrow")
+    assert table.column_names == ["productId", "productName", "unitPrice"]
+    assert table.column("productId").to_pylist() == [3, 4, 5, 6, 7]
+    assert Arrow.from_ipc(Arrow.to_ipc(table)).equals(table)
+    cached = client({"cache": True})  # lookups read through the cache
+    lookup = "SELECT * FROM products WHERE productId IN (1, 2)"
+    for _ in range(2):
+        assert (await cached.query(lookup, format="arrow")).num_rows == 2
+    assert cached.cache_stats()["hits"] == 2
+
+    stream = c.stream_arrow("SELECT * FROM products", batch_size=3)
+    batches = [batch async for batch in stream]
+    assert [b.num_rows for b in batches] == [3, 3, 1]
+    assert all(isinstance(b, pa.RecordBatch) for b in batches)
+    assert Arrow.table(batches).to_pylist() == PRODUCTS
+
+    mixed = Arrow.record_batch({"v": [1, "a", None]})
+    assert mixed.column(0).to_pylist() == ["1", "a", None]
+    later = Arrow.record_batch({"v": ["x"], "w": [1]}, batches[0].schema)
+    assert later.schema.names == [*batches[0].schema.names, "v", "w"]
+
+
+@pytest.mark.asyncio
+async def test_arrow_results_keep_one_schema():
+    pa = pytest.importorskip("pyarrow")
+    c = client()
+    conn = c.backends["postgres"]
+    code = {1: 1, 2: 2, 4: "X4"}  # int in the first batch, text later
+    codes = [{"productId": i, "code": v} for i, v in code.items()]
+    conn.load("codes", codes, "productId")
+    c._catalogue["codes"] = ("postgres", "productId")
+    stream = c.stream_arrow("SELECT * FROM codes", batch_size=2)
+    with pytest.raises(ValueError):
+        [batch async for batch in stream]
+    sql = "SELECT * FROM codes WHERE productId > 0"
+    table = await c.query(sql, format="arrow")
+    assert table.schema.field("code").type == pa.string()
+    assert table.column("code").to_pylist() == ["1", "2", "X4"]
+
+    later = [{"productId": i, "note": None if i < 3 else i} for i in (1, 2, 3)]
+    conn.load("notes", later, "productId")
+    c._catalogue["notes"] = ("postgres", "productId")
+    stream = c.stream_arrow("SELECT * FROM notes", batch_size=2)
+    batches = [batch async for batch in stream]
+    assert [b.schema.field("note").type for b in batches] == [pa.int64()] * 2
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batches[0].schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+    read = Arrow.from_ipc(sink.getvalue().to_pybytes())
+    assert read.column("note").to_pylist() == [None, None, 3]
+
+    async def nulls():
+        for _ in range(3):
+            yield {"v": [None]}
+
+    held = Arrow.record_batches(nulls(), hold=2)
+    types = [batch.schema.field("v").type async for batch in held]
+    assert types == [pa.string()] * 3
@@ -0,0 +1,41 @@
+# tests/test_benchmark.py
+import asyncio
+
+import pytest
+from polyfuseql.benchmark import Bench
+from polyfuseql.benchmark.InMemory import InMemoryConnector
+
+
+@pytest.mark.asyncio
+async def test_fake_stack_reports_every_case_and_backend():
+    report = await Bench.run("fake", ops=20, warmup=2, batch=5)
+    names = {f"{c}/{t.backend}" for c in Bench.CASES for t in Bench.TARGETS}
+    assert set(report["results"]) == names
+    for result in report["results"].values():
+        assert "error" not in result
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+        total = result["router_ms"] + result["backend_ms"]
+        assert total == pytest.approx(result["mean_ms"], rel=0.05)
+    assert report["meta"]["stack"] == "fake"
+
+
+@pytest.mark.asyncio
+async def test_backend_time_is_charged_to_the_calling_operation():
+    conn = InMemoryConnector({"latency": 0.005})
+    conn.load("products", [{"productId": 1}], "productId")
+    timed = Bench.TimedConnector(conn)
+
+    async def op(i):
+        await timed.get("products", "1")
+        await asyncio.sleep(0.005)  # router work
+
+    result = await Bench.measure(op, ops=4, concurrency=2, warmup=0)
+    assert result["backend_ms"] >= 5
+    assert result["router_ms"] >= 4
+
+
+def test_compare_flags_throughput_and_tail_regressions():
+    old = {"results": {"get/pg": {"ops_per_s": 1000, "p99_ms": 1.0}}}
+    new = {"results": {"get/pg": {"ops_per_s": 850, "p99_ms": 1.05}}}
+    assert Bench.compare(old, new) == ["get/pg: 1000 → 850 ops/s"]
+    assert Bench.compare(old, new, tolerance=0.2) == []
@@ -0,0 +1,50 @@
+# tests/test_get_many.py
+import pytest
+from polyfuseql.client.PolyClient import PolyClient
+
+
+class FakeConnector:
+    max_batch_size = 500
+
+    def __init__(self) -> None:
+        self.calls = []
+
+    async def get_many(self, entity, pks):
+        self.calls.append(list(pks))
+        return {pk: {"id": pk} for pk in pks if pk != "missing"}
+
+
+@pytest.mark.asyncio
+async def test_get_many_preserves_order_and_reports_missing():
+    c = PolyClient()
+    fake = c.backends["redis"] = FakeConnector()
+    rows = await c.get_many("Customer", ["b", "missing", "a", "b"], "redis")
+    assert [r["id"] for r in rows] == ["b", "a"]
+    assert rows.missing == ["missing"]
+    assert fake.calls == [["b", "missing", "a"]]  # one batched call
+
+
+@pytest.mark.asyncio
+async def test_get_many_products_postgres():
+    c = PolyClient()
+    rows = await c.get_many("products", ["2", "1", "999999"], "pg")
+    assert [r["productName"] for r in rows] == ["Chang", "Chai"]
+    assert rows.missing == ["999999"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("data_type", ["string", "hash", "json"])
+async def test_get_many_customers_redis(data_type):
+    c = PolyClient({"data_type": data_type})
+    pks = [f"1:{data_type}", f"0:{data_type}"]
+    rows = await c.get_many("Customer", pks, "redis")
+    assert rows[0]["companyName"] == "Customer NRZBB"
+    assert rows.missing == [f"0:{data_type}"]
+
+
+@pytest.mark.asyncio
+async def test_get_many_customers_neo4j():
+    c = PolyClient()
+    rows = await c.get_many("customer", ["ANATR", "ALFKI"], "neo4j")
+    assert rows[1]["companyName"] == "Alfreds Futterkiste"
+    assert not rows.missing
@@ -0,0 +1,151 @@
+# tests/test_join.py
+import pytest
+from polyfuseql.client import Join
+from polyfuseql.client.PolyClient import PolyClient
+from polyfuseql.connector import Predicate as P
+
+CUSTOMERS = [
+    {"customerId": "A", "companyName": "Alfreds"},
+    {"customerId": "B", "companyName": "Berglunds"},
+    {"customerId": "C", "companyName": "Chop-suey"},
+]
+ORDERS = [
+    {"orderId": 1, "customerId": "A", "freight": 5},
+    {"orderId": 2, "customerId": "B", "freight": 20},
+    {"orderId": 3, "customerId": "A", "freight": 30},
+    {"orderId": 4, "customerId": "Z", "freight": 40},
+]
+
+
+class FakeConnector:
+    max_batch_size = 2
+    scan_batch_size = 2
+
+    def __init__(self, rows, pk) -> None:
+        self.rows, self.pk = rows, pk
+        self.calls = []
+
+    def _project(self, row, columns):
+        if columns is None:
+            return dict(row)
+        return {alias: row.get(col) for alias, col in columns}
+
+    async def count(self, entity):
+        return len(self.rows)
+
+    async def get_many(self, entity, pks, columns=None):
+        self.calls.append(("get_many", list(pks), columns))
+        by_pk = {str(r[self.pk]): r for r in self.rows}
+        found = [pk for pk in pks if pk in by_pk]
+        return {pk: self._project(by_pk[pk], columns) for pk in found}
+
+    async def scan(self, entity, batch_size=None, columns=None, where=None):
+        self.calls.append(("scan", columns))
+        rows = [r for r in self.rows if P.matches(where, r)]
+        size = batch_size or self.scan_batch_size
+        for start in range(0, len(rows), size):
+            end = start + size
+            batch = rows[start:end]
+            yield [self._project(r, columns) for r in batch]
+
+
+def client(**options):
+    c = PolyClient(options)
+    customers = c.backends["redis"] = FakeConnector(CUSTOMERS, "customerId")
+    orders = c.backends["postgres"] = FakeConnector(ORDERS, "orderId")
+    c._catalogue["orders"] = ("postgres", "orderId")
+    return c, customers, orders
+
+
+def pairs(rows):
+    return sorted((r["companyName"], r["orderId"]) for r in rows)
+
+
+@pytest.mark.asyncio
+async def test_bind_join_probes_the_pk_side_in_batches():
+    c, customers, orders = client()
+    customers.rows = CUSTOMERS * 10  # bigger than orders: probe by key
+    rows = await c.query(
+        "SELECT c.companyName, o.orderId FROM orders o "
+        "JOIN customers c ON o.customerId = c.customerId "
+        "WHERE o.freight > 10"
+    )
+    assert pairs(rows) == [("Alfreds", 3), ("Berglunds", 2)]
+    kinds = [call[0] for call in customers.calls]
+    assert "scan" not in kinds and kinds.count("get_many") == 2
+    # only the columns the query needs travel
+    needed = ("orderId", "customerId", "freight")
+    assert orders.calls[0] == ("scan", tuple((c, c) for c in needed))
+
+
+@pytest.mark.asyncio
+async def test_pk_predicate_is_pushed_down_and_hash_join_builds_small_side():
+    c, customers, orders = client()
+    rows = await c.query(
+        "SELECT * FROM customers c JOIN orders o "
+        "ON c.customerId = o.customerId WHERE c.customerId IN (?, ?)",
+        params=["A", "C"],
+    )
+    assert customers.calls == [("get_many", ["A", "C"], None)]
+    assert sorted(r["orderId"] for r in rows) == [1, 3]
+    assert set(rows[0]) == {
+        "c.customerId",
+        "companyName",
+        "orderId",
+        "o.customerId",
+        "freight",
+    }
+
+
+@pytest.mark.asyncio
+async def test_spilled_join_matches_in_memory_join():
+    sql = (
+        "SELECT c.companyName, o.orderId FROM customers c "
+        "JOIN orders o ON c.customerId = o.customerId"
+    )
+    c, _, _ = client()
+    expected = pairs(await c.query(sql))
+    c, _, _ = client(join_max_build_rows=1, join_spill_partitions=3)
+    assert expected == [("Alfreds", 1), ("Alfreds", 3), ("Berglunds", 2)]
+    assert pairs(await c.query(sql)) == expected
+    streamed = [r async for r in c.stream(sql)]
+    assert pairs(streamed) == expected
+
+
+@pytest.mark.asyncio
+async def test_hash_join_spills_past_the_row_cap():
+    customers = FakeConnector(CUSTOMERS, "customerId")
+    orders = FakeConnector(ORDERS, "orderId")
+    left = Join.JoinSide("customers", "c")
+    right = Join.JoinSide("orders", "o")
+    left.key = right.key = "customerId"
+    joiner = Join.HashJoin(max_rows=2, partitions=4)
+    build = Join.JoinInput(left, lambda: customers.scan("customers"), 3)
+    probe = Join.JoinInput(right, lambda: orders.scan("orders"), 4)
+    found = [p async for batch in joiner.run(build, probe) for p in batch]
+    assert joiner.spilled and joiner.build_rows == 3
+    assert sorted(o["orderId"] for _, o in found) == [1, 2, 3]
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "SELECT * FROM customers c LEFT JOIN orders o "
+        "ON c.customerId = o.customerId",
+        "SELECT * FROM customers c JOIN orders o ON customerId = o.orderId",
+        "SELECT * FROM customers c JOIN orders o "
+        "ON c.customerId = o.customerId WHERE c.companyName = o.freight",
+    ],
+)
+def test_unsupported_joins(sql):
+    c, _, _ = client()
+    with pytest.raises(NotImplementedError):
+        c._plan(sql)
+
+
+def test_catalogue_change_invalidates_join_plans():
+    c, _, _ = client()
+    sql = "SELECT * FROM customers c JOIN orders o ON c.customerId = o.pk"
+    c._plan(sql)
+    c._catalogue["orders"] = ("neo4j", "orderId")
+    assert c._plan(sql).right.backend == "neo4j"
@@ -0,0 +1,104 @@
+# tests/test_lazy_connectors.py
+import gc
+import pathlib
+import subprocess
+import sys
+from importlib import metadata
+
+import pytest
+from polyfuseql.benchmark.InMemory import InMemoryConnector
+from polyfuseql.catalogue import Catalogue as catalogue_module
+from polyfuseql.catalogue.Catalogue import Catalogue
+from polyfuseql.client.PolyClient import PolyClient
+from polyfuseql.connector.ConnectorFactory import ConnectorFactory
+
+IN_MEMORY = "polyfuseql.benchmark.InMemory:InMemoryConnector"
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+
+def test_drivers_are_imported_on_first_use_of_their_backend():
+    code = (
+        "import sys\n"
+        "from polyfuseql.client.PolyClient import PolyClient\n"
+        "c = PolyClient()\n"
+        "drivers = ('asyncpg', 'redis', 'neo4j')\n"
+        "print(*[d for d in drivers if d in sys.modules])\n"
+        "c.rd\n"
+        "print(*[d for d in drivers if d in sys.modules])\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT
+    )
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.splitlines() == ["", "redis"]
+
+
+def test_connectors_are_built_once_and_shared_by_aliases():
+    c = PolyClient()
+    assert not c.backends
+    assert c.backends["pg"] is c.backends["postgres"] is c.pg
+    assert set(c.backends) == {"pg", "postgres"}
+    assert c.pg.telemetry is c.telemetry
+    with pytest.raises(ValueError):
+        c._connector("mongo")
+    # a replaced routing entry leaves the client's own connector alone
+    c.backends["redis"] = fake = InMemoryConnector()
+    assert c.rd is not fake
+
+
+def test_registered_and_entry_point_connectors(monkeypatch):
+    monkeypatch.setattr(ConnectorFactory, "_registry", {})
+    monkeypatch.setattr(ConnectorFactory, "_entry_points_loaded", False)
+    ep = metadata.EntryPoint("memory", IN_MEMORY, "polyfuseql.connectors")
+    monkeypatch.setattr(metadata, "entry_points", lambda group: [ep])
+    assert ConnectorFactory.available() == ["memory"]
+
+    c = PolyClient()
+    conn = c.backends["memory"]
+    assert isinstance(conn, InMemoryConnector)
+    assert ConnectorFactory._registry["memory"] is InMemoryConnector
+
+    ConnectorFactory.register("memo", IN_MEMORY)
+    assert isinstance(c.backends["memo"], InMemoryConnector)
+    with pytest.raises(ValueError):
+        ConnectorFactory.create_connector("postgres")
+
+
+@pytest.mark.asyncio
+async def test_queries_reach_a_plugin_backend(monkeypatch):
+    monkeypatch.setitem(ConnectorFactory._registry, "memory", IN_MEMORY)
+    c = PolyClient()
+    c.backends["memory"].load("items", [{"itemId": 1, "n": 2}], "itemId")
+    c._catalogue["items"] = ("memory", "itemId")
+    rows = await c.query("SELECT n FROM items WHERE itemId = 1")
+    assert list(rows) == [{"n": 2}]
+    await c.aclose()
+
+
+def test_neo4j_picks_up_key_hints_when_created():
+    c = PolyClient()
+    c._catalogue["person"] = ("neo4j", "personId")
+    assert "neo4j" not in c.backends
+    assert c.nj._key_hints["person"] == "personId"
+    c._catalogue["person"] = ("neo4j", "uid")
+    assert c.nj._key_hints["person"] == "uid"
+
+
+def test_shared_catalogue_and_mapping_read_once():
+    before = catalogue_module._mapping_file.cache_info().misses
+    Catalogue()
+    Catalogue()
+    assert catalogue_module._mapping_file.cache_info().misses == before
+
+    shared = Catalogue.shared()
+    a = PolyClient({"catalogue": "shared"})
+    b = PolyClient({"catalogue": shared})
+    assert a._catalogue is b._catalogue is shared
+    assert PolyClient()._catalogue is not shared
+
+    listeners = len(shared._listeners)
+    del a, b
+    gc.collect()
+    shared["customers"] = shared["customers"]  # unchanged: no callback
+    shared.set_replicas("customers", [])
+    assert len(shared._listeners) < listeners
@@ -0,0 +1,70 @@
+# tests/test_neo4j_key_resolution.py
+import logging
+
+import pytest
+from polyfuseql.client.PolyClient import PolyClient
+from polyfuseql.connector.Neo4j import Neo4jConnector
+
+
+class FakeResult:
+    def __init__(self, record):
+        self._record = record
+
+    async def single(self):
+        return self._record
+
+
+class FakeSession:
+    def __init__(self, props, indexes=0):
+        self.props, self.indexes = props, indexes
+        self.queries = []
+
+    async def run(self, query, params=None, **kwargs):
+        self.queries.append(query)
+        if "nodeTypeProperties" in query:
+            return FakeResult({"props": self.props})
+        return FakeResult({"n": self.indexes})
+
+
+@pytest.mark.asyncio
+async def test_key_is_resolved_once_from_schema(caplog):
+    nj = Neo4jConnector()
+    nj.set_key_hint("customer", "customerId")
+    session = FakeSession(["companyName", "customerID"])
+    with caplog.at_level(logging.WARNING):
+        prop = await nj._resolve_key(session, "customer", ["ALFKI"])
+    assert prop == "customerID"
+    assert "No index on :Customer(customerID)" in caplog.text
+
+    assert await nj._resolve_key(session, "customer", ["ANATR"]) == prop
+    assert len(session.queries) == 2  # schema probe + index check only
+
+    nj.invalidate("customer")
+    await nj._resolve_key(session, "customer", ["ALFKI"])
+    assert len(session.queries) == 4
+
+
+@pytest.mark.asyncio
+async def test_explicit_key_mapping_skips_probing():
+    nj = Neo4jConnector({"neo4j_keys": {"Product": "productID"}})
+    session = FakeSession([])
+    assert await nj._resolve_key(session, "product", ["1"]) == "productID"
+    assert session.queries == []
+    nj._count_avoided("product", "productID", complete=True, probed=False)
+    assert nj.key_resolution_stats()["probes_avoided"] == 1
+
+
+def test_catalogue_pk_is_used_as_hint():
+    c = PolyClient()
+    assert c.nj._key_hints["customer"] == "customerId"
+
+
+@pytest.mark.asyncio
+async def test_repeated_neo4j_gets_are_single_queries():
+    c = PolyClient()
+    await c.get("customer", "ALFKI", "neo4j")
+    probes = c.nj.probe_queries
+    doc = await c.get("customer", "ANATR", "neo4j")
+    assert doc["customerID"] == "ANATR"
+    assert c.nj.probe_queries == probes
+    assert c.nj.probes_avoided > 0
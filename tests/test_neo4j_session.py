@@ -0,0 +1,150 @@
+# tests/test_neo4j_session.py
+import asyncio
+
+import pytest
+from neo4j import AsyncGraphDatabase
+from polyfuseql.connector.Neo4j import Neo4jConnector
+
+
+class FakeResult:
+    def __init__(self, records):
+        self.records = records
+
+    async def single(self):
+        return self.records[0]
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for rec in self.records:
+            yield rec
+
+
+class FakeTx:
+    def __init__(self, session):
+        self.session = session
+
+    async def run(self, query, params=None, **kwargs):
+        self.session.queries.append(query)
+        await asyncio.sleep(0)
+        if "UNWIND" in query:
+            ids = kwargs["ids"]
+            return FakeResult([{"id": i, "p": {"id": i}} for i in ids])
+        if "count(n)" in query:
+            return FakeResult([{"n": 3}])
+        return FakeResult([{"p": {"id": kwargs["id"]}}])
+
+
+class FakeSession:
+    def __init__(self, driver, config):
+        self.driver, self.config = driver, config
+        self.queries, self.transactions, self.busy = [], [], False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def execute_read(self, work, *args):
+        assert not self.busy, "a session runs one transaction at a time"
+        self.busy = True
+        try:
+            self.transactions.append("read")
+            return await work(FakeTx(self), *args)
+        finally:
+            self.busy = False
+
+
+class FakeDriver:
+    def __init__(self):
+        self.sessions = []
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+    def session(self, **config):
+        self.sessions.append(FakeSession(self, config))
+        return self.sessions[-1]
+
+
+def connector(options=None):
+    nj = Neo4jConnector({"neo4j_keys": {"customer": "customerID"}, **options})
+    nj._driver = FakeDriver()
+    return nj
+
+
+@pytest.mark.asyncio
+async def test_lookups_are_read_transactions_in_read_sessions():
+    nj = connector({})
+    assert await nj.get("customer", "ALFKI") == {"id": "ALFKI"}
+    assert await nj.count("customer") == 3
+    assert len(nj._driver.sessions) == 2
+    for session in nj._driver.sessions:
+        assert session.config["default_access_mode"] == "READ"
+        assert session.config["bookmark_manager"] is None
+        assert session.transactions == ["read"]
+
+
+@pytest.mark.asyncio
+async def test_scoped_session_is_shared_by_the_calls_of_a_block():
+    nj = connector({})
+    async with nj.session() as s:
+        async with nj.session() as inner:
+            assert inner is s
+        found = await asyncio.gather(
+            nj.get("customer", "ALFKI"),
+            nj.get_many("customer", ["ANATR", "AROUT"]),
+            nj.count("customer"),
+        )
+    assert found[1] == {"ANATR": {"id": "ANATR"}, "AROUT": {"id": "AROUT"}}
+    assert nj._driver.sessions == [s] and len(s.transactions) == 3
+
+    await nj.get("customer", "ALFKI")  # outside the block: a new session
+    assert len(nj._driver.sessions) == 2
+
+
+@pytest.mark.asyncio
+async def test_causal_consistency_shares_one_bookmark_manager():
+    nj = connector({"causal_consistency": "true"})
+    await nj.get("customer", "ALFKI")
+    await nj.count("customer")
+    first, second = nj._driver.sessions
+    manager = first.config["bookmark_manager"]
+    assert manager is not None and second.config["bookmark_manager"] is manager
+
+
+def test_driver_pool_settings(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        AsyncGraphDatabase, "driver", lambda *a, **kw: calls.append((a, kw))
+    )
+    monkeypatch.setenv("NEO4J_SCHEME", "neo4j")
+    nj = Neo4jConnector({"max_pool_size": 20, "acquisition_timeout": 2})
+    assert not calls  # created lazily
+    nj._driver
+    (uri,), kwargs = calls[0]
+    assert uri.startswith("neo4j://")
+    assert kwargs["max_connection_pool_size"] == 20
+    assert kwargs["connection_acquisition_timeout"] == 2.0
+    assert kwargs["max_connection_lifetime"] == 3600.0
+
+
+@pytest.mark.asyncio
+async def test_closed_connector_opens_a_new_driver(monkeypatch):
+    drivers = []
+
+    def driver(*args, **kwargs):
+        drivers.append(FakeDriver())
+        return drivers[-1]
+
+    monkeypatch.setattr(AsyncGraphDatabase, "driver", driver)
+    nj = Neo4jConnector({"neo4j_keys": {"customer": "customerID"}})
+    assert await nj.get("customer", "ALFKI") == {"id": "ALFKI"}
+    await nj.aclose()
+    await nj.aclose()  # closing twice is harmless
+    assert await nj.get("customer", "ALFKI") == {"id": "ALFKI"}
+    assert len(drivers) == 2 and drivers[0].closed
+    assert not drivers[1].closed
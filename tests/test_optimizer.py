@@ -0,0 +1,150 @@
+# tests/test_optimizer.py
+import sqlglot
+import pytest
+from polyfuseql.client.PolyClient import PolyClient
+from polyfuseql.optimizer import LogicalPlan
+from polyfuseql.optimizer.Optimizer import Optimizer
+
+PRODUCTS = [{"productId": str(i), "productName": f"p{i}"} for i in range(10)]
+
+
+class FakeConnector:
+    max_batch_size = 100
+    scan_batch_size = 4
+
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.calls = []
+        self.closed = False
+
+    async def get_many(self, entity, pks, columns=None):
+        self.calls.append(("get_many", list(pks)))
+        if self.fail:
+            raise ConnectionError("replica down")
+        return {r["productId"]: r for r in PRODUCTS if r["productId"] in pks}
+
+    async def scan(self, entity, batch_size=None, columns=None):
+        self.calls.append(("scan", batch_size))
+        size = batch_size or self.scan_batch_size
+        try:
+            for start in range(0, len(PRODUCTS), size):
+                end = start + size
+                yield PRODUCTS[start:end]
+        finally:
+            self.closed = True
+
+
+def logical(sql):
+    ast = sqlglot.parse_one(sql, dialect="mysql")
+    return Optimizer().optimize(ast)
+
+
+def test_pushdown_rules():
+    plan = logical(
+        "SELECT c.companyName, o.orderId FROM customers c "
+        "JOIN orders o ON c.customerId = o.customerId "
+        "WHERE o.freight > 10 AND c.customerId = 'A' "
+        "AND c.city = o.shipCity LIMIT 5"
+    )
+    limit, project, where, join = LogicalPlan.layers(plan)
+    c, o = join.left, join.right
+    assert [p.sql() for p in o.predicates] == ["o.freight > 10"]
+    assert [p.sql() for p in c.predicates] == ["c.customerId = 'A'"]
+    assert [w.sql() for w in where.conditions] == ["c.city = o.shipCity"]
+    assert c.columns == ["companyName", "customerId", "city"]
+    assert o.columns == ["orderId", "customerId", "freight", "shipCity"]
+    # the residual filter drops rows after the join: LIMIT stays on top
+    assert limit.count == 5 and c.limit is None and o.limit is None
+
+    scan = LogicalPlan.layers(logical("SELECT * FROM products LIMIT 3"))[3]
+    assert scan.limit == 3 and scan.columns is None
+    text = "\n".join(LogicalPlan.render(plan))
+    assert "Filter c.city = o.shipCity" in text
+    assert "Scan orders AS o [o.freight > 10]" in text
+
+
+def test_positional_params_keep_query_order_across_join_sides():
+    c = PolyClient()
+    c._catalogue["orders"] = ("postgres", "orderId")
+    plan = c._plan(
+        "SELECT * FROM customers c JOIN orders o "
+        "ON c.customerId = o.customerId "
+        "WHERE o.orderId = ? AND c.customerId IN (?, ?)"
+    )
+    assert plan.bind(["10", "A", "B"]) == (["A", "B"], ["10"])
+
+
+def client():
+    c = PolyClient()
+    primary = c.backends["postgres"] = FakeConnector()
+    replica = c.backends["redis"] = FakeConnector()
+    c._catalogue["products"] = ("postgres", "productId")
+    c._catalogue.set_replicas("products", ["redis"])
+    return c, primary, replica
+
+
+@pytest.mark.asyncio
+async def test_cheapest_replica_serves_the_lookup():
+    c, primary, replica = client()
+    sql = "SELECT * FROM products WHERE productId IN (1, 2)"
+    stats = c._optimizer.stats
+    stats.observe("postgres", 0.050, 2)
+    stats.observe("redis", 0.001, 2)
+    rows = await c.query(sql)
+    assert [r["productName"] for r in rows] == ["p1", "p2"]
+    assert replica.calls and not primary.calls
+
+    # a failing replica is steered away from on the next queries
+    replica.fail = True
+    with pytest.raises(ConnectionError):
+        await c.query(sql)
+    await c.query(sql)
+    assert primary.calls
+    assert c._catalogue.replicas("products") == ["postgres", "redis"]
+
+
+def test_cost_model_reproduces_observed_timings():
+    optimizer = Optimizer()
+    stats = optimizer.stats
+
+    def took(rows):  # 5 ms per round trip, 10 µs per row
+        return 0.005 + rows * 0.00001
+
+    for _ in range(30):
+        stats.observe("postgres", took(1), 1)
+        stats.observe("postgres", took(5000), 5000)
+    for rows in (1, 2, 100, 5000, 100000):
+        assert optimizer.cost("postgres", "t", rows) == pytest.approx(
+            took(rows), rel=0.01
+        )
+    assert stats.latency("redis") is None
+
+
+@pytest.mark.asyncio
+async def test_limit_caps_scans_and_lookups():
+    c, primary, _ = client()
+    rows = [r async for r in c.stream("SELECT * FROM products LIMIT 3")]
+    assert len(rows) == 3
+    assert primary.calls == [("scan", 3)] and primary.closed
+
+    sql = "SELECT * FROM products WHERE productId IN (1, 2, 3) LIMIT 2"
+    assert len(await c.query(sql)) == 2
+    # a full scan records the table's cardinality
+    [r async for r in c.stream("SELECT * FROM products")]
+    assert c._optimizer.estimate("products") == len(PRODUCTS)
+
+
+def test_explain_shows_physical_plan_and_costs():
+    c, _, _ = client()
+    c._catalogue["orders"] = ("postgres", "orderId")
+    c._optimizer.stats.observe("postgres", 0.002, 1)
+    text = c.explain("SELECT * FROM products WHERE productId IN (1, 2)")
+    assert "Lookup products.productId (2 key(s)) on redis" in text
+    assert "redis=0.000ms (chosen)" in text and "postgres=" in text
+
+    text = c.explain(
+        "SELECT c.companyName FROM customers c JOIN orders o "
+        "ON c.customerId = o.customerId WHERE o.orderId IN (1, 2)"
+    )
+    assert "BindJoin outer=o inner=c" in text
+    assert "Scan orders AS o [o.orderId IN (1, 2)]" in text
@@ -0,0 +1,68 @@
+# tests/test_plan_cache.py
+import pytest
+from polyfuseql.client.PlanCache import normalize_sql
+from polyfuseql.client.PolyClient import PolyClient
+
+
+class FakeConnector:
+    max_batch_size = 100
+
+    async def get(self, entity, pk):
+        return {"customerId": pk}
+
+    async def get_many(self, entity, pks):
+        return {pk: {"customerId": pk} for pk in pks}
+
+
+def client() -> PolyClient:
+    c = PolyClient()
+    c.backends["redis"] = FakeConnector()
+    return c
+
+
+def test_normalize_keeps_quoted_whitespace():
+    sql = "SELECT *\n  FROM customers   WHERE customerId = 'A  B' ;"
+    expected = "SELECT * FROM customers WHERE customerId = 'A  B'"
+    assert normalize_sql(sql) == expected
+
+
+@pytest.mark.asyncio
+async def test_one_plan_serves_every_bound_value():
+    c = client()
+    sql = "SELECT * FROM customers WHERE customerId = ?"
+    for pk in ("ALFKI", "ANATR", "ANTON"):
+        rows = await c.query(sql, params=[pk])
+        assert rows == [{"customerId": pk}]
+    spaced = "SELECT  *  FROM customers\n WHERE customerId = ?"
+    rows = await c.query(spaced, params=["X"])
+    assert rows == [{"customerId": "X"}]
+    stats = c.plan_cache_stats()
+    assert (stats["size"], stats["parses"], stats["hits"]) == (1, 1, 3)
+    assert stats["parse_time"] > 0
+
+
+@pytest.mark.asyncio
+async def test_named_and_positional_params_in_lists():
+    c = client()
+    rows = await c.query(
+        "SELECT * FROM customers WHERE customerId IN (?, 'B', ?)",
+        params=("A", "C"),
+    )
+    assert [r["customerId"] for r in rows] == ["A", "B", "C"]
+    rows = await c.query(
+        "SELECT * FROM customers WHERE customerId = :a OR customerId = :b",
+        params={"a": "Y", "b": "Z"},
+    )
+    assert [r["customerId"] for r in rows] == ["Y", "Z"]
+    with pytest.raises(ValueError):
+        await c.query("SELECT * FROM customers WHERE customerId = :id")
+
+
+def test_catalogue_change_invalidates_plans():
+    c = client()
+    c._plan("SELECT * FROM customers WHERE customerId = ?")
+    assert c._plan("SELECT * FROM customers WHERE customerId = ?").backend
+    c._catalogue["customers"] = ("postgres", "customer_id")
+    plan = c._plan("SELECT * FROM customers WHERE customerId = ?")
+    assert plan.backend is None
+    assert c.plan_cache_stats()["parses"] == 2
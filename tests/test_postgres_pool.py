@@ -0,0 +1,23 @@
+# tests/test_postgres_pool.py
+import pytest
+from polyfuseql.client.PolyClient import PolyClient
+from polyfuseql.connector.Postgres import PostgresConnector
+
+
+def test_pool_settings_from_options_and_env(monkeypatch):
+    monkeypatch.setenv("POSTGRES_POOL_MAX_SIZE", "7")
+    conn = PostgresConnector({"pool_min_size": 2})
+    assert conn._min_size == 2
+    assert conn._max_size == 7
+    assert conn._pool is None  # created lazily
+
+
+@pytest.mark.asyncio
+async def test_pool_is_shared_and_drained():
+    async with PolyClient() as c:
+        pool = c.pg._pool
+        assert pool is not None
+        assert await c.pg.ping()
+        assert await c.pg.count("products") > 0
+        assert c.pg._pool is pool
+    assert c.pg._pool is None
@@ -0,0 +1,199 @@
+# tests/test_predicate.py
+import fnmatch
+import json
+
+import pytest
+import sqlglot
+from polyfuseql.client.PolyClient import PolyClient
+from polyfuseql.connector import Predicate as P
+from polyfuseql.connector.Neo4j import _where_cypher
+from polyfuseql.connector.Postgres import _where_sql
+from polyfuseql.connector.Redis import RedisConnector, _search_query
+from polyfuseql.optimizer import LogicalPlan
+from redis.exceptions import ResponseError
+
+PRODUCTS = [
+    {"productId": 1, "productName": "Chai", "unitPrice": 18},
+    {"productId": 2, "productName": "Chang", "unitPrice": 19},
+    {"productId": 3, "productName": "Aniseed Syrup", "unitPrice": 10},
+    {"productId": 4, "productName": "Chef Anton", "unitPrice": 22},
+    {"productId": 5, "productName": "Gumbo Mix", "unitPrice": None},
+]
+
+
+def where(condition):
+    sql = f"SELECT * FROM products WHERE {condition}"
+    ast = sqlglot.parse_one(sql, dialect="mysql")
+    LogicalPlan.from_ast(ast)  # numbers the `?` placeholders
+    return LogicalPlan.predicate(ast.args["where"].this)
+
+
+def test_sql_conditions_compile_to_predicates():
+    assert where("10 < unitPrice") == P.Cmp("unitPrice", "gt", 10)
+    pred = where("unitPrice BETWEEN 10 AND 20 AND productName LIKE 'Ch%'")
+    assert pred == P.And(
+        (
+            P.Cmp("unitPrice", "between", (10, 20)),
+            P.Cmp("productName", "like", "Ch%"),
+        )
+    )
+    pred = where("NOT (productId IN (1, 2) OR unitPrice IS NULL)")
+    assert pred == P.Not(
+        P.Or(
+            (
+                P.Cmp("productId", "in", (1, 2)),
+                P.Cmp("unitPrice", "null"),
+            )
+        )
+    )
+    with pytest.raises(NotImplementedError):
+        where("unitPrice = NULL")
+
+
+def test_evaluate_follows_three_valued_logic():
+    gumbo = PRODUCTS[4]
+    assert P.evaluate(P.Cmp("unitPrice", "gt", 10), gumbo) is None
+    assert P.evaluate(P.Not(P.Cmp("unitPrice", "gt", 10)), gumbo) is None
+    either = P.Or((P.Cmp("unitPrice", "gt", 10), P.Cmp("productId", "eq", 5)))
+    assert P.evaluate(either, gumbo) is True
+    like = P.Cmp("productName", "like", "Ch_i%")
+    assert [p["productId"] for p in PRODUCTS if P.matches(like, p)] == [1]
+    # Redis hashes hold numbers as text
+    assert P.matches(P.Cmp("unitPrice", "gte", 18), {"unitPrice": "18.0"})
+
+
+def test_stores_compile_the_same_filter_natively():
+    pred = where("unitPrice BETWEEN ? AND ? AND productName LIKE ?")
+    pred = P.bind(pred, [10, 20, "Ch%"])
+    args = []
+    expected = "t.unit_price BETWEEN $1 AND $2 AND t.product_name LIKE $3"
+    assert _where_sql(pred, args) == f"({expected})"
+    assert args == [10, 20, "Ch%"]
+
+    params = {}
+    cypher = _where_cypher(pred, params)
+    assert "n.productName STARTS WITH $w2" in cypher
+    assert params["w2"] == "Ch"
+
+    schema = {"unitPrice": "NUMERIC", "category": "TAG"}
+    assert _search_query(pred, schema) == ("(@unitPrice:[10 20])", False)
+    cheap = P.Cmp("unitPrice", "lt", 15)
+    assert _search_query(cheap, schema) == ("@unitPrice:[-inf (15]", True)
+    # a TAG match is inexact: it cannot be negated in the index
+    tag = P.Cmp("category", "eq", "Dairy Products")
+    assert _search_query(P.Not(tag), schema) is None
+    assert _search_query(P.Cmp("productName", "eq", "Chai"), schema) is None
+
+
+class FakeIndex:
+    def __init__(self, attributes):
+        self.attributes = attributes
+
+    async def info(self):
+        if self.attributes is None:
+            raise ResponseError("Unknown index name")
+        return {"attributes": self.attributes}
+
+
+class FakeRedis:
+    """String-encoded products, optionally with a RediSearch index."""
+
+    def __init__(self, attributes=None):
+        self.docs = {f"Product:{p['productId']}:string": p for p in PRODUCTS}
+        self.attributes = attributes
+        self.calls = []
+
+    def ft(self, index):
+        return FakeIndex(self.attributes)
+
+    async def scan(self, cursor=0, match=None, count=None, _type=None):
+        self.calls.append("SCAN")
+        names = sorted(k for k in self.docs if fnmatch.fnmatchcase(k, match))
+        nxt = cursor + count
+        return (nxt if nxt < len(names) else 0), names[cursor:nxt]
+
+    async def mget(self, keys):
+        docs = [self.docs.get(k) for k in keys]
+        return [json.dumps(d) if d else None for d in docs]
+
+    async def execute_command(self, *args):
+        self.calls.append(args[0])
+        assert args[2] == "@unitPrice:[-inf (15]"
+        keys = [k for k, d in self.docs.items() if (d["unitPrice"] or 99) < 15]
+        offset, size = args[5], args[6]
+        end = offset + size
+        return [len(keys), *keys[offset:end]]
+
+
+async def redis_scan(fake, pred, columns=None):
+    rd = RedisConnector({"data_type": "string"})
+    rd._client = fake
+    scan = rd.scan("Product", 2, columns, where=pred)
+    return [row async for batch in scan for row in batch]
+
+
+@pytest.mark.asyncio
+async def test_redis_filters_through_the_index_or_while_scanning():
+    cheap = P.Cmp("unitPrice", "lt", 15)
+    schema = [["identifier", "$.unitPrice", "attribute", "unitPrice"]]
+    schema[0] += ["type", "NUMERIC"]
+    fake = FakeRedis(schema)
+    rows = await redis_scan(fake, cheap)
+    assert [r["productId"] for r in rows] == [3]
+    assert fake.calls == ["FT.SEARCH"]
+
+    fake = FakeRedis()
+    name = P.Cmp("productName", "like", "Ch%")
+    rows = await redis_scan(fake, name, (("id", "productId"),))
+    assert sorted(r["id"] for r in rows) == [1, 2, 4]
+    assert rows[0].keys() == {"id"} and "FT.SEARCH" not in fake.calls
+
+
+class FakeConnector:
+    max_batch_size = 100
+    scan_batch_size = 2
+
+    def __init__(self) -> None:
+        self.wheres = []
+
+    async def get_many(self, entity, pks, columns=None):
+        by_pk = {str(p["productId"]): p for p in PRODUCTS}
+        return {pk: by_pk[pk] for pk in pks if pk in by_pk}
+
+    async def scan(self, entity, batch_size=None, columns=None, where=None):
+        self.wheres.append(where)
+        rows = [p for p in PRODUCTS if P.matches(where, p)]
+        size = batch_size or self.scan_batch_size
+        for start in range(0, len(rows), size):
+            end = start + size
+            yield rows[start:end]
+
+
+@pytest.mark.asyncio
+async def test_query_pushes_filters_to_the_store():
+    c = PolyClient()
+    store = c.backends["postgres"] = FakeConnector()
+    c._catalogue["products"] = ("postgres", "productId")
+    sql = (
+        "SELECT productName FROM products "
+        "WHERE unitPrice BETWEEN ? AND 20 AND productName LIKE 'Ch%'"
+    )
+    rows = await c.query(sql, params=[15])
+    assert [r["productName"] for r in rows] == ["Chai", "Chang"]
+    assert store.wheres == [
+        P.And(
+            (
+                P.Cmp("unitPrice", "between", (15, 20)),
+                P.Cmp("productName", "like", "Ch%"),
+            )
+        )
+    ]
+    assert "filter: (unitPrice BETWEEN ? AND 20" in c.explain(sql)
+
+    # next to the pk predicate the filter applies to the looked-up rows
+    sql = "SELECT productName FROM products WHERE productId IN (1, 3, 4) "
+    rows = await c.query(sql + "AND unitPrice > 15")
+    assert list(rows) == [
+        {"productName": "Chai"},
+        {"productName": "Chef Anton"},
+    ]
@@ -0,0 +1,93 @@
+# tests/test_projection.py
+import json
+
+import pytest
+from polyfuseql.client.PolyClient import PolyClient
+from polyfuseql.connector.Neo4j import _return_expr
+from polyfuseql.connector.Postgres import _select_expr
+from polyfuseql.connector.Redis import _from_fields, _from_paths
+
+COLUMNS = (("name", "productName"), ("unitPrice", "unitPrice"))
+
+
+class FakeConnector:
+    max_batch_size = 100
+
+    def __init__(self) -> None:
+        self.columns = []
+
+    async def get(self, entity, pk, columns=None):
+        self.columns.append(columns)
+        row = {"productId": pk, "productName": "Chai", "unitPrice": 18}
+        if columns is None:
+            return row
+        return {alias: row[col] for alias, col in columns}
+
+    async def get_many(self, entity, pks, columns=None):
+        return {pk: await self.get(entity, pk, columns) for pk in pks}
+
+
+def test_parse_projection_with_aliases():
+    c = PolyClient()
+    sql = "SELECT productName AS name, unitPrice FROM products WHERE "
+    _, _, _, columns = c._parse(sql + "productId = 1")
+    assert columns == COLUMNS
+    assert c._parse("SELECT * FROM products WHERE productId = 1")[3] is None
+
+
+@pytest.mark.parametrize(
+    "select",
+    ["COUNT(*)", "*, productName", "a AS x, b AS x", "unitPrice * 2"],
+)
+def test_unsupported_projections(select):
+    c = PolyClient()
+    with pytest.raises(NotImplementedError):
+        c._parse(f"SELECT {select} FROM products WHERE productId = 1")
+
+
+@pytest.mark.asyncio
+async def test_projection_is_pushed_to_the_connector():
+    c = PolyClient({"cache": True})
+    fake = c.backends["redis"] = FakeConnector()
+    sql = "SELECT productName AS name, unitPrice FROM products WHERE "
+    rows = await c.query(sql + "productId = 1", engine="redis")
+    assert rows == [{"name": "Chai", "unitPrice": 18}]
+    assert fake.columns == [COLUMNS]
+    rows = await c.query(sql + "productId IN (1, 2)", engine="redis")
+    assert [r["name"] for r in rows] == ["Chai", "Chai"]
+
+    # SELECT * is cached apart from the projection, without columns=
+    await c.query("SELECT * FROM products WHERE productId = 1", engine="redis")
+    assert fake.columns[-1] is None
+
+
+def test_native_projections():
+    select = 't.product_name AS "name", t.unit_price AS "unitPrice"'
+    assert _select_expr(COLUMNS) == select
+    assert _select_expr(None) == "t.*"
+    assert _return_expr(COLUMNS) == "n {name: n.productName, .unitPrice}"
+
+    paths = ["$.productName", "$.unitPrice"]
+    raw = json.dumps({"$.productName": ["Chai"], "$.unitPrice": []})
+    row = _from_paths(raw, paths, COLUMNS)
+    assert row == {"name": "Chai", "unitPrice": None}
+    row = _from_paths("[18]", ["$.unitPrice"], COLUMNS[1:])
+    assert row == {"unitPrice": 18}
+    assert _from_paths(None, paths, COLUMNS) is None
+    assert _from_fields(["Chai", "18"], COLUMNS) == {
+        "name": "Chai",
+        "unitPrice": "18",
+    }
+    assert _from_fields([None, None], COLUMNS) is None
+
+
+@pytest.mark.asyncio
+async def test_projection_postgres_products():
+    c = PolyClient()
+    rows = await c.query(
+        "SELECT productName AS name, unitPrice FROM products "
+        "WHERE productId IN (1, 2)",
+        engine="postgres",
+    )
+    assert [set(r) for r in rows] == [{"name", "unitPrice"}] * 2
+    assert rows[0]["name"] == "Chai"
@@ -0,0 +1,94 @@
+# tests/test_query_fan_out.py
+import asyncio
+
+import pytest
+from polyfuseql.client.PolyClient import PolyClient
+
+SQL = "SELECT * FROM customers WHERE customerId = 'ALFKI'"
+
+
+class FakeConnector:
+    def __init__(self, delay=0.0, doc=None, fail=False):
+        self.delay, self.fail = delay, fail
+        self.doc = doc or {"companyName": "Alfreds Futterkiste"}
+        self.cancelled = False
+
+    async def get(self, entity, pk):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.fail:
+            raise ConnectionError("backend down")
+        return self.doc
+
+
+def client(**fakes) -> PolyClient:
+    c = PolyClient()
+    c.backends.update(fakes)
+    return c
+
+
+@pytest.mark.asyncio
+async def test_gather_runs_concurrently_and_reports_failures():
+    c = client(
+        redis=FakeConnector(0.05),
+        postgres=FakeConnector(0.05),
+        neo4j=FakeConnector(fail=True),
+    )
+    started = asyncio.get_running_loop().time()
+    rows = await c.query(
+        SQL, engines=["redis", "postgres", "neo4j"], include_source=True
+    )
+    assert asyncio.get_running_loop().time() - started < 0.09
+    assert [r["_source"] for r in rows] == ["redis", "postgres"]
+    assert isinstance(rows.errors["neo4j"], ConnectionError)
+
+
+@pytest.mark.asyncio
+async def test_first_returns_fastest_and_cancels_the_rest():
+    slow = FakeConnector(1.0)
+    c = client(redis=FakeConnector(0.01), neo4j=slow)
+    rows = await c.query(
+        SQL, engines=["neo4j", "redis"], mode="first", include_source=True
+    )
+    assert rows[0]["_source"] == "redis"
+    assert slow.cancelled
+
+
+@pytest.mark.asyncio
+async def test_timeout_is_per_backend():
+    c = client(redis=FakeConnector(0.0), neo4j=FakeConnector(1.0))
+    rows = await c.query(
+        SQL,
+        engines=["redis", "neo4j"],
+        timeout={"neo4j": 0.01},
+    )
+    assert len(rows) == 1
+    assert isinstance(rows.errors["neo4j"], asyncio.TimeoutError)
+
+
+@pytest.mark.asyncio
+async def test_quorum_needs_agreeing_answers():
+    other = {"companyName": "Someone Else"}
+    c = client(
+        redis=FakeConnector(0.0, doc=other),
+        postgres=FakeConnector(0.01),
+        neo4j=FakeConnector(0.02),
+    )
+    rows = await c.query(
+        SQL,
+        engines=["redis", "postgres", "neo4j"],
+        mode="quorum",
+    )
+    assert rows == [{"companyName": "Alfreds Futterkiste"}]
+    with pytest.raises(RuntimeError):
+        await c.query(SQL, engines=["redis", "postgres"], mode="quorum")
+
+
+@pytest.mark.asyncio
+async def test_unknown_engine_in_fan_out():
+    c = PolyClient()
+    with pytest.raises(ValueError):
+        await c.query(SQL, engines=["redis", "oracle"])
@@ -0,0 +1,54 @@
+# tests/test_query_in.py
+import pytest
+from polyfuseql.client.PolyClient import PolyClient
+
+
+class FakeConnector:
+    max_batch_size = 2
+
+    def __init__(self) -> None:
+        self.calls = []
+
+    async def get_many(self, entity, pks):
+        self.calls.append(list(pks))
+        return {pk: {"customerId": pk} for pk in pks}
+
+
+def test_parse_in_list_and_or_chain():
+    c = PolyClient()
+    _, pk_col, pk_val = c.query_parse_validate_grammar(
+        "SELECT * FROM customers WHERE customerId IN ('B', 'A', 'B')"
+    )
+    assert (pk_col, pk_val) == ("customerId", ["B", "A"])
+    _, _, pk_val = c.query_parse_validate_grammar(
+        "SELECT * FROM customers "
+        "WHERE customerId = 'A' OR (customerId = 'C' OR customerId = 'B')"
+    )
+    assert pk_val == ["A", "C", "B"]
+
+
+def test_or_on_different_columns_is_rejected():
+    c = PolyClient()
+    with pytest.raises(NotImplementedError):
+        c.query_parse_validate_grammar(
+            "SELECT * FROM customers WHERE customerId = 'A' OR city = 'B'"
+        )
+
+
+@pytest.mark.asyncio
+async def test_in_list_is_chunked_and_ordered():
+    c = PolyClient()
+    fake = c.backends["redis"] = FakeConnector()
+    rows = await c.query(
+        "SELECT * FROM customers WHERE customerId IN ('C', 'A', 'B')",
+        engine="redis",
+    )
+    assert [r["customerId"] for r in rows] == ["C", "A", "B"]
+    assert fake.calls == [["C", "A"], ["B"]]
+
+
+@pytest.mark.asyncio
+async def test_query_products_in_postgres():
+    c = PolyClient()
+    rows = await c.query("SELECT * FROM products WHERE productId IN (2, 1)")
+    assert [r["productName"] for r in rows] == ["Chang", "Chai"]
@@ -0,0 +1,125 @@
+# tests/test_redis_count.py
+import fnmatch
+
+import pytest
+from polyfuseql.connector.Redis import RedisConnector
+from redis.exceptions import ResponseError
+
+
+class FakeIndex:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def info(self):
+        if self.docs is None:
+            raise ResponseError("Unknown index name")
+        return {"num_docs": self.docs}
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio.Redis for the count paths."""
+
+    def __init__(self, keys, index_docs=None):
+        self.keys = dict(keys)  # key -> TYPE
+        self.sets = {}
+        self.index_docs = index_docs
+        self.calls = []
+
+    def ft(self, index):
+        self.calls.append("FT.INFO")
+        return FakeIndex(self.index_docs)
+
+    async def scan(self, cursor=0, match=None, count=None, _type=None):
+        self.calls.append("SCAN")
+        names = sorted(
+            k
+            for k, t in self.keys.items()
+            if fnmatch.fnmatchcase(k, match) and (_type in (None, t))
+        )
+        nxt = cursor + count
+        page = names[cursor:nxt]
+        return (nxt if nxt < len(names) else 0), page
+
+    async def type(self, key):
+        return "set" if key in self.sets else "none"
+
+    async def scard(self, key):
+        self.calls.append("SCARD")
+        return len(self.sets[key])
+
+    async def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(members)
+
+    async def srem(self, key, *members):
+        self.sets.get(key, set()).difference_update(members)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.sets.pop(key, None)
+
+    async def rename(self, src, dst):
+        self.sets[dst] = self.sets.pop(src)
+
+
+KEYS = {
+    **{f"Customer:{i}:string": "string" for i in range(7)},
+    **{f"Customer:{i}:hash": "hash" for i in range(5)},
+    "Customer:9:json": "ReJSON-RL",
+    "Product:1:string": "string",
+}
+
+
+def connector(fake, **options) -> RedisConnector:
+    rd = RedisConnector({"data_type": "string", **options})
+    rd._client = fake
+    return rd
+
+
+@pytest.mark.asyncio
+async def test_scan_counts_only_the_configured_representation():
+    fake = FakeRedis(KEYS)
+    rd = connector(fake, count_mode="scan", scan_count=2)
+    assert await rd.count("Customer") == 7
+    assert fake.calls.count("SCAN") == 4
+    rd._options["data_type"] = "hash"
+    assert await rd.count("Customer") == 5
+
+
+@pytest.mark.asyncio
+async def test_auto_prefers_index_then_counter_then_scan():
+    fake = FakeRedis(KEYS, index_docs=42)
+    assert await connector(fake).count("Customer") == 42
+    assert "SCAN" not in fake.calls
+
+    fake = FakeRedis(KEYS)
+    rd = connector(fake)
+    assert await rd.count("Customer") == 7
+    await rd.count("Customer")
+    assert fake.calls.count("FT.INFO") == 1  # missing index remembered
+
+    await rd.rebuild_count("Customer")
+    fake.calls.clear()
+    assert await rd.count("Customer") == 7
+    assert fake.calls == ["SCARD"]
+
+
+@pytest.mark.asyncio
+async def test_set_counter_is_built_once_and_maintained():
+    fake = FakeRedis(KEYS)
+    rd = connector(fake, count_mode="set")
+    assert await rd.count("Customer") == 7
+    assert fake.sets["polyfuseql:count:Customer:string"] == {
+        f"{i}:string" for i in range(7)
+    }
+    await rd.track("Customer", ["7:string", "8:string"])
+    await rd.untrack("Customer", ["0:string"])
+    fake.calls.clear()
+    assert await rd.count("Customer") == 8
+    assert "SCAN" not in fake.calls
+
+
+def test_scan_nodes_and_mode_settings():
+    rd = RedisConnector({"scan_nodes": "a:7000, b:7001"})
+    assert rd.scan_nodes == [("a", 7000), ("b", 7001)]
+    with pytest.raises(ValueError):
+        RedisConnector({"count_mode": "guess"})
@@ -0,0 +1,113 @@
+# tests/test_redis_pipeline.py
+import asyncio
+import json
+
+import pytest
+from polyfuseql.connector.AutoPipeline import AutoPipeline
+from polyfuseql.connector.Redis import RedisConnector
+
+
+class FakeJSON:
+    def __init__(self, redis):
+        self.redis = redis
+
+    async def get(self, key):
+        return self.redis.docs.get(key)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.docs, self.mgets, self.wrappers = {}, [], 0
+
+    async def mget(self, keys):
+        self.mgets.append(list(keys))
+        docs = [self.docs.get(k) for k in keys]
+        return [json.dumps(d) if d else None for d in docs]
+
+    def json(self):
+        self.wrappers += 1
+        return FakeJSON(self)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_gets_share_one_mget():
+    rd = RedisConnector({"data_type": "string", "auto_pipeline": "true"})
+    rd._client = fake = FakeRedis()
+    fake.docs = {"Customer:A": {"id": "A"}, "Customer:B": {"id": "B"}}
+    pks = ["A", "B", "A", "Z"]
+    rows = await asyncio.gather(*(rd.get("Customer", pk) for pk in pks))
+    assert rows == [{"id": "A"}, {"id": "B"}, {"id": "A"}, {}]
+    assert rows[0] is not rows[2]  # each waiter owns its row
+    assert fake.mgets == [["Customer:A", "Customer:B", "Customer:Z"]]
+    assert rd._pipeline.stats()["batches"] == 1
+
+    await rd.get("Customer", "B")  # a lone get is not held back
+    assert fake.mgets[-1] == ["Customer:B"]
+
+
+@pytest.mark.asyncio
+async def test_auto_pipeline_splits_at_max_batch_and_shares_errors():
+    batches = []
+
+    async def fetch(keys):
+        batches.append(list(keys))
+        if "bad" in keys:
+            raise ConnectionError("down")
+        return [k.upper() for k in keys]
+
+    pipe = AutoPipeline(fetch, window=0.01, max_batch=2)
+    found = await asyncio.gather(*(pipe.get(k) for k in "abc"))
+    assert found == ["A", "B", "C"]
+    assert batches == [["a", "b"], ["c"]]
+
+    with pytest.raises(ConnectionError):
+        await asyncio.gather(pipe.get("bad"), pipe.get("d"))
+
+
+@pytest.mark.asyncio
+async def test_closing_cancels_waiters_and_copies_are_deep():
+    async def fetch(keys):
+        return [{"tags": [k]} for k in keys]
+
+    pipe = AutoPipeline(fetch)
+    first, second = await asyncio.gather(pipe.get("a"), pipe.get("a"))
+    first["tags"].append("mine")
+    assert second == {"tags": ["a"]}
+
+    started = asyncio.Event()
+
+    async def hang(keys):
+        started.set()
+        await asyncio.sleep(10)
+
+    pipe = AutoPipeline(hang)
+    gets = [asyncio.ensure_future(pipe.get(k)) for k in "ab"]
+    await started.wait()
+    parked = asyncio.ensure_future(pipe.get("c"))
+    await asyncio.sleep(0)
+    await pipe.aclose()
+    results = await asyncio.gather(*gets, parked, return_exceptions=True)
+    assert all(isinstance(r, asyncio.CancelledError) for r in results)
+    assert not pipe._flushes
+
+
+@pytest.mark.asyncio
+async def test_json_commands_are_built_once_per_client():
+    rd = RedisConnector({"data_type": "json"})
+    rd._client = fake = FakeRedis()
+    fake.docs = {"Customer:A": {"id": "A"}}
+    for _ in range(3):
+        assert await rd.get("Customer", "A") == {"id": "A"}
+    assert fake.wrappers == 1
+
+
+def test_pool_settings(monkeypatch):
+    monkeypatch.setenv("REDIS_SOCKET_KEEPALIVE", "no")
+    monkeypatch.setenv("REDIS_RESP3", "1")
+    rd = RedisConnector({"data_type": "hash", "max_connections": 8})
+    pool = rd._new_client("cache", 6380).connection_pool
+    assert pool.max_connections == 8 and pool.timeout == 5.0
+    kwargs = pool.connection_kwargs
+    assert kwargs["host"] == "cache" and kwargs["port"] == 6380
+    assert kwargs["protocol"] == 3 and kwargs["socket_keepalive"] is False
+    assert kwargs["socket_timeout"] == 5.0 and kwargs["decode_responses"]
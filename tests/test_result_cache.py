@@ -0,0 +1,144 @@
+# tests/test_result_cache.py
+import asyncio
+
+import pytest
+from polyfuseql.cache.LRUCache import LRUCache
+from polyfuseql.cache.ResultCache import ResultCache
+from polyfuseql.client.PolyClient import PolyClient
+
+
+class FakeConnector:
+    max_batch_size = 100
+
+    def __init__(self) -> None:
+        self.gets, self.batches = [], []
+
+    async def get(self, entity, pk):
+        self.gets.append(pk)
+        await asyncio.sleep(0.01)
+        return {"customerId": pk}
+
+    async def get_many(self, entity, pks):
+        self.batches.append(list(pks))
+        return {pk: {"customerId": pk} for pk in pks if pk != "missing"}
+
+
+def cached_client(**cache) -> tuple[PolyClient, FakeConnector]:
+    c = PolyClient({"cache": cache or True})
+    fake = c.backends["redis"] = FakeConnector()
+    return c, fake
+
+
+def test_lru_bounds_and_ttl():
+    now = [0.0]
+    lru = LRUCache(max_entries=2, ttl=10, clock=lambda: now[0])
+    lru.set("a", {"v": 1})
+    lru.set("b", {"v": 2})
+    lru.set("c", {"v": 3})
+    assert lru.get("a") is None and lru.evictions == 1
+    now[0] = 11
+    assert lru.get("b") is None and lru.expirations == 1
+
+    small = LRUCache(max_bytes=25)
+    small.set("a", {"v": "x" * 10})
+    small.set("b", {"v": "y" * 10})
+    assert len(small) == 1 and small.get("b") == {"v": "y" * 10}
+
+
+@pytest.mark.asyncio
+async def test_get_is_read_through_and_single_flight():
+    c, fake = cached_client()
+    reads = [c.get("Customer", "1", "redis") for _ in range(5)]
+    docs = await asyncio.gather(*reads)
+    assert all(doc == {"customerId": "1"} for doc in docs)
+    assert fake.gets == ["1"]  # one backend call for five readers
+    await c.get("Customer", "1", "redis")
+    assert fake.gets == ["1"]
+    stats = c.cache_stats()
+    assert stats["coalesced"] == 4 and stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_many_only_fetches_uncached_keys():
+    c, fake = cached_client()
+    await c.get_many("Customer", ["a", "b"], "redis")
+    rows = await c.get_many("Customer", ["b", "c", "missing"], "redis")
+    assert [r["customerId"] for r in rows] == ["b", "c"]
+    assert rows.missing == ["missing"]
+    assert fake.batches == [["a", "b"], ["c", "missing"]]
+
+
+@pytest.mark.asyncio
+async def test_invalidate_row_and_table():
+    c, fake = cached_client()
+    await c.get_many("Customer", ["a", "b"], "redis")
+    await c.invalidate("customer", "a")
+    await c.get_many("Customer", ["a", "b"], "redis")
+    assert fake.batches[-1] == ["a"]
+    await c.invalidate_table("CUSTOMER")
+    await c.get_many("Customer", ["a", "b"], "redis")
+    assert fake.batches[-1] == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_cached_rows_are_copies():
+    c, _ = cached_client()
+    doc = await c.get("Customer", "1", "redis")
+    doc["customerId"] = "changed"
+    assert (await c.get("Customer", "1", "redis"))["customerId"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_waiters_load_again_when_the_fetch_is_cancelled():
+    cache = ResultCache(LRUCache())
+    key = ("redis", "Customer", "1", "*")
+    calls = []
+
+    async def load(keys):
+        calls.append(keys)
+        await asyncio.sleep(0.05 if len(calls) == 1 else 0)
+        return {k: {"customerId": k[2]} for k in keys}
+
+    fetch = asyncio.create_task(cache.get_many([key], load))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_many([key], load))
+    await asyncio.sleep(0)
+    fetch.cancel()
+    assert await waiter == {key: {"customerId": "1"}}
+    assert fetch.cancelled() and len(calls) == 2
+    assert cache.stats()["inflight"] == 0
+
+    async def failing(keys):
+        await asyncio.sleep(0.01)
+        raise ConnectionError("store down")
+
+    other = ("redis", "Customer", "2", "*")
+    reads = [cache.get_many([other], failing) for _ in range(2)]
+    results = await asyncio.gather(*reads, return_exceptions=True)
+    assert all(isinstance(r, ConnectionError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_l2_hit_overlapping_an_invalidation_is_not_cached():
+    class SlowL2:
+        async def get_many(self, keys):
+            await asyncio.sleep(0.01)  # invalidated meanwhile
+            return {key: {"customerId": "stale"} for key in keys}
+
+        async def set_many(self, items):
+            pass
+
+        async def invalidate(self, entity, pk=None):
+            pass
+
+    cache = ResultCache(LRUCache(), SlowL2())
+    key = ("redis", "Customer", "1", "*")
+
+    async def load(keys):
+        return {}
+
+    read = asyncio.create_task(cache.get_many([key], load))
+    await asyncio.sleep(0)
+    await cache.invalidate("Customer")
+    assert await read == {key: {"customerId": "stale"}}
+    assert cache.l1.get(key) is None
@@ -0,0 +1,80 @@
+# tests/test_row_shape.py
+import datetime
+import uuid
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from polyfuseql.connector.Postgres import _PK, PostgresConnector
+from polyfuseql.connector.RowShape import RowShape
+from polyfuseql.utils.utils import _camelize_keys
+
+
+def attrs(*columns):
+    return [
+        SimpleNamespace(name=name, type=SimpleNamespace(name=kind))
+        for name, kind in columns
+    ]
+
+
+@pytest.mark.parametrize(
+    "kind, value, as_json",
+    [
+        ("numeric", Decimal("18"), "18"),
+        ("numeric", Decimal("18.00"), "18.00"),
+        ("numeric", Decimal("NaN"), '"NaN"'),
+        ("float4", 18.399999618530273, "18.4"),
+        ("float4", 18.0, "18"),
+        ("float8", 0.1, "0.1"),
+        ("float8", 2.0, "2"),
+        ("float8", float("inf"), '"Infinity"'),
+        ("date", datetime.date(1996, 7, 4), '"1996-07-04"'),
+        ("timestamp", datetime.datetime(1996, 7, 4), '"1996-07-04T00:00:00"'),
+        ("jsonb", '{"a": [1]}', '{"a": [1]}'),
+        ("bytea", b"\x01\xff", '"\\\\x01ff"'),
+        ("uuid", uuid.UUID(int=1), f'"{uuid.UUID(int=1)}"'),
+        ("varchar", "Chai", '"Chai"'),
+        ("int4", None, "null"),
+    ],
+)
+def test_record_rows_match_the_row_to_json_ones(kind, value, as_json):
+    shape = RowShape(attrs(("unit_price", kind)), camelize=True)
+    legacy = _camelize_keys(f'{{"unit_price": {as_json}}}')
+    assert shape.row((value,)) == legacy
+
+
+def test_shape_names_columns_once_and_keeps_the_pk_column():
+    shape = RowShape(
+        attrs((_PK, "text"), ("product_id", "int2"), ("qty_per_unit", "text")),
+        camelize=True,
+        keep=(_PK,),
+    )
+    assert shape.names == (_PK, "productId", "qtyPerUnit")
+    assert shape.converters == ()
+    assert shape.rows([("1", 1, "x")]) == [
+        {_PK: "1", "productId": 1, "qtyPerUnit": "x"}
+    ]
+    projected = RowShape(attrs(("unitPrice", "numeric")))
+    assert projected.row((Decimal("1.5"),)) == {"unitPrice": 1.5}
+
+
+class FakeStatement:
+    def __init__(self, *columns):
+        self.calls = 0
+        self.columns = columns
+
+    def get_attributes(self):
+        self.calls += 1
+        return attrs(*self.columns)
+
+
+def test_connector_caches_shapes_until_the_table_changes():
+    pg = PostgresConnector()
+    stmt = FakeStatement(("product_id", "int2"))
+    key = ("products", "product_id", "*")
+    assert pg._shape(key, stmt, None) is pg._shape(key, stmt, None)
+    assert stmt.calls == 1
+    pg.invalidate("Products")
+    assert pg.shapes == {}
+    pg._shape(key, stmt, None)
+    assert stmt.calls == 2
@@ -0,0 +1,115 @@
+# tests/test_service.py
+import asyncio
+
+import pytest
+from polyfuseql.benchmark.InMemory import InMemoryConnector
+from polyfuseql.client.PolyClient import PolyClient
+from polyfuseql.service.Service import Service
+from polyfuseql.service.SingleFlight import SingleFlight
+
+PRODUCTS = [
+    {"productId": 1, "productName": "Chai"},
+    {"productId": 2, "productName": "Chang"},
+]
+
+
+class Counting(InMemoryConnector):
+    def __init__(self):
+        super().__init__({"latency": 0.02})
+        self.calls = 0
+        self.closed = False
+        self.load("products", PRODUCTS, "productId")
+
+    async def get(self, entity, pk, columns=None):
+        self.calls += 1
+        return await super().get(entity, pk, columns)
+
+    async def count(self, entity):
+        self.calls += 1
+        return await super().count(entity)
+
+    async def aclose(self):
+        self.closed = True
+
+
+def client():
+    c = PolyClient()
+    c.pg = c.backends["pg"] = c.backends["postgres"] = Counting()
+    c.rd = c.nj = InMemoryConnector()
+    return c
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_requests_share_one_backend_call():
+    service = Service(client())
+    calls = [service.get("products", "1") for _ in range(5)]
+    calls += [service.count("products"), service.count("products")]
+    calls.append(service.get("products", "2"))
+    found = await asyncio.gather(*calls)
+    assert found[0] == PRODUCTS[0] and found[5] == 2
+    assert found[-1] == PRODUCTS[1]
+    assert service.client.pg.calls == 3
+    stats = service.stats()
+    assert stats["requests"] == 8 and stats["coalesced"] == 5
+
+    await service.get("products", "1")  # the earlier flight has landed
+    assert service.client.pg.calls == 4
+
+    service = Service(client(), coalesce=False)
+    await asyncio.gather(*(service.get("products", "1") for _ in range(3)))
+    assert service.client.pg.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_query_payload_and_pool_drain():
+    service = Service(client())
+    await service.start()
+    sql = "SELECT * FROM products WHERE productId IN (?, ?)"
+    found = await service.query(sql, ["2", "9"])
+    assert found == {"rows": [PRODUCTS[1]], "missing": ["9"], "errors": {}}
+    found = await service.get_many("products", ["1", "9"])
+    assert found == {"rows": [PRODUCTS[0]], "missing": ["9"]}
+    await service.stop()
+    assert service.client.pg.closed
+
+
+@pytest.mark.asyncio
+async def test_single_flight_survives_a_departed_caller():
+    flights = SingleFlight()
+    started = []
+
+    async def call():
+        started.append(1)
+        await asyncio.sleep(0.02)
+        return "row"
+
+    first = asyncio.ensure_future(flights.do("k", call))
+    second = asyncio.ensure_future(flights.do("k", call))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == "row" and started == [1]
+
+    async def fail():
+        raise ValueError("bad sql")
+
+    calls = [flights.do("bad", fail), flights.do("bad", fail)]
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flights.stats()["inflight"] == 0
+
+
+def test_app_endpoints():
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+    from polyfuseql.service.App import create_app
+
+    with TestClient(create_app(client)) as http:
+        reply = http.get("/get/products/1")
+        assert reply.json() == PRODUCTS[0] and reply.headers["X-Worker"]
+        assert http.get("/get/products/9").status_code == 404
+        assert http.get("/count/products").json()["count"] == 2
+        body = {"table": "products", "pks": ["2"]}
+        rows = http.post("/get_many", json=body).json()["rows"]
+        assert rows == [PRODUCTS[1]]
+        sql = "DELETE FROM products WHERE productId = 1"
+        assert http.post("/query", json={"sql": sql}).status_code == 501
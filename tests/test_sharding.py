@@ -0,0 +1,233 @@
+# tests/test_sharding.py
+import time
+
+import pytest
+from polyfuseql.benchmark.InMemory import InMemoryConnector
+from polyfuseql.client.PolyClient import PolyClient
+from polyfuseql.connector.Aggregation import Agg, Aggregation, combine
+from polyfuseql.connector.ConnectorFactory import ConnectorFactory
+from polyfuseql.connector.Sharding import (
+    ConsistentShards,
+    HashShards,
+    RangeShards,
+    ShardedConnector,
+    merge,
+    shard_map,
+)
+
+
+def order(i):
+    return {"orderId": i, "customerId": "ABC"[i % 3], "freight": i * 1.5}
+
+
+ORDERS = [order(i) for i in range(1, 31)]
+KEYS = [str(row["orderId"]) for row in ORDERS]
+
+
+class Recording(InMemoryConnector):
+    def __init__(self, options=None):
+        super().__init__(options)
+        self.calls = []
+        self.opened = False
+
+    async def open(self):
+        self.opened = True
+
+    async def get(self, entity, pk, columns=None):
+        self.calls.append(("get", pk))
+        return await super().get(entity, pk, columns)
+
+    async def get_many(self, entity, pks, columns=None):
+        self.calls.append(("get_many", sorted(pks)))
+        return await super().get_many(entity, pks, columns)
+
+
+def client(monkeypatch, by="hash", latency=0.0, **spec):
+    monkeypatch.setitem(ConnectorFactory._registry, "memory", Recording)
+    c = PolyClient()
+    c._catalogue["orders"] = ("memory", "orderId")
+    c._catalogue["orders_whole"] = ("memory", "orderId")
+    names = ("m0", "m1", "m2")
+    instances = [{"name": n, "latency": latency} for n in names]
+    spec = {"by": by, "instances": instances, **spec}
+    c._catalogue.set_shards("orders", spec)
+    return c
+
+
+async def loaded(monkeypatch, by="hash", **spec):
+    c = client(monkeypatch, by, **spec)
+    result = await c.insert("orders", ORDERS)
+    assert dict(result) == {"memory": len(ORDERS)}
+    c.backends["memory"].load("orders_whole", ORDERS, "orderId")
+    return c
+
+
+def sharded(c):
+    return c._sharded_connector("memory", "orders")
+
+
+@pytest.mark.parametrize(
+    "by,spec",
+    [("hash", {}), ("range", {"bounds": [10, 20]}), ("consistent", {})],
+)
+@pytest.mark.asyncio
+async def test_rows_live_on_their_owning_shard_only(monkeypatch, by, spec):
+    c = await loaded(monkeypatch, by, **spec)
+    conn = sharded(c)
+    stored = [s._entities.get("orders", {}) for s in conn.shards]
+    assert sum(len(rows) for rows in stored) == len(ORDERS)
+    for i, rows in enumerate(stored):
+        assert all(conn.shard_map.owner(pk) == i for pk in rows)
+    if by == "range":
+        assert [sorted(map(int, rows)) for rows in stored] == [
+            list(range(1, 10)),
+            list(range(10, 20)),
+            list(range(20, 31)),
+        ]
+    assert await c.count("orders", "memory") == len(ORDERS)
+
+
+@pytest.mark.asyncio
+async def test_point_lookups_and_in_lists_go_to_the_owning_shards(monkeypatch):
+    c = await loaded(monkeypatch)
+    conn = sharded(c)
+    owner = conn.shards[conn.shard_map.owner("7")]
+    rows = await c.query("SELECT freight FROM orders WHERE orderId = 7")
+    assert list(rows) == [{"freight": 10.5}]
+    assert [s.calls for s in conn.shards if s is not owner] == [[], []]
+    assert owner.calls == [("get", "7")]
+
+    for s in conn.shards:
+        s.calls.clear()
+    sql = "SELECT orderId FROM orders WHERE orderId IN (3, 4, 5, 6, 99)"
+    rows = await c.query(sql)
+    assert [r["orderId"] for r in rows] == [3, 4, 5, 6]
+    split = conn.shard_map.split(["3", "4", "5", "6", "99"])
+    assert len(split) > 1
+    for i, s in enumerate(conn.shards):
+        expected = [("get_many", sorted(split[i]))] if i in split else []
+        assert s.calls == expected
+
+
+@pytest.mark.asyncio
+async def test_shards_are_read_concurrently(monkeypatch):
+    c = client(monkeypatch, latency=0.05)
+    await c.insert("orders", ORDERS)
+    started = time.perf_counter()
+    found = await c.get_many("orders", KEYS, "memory")
+    assert len(found) == len(ORDERS)
+    rows = [row async for row in c.stream("SELECT * FROM orders")]
+    assert sorted(r["orderId"] for r in rows) == list(range(1, 31))
+    assert time.perf_counter() - started < 0.3  # not 3 + 3 round trips each
+
+
+@pytest.mark.asyncio
+async def test_scans_and_aggregates_match_the_unsharded_table(monkeypatch):
+    c = await loaded(monkeypatch, "consistent")
+    for sql in (
+        "SELECT * FROM {} WHERE freight > 20",
+        "SELECT customerId, COUNT(*) AS n, SUM(freight) AS total, "
+        "AVG(freight) AS mean, MIN(orderId) AS lo FROM {} "
+        "GROUP BY customerId HAVING AVG(freight) > 22",
+        "SELECT COUNT(*) AS n, AVG(freight) FROM {} WHERE freight > 1000",
+    ):
+        found = await c.query(sql.format("orders"))
+        whole = await c.query(sql.format("orders_whole"))
+        assert sorted(map(str, found)) == sorted(map(str, whole))
+    rows = [row async for row in c.stream("SELECT * FROM orders LIMIT 4")]
+    assert len(rows) == 4
+
+    await c.delete("orders", ["1", "2", "29"])
+    await c.update("orders", ["3", "28"], {"freight": 0})
+    rows = await c.query("SELECT orderId FROM orders WHERE freight < 1")
+    assert sorted(r["orderId"] for r in rows) == [3, 28]
+    assert await c.count("orders", "memory") == len(ORDERS) - 3
+
+
+@pytest.mark.asyncio
+async def test_open_warms_the_shards_and_new_options_get_new_shards(
+    monkeypatch,
+):
+    c = client(monkeypatch)
+    c.pg, c.rd, c.nj = (InMemoryConnector() for _ in range(3))
+    await c.open()
+    conn = sharded(c)
+    assert all(shard.opened for shard in conn.shards)
+
+    spec = c._catalogue.shards("orders")
+    instances = [{**i, "latency": 0.01} for i in spec["instances"]]
+    c._catalogue.set_shards("orders", {**spec, "instances": instances})
+    moved = sharded(c)
+    assert moved.shards[0] is not conn.shards[0]
+    assert [s.latency for s in moved.shards] == [0.01] * 3
+    c._catalogue.set_shards("orders", spec)
+    assert sharded(c).shards == conn.shards  # same options: reused
+
+
+def test_consistent_hashing_moves_only_the_new_shards_keys():
+    keys = [str(i) for i in range(20000)]
+    names = ["pg-a:5432", "pg-b:5432", "pg-c:5432", "pg-d:5432"]
+    before = ConsistentShards(names)
+    after = ConsistentShards(names + ["pg-e:5432"])
+    moved = [k for k in keys if before.owner(k) != after.owner(k)]
+    assert 0.1 < len(moved) / len(keys) < 0.3  # about 1/5
+    assert all(after.owner(k) == 4 for k in moved)  # all to the new shard
+
+    hashed = HashShards(names), HashShards(names + ["pg-e:5432"])
+    remapped = sum(hashed[0].owner(k) != hashed[1].owner(k) for k in keys)
+    assert remapped / len(keys) > 0.6
+
+
+def test_shard_specs_are_validated():
+    ranges = RangeShards(["a", "b", "c"], [100, 200])
+    owners = [ranges.owner(k) for k in ("5", 100, "150.5", 10**6)]
+    assert owners == [0, 1, 1, 2]
+    assert RangeShards(["a", "b"], ["m"]).owner("kiwi") == 0
+    with pytest.raises(ValueError):
+        ranges.owner("abc")
+    with pytest.raises(ValueError):
+        RangeShards(["a", "b"], [])
+    with pytest.raises(ValueError):
+        shard_map({"by": "modulo", "instances": [{}]})
+    with pytest.raises(ValueError):
+        shard_map({"by": "hash", "instances": []})
+    spec = {"by": "consistent", "instances": [{"host": "h"}, {"host": "h"}]}
+    with pytest.raises(ValueError):
+        shard_map(spec)
+    with pytest.raises(ValueError):
+        ShardedConnector([InMemoryConnector()], HashShards(["a", "b"]))
+
+
+@pytest.mark.asyncio
+async def test_merge_closes_every_source_when_stopped_early():
+    closed = []
+
+    async def source(name):
+        try:
+            for i in range(100):
+                yield (name, i)
+        finally:
+            closed.append(name)
+
+    merged = merge([source("a"), source("b")])
+    seen = [await merged.__anext__() for _ in range(3)]
+    await merged.aclose()
+    assert len(seen) == 3
+    assert sorted(closed) == ["a", "b"]
+
+
+def test_explain_names_the_shards_of_a_lookup(monkeypatch):
+    c = client(monkeypatch)
+    text = c.explain("SELECT * FROM orders WHERE orderId = 7")
+    assert "shards: 1 of 3 (hash), queried concurrently" in text
+    text = c.explain("SELECT * FROM orders")
+    assert "shards: 3 (hash), queried concurrently" in text
+
+
+def test_combined_min_max_keep_values_as_stored():
+    aggregation = Aggregation((), (Agg("min", "zip"), Agg("max", "zip")))
+    low, high = {"a0": "01234", "a1": "01234"}, {"a0": "12209", "a1": "12209"}
+    parts = [[low], [high]]
+    assert combine(aggregation, parts) == [{"a0": "01234", "a1": "12209"}]
+    parts = [[{"a0": "05021", "a1": "05021"}], [{"a0": "WX3 6FW", "a1": 7}]]
+    assert combine(aggregation, parts) == [{"a0": "05021", "a1": "05021"}]
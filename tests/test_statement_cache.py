@@ -0,0 +1,54 @@
+# tests/test_statement_cache.py
+import pytest
+from polyfuseql.client.PolyClient import PolyClient
+from polyfuseql.connector.StatementCache import StatementCache
+
+
+class FakeConnection:
+    def __init__(self, pid: int) -> None:
+        self.pid = pid
+        self.prepared = []
+
+    def get_server_pid(self) -> int:
+        return self.pid
+
+    async def prepare(self, sql: str) -> str:
+        self.prepared.append(sql)
+        return f"stmt<{sql}>"
+
+
+@pytest.mark.asyncio
+async def test_statement_cache_hits_and_lru_eviction():
+    cache = StatementCache(max_size=2)
+    conn = FakeConnection(pid=1)
+    await cache.prepare(conn, ("products", "product_id", "*"), "q1")
+    await cache.prepare(conn, ("products", "product_id", "*"), "q1")
+    await cache.prepare(conn, ("customers", "customer_id", "*"), "q2")
+    await cache.prepare(conn, ("orders", "order_id", "*"), "q3")
+    assert conn.prepared == ["q1", "q2", "q3"]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 3, 1)
+    assert stats["size"] == 2
+
+
+@pytest.mark.asyncio
+async def test_statement_cache_is_per_connection_and_invalidated():
+    cache = StatementCache()
+    first, recycled = FakeConnection(pid=1), FakeConnection(pid=2)
+    await cache.prepare(first, ("products", "product_id", "*"), "q1")
+    await cache.prepare(recycled, ("products", "product_id", "*"), "q1")
+    assert len(recycled.prepared) == 1  # not shared across backends
+
+    cache.discard_connection(1)
+    assert len(cache) == 1
+    cache.invalidate("Products")
+    assert len(cache) == 0
+
+
+def test_catalogue_change_invalidates_postgres_statements():
+    c = PolyClient()
+    c.pg.statements._by_conn[1] = {("products", "product_id", "*"): "s"}
+    c._catalogue["products"] = ("postgres", "productId")  # unchanged
+    assert len(c.pg.statements) == 1
+    c._catalogue["products"] = ("redis", "productId")
+    assert len(c.pg.statements) == 0
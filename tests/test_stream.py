@@ -0,0 +1,76 @@
+# tests/test_stream.py
+import pytest
+from polyfuseql.client.PolyClient import PolyClient
+
+
+class FakeConnector:
+    max_batch_size = 100
+    scan_batch_size = 2
+
+    def __init__(self, total=5) -> None:
+        self.total = total
+        self.pulled = 0
+        self.closed = False
+
+    async def get(self, entity, pk):
+        return {"customerId": pk}
+
+    async def scan(self, entity, batch_size=None):
+        size = batch_size or self.scan_batch_size
+        try:
+            for start in range(0, self.total, size):
+                stop = min(start + size, self.total)
+                self.pulled = stop
+                yield [{"customerId": str(i)} for i in range(start, stop)]
+        finally:
+            self.closed = True
+
+
+def client(fake) -> PolyClient:
+    c = PolyClient()
+    c.backends["redis"] = fake
+    return c
+
+
+@pytest.mark.asyncio
+async def test_stream_full_scan_in_batches():
+    fake = FakeConnector()
+    c = client(fake)
+    rows = [r async for r in c.stream("SELECT * FROM customers")]
+    assert [r["customerId"] for r in rows] == ["0", "1", "2", "3", "4"]
+    assert fake.closed
+
+
+@pytest.mark.asyncio
+async def test_stream_pulls_lazily():
+    fake = FakeConnector(total=1000)
+    c = client(fake)
+    stream = c.stream("SELECT * FROM customers", batch_size=10)
+    async for row in stream:
+        if row["customerId"] == "15":
+            break
+    await stream.aclose()
+    assert fake.pulled == 20 and fake.closed
+
+
+@pytest.mark.asyncio
+async def test_stream_with_pk_predicate_and_scan_only_grammar():
+    c = client(FakeConnector())
+    sql = "SELECT * FROM customers WHERE customerId = ?"
+    rows = [r async for r in c.stream(sql, params=["ALFKI"])]
+    assert rows == [{"customerId": "ALFKI"}]
+    with pytest.raises(NotImplementedError):
+        await c.query("SELECT * FROM customers")
+
+
+@pytest.mark.asyncio
+async def test_stream_postgres_products():
+    async with PolyClient() as c:
+        rows = [
+            r
+            async for r in c.stream(
+                "SELECT * FROM products", engine="postgres", batch_size=20
+            )
+        ]
+    assert len(rows) == 77
+    assert "productName" in rows[0]
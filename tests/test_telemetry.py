@@ -0,0 +1,102 @@
+# tests/test_telemetry.py
+import json
+import logging
+
+import pytest
+from polyfuseql.client.PolyClient import PolyClient
+from polyfuseql.connector.Redis import RedisConnector
+from polyfuseql.telemetry.Instrumentation import (
+    HistogramSink,
+    Instrumentation,
+    LoggingSink,
+    MultiSink,
+    OTelSink,
+)
+
+
+class FakeConnector:
+    max_batch_size = 100
+
+    async def get(self, entity, pk, columns=None):
+        return {"customerId": pk}
+
+
+class FakeRedis:
+    async def mget(self, keys):
+        return [json.dumps({"customerId": k}) for k in keys]
+
+
+def test_disabled_instrumentation_hands_out_one_shared_span():
+    telemetry = Instrumentation()
+    with telemetry.span("parse") as span:
+        span.set(rows=1)
+    assert telemetry.span("plan") is span
+
+
+@pytest.mark.asyncio
+async def test_client_and_connector_stages_reach_the_sink(caplog):
+    histograms = HistogramSink()
+    sink = MultiSink(histograms, LoggingSink())
+    c = PolyClient({"data_type": "string", "telemetry": sink})
+    c.backends["redis"] = FakeConnector()
+    sql = "SELECT * FROM customers WHERE customerId = ?"
+    with caplog.at_level(logging.DEBUG, "polyfuseql.telemetry"):
+        await c.query(sql, params=["ALFKI"])
+        await c.query(sql, params=["ANATR"])
+    stats = histograms.snapshot()
+    assert stats["query"]["count"] == 2
+    assert stats["parse"]["count"] == stats["plan"]["count"] == 1
+    assert stats["route@redis"]["count"] == 2
+    assert any(r.getMessage().startswith("query ") for r in caplog.records)
+
+    # the client shares its instrumentation with the connectors
+    c.rd._client = FakeRedis()
+    await c.rd.get_many("Customer", ["1:string", "2:string"])
+    stats = histograms.snapshot()
+    assert stats["round_trip@redis"]["count"] == 1
+    assert stats["deserialize@redis"]["count"] == 1
+    text = histograms.expose()
+    labels = 'stage="round_trip",backend="redis"'
+    assert f'polyfuseql_stage_seconds_bucket{{{labels},le="+Inf"}} 1' in text
+
+
+@pytest.mark.asyncio
+async def test_failing_stage_is_recorded_with_its_error():
+    records = []
+
+    class Recorder(HistogramSink):
+        def finish(self, span, token):
+            records.append((span.name, span.attrs, span.error))
+
+    rd = RedisConnector({"data_type": "string", "telemetry": Recorder()})
+
+    class Down:
+        async def get(self, key):
+            raise ConnectionError("redis down")
+
+    rd._client = Down()
+    with pytest.raises(ConnectionError):
+        await rd.get("Customer", "1:string")
+    ((name, attrs, error),) = records
+    assert name == "round_trip" and attrs == {"backend": "redis"}
+    assert isinstance(error, ConnectionError)
+
+
+def test_otel_spans_nest_like_the_calls():
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+        InMemorySpanExporter,
+    )
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    telemetry = Instrumentation(OTelSink(provider.get_tracer("test")))
+    with telemetry.span("query"):
+        with telemetry.span("round_trip", backend="redis"):
+            pass
+    inner, outer = exporter.get_finished_spans()
+    assert inner.parent.span_id == outer.context.span_id
+    assert inner.attributes["polyfuseql.backend"] == "redis"
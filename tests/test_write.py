@@ -0,0 +1,292 @@
+# tests/test_write.py
+import asyncio
+import fnmatch
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+from polyfuseql.benchmark.InMemory import InMemoryConnector
+from polyfuseql.client.PolyClient import PolyClient
+from polyfuseql.connector.Postgres import PostgresConnector
+from polyfuseql.connector.Redis import RedisConnector
+
+ROWS = [
+    {"itemId": 1, "name": "Chai", "price": 18},
+    {"itemId": 2, "name": "Chang", "price": 19},
+]
+
+
+def client(*copies):
+    c = PolyClient({"cache": True})
+    c._catalogue["items"] = ("postgres", "itemId")
+    c._catalogue.set_replicas("items", list(copies))
+    for name in ("postgres", "redis", "neo4j"):
+        c.backends[name] = InMemoryConnector()
+    return c
+
+
+class Down(InMemoryConnector):
+    async def insert(self, entity, rows, pk):
+        raise ConnectionError("store down")
+
+
+@pytest.mark.asyncio
+async def test_sql_writes_reach_every_copy_of_the_table():
+    c = client("redis")
+    sql = "INSERT INTO items (itemId, name, price) VALUES "
+    sql += "(1, 'Chai', ?), (2, ?, NULL)"
+    result = await c.execute(sql, params=[18, "Chang"])
+    assert result == {"postgres": 2, "redis": 2} and result.ok
+    assert await c.get("items", "2", backend="redis") == {
+        "itemId": 2,
+        "name": "Chang",
+        "price": None,
+    }
+
+    sql = "UPDATE items SET price = ? WHERE itemId IN (?, ?, 3)"
+    result = await c.execute(sql, params=[20, "1", "2"])
+    assert result == {"postgres": 2, "redis": 2}
+    assert (await c.get("items", "1", backend="postgres"))["price"] == 20
+
+    result = await c.execute("DELETE FROM items WHERE itemId = 1")
+    assert result == {"postgres": 1, "redis": 1}
+    assert await c.get("items", "1", backend="redis") == {}
+    assert c.plan_cache_stats()["parses"] == 3
+
+
+@pytest.mark.asyncio
+async def test_dual_write_reports_the_failed_store_and_drops_cached_rows():
+    c = client("redis")
+    await c.insert("items", ROWS)
+    assert (await c.get("items", "1", backend="redis"))["price"] == 18
+    c.backends["redis"] = Down()
+    c.backends["redis"].load("items", ROWS, "itemId")
+
+    result = await c.update("items", ["1"], {"price": 21})
+    assert result.succeeded == ["postgres", "redis"]
+    result = await c.insert("items", [{**ROWS[0], "price": 22}])
+    assert result == {"postgres": 1}
+    assert result.failed == ["redis"] and not result.ok
+    assert isinstance(result.errors["redis"], ConnectionError)
+    # the cached row of the dual-written key was dropped
+    assert (await c.get("items", "1", backend="redis"))["price"] == 21
+
+    with pytest.raises(ConnectionError):
+        await c.insert("items", ROWS, engines="redis")
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "UPDATE items SET price = 1",
+        "DELETE FROM items WHERE name = 'Chai'",
+        "UPDATE items SET price = price + 1 WHERE itemId = 1",
+        "UPDATE items SET itemId = 3 WHERE itemId = 1",
+        "INSERT INTO items (name) VALUES ('Chai')",
+        "INSERT INTO items VALUES (1, 'Chai', 18)",
+        "SELECT * FROM items WHERE itemId = 1",
+    ],
+)
+@pytest.mark.asyncio
+async def test_unsupported_writes(sql):
+    c = client()
+    with pytest.raises(NotImplementedError):
+        await c.execute(sql)
+
+
+@pytest.mark.asyncio
+async def test_invalid_writes():
+    c = client()
+    with pytest.raises(ValueError):
+        await c.execute("INSERT INTO items (itemId, name) VALUES (1)")
+    with pytest.raises(ValueError):
+        await c.execute("DELETE FROM orders WHERE orderId = 1")
+    with pytest.raises(ValueError):
+        await c.insert("items", [{"name": "Chai"}])
+
+
+@pytest.mark.asyncio
+async def test_write_statements_are_not_queries():
+    c = client()
+    await c.execute("DELETE FROM items WHERE itemId = 1")
+    with pytest.raises(NotImplementedError):
+        await c.query("DELETE FROM items WHERE itemId = 1")
+
+
+class FakePipeline:
+    def __init__(self, redis, transaction):
+        self.redis, self.transaction = redis, transaction
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def watch(self, *keys):
+        self.redis.watched = keys
+
+    async def mget(self, keys):
+        return [self.redis.data.get(k) for k in keys]
+
+    def multi(self):
+        pass
+
+    async def execute(self):
+        self.redis.executed.append((self.transaction, self.commands))
+        replies = []
+        for name, args, _ in self.commands:
+            if name == "exists":
+                replies.append(int(args[0] in self.redis.data))
+            elif name == "delete":
+                replies.append(
+                    sum(self.redis.data.pop(k, None) is not None for k in args)
+                )
+            elif name == "set":
+                self.redis.data[args[0]] = args[1]
+                replies.append(True)
+            else:
+                replies.append(1)
+        return replies
+
+
+class FakeRedis:
+    def __init__(self, counter="none"):
+        self.data, self.executed, self.counter = {}, [], counter
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self, transaction)
+
+    async def type(self, key):
+        return self.counter
+
+    async def scan(self, cursor=0, match=None, count=None, _type=None):
+        keys = [k for k in self.data if fnmatch.fnmatchcase(k, match)]
+        return 0, sorted(keys)
+
+    async def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+    def register_script(self, source):
+        async def script(keys, args):
+            self.executed.append(("script", keys, args))
+            return sum(key in self.data for key in keys)
+
+        return script
+
+
+@pytest.mark.asyncio
+async def test_redis_writes_are_one_multi_exec_with_the_counter():
+    rd = RedisConnector({"data_type": "hash", "count_mode": "auto"})
+    rd._client = fake = FakeRedis(counter="set")
+    rows = [{"customerId": "A", "active": True, "city": None}]
+    assert await rd.insert("Customer", rows, "customerId") == 1
+    ((transaction, commands),) = fake.executed
+    assert transaction
+    assert [name for name, _, _ in commands] == ["delete", "hset", "sadd"]
+    assert commands[1][2] == {"mapping": {"customerId": "A", "active": "true"}}
+    assert commands[2][1] == ("polyfuseql:count:Customer:hash", "A:hash")
+    assert commands[0][1] == ("Customer:A:hash",)
+
+    fake.data["Customer:A:hash"] = "hash"
+    fake.executed.clear()
+    changes = {"city": "Berlin", "fax": None}
+    assert await rd.update("Customer", ["A", "B"], changes, "customerId") == 1
+    # one script: no key deleted between a probe and the write
+    ((_, keys, args),) = fake.executed
+    assert keys == ["Customer:A:hash", "Customer:B:hash"]
+    assert args == ["hash", 1, "city", "Berlin", "fax"]
+
+    fake.counter = "string"  # a HyperLogLog cannot forget keys: drop it
+    fake.executed.clear()
+    assert await rd.delete("Customer", ["A", "B"], "customerId") == 1
+    ((_, commands),) = fake.executed
+    assert commands[1] == ("delete", ("polyfuseql:count:Customer:hash",), {})
+
+
+@pytest.mark.asyncio
+async def test_redis_string_update_merges_under_watch():
+    rd = RedisConnector({"data_type": "string"})
+    rd._client = fake = FakeRedis()
+    doc = json.dumps({"customerId": "A", "city": "Berlin"})
+    fake.data["Customer:A:string"] = doc
+    assert await rd.update("Customer", ["A", "B"], {"city": "Bonn"}, "id") == 1
+    assert fake.watched == ("Customer:A:string", "Customer:B:string")
+    doc = json.loads(fake.data["Customer:A:string"])
+    assert doc == {"customerId": "A", "city": "Bonn"}
+
+
+@pytest.mark.asyncio
+async def test_redis_rows_written_are_counted_scanned_and_read_back():
+    rd = RedisConnector({"data_type": "string", "count_mode": "scan"})
+    rd._client = fake = FakeRedis()
+    fake.data["Customer:Z:hash"] = "another representation"
+    rows = [{"customerId": "A", "city": "Bonn"}, {"customerId": "B"}]
+    assert await rd.insert("Customer", rows, "customerId") == 2
+    assert await rd.count("Customer") == 2
+    batches = [batch async for batch in rd.scan("Customer")]
+    assert sorted(r["customerId"] for b in batches for r in b) == ["A", "B"]
+    found = await rd.get_many("Customer", ["A:string", "B:string"])
+    assert list(found.values()) == rows
+    assert await rd.delete("Customer", ["A"], "customerId") == 1
+    assert await rd.count("Customer") == 1
+
+
+class FakeConnection:
+    def __init__(self):
+        self.calls = []
+
+    async def executemany(self, query, records):
+        self.calls.append(("executemany", query, records))
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.calls.append(("copy", table, records, columns))
+
+    async def execute(self, query, *args):
+        self.calls.append(("execute", query, args))
+        return f"UPDATE {len(args[-1])}"
+
+
+@pytest.mark.asyncio
+async def test_postgres_bulk_insert_switches_to_copy():
+    pg = PostgresConnector({"copy_threshold": 3})
+    conn = FakeConnection()
+
+    @asynccontextmanager
+    async def connect():
+        yield conn
+
+    pg._connect = connect
+    await pg.insert("products", ROWS, "productId")
+    await pg.insert("products", ROWS * 2, "productId")
+    (kind, query, records), copy = conn.calls
+    assert kind == "executemany"
+    columns = "(item_id, name, price) VALUES ($1, $2, $3)"
+    assert query == f"INSERT INTO products {columns}"
+    assert records == [(1, "Chai", 18), (2, "Chang", 19)]
+    assert copy[0] == "copy" and copy[3] == ["item_id", "name", "price"]
+
+    changes = {"unitPrice": 5}
+    assert await pg.update("products", ["1", "2"], changes, "productId") == 2
+    query, args = conn.calls[-1][1:]
+    where = "WHERE product_id = ANY($2)"
+    assert query == f"UPDATE products SET unit_price = $1 {where}"
+    assert args == (5, [1, 2])
+
+
+@pytest.mark.asyncio
+async def test_writes_run_concurrently():
+    c = client("redis", "neo4j")
+    for name in ("postgres", "redis", "neo4j"):
+        c.backends[name] = InMemoryConnector({"latency": 0.05})
+    started = asyncio.get_running_loop().time()
+    await c.insert("items", ROWS)
+    assert asyncio.get_running_loop().time() - started < 0.12